@@ -76,6 +76,8 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "fish_farming.pagination.StandardPagination",
+    "PAGE_SIZE": 100,
 }
 
 
@@ -114,6 +116,19 @@ DATABASES = {
     }
 }
 
+# Cache shared by every worker process on this host, so cached trees and their
+# ETags, financial summaries, biomass series and the version tokens that
+# invalidate them agree between workers (a per-process LocMemCache would let a
+# worker keep serving data another worker has invalidated). Deployments spread
+# over several hosts need a networked cache such as Redis or Memcached instead.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / ".cache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.mysql',
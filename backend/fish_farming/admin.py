@@ -2,9 +2,10 @@ from django.contrib import admin
 from .models import (
     Pond, Species, Stocking, DailyLog, FeedType, Feed, SampleType, Sampling, 
     Mortality, Harvest, AccountType, ExpenseType, IncomeType, Expense, Income, 
-    InventoryFeed, Treatment, Alert, Setting, FeedingBand, 
+    InventoryFeed, Treatment, Alert, Setting, FeedingBand, FeedingRule,
     EnvAdjustment, KPIDashboard, FishSampling, FeedingAdvice, SurvivalRate,
-    MedicalDiagnostic, Vendor, Customer, ItemService
+    MedicalDiagnostic, Vendor, Customer, ItemService, PondSpeciesPopulation,
+    PondMonthlyFact
 )
 
 
@@ -65,8 +66,8 @@ class FeedAdmin(admin.ModelAdmin):
 
 @admin.register(SampleType)
 class SampleTypeAdmin(admin.ModelAdmin):
-    list_display = ['name', 'description', 'icon', 'color', 'is_active', 'created_at']
-    list_filter = ['is_active', 'color', 'created_at']
+    list_display = ['name', 'description', 'icon', 'color', 'is_water', 'is_active', 'created_at']
+    list_filter = ['is_water', 'is_active', 'color', 'created_at']
     search_fields = ['name', 'description']
     readonly_fields = ['created_at']
 
@@ -95,6 +96,26 @@ class HarvestAdmin(admin.ModelAdmin):
     readonly_fields = ['avg_weight_kg', 'total_count', 'total_revenue', 'created_at']
 
 
+@admin.register(PondSpeciesPopulation)
+class PondSpeciesPopulationAdmin(admin.ModelAdmin):
+    list_display = ['pond', 'species', 'stocked_count', 'dead_count', 'harvested_count', 'alive_count', 'alive_weight_kg', 'updated_at']
+    list_filter = ['species', 'pond__user']
+    search_fields = ['pond__name', 'species__name']
+    readonly_fields = [
+        'stocked_count', 'stocked_weight_kg', 'dead_count', 'dead_weight_kg',
+        'harvested_count', 'harvested_weight_kg', 'alive_count', 'average_weight_kg',
+        'alive_weight_kg', 'updated_at'
+    ]
+
+
+@admin.register(PondMonthlyFact)
+class PondMonthlyFactAdmin(admin.ModelAdmin):
+    list_display = ['month', 'user', 'pond', 'species', 'feed_kg', 'mortality_count', 'harvest_kg', 'expenses', 'incomes', 'updated_at']
+    list_filter = ['month', 'user']
+    search_fields = ['pond__name', 'species__name']
+    readonly_fields = list(PondMonthlyFact.METRIC_FIELDS) + ['updated_at']
+
+
 @admin.register(ExpenseType)
 class ExpenseTypeAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'created_at']
@@ -166,6 +187,14 @@ class FeedingBandAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
 
 
+@admin.register(FeedingRule)
+class FeedingRuleAdmin(admin.ModelAdmin):
+    list_display = ['user', 'key', 'group', 'feature', 'operator', 'value', 'adjustment_percent', 'priority', 'is_active']
+    list_filter = ['group', 'is_active', 'user']
+    search_fields = ['user__username', 'key', 'feature', 'description']
+    readonly_fields = ['created_at', 'updated_at']
+
+
 @admin.register(EnvAdjustment)
 class EnvAdjustmentAdmin(admin.ModelAdmin):
     list_display = ['pond', 'date', 'adjustment_type', 'amount', 'unit']
@@ -0,0 +1,294 @@
+import hashlib
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .feeding_stages import set_feeding_band_table
+from .models import (
+    Pond, Stocking, FishSampling, Mortality, Feed, Sampling, DailyLog,
+    MedicalDiagnostic, FeedingAdvice, FeedingBand, PondSpeciesPopulation
+)
+from .rules import get_rule_plan
+
+
+# Look-back windows used by the feeding advice analyses
+MORTALITY_WINDOW_DAYS = 30
+FEED_WINDOW_DAYS = 30
+WATER_SAMPLE_WINDOW_DAYS = 30
+DAILY_LOG_WINDOW_DAYS = 7
+MEDICAL_WINDOW_DAYS = 30
+APPLIED_ADVICE_LIMIT = 5
+
+# Threads used to load the advice tables concurrently. SQLite serializes the
+# reads and pays for a new connection per thread, so there the tables load on
+# the request thread instead; the ADVICE_CONTEXT_LOAD_WORKERS setting
+# overrides either default (1 loads them one after the other).
+CONTEXT_LOAD_WORKERS = 4
+
+
+def _row_signature(row):
+    """The loaded column values of a model instance (deferred columns are skipped)"""
+    return tuple(
+        (field.attname, row.__dict__[field.attname])
+        for field in row._meta.concrete_fields if field.attname in row.__dict__
+    )
+
+
+def context_load_workers():
+    """Threads AdviceDataContext loads its tables on (1 means on the calling thread)"""
+    workers = getattr(settings, 'ADVICE_CONTEXT_LOAD_WORKERS', None)
+    if workers is None:
+        workers = 1 if connection.vendor == 'sqlite' else CONTEXT_LOAD_WORKERS
+    return workers
+
+
+class AdviceDataContext:
+    """Preloaded inputs for feeding advice generation across a set of ponds.
+
+    Every table the advice analyses read is fetched once for all ponds, so
+    generating advice for a whole farm costs a fixed number of queries
+    instead of a dozen or so per pond/species. The tables are loaded
+    concurrently outside of transactions on databases that benefit from it
+    (see context_load_workers).
+    """
+
+    def __init__(self, user, ponds=None):
+        self.user = user
+        self.now = timezone.now()
+        self.today = self.now.date()
+
+        if ponds is None:
+            ponds = Pond.objects.filter(user=user, is_active=True)
+        self.ponds = list(ponds)
+        pond_ids = [pond.id for pond in self.ponds]
+
+        loaders = [
+            ('stockings', self._load_stockings),
+            ('fish_samplings', self._load_fish_samplings),
+            ('populations', self._load_populations),
+            ('mortalities', self._load_mortalities),
+            ('feeds', self._load_feeds),
+            ('water_samples', self._load_water_samples),
+            ('daily_logs', self._load_daily_logs),
+            ('diagnostics', self._load_diagnostics),
+            ('applied_advice', self._load_applied_advice),
+            ('feeding_bands', self._load_feeding_bands),
+            ('rule_plan', self._load_rule_plan),
+        ]
+        # The loads are independent, so they can overlap on a small thread pool. Worker
+        # threads use their own connections and cannot see rows written by an open
+        # transaction, so inside one they run one after the other.
+        workers = 1 if connection.in_atomic_block else min(context_load_workers(), len(loaders))
+        if workers <= 1:
+            timings = self._timed_loads(loaders, pond_ids)
+        else:
+            # Each worker takes a share of the loaders, so it opens and closes one connection
+            timings = {}
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for share in executor.map(
+                    self._threaded_loads, [loaders[index::workers] for index in range(workers)], [pond_ids] * workers
+                ):
+                    timings.update(share)
+        # Milliseconds spent loading each table
+        self.load_timings = {name: timings[name] for name, _ in loaders}
+
+    def _timed_loads(self, loaders, pond_ids):
+        timings = {}
+        for name, loader in loaders:
+            started = time.perf_counter()
+            loader(pond_ids)
+            timings[name] = round((time.perf_counter() - started) * 1000, 2)
+        return timings
+
+    def _threaded_loads(self, loaders, pond_ids):
+        try:
+            return self._timed_loads(loaders, pond_ids)
+        finally:
+            # The worker thread's own connection
+            connection.close()
+
+    def _load_stockings(self, pond_ids):
+        # Species per pond and the latest stocking per pond/species
+        species_by_pond = defaultdict(dict)
+        latest_stockings = {}
+        for stocking in Stocking.objects.filter(pond_id__in=pond_ids).select_related('species').order_by('-date'):
+            species_by_pond[stocking.pond_id].setdefault(stocking.species_id, stocking.species)
+            latest_stockings.setdefault((stocking.pond_id, stocking.species_id), stocking)
+        self._species_by_pond = species_by_pond
+        self._latest_stockings = latest_stockings
+
+    def _load_fish_samplings(self, pond_ids):
+        # Fish samplings in date order per pond/species
+        fish_samplings = defaultdict(list)
+        for sampling in FishSampling.objects.filter(
+            pond_id__in=pond_ids, species__isnull=False
+        ).only('id', 'pond_id', 'species_id', 'date', 'average_weight_kg').order_by('date'):
+            fish_samplings[(sampling.pond_id, sampling.species_id)].append(sampling)
+        self._fish_samplings = fish_samplings
+
+    def _load_populations(self, pond_ids):
+        self._populations = {
+            (population.pond_id, population.species_id): population
+            for population in PondSpeciesPopulation.objects.filter(pond_id__in=pond_ids)
+        }
+
+    def _load_mortalities(self, pond_ids):
+        recent_mortalities = defaultdict(list)
+        for mortality in Mortality.objects.filter(
+            pond_id__in=pond_ids,
+            date__gte=self.today - timedelta(days=MORTALITY_WINDOW_DAYS)
+        ):
+            recent_mortalities[(mortality.pond_id, mortality.species_id)].append(mortality)
+        self._recent_mortalities = recent_mortalities
+
+    def _load_feeds(self, pond_ids):
+        recent_feeds = defaultdict(list)
+        for feed in Feed.objects.filter(
+            pond_id__in=pond_ids,
+            date__gte=self.today - timedelta(days=FEED_WINDOW_DAYS)
+        ).select_related('feed_type').order_by('-date'):
+            recent_feeds[feed.pond_id].append(feed)
+        self._recent_feeds = recent_feeds
+
+    def _load_water_samples(self, pond_ids):
+        latest_water_samples = {}
+        for sample in Sampling.objects.filter(
+            pond_id__in=pond_ids,
+            sample_type__is_water=True,
+            date__gte=self.today - timedelta(days=WATER_SAMPLE_WINDOW_DAYS)
+        ).order_by('-date', '-id'):
+            latest_water_samples.setdefault(sample.pond_id, sample)
+        self._latest_water_samples = latest_water_samples
+
+    def _load_daily_logs(self, pond_ids):
+        recent_daily_logs = defaultdict(list)
+        for log in DailyLog.objects.filter(
+            pond_id__in=pond_ids,
+            date__gte=self.today - timedelta(days=DAILY_LOG_WINDOW_DAYS)
+        ).order_by('-date'):
+            recent_daily_logs[log.pond_id].append(log)
+        self._recent_daily_logs = recent_daily_logs
+
+    def _load_diagnostics(self, pond_ids):
+        recent_diagnostics = defaultdict(list)
+        for diagnostic in MedicalDiagnostic.objects.filter(
+            pond_id__in=pond_ids,
+            created_at__gte=self.now - timedelta(days=MEDICAL_WINDOW_DAYS)
+        ).order_by('-created_at'):
+            recent_diagnostics[diagnostic.pond_id].append(diagnostic)
+        self._recent_diagnostics = recent_diagnostics
+
+    def _load_applied_advice(self, pond_ids):
+        # Last few applied advice per pond/species
+        applied_advice = defaultdict(list)
+        for advice in FeedingAdvice.objects.filter(
+            pond_id__in=pond_ids, species__isnull=False, is_applied=True, applied_date__isnull=False
+        ).annotate(
+            applied_rank=Window(
+                expression=RowNumber(),
+                partition_by=[F('pond_id'), F('species_id')],
+                order_by=F('applied_date').desc()
+            )
+        ).filter(applied_rank__lte=APPLIED_ADVICE_LIMIT).order_by('-applied_date'):
+            applied_advice[(advice.pond_id, advice.species_id)].append(advice)
+        self._applied_advice = applied_advice
+
+    def species_in_pond(self, pond_id):
+        """Species stocked in a pond, ordered by name"""
+        return sorted(self._species_by_pond.get(pond_id, {}).values(), key=lambda species: species.name)
+
+    def latest_stocking(self, pond_id, species_id):
+        return self._latest_stockings.get((pond_id, species_id))
+
+    def fish_samplings(self, pond_id, species_id):
+        """Fish samplings for a pond/species, oldest first"""
+        return self._fish_samplings.get((pond_id, species_id), [])
+
+    def latest_fish_sampling(self, pond_id, species_id):
+        samplings = self.fish_samplings(pond_id, species_id)
+        return samplings[-1] if samplings else None
+
+    def population(self, pond_id, species_id):
+        """Ledger row for a pond/species, or an unsaved zero row if nothing was recorded"""
+        population = self._populations.get((pond_id, species_id))
+        if population is None:
+            population = PondSpeciesPopulation(pond_id=pond_id, species_id=species_id)
+        return population
+
+    def recent_mortalities(self, pond_id, species_id):
+        return self._recent_mortalities.get((pond_id, species_id), [])
+
+    def recent_feeds(self, pond_id):
+        """Feeds in the look-back window, newest first"""
+        return self._recent_feeds.get(pond_id, [])
+
+    def latest_water_sample(self, pond_id):
+        return self._latest_water_samples.get(pond_id)
+
+    def recent_daily_logs(self, pond_id):
+        """Daily logs in the look-back window, newest first"""
+        return self._recent_daily_logs.get(pond_id, [])
+
+    def recent_diagnostics(self, pond_id):
+        """Medical diagnostics in the look-back window, newest first"""
+        return self._recent_diagnostics.get(pond_id, [])
+
+    def _load_feeding_bands(self, pond_ids):
+        # Shared by every pond; the advice metrics are computed from these same rows
+        self._feeding_bands = list(FeedingBand.objects.order_by('pk'))
+        self.feeding_band_table = set_feeding_band_table(self._feeding_bands)
+
+    def _load_rule_plan(self, pond_ids):
+        self.rule_plan = get_rule_plan(self.user.pk)
+
+    def applied_advice(self, pond_id, species_id):
+        """Most recently applied advice for a pond/species, newest first"""
+        return self._applied_advice.get((pond_id, species_id), [])
+
+    def input_fingerprint(self, pond, species):
+        """SHA-256 of every input row the advice for a pond/species is computed from, plus today's date.
+
+        The inputs include the FeedingBand table, which sets the feeding rate
+        and frequency of the saved advice, and the user's compiled feeding
+        rules.
+
+        Each source contributes its row count, highest id and latest
+        updated_at (where the table has one) and the values of its rows, so
+        an added, edited or deleted row, or a new day moving the look-back
+        windows, gives a new fingerprint.
+        """
+        latest_stocking = self.latest_stocking(pond.id, species.id)
+        population = self._populations.get((pond.id, species.id))
+        water_sample = self.latest_water_sample(pond.id)
+        sources = [
+            ('pond', [pond]),
+            ('species', [species]),
+            ('stocking', [latest_stocking] if latest_stocking else []),
+            ('fish_samplings', self.fish_samplings(pond.id, species.id)),
+            ('population', [population] if population else []),
+            ('mortalities', self.recent_mortalities(pond.id, species.id)),
+            ('feeds', self.recent_feeds(pond.id)),
+            ('water_sample', [water_sample] if water_sample else []),
+            ('daily_logs', self.recent_daily_logs(pond.id)),
+            ('diagnostics', self.recent_diagnostics(pond.id)),
+            ('applied_advice', self.applied_advice(pond.id, species.id)),
+            ('feeding_bands', self._feeding_bands),
+        ]
+        digest = hashlib.sha256(f'{self.today.isoformat()}:{self.rule_plan.digest}'.encode())
+        for name, rows in sources:
+            updated = [row.updated_at for row in rows if getattr(row, 'updated_at', None)]
+            digest.update(repr((
+                name,
+                len(rows),
+                max((row.pk for row in rows), default=None),
+                max(updated, default=None),
+                sorted((_row_signature(row) for row in rows), key=repr),
+            )).encode())
+        return digest.hexdigest()
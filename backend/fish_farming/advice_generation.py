@@ -0,0 +1,1168 @@
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from .advice import AdviceDataContext
+from .models import FeedingAdvice
+from .rules import ADJUSTMENT_GROUPS, ADJUSTMENT_LIMITS, apply_rate_adjustments
+from .serializers import FeedingAdviceSerializer
+from .water_quality import SCORED_READINGS, reading_array, score_water_quality
+
+
+def advice_by_fingerprint(user, ponds, fingerprints):
+    """{(pond_id, species_id, fingerprint): latest advice} of earlier runs with any of the given fingerprints"""
+    advice = FeedingAdvice.objects.filter(
+        user=user, pond__in=ponds, input_fingerprint__in=set(fingerprints)
+    ).select_related('pond', 'species', 'user', 'feed_type').prefetch_related(
+        'medical_diagnostics'
+    ).order_by('created_at', 'id')
+    return {(item.pond_id, item.species_id, item.input_fingerprint): item for item in advice}
+
+
+def generate_farm_advice(user, ponds=None, force=False):
+    """Generate feeding advice for all given ponds from one preloaded context and save it with bulk_create
+
+    Pond/species whose inputs match an earlier advice's fingerprint keep
+    that advice (listed under ``unchanged``) unless ``force`` is set. Used by
+    the batch_generate endpoint and the generate_feeding_advice command.
+    """
+    generator = FeedingAdviceGenerator()
+    context = AdviceDataContext(user, ponds=ponds)
+    fingerprints = {
+        (pond.id, species.id): context.input_fingerprint(pond, species)
+        for pond in context.ponds
+        for species in context.species_in_pond(pond.id)
+    }
+    unchanged_advice = {} if force else advice_by_fingerprint(user, context.ponds, fingerprints.values())
+    
+    advice_objects = []
+    unchanged = []
+    species_without_sampling = []
+    failed_species = []
+    ponds_without_stocking = []
+    
+    # Run the analyses of every pond/species first so the feeding rules are evaluated in one pass
+    pending = []
+    for pond in context.ponds:
+        species_in_pond = context.species_in_pond(pond.id)
+        if not species_in_pond:
+            ponds_without_stocking.append(pond.name)
+            continue
+        
+        for species in species_in_pond:
+            label = f"{pond.name} - {species.name}"
+            fingerprint = fingerprints[(pond.id, species.id)]
+            existing = unchanged_advice.get((pond.id, species.id, fingerprint))
+            if existing:
+                unchanged.append(existing)
+                continue
+            try:
+                if context.latest_fish_sampling(pond.id, species.id) is None:
+                    species_without_sampling.append(label)
+                
+                inputs = generator.collect_inputs(pond, species, context)
+                if not inputs:
+                    failed_species.append(f"{label} (no data)")
+                    continue
+                pending.append((pond, species, label, fingerprint, inputs))
+            except Exception as e:
+                failed_species.append(f"{label} (error: {str(e)})")
+    
+    rule_plan = context.rule_plan
+    rule_adjustments = rule_plan.evaluate([inputs['features'] for _, _, _, _, inputs in pending])
+    
+    for index, (pond, species, label, fingerprint, inputs) in enumerate(pending):
+        try:
+            advice_data = generator.build_advice(pond, species, inputs, rule_adjustments.row(index), rule_plan, context)
+            
+            # Validate the writable fields as auto_generate does; pond and species are already loaded
+            serializer = FeedingAdviceSerializer(
+                data={key: value for key, value in advice_data.items() if key not in ('pond', 'species')},
+                partial=True
+            )
+            if not serializer.is_valid():
+                failed_species.append(f"{label} (validation error)")
+                continue
+            
+            # Derived metrics normally computed in save(), which bulk_create skips
+            advice = FeedingAdvice(
+                pond=pond, species=species, user=user, input_fingerprint=fingerprint,
+                **serializer.validated_data
+            )
+            advice.calculate_metrics(rule_plan, context.feeding_band_table)
+            if advice.total_biomass_kg is None or advice.recommended_feed_kg is None:
+                failed_species.append(f"{label} (no fish remaining)")
+                continue
+            
+            advice_objects.append(advice)
+        except Exception as e:
+            failed_species.append(f"{label} (error: {str(e)})")
+    
+    with transaction.atomic():
+        FeedingAdvice.objects.bulk_create(advice_objects, batch_size=500)
+    
+    return {
+        'advice': advice_objects,
+        'unchanged': unchanged,
+        'ponds_processed': len(context.ponds),
+        'species_without_sampling': species_without_sampling,
+        'failed_species': failed_species,
+        'ponds_without_stocking': ponds_without_stocking
+    }
+
+
+class FeedingAdviceGenerator:
+    """The feeding advice analyses of a pond/species, run over a preloaded AdviceDataContext"""
+    
+    def _timed_analysis(self, timings, name, analysis, *args):
+        """Run one advice analysis and record how long it took in ``timings``"""
+        started = time.perf_counter()
+        result = analysis(*args)
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+    
+    def generate_for_species(self, pond, species, context):
+        """Comprehensive feeding advice generation based on all available data"""
+        inputs = self.collect_inputs(pond, species, context)
+        if inputs is None:
+            return None
+        
+        rule_plan = context.rule_plan
+        adjustments = rule_plan.evaluate([inputs['features']])
+        return self.build_advice(pond, species, inputs, adjustments.row(0), rule_plan, context)
+    
+    def collect_inputs(self, pond, species, context):
+        """Run the analyses of a pond/species and gather the features the feeding rules test.
+        
+        Returns None when there is neither fish sampling nor stocking data, or
+        no fish are left in a stocking-only pond.
+        """
+        # Milliseconds spent in each analysis
+        timings = {}
+        
+        # 1. Get latest fish sampling data
+        latest_sampling = context.latest_fish_sampling(pond.id, species.id)
+        
+        # 2. If no sampling data, try to work with stocking data
+        latest_stocking = None
+        if not latest_sampling:
+            latest_stocking = context.latest_stocking(pond.id, species.id)
+            if not latest_stocking:
+                return None
+        
+        # 3. Calculate current fish count with detailed analysis
+        fish_count_analysis = self._timed_analysis(timings, 'fish_population', self._analyze_fish_population, pond, species, context)
+        if latest_stocking and fish_count_analysis['current_count'] <= 0:
+            return None
+        
+        # 4. Comprehensive water quality analysis
+        water_quality_analysis = self._timed_analysis(timings, 'water_quality', self._analyze_water_quality, pond, context)
+        
+        # 5. Mortality pattern analysis
+        mortality_analysis = self._timed_analysis(timings, 'mortality_patterns', self._analyze_mortality_patterns, pond, species, context)
+        
+        # 6. Feeding pattern analysis
+        feeding_analysis = self._timed_analysis(timings, 'feeding_patterns', self._analyze_feeding_patterns, pond, species, context)
+        
+        # 7. Environmental and seasonal analysis
+        environmental_analysis = self._timed_analysis(timings, 'environmental_factors', self._analyze_environmental_factors, pond, context)
+        
+        # 8. Growth rate analysis (simplified for stocking-based advice)
+        if latest_sampling:
+            growth_analysis = self._timed_analysis(timings, 'growth_patterns', self._analyze_growth_patterns, pond, species, context)
+        else:
+            growth_analysis = self._timed_analysis(timings, 'growth_patterns', self._analyze_growth_patterns_from_stocking, pond, species, latest_stocking)
+        
+        # 9. Medical diagnostic analysis
+        medical_analysis = self._timed_analysis(timings, 'medical_conditions', self._analyze_medical_conditions, pond, context)
+        
+        return {
+            'latest_sampling': latest_sampling,
+            'latest_stocking': latest_stocking,
+            'fish_count_analysis': fish_count_analysis,
+            'water_quality_analysis': water_quality_analysis,
+            'mortality_analysis': mortality_analysis,
+            'feeding_analysis': feeding_analysis,
+            'environmental_analysis': environmental_analysis,
+            'growth_analysis': growth_analysis,
+            'medical_analysis': medical_analysis,
+            'features': self._advice_features(
+                water_quality_analysis, mortality_analysis, feeding_analysis,
+                environmental_analysis, growth_analysis, medical_analysis
+            ),
+            'timings': timings,
+        }
+    
+    def _advice_features(self, water_quality, mortality, feeding, environmental, growth, medical):
+        """Feature row of a pond/species for the feeding rules (see rules.FEATURES)"""
+        confidences = [disease['confidence'] for disease in medical['active_diseases']]
+        return {
+            'water_quality_status': water_quality['quality_status'],
+            'water_temp_c': water_quality['temperature'] or None,
+            'high_mortality_rate': 'high_mortality_rate' in mortality['risk_factors'],
+            'disease_present': 'disease_present' in mortality['risk_factors'],
+            'growth_quality': growth.get('growth_quality'),
+            'season': environmental['season'],
+            'feeding_consistency': feeding['feeding_consistency'],
+            'disease_count': len(confidences),
+            'max_disease_confidence': max(confidences, default=None),
+            'has_medical_warnings': bool(medical.get('medical_warnings')),
+        }
+    
+    def build_advice(self, pond, species, inputs, adjustments, rule_plan, context):
+        """Feeding advice data from collected inputs and their rule adjustments ({group: percent})"""
+        if inputs['latest_sampling']:
+            return self._build_advice_from_sampling(pond, species, inputs, adjustments, rule_plan, context)
+        return self._build_advice_from_stocking(pond, species, inputs, adjustments, rule_plan, context)
+    
+    def _build_advice_from_sampling(self, pond, species, inputs, adjustments, rule_plan, context):
+        """Feeding advice based on the latest fish sampling"""
+        latest_sampling = inputs['latest_sampling']
+        fish_count_analysis = inputs['fish_count_analysis']
+        water_quality_analysis = inputs['water_quality_analysis']
+        mortality_analysis = inputs['mortality_analysis']
+        feeding_analysis = inputs['feeding_analysis']
+        environmental_analysis = inputs['environmental_analysis']
+        growth_analysis = inputs['growth_analysis']
+        medical_analysis = inputs['medical_analysis']
+        timings = inputs['timings']
+        estimated_fish_count = fish_count_analysis['current_count']
+        
+        # 10. Calculate comprehensive feeding recommendations
+        feeding_recommendations = self._calculate_feeding_recommendations(
+            estimated_fish_count,
+            latest_sampling,
+            adjustments
+        )
+        
+        # 11. Enhanced feed type and cost analysis
+        feed_analysis = self._timed_analysis(timings, 'feeding_history', self._analyze_feeding_history, pond, species, context)
+        if feed_analysis:
+            feeding_recommendations.update(feed_analysis)
+        
+        # 12. Add learning from previously applied advice
+        advice_learning = self._timed_analysis(timings, 'applied_advice_history', self._analyze_applied_advice_history, pond, species, feeding_recommendations['base_rate'], context, rule_plan)
+        if advice_learning:
+            feeding_recommendations.update(advice_learning)
+        
+        # 13. Create comprehensive feeding advice
+        advice_data = {
+            'pond': pond.id,
+            'species': species.id,
+            'date': timezone.now().date(),
+            'estimated_fish_count': estimated_fish_count,
+            'average_fish_weight_kg': latest_sampling.average_weight_kg,
+            'total_biomass_kg': estimated_fish_count * float(latest_sampling.average_weight_kg),
+            'recommended_feed_kg': feeding_recommendations['recommended_feed_kg'],
+            'feeding_rate_percent': feeding_recommendations['final_rate'],
+            'feeding_frequency': feeding_recommendations['feeding_frequency'],
+            'water_temp_c': water_quality_analysis.get('temperature'),
+            'season': environmental_analysis['season'],
+            'medical_considerations': self._generate_medical_considerations(medical_analysis),
+            'medical_warnings': medical_analysis.get('medical_warnings', []),
+            'notes': self._generate_comprehensive_notes(
+                pond, species, fish_count_analysis, water_quality_analysis,
+                mortality_analysis, feeding_analysis, environmental_analysis,
+                growth_analysis, feeding_recommendations, medical_analysis
+            )
+        }
+        
+        # Calculate daily feed cost with enhanced cost data
+        if 'feed_cost_per_kg' in feeding_recommendations and feeding_recommendations['feed_cost_per_kg']:
+            advice_data['daily_feed_cost'] = feeding_recommendations['recommended_feed_kg'] * float(feeding_recommendations['feed_cost_per_kg'])
+        
+        # Add all analysis data for transparency
+        advice_data.update({
+            'analysis_data': {
+                'fish_count_analysis': fish_count_analysis,
+                'water_quality_analysis': water_quality_analysis,
+                'mortality_analysis': mortality_analysis,
+                'feeding_analysis': feeding_analysis,
+                'environmental_analysis': environmental_analysis,
+                'growth_analysis': growth_analysis,
+                'medical_analysis': medical_analysis,
+                'feeding_recommendations': feeding_recommendations,
+                'timings_ms': {'analyses': timings, 'context_load': context.load_timings}
+            }
+        })
+        
+        return advice_data
+    
+    def _build_advice_from_stocking(self, pond, species, inputs, adjustments, rule_plan, context):
+        """Feeding advice based on stocking data when fish sampling is not available"""
+        from decimal import Decimal
+        
+        latest_stocking = inputs['latest_stocking']
+        fish_count_analysis = inputs['fish_count_analysis']
+        water_quality_analysis = inputs['water_quality_analysis']
+        mortality_analysis = inputs['mortality_analysis']
+        feeding_analysis = inputs['feeding_analysis']
+        environmental_analysis = inputs['environmental_analysis']
+        growth_analysis = inputs['growth_analysis']
+        medical_analysis = inputs['medical_analysis']
+        timings = inputs['timings']
+        estimated_fish_count = fish_count_analysis['current_count']
+        
+        # 10. Calculate average fish weight from stocking data
+        # Use pieces_per_kg from stocking to estimate average weight
+        if latest_stocking.pieces_per_kg and latest_stocking.pieces_per_kg > 0:
+            average_fish_weight_kg = Decimal('1.0') / latest_stocking.pieces_per_kg
+        else:
+            # Fallback: estimate based on species and time since stocking
+            days_since_stocking = (timezone.now().date() - latest_stocking.date).days
+            # Assume initial weight of 0.0025 kg (2.5g) and growth rate of 0.0001 kg/day
+            average_fish_weight_kg = Decimal('0.0025') + (Decimal('0.0001') * days_since_stocking)
+        
+        # 11. Calculate total biomass
+        total_biomass_kg = estimated_fish_count * average_fish_weight_kg
+        
+        # 12. Calculate feeding recommendations based on stocking data
+        feeding_recommendations = self._calculate_feeding_recommendations_from_stocking(
+            average_fish_weight_kg,
+            total_biomass_kg,
+            adjustments
+        )
+        
+        # 13. Enhanced feed type and cost analysis
+        feed_analysis = self._timed_analysis(timings, 'feeding_history', self._analyze_feeding_history, pond, species, context)
+        if feed_analysis:
+            feeding_recommendations.update(feed_analysis)
+        
+        # 14. Add learning from previously applied advice
+        advice_learning = self._timed_analysis(timings, 'applied_advice_history', self._analyze_applied_advice_history, pond, species, feeding_recommendations['base_rate'], context, rule_plan)
+        if advice_learning:
+            feeding_recommendations.update(advice_learning)
+        
+        # 15. Create comprehensive feeding advice
+        advice_data = {
+            'pond': pond.id,
+            'species': species.id,
+            'date': timezone.now().date(),
+            'estimated_fish_count': estimated_fish_count,
+            'average_fish_weight_kg': average_fish_weight_kg,
+            'total_biomass_kg': total_biomass_kg,
+            'recommended_feed_kg': feeding_recommendations['recommended_feed_kg'],
+            'feeding_rate_percent': feeding_recommendations['final_rate'],
+            'feeding_frequency': feeding_recommendations['feeding_frequency'],
+            'water_temp_c': water_quality_analysis.get('temperature'),
+            'season': environmental_analysis['season'],
+            'medical_considerations': self._generate_medical_considerations(medical_analysis),
+            'medical_warnings': medical_analysis.get('medical_warnings', []),
+            'notes': self._generate_stocking_based_notes(
+                pond, species, fish_count_analysis, water_quality_analysis,
+                mortality_analysis, feeding_analysis, environmental_analysis,
+                growth_analysis, feeding_recommendations, medical_analysis,
+                latest_stocking
+            )
+        }
+        
+        # Calculate daily feed cost with enhanced cost data
+        if 'feed_cost_per_kg' in feeding_recommendations and feeding_recommendations['feed_cost_per_kg']:
+            advice_data['daily_feed_cost'] = float(feeding_recommendations['recommended_feed_kg']) * float(feeding_recommendations['feed_cost_per_kg'])
+        
+        # Add all analysis data for transparency
+        advice_data.update({
+            'analysis_data': {
+                'fish_count_analysis': fish_count_analysis,
+                'water_quality_analysis': water_quality_analysis,
+                'mortality_analysis': mortality_analysis,
+                'feeding_analysis': feeding_analysis,
+                'environmental_analysis': environmental_analysis,
+                'growth_analysis': growth_analysis,
+                'medical_analysis': medical_analysis,
+                'feeding_recommendations': feeding_recommendations,
+                'data_source': 'stocking_based',
+                'timings_ms': {'analyses': timings, 'context_load': context.load_timings}
+            }
+        })
+        
+        return advice_data
+    
+    def _analyze_growth_patterns_from_stocking(self, pond, species, latest_stocking):
+        """Simplified growth analysis based on stocking data"""
+        from datetime import timedelta
+        from decimal import Decimal
+        
+        days_since_stocking = (timezone.now().date() - latest_stocking.date).days
+        
+        # Estimate growth based on time since stocking
+        if latest_stocking.pieces_per_kg and latest_stocking.pieces_per_kg > 0:
+            initial_weight = Decimal('1.0') / latest_stocking.pieces_per_kg
+        else:
+            initial_weight = Decimal('0.0025')  # 2.5g default
+        
+        # Estimate current weight (simplified growth model)
+        estimated_current_weight = initial_weight + (Decimal('0.0001') * days_since_stocking)
+        
+        # Calculate daily growth rate
+        daily_growth_rate = Decimal('0.0001')  # 0.1g per day
+        
+        return {
+            'initial_weight_kg': initial_weight,
+            'estimated_current_weight_kg': estimated_current_weight,
+            'daily_growth_rate_kg': daily_growth_rate,
+            'days_since_stocking': days_since_stocking,
+            'growth_stage': 'juvenile' if estimated_current_weight < Decimal('0.01') else 'adult',
+            'data_source': 'stocking_estimated'
+        }
+    
+    def _calculate_feeding_recommendations_from_stocking(self, average_fish_weight_kg, total_biomass_kg, adjustments):
+        """Calculate feeding recommendations based on stocking data"""
+        from decimal import Decimal
+        
+        # Base feeding rate (3% of biomass as starting point)
+        base_rate = Decimal('3.0')
+        
+        # Adjust based on fish size
+        if average_fish_weight_kg < Decimal('0.01'):  # Less than 10g
+            base_rate = Decimal('5.0')  # Higher rate for small fish
+        elif average_fish_weight_kg > Decimal('0.5'):  # More than 500g
+            base_rate = Decimal('2.0')  # Lower rate for large fish
+        
+        # Temperature, season and health adjustments from the feeding rules
+        base_rate = apply_rate_adjustments(base_rate, adjustments, ['rate_temperature', 'rate_season', 'rate_medical'])
+        
+        # Calculate recommended feed amount
+        recommended_feed_kg = (total_biomass_kg * base_rate) / 100
+        
+        # Determine feeding frequency
+        feeding_frequency = 2  # Default
+        if average_fish_weight_kg < Decimal('0.01'):
+            feeding_frequency = 3  # More frequent for small fish
+        elif average_fish_weight_kg > Decimal('0.5'):
+            feeding_frequency = 1  # Less frequent for large fish
+        
+        return {
+            'base_rate': base_rate,
+            'final_rate': base_rate,
+            'recommended_feed_kg': recommended_feed_kg,
+            'feeding_frequency': feeding_frequency,
+            'data_source': 'stocking_based'
+        }
+    
+    def _generate_stocking_based_notes(self, pond, species, fish_count_analysis, water_quality_analysis,
+                                     mortality_analysis, feeding_analysis, environmental_analysis,
+                                     growth_analysis, feeding_recommendations, medical_analysis, latest_stocking):
+        """Generate comprehensive notes for stocking-based feeding advice"""
+        notes = []
+        
+        # Data source note
+        notes.append("⚠️ This feeding advice is based on stocking data as fish sampling data is not available.")
+        notes.append(f"📊 Based on stocking from {latest_stocking.date} with {latest_stocking.pcs} pieces.")
+        
+        # Fish count analysis
+        if fish_count_analysis.get('survival_rate'):
+            notes.append(f"🐟 Estimated survival rate: {fish_count_analysis['survival_rate']:.1f}%")
+        
+        # Water quality
+        if water_quality_analysis.get('temperature'):
+            notes.append(f"🌡️ Water temperature: {water_quality_analysis['temperature']}°C")
+        
+        # Environmental factors
+        season = environmental_analysis.get('season', 'summer')
+        notes.append(f"🌍 Season: {season.title()}")
+        
+        # Medical considerations
+        if medical_analysis.get('medical_warnings'):
+            notes.append("⚠️ Medical warnings detected - consider consulting a fish health specialist.")
+        
+        # Growth analysis
+        if growth_analysis.get('days_since_stocking'):
+            days = growth_analysis['days_since_stocking']
+            notes.append(f"📈 Days since stocking: {days} days")
+        
+        # Recommendations
+        notes.append(f"💡 Recommended feeding rate: {feeding_recommendations['final_rate']}% of biomass")
+        notes.append(f"🍽️ Feeding frequency: {feeding_recommendations['feeding_frequency']} times per day")
+        
+        # Data limitations
+        notes.append("📝 Note: For more accurate feeding advice, consider conducting fish sampling to get current weight and growth data.")
+        
+        return "\n".join(notes)
+    
+    def _analyze_feeding_history(self, pond, species, context):
+        """Analyze feeding history to recommend optimal feed type and cost"""
+        from datetime import timedelta
+        
+        # Get recent feeding records (last 30 days)
+        recent_feeds = context.recent_feeds(pond.id)
+        
+        if not recent_feeds:
+            return None
+        
+        # Analyze feed types by performance
+        feed_type_performance = {}
+        for feed in recent_feeds:
+            if feed.feed_type:
+                feed_type_id = feed.feed_type.id
+                if feed_type_id not in feed_type_performance:
+                    feed_type_performance[feed_type_id] = {
+                        'feed_type': feed.feed_type,
+                        'total_usage': 0,
+                        'avg_cost_per_kg': 0,
+                        'usage_count': 0,
+                        'recent_usage': 0
+                    }
+                
+                feed_type_performance[feed_type_id]['total_usage'] += float(feed.amount_kg or 0)
+                feed_type_performance[feed_type_id]['usage_count'] += 1
+                
+                # Calculate cost per kg
+                if feed.cost_per_kg:
+                    cost_per_kg = float(feed.cost_per_kg)
+                elif feed.cost_per_packet and feed.packet_size_kg:
+                    cost_per_kg = float(feed.cost_per_packet) / float(feed.packet_size_kg)
+                else:
+                    cost_per_kg = 0
+                
+                if cost_per_kg > 0:
+                    current_avg = feed_type_performance[feed_type_id]['avg_cost_per_kg']
+                    count = feed_type_performance[feed_type_id]['usage_count']
+                    feed_type_performance[feed_type_id]['avg_cost_per_kg'] = (
+                        (current_avg * (count - 1) + cost_per_kg) / count
+                    )
+                
+                # Check if used recently (last 7 days)
+                if feed.date >= context.today - timedelta(days=7):
+                    feed_type_performance[feed_type_id]['recent_usage'] += 1
+        
+        # Find the most used and cost-effective feed type
+        best_feed_type = None
+        best_avg_cost = None
+        
+        if feed_type_performance:
+            # Sort by recent usage first, then by total usage
+            sorted_types = sorted(
+                feed_type_performance.items(),
+                key=lambda x: (x[1]['recent_usage'], x[1]['total_usage']),
+                reverse=True
+            )
+            
+            best_feed_type_id, best_feed_data = sorted_types[0]
+            best_feed_type = best_feed_data['feed_type']
+            best_avg_cost = best_feed_data['avg_cost_per_kg']
+        
+        result = {}
+        if best_feed_type:
+            result['feed_type'] = best_feed_type.id
+            if best_avg_cost and best_avg_cost > 0:
+                result['feed_cost_per_kg'] = best_avg_cost
+        
+        return result
+    
+    def _analyze_applied_advice_history(self, pond, species, current_base_rate, context, rule_plan):
+        """Analyze previously applied advice to improve recommendations"""
+        # Get previously applied advice for this pond/species (last 5)
+        applied_advice = context.applied_advice(pond.id, species.id)
+        
+        if not applied_advice:
+            return None
+        
+        # Analyze the effectiveness of previous advice
+        growth_rows = []
+        
+        for advice in applied_advice:
+            # Get fish sampling data after this advice was applied
+            applied_on = timezone.localtime(advice.applied_date, timezone.get_default_timezone()).date()
+            post_advice_samplings = [
+                sampling for sampling in context.fish_samplings(pond.id, species.id)
+                if sampling.date > applied_on
+            ][:3]  # Next 3 samplings after advice
+            
+            if len(post_advice_samplings) >= 2:
+                # Calculate growth rate after advice
+                first_sampling = post_advice_samplings[0]
+                last_sampling = post_advice_samplings[-1]
+                
+                days_diff = (last_sampling.date - first_sampling.date).days
+                if days_diff > 0:
+                    weight_growth = float(last_sampling.average_weight_kg) - float(first_sampling.average_weight_kg)
+                    growth_rate = weight_growth / days_diff
+                    growth_rows.append({'post_advice_growth_kg_per_day': growth_rate})
+        
+        # The history rules turn each growth rate into a rate and feed adjustment
+        rate_adjustments = []
+        feed_adjustments = []
+        if growth_rows:
+            evaluation = rule_plan.evaluate(growth_rows, groups=['history_rate', 'history_feed'])
+            rate_adjustments = [1 + percent / 100 for percent in evaluation.adjustments['history_rate'].tolist()]
+            feed_adjustments = [1 + percent / 100 for percent in evaluation.adjustments['history_feed'].tolist()]
+        
+        # Calculate average adjustments
+        if rate_adjustments:
+            avg_rate_adjustment = sum(rate_adjustments) / len(rate_adjustments)
+            avg_feed_adjustment = sum(feed_adjustments) / len(feed_adjustments)
+            
+            # Apply adjustments to current recommendations
+            adjusted_rate = current_base_rate * avg_rate_adjustment
+            # Note: estimated_fish_count and latest_sampling are from the calling function
+            # We'll recalculate the feed amount in the main function
+            
+            return {
+                'final_rate': adjusted_rate,
+                'learning_applied': True,
+                'historical_analysis': {
+                    'previous_advice_count': len(applied_advice),
+                    'rate_adjustment_factor': avg_rate_adjustment,
+                    'feed_adjustment_factor': avg_feed_adjustment
+                }
+            }
+        
+        return None
+    
+    def _analyze_fish_population(self, pond, species, context):
+        """Comprehensive fish population analysis"""
+        # Lifetime totals come from the population ledger
+        population = context.population(pond.id, species.id)
+        total_stocked = population.stocked_count
+        total_mortality = population.dead_count
+        total_harvested = population.harvested_count
+        
+        # Get mortality data with time analysis (last 30 days)
+        recent_mortality = sum(mortality.count for mortality in context.recent_mortalities(pond.id, species.id))
+        
+        # Calculate survival rate
+        survival_rate = 0
+        if total_stocked > 0:
+            survival_rate = ((total_stocked - total_mortality - total_harvested) / total_stocked) * 100
+        
+        # Analyze mortality trends
+        mortality_trend = 'stable'
+        if recent_mortality > 0:
+            avg_daily_mortality = recent_mortality / 30
+            if avg_daily_mortality > (total_stocked * 0.001):  # More than 0.1% daily
+                mortality_trend = 'high'
+            elif avg_daily_mortality < (total_stocked * 0.0001):  # Less than 0.01% daily
+                mortality_trend = 'low'
+        
+        return {
+            'total_stocked': total_stocked,
+            'total_mortality': total_mortality,
+            'recent_mortality_30d': recent_mortality,
+            'total_harvested': total_harvested,
+            'current_count': population.alive_count,
+            'survival_rate': survival_rate,
+            'mortality_trend': mortality_trend
+        }
+    
+    def _analyze_water_quality(self, pond, context):
+        """Comprehensive water quality analysis"""
+        # Get latest water sample (last 30 days)
+        latest_sample = context.latest_water_sample(pond.id)
+        
+        # Get recent daily logs (last 7 days)
+        recent_logs = context.recent_daily_logs(pond.id)
+        
+        water_quality = {
+            'temperature': None,
+            'ph': None,
+            'dissolved_oxygen': None,
+            'turbidity': None,
+            'ammonia': None,
+            'nitrite': None,
+            'quality_score': 0,
+            'quality_status': 'unknown'
+        }
+        
+        # Analyze temperature
+        if latest_sample:
+            water_quality['temperature'] = latest_sample.temperature_c
+            water_quality['ph'] = latest_sample.ph
+            water_quality['dissolved_oxygen'] = latest_sample.dissolved_oxygen
+            water_quality['turbidity'] = latest_sample.turbidity
+            water_quality['ammonia'] = latest_sample.ammonia
+            water_quality['nitrite'] = latest_sample.nitrite
+        elif recent_logs:
+            latest_log = recent_logs[0]
+            water_quality['temperature'] = latest_log.water_temp_c
+            water_quality['ph'] = latest_log.ph
+        
+        # Calculate water quality score (0-100) against the default optimal ranges
+        scores = score_water_quality({
+            name: reading_array([water_quality[name]]) for name in SCORED_READINGS
+        })
+        water_quality['quality_score'] = int(scores['score'][0])
+        water_quality['quality_status'] = str(scores['status'][0])
+        
+        return water_quality
+    
+    def _analyze_mortality_patterns(self, pond, species, context):
+        """Analyze mortality patterns and causes"""
+        # Get recent mortality data (last 30 days)
+        recent_mortality = context.recent_mortalities(pond.id, species.id)
+        
+        mortality_analysis = {
+            'total_recent_deaths': sum(mortality.count for mortality in recent_mortality),
+            'mortality_events': len(recent_mortality),
+            'avg_deaths_per_event': 0,
+            'mortality_trend': 'stable',
+            'risk_factors': []
+        }
+        
+        if mortality_analysis['mortality_events'] > 0:
+            mortality_analysis['avg_deaths_per_event'] = (
+                mortality_analysis['total_recent_deaths'] / mortality_analysis['mortality_events']
+            )
+        
+        # Analyze mortality causes
+        causes = {}
+        for mortality in recent_mortality:
+            cause = causes.setdefault(mortality.cause, {'cause': mortality.cause, 'total_deaths': 0, 'event_count': 0})
+            cause['total_deaths'] += mortality.count
+            cause['event_count'] += 1
+        
+        mortality_analysis['causes'] = sorted(causes.values(), key=lambda cause: -cause['total_deaths'])
+        
+        # Determine risk factors
+        if mortality_analysis['total_recent_deaths'] > 10:
+            mortality_analysis['risk_factors'].append('high_mortality_rate')
+        
+        if mortality_analysis['mortality_events'] > 5:
+            mortality_analysis['risk_factors'].append('frequent_mortality_events')
+        
+        # Check for disease-related mortality
+        disease_causes = sum(
+            mortality.count for mortality in recent_mortality
+            if 'disease' in mortality.cause.lower()
+        )
+        
+        if disease_causes > 0:
+            mortality_analysis['risk_factors'].append('disease_present')
+        
+        return mortality_analysis
+    
+    def _analyze_feeding_patterns(self, pond, species, context):
+        """Analyze historical feeding patterns and success rates"""
+        # Get recent feeding records, last 30 days (Feed model doesn't have species field, only pond)
+        recent_feeds = context.recent_feeds(pond.id)
+        
+        feeding_analysis = {
+            'total_feed_30d': sum(feed.amount_kg for feed in recent_feeds),
+            'avg_daily_feed': 0,
+            'feeding_consistency': 'unknown',
+            'feed_efficiency': 0,
+            'cost_analysis': {},
+            'feed_types_used': []
+        }
+        
+        if recent_feeds:
+            feeding_analysis['avg_daily_feed'] = feeding_analysis['total_feed_30d'] / 30
+            
+            # Analyze feeding consistency
+            daily_feeds = {}
+            for feed in sorted(recent_feeds, key=lambda feed: feed.date):
+                daily_feeds[feed.date] = daily_feeds.get(feed.date, 0) + feed.amount_kg
+            
+            if len(daily_feeds) > 5:
+                amounts = [float(daily_total) for daily_total in daily_feeds.values() if daily_total]
+                if amounts:
+                    avg_amount = sum(amounts) / len(amounts)
+                    variance = sum((x - avg_amount) ** 2 for x in amounts) / len(amounts)
+                    std_dev = variance ** 0.5
+                    
+                    if std_dev < avg_amount * 0.2:  # Less than 20% variation
+                        feeding_analysis['feeding_consistency'] = 'very_consistent'
+                    elif std_dev < avg_amount * 0.4:  # Less than 40% variation
+                        feeding_analysis['feeding_consistency'] = 'consistent'
+                    else:
+                        feeding_analysis['feeding_consistency'] = 'inconsistent'
+            
+            # Analyze feed types
+            feed_types = {}
+            for feed in recent_feeds:
+                feed_type = feed_types.setdefault(feed.feed_type.name, {
+                    'feed_type__name': feed.feed_type.name, 'total_amount': 0, 'usage_count': 0
+                })
+                feed_type['total_amount'] += feed.amount_kg
+                feed_type['usage_count'] += 1
+            
+            feeding_analysis['feed_types_used'] = sorted(
+                feed_types.values(), key=lambda feed_type: -feed_type['total_amount']
+            )
+            
+            # Calculate feed conversion ratio if possible
+            # This would require harvest data to be meaningful
+        
+        return feeding_analysis
+    
+    def _analyze_environmental_factors(self, pond, context):
+        """Analyze environmental and seasonal factors"""
+        # Determine season
+        current_month = timezone.now().month
+        if current_month in [12, 1, 2]:
+            season = 'winter'
+        elif current_month in [3, 4, 5]:
+            season = 'spring'
+        elif current_month in [6, 7, 8]:
+            season = 'summer'
+        else:
+            season = 'autumn'
+        
+        # Get recent weather data from daily logs (last 7 days)
+        recent_logs = context.recent_daily_logs(pond.id)
+        
+        environmental_analysis = {
+            'season': season,
+            'temperature_trend': 'stable',
+            'weather_conditions': 'normal',
+            'seasonal_factors': []
+        }
+        
+        # Analyze temperature trends
+        if recent_logs:
+            temps = [log.water_temp_c for log in recent_logs if log.water_temp_c]
+            if len(temps) > 1:
+                temp_change = temps[0] - temps[-1]
+                if temp_change > 2:
+                    environmental_analysis['temperature_trend'] = 'warming'
+                elif temp_change < -2:
+                    environmental_analysis['temperature_trend'] = 'cooling'
+        
+        # Add seasonal factors
+        if season == 'winter':
+            environmental_analysis['seasonal_factors'].extend(['low_metabolism', 'reduced_appetite'])
+        elif season == 'summer':
+            environmental_analysis['seasonal_factors'].extend(['high_metabolism', 'increased_appetite'])
+        
+        return environmental_analysis
+    
+    def _analyze_growth_patterns(self, pond, species, context):
+        """Analyze fish growth patterns and trends"""
+        from datetime import timedelta
+        
+        # Get recent fish sampling data (last 90 days)
+        recent_samplings = [
+            sampling for sampling in context.fish_samplings(pond.id, species.id)
+            if sampling.date >= context.today - timedelta(days=90)
+        ]
+        
+        growth_analysis = {
+            'growth_rate_kg_per_day': 0,
+            'growth_trend': 'stable',
+            'weight_gain_90d': 0,
+            'growth_consistency': 'unknown',
+            'growth_quality': 'normal'
+        }
+        
+        if len(recent_samplings) >= 2:
+            first_sampling = recent_samplings[0]
+            last_sampling = recent_samplings[-1]
+            
+            days_diff = (last_sampling.date - first_sampling.date).days
+            if days_diff > 0:
+                weight_gain = float(last_sampling.average_weight_kg) - float(first_sampling.average_weight_kg)
+                growth_analysis['weight_gain_90d'] = weight_gain
+                growth_analysis['growth_rate_kg_per_day'] = weight_gain / days_diff
+                
+                # Determine growth trend
+                if growth_analysis['growth_rate_kg_per_day'] > 0.02:  # > 20g/day
+                    growth_analysis['growth_trend'] = 'excellent'
+                    growth_analysis['growth_quality'] = 'excellent'
+                elif growth_analysis['growth_rate_kg_per_day'] > 0.01:  # > 10g/day
+                    growth_analysis['growth_trend'] = 'good'
+                    growth_analysis['growth_quality'] = 'good'
+                elif growth_analysis['growth_rate_kg_per_day'] > 0.005:  # > 5g/day
+                    growth_analysis['growth_trend'] = 'normal'
+                    growth_analysis['growth_quality'] = 'normal'
+                else:
+                    growth_analysis['growth_trend'] = 'slow'
+                    growth_analysis['growth_quality'] = 'poor'
+        
+        return growth_analysis
+    
+    def _analyze_medical_conditions(self, pond, context):
+        """Analyze medical conditions and their impact on feeding"""
+        # Get recent medical diagnostics (last 30 days)
+        recent_diagnostics = context.recent_diagnostics(pond.id)
+        
+        medical_analysis = {
+            'active_diseases': [],
+            'disease_severity': 'none',
+            'feeding_adjustments': [],
+            'medical_warnings': [],
+            'recommended_feed_changes': [],
+            'treatment_considerations': []
+        }
+        
+        if recent_diagnostics:
+            for diagnostic in recent_diagnostics:
+                disease_info = {
+                    'disease_name': diagnostic.disease_name,
+                    'confidence': float(diagnostic.confidence_percentage),
+                    'is_applied': diagnostic.is_applied,
+                    'created_at': diagnostic.created_at,
+                    'treatment': diagnostic.recommended_treatment,
+                    'dosage': diagnostic.dosage_application
+                }
+                medical_analysis['active_diseases'].append(disease_info)
+                
+                # Determine disease severity and feeding adjustments
+                confidence = float(diagnostic.confidence_percentage)
+                if confidence >= 80:
+                    medical_analysis['disease_severity'] = 'high'
+                    medical_analysis['feeding_adjustments'].append({
+                        'type': 'reduce_feed',
+                        'percentage': 0.5,
+                        'reason': f'High confidence disease: {diagnostic.disease_name}'
+                    })
+                    medical_analysis['medical_warnings'].append(
+                        f'⚠️ উচ্চ ঝুঁকি: {diagnostic.disease_name} - খাদ্য পরিমাণ ৫০% কমিয়ে দিন'
+                    )
+                elif confidence >= 60:
+                    medical_analysis['disease_severity'] = 'medium'
+                    medical_analysis['feeding_adjustments'].append({
+                        'type': 'reduce_feed',
+                        'percentage': 0.7,
+                        'reason': f'Medium confidence disease: {diagnostic.disease_name}'
+                    })
+                    medical_analysis['medical_warnings'].append(
+                        f'⚠️ মাঝারি ঝুঁকি: {diagnostic.disease_name} - খাদ্য পরিমাণ ৩০% কমিয়ে দিন'
+                    )
+                else:
+                    medical_analysis['disease_severity'] = 'low'
+                    medical_analysis['feeding_adjustments'].append({
+                        'type': 'monitor',
+                        'percentage': 1.0,
+                        'reason': f'Low confidence disease: {diagnostic.disease_name}'
+                    })
+                    medical_analysis['medical_warnings'].append(
+                        f'ℹ️ নিম্ন ঝুঁকি: {diagnostic.disease_name} - নিবিড় পর্যবেক্ষণ করুন'
+                    )
+                
+                # Disease-specific feeding recommendations
+                disease_name = diagnostic.disease_name.lower()
+                if any(keyword in disease_name for keyword in ['bacterial', 'infection', 'septicemia']):
+                    medical_analysis['recommended_feed_changes'].append(
+                        'ব্যাকটেরিয়াজনিত রোগ - উচ্চ প্রোটিন খাদ্য দিন এবং খাদ্য পরিমাণ কমিয়ে দিন'
+                    )
+                elif any(keyword in disease_name for keyword in ['parasite', 'worm', 'gill']):
+                    medical_analysis['recommended_feed_changes'].append(
+                        'পরজীবী রোগ - খাদ্য পরিমাণ কমিয়ে দিন এবং নিয়মিত পর্যবেক্ষণ করুন'
+                    )
+                elif any(keyword in disease_name for keyword in ['fungal', 'mold']):
+                    medical_analysis['recommended_feed_changes'].append(
+                        'ছত্রাকজনিত রোগ - খাদ্য গুণমান পরীক্ষা করুন এবং পরিমাণ কমিয়ে দিন'
+                    )
+                
+                # Treatment considerations
+                if diagnostic.is_applied:
+                    medical_analysis['treatment_considerations'].append(
+                        f'চিকিৎসা প্রয়োগ হয়েছে: {diagnostic.recommended_treatment}'
+                    )
+                else:
+                    medical_analysis['treatment_considerations'].append(
+                        f'চিকিৎসা প্রয়োগ প্রয়োজন: {diagnostic.recommended_treatment}'
+                    )
+        
+        return medical_analysis
+    
+    def _generate_medical_considerations(self, medical_analysis):
+        """Generate medical considerations text for feeding advice"""
+        considerations = []
+        
+        if medical_analysis['active_diseases']:
+            considerations.append("চিকিৎসা সংক্রান্ত বিবেচনা:")
+            
+            for disease in medical_analysis['active_diseases']:
+                status = "প্রয়োগ হয়েছে" if disease['is_applied'] else "প্রয়োগ প্রয়োজন"
+                considerations.append(
+                    f"- {disease['disease_name']} ({disease['confidence']:.0f}% নিশ্চিত) - {status}"
+                )
+            
+            if medical_analysis['recommended_feed_changes']:
+                considerations.append("\nখাদ্য সংক্রান্ত সুপারিশ:")
+                for change in medical_analysis['recommended_feed_changes']:
+                    considerations.append(f"- {change}")
+            
+            if medical_analysis['treatment_considerations']:
+                considerations.append("\nচিকিৎসা সংক্রান্ত বিবেচনা:")
+                for consideration in medical_analysis['treatment_considerations']:
+                    considerations.append(f"- {consideration}")
+        else:
+            considerations.append("কোনো সক্রিয় রোগ নেই - স্বাভাবিক খাদ্য পরিকল্পনা অনুসরণ করুন")
+        
+        return "\n".join(considerations)
+    
+    def _get_feeding_stage(self, avg_weight_g):
+        """Get feeding stage information based on fish weight using scientific feeding table"""
+        from .feeding_stages import get_feeding_stage
+        return get_feeding_stage(avg_weight_g)
+    
+    def _get_feeding_frequency(self, avg_weight_g):
+        """Determine feeding frequency based on fish size using scientific feeding stages"""
+        feeding_stage = self._get_feeding_stage(avg_weight_g)
+        return feeding_stage['feeding_frequency']
+    
+    def _calculate_feeding_adjustments(self, rule_adjustments):
+        """Environmental and health adjustments (%) from the feeding rule groups, clamped in total"""
+        adjustments = {group: rule_adjustments[group] for group in ADJUSTMENT_GROUPS}
+        
+        # Clamp total adjustment to reasonable range
+        low, high = ADJUSTMENT_LIMITS
+        adjustments['total_adjustment'] = max(low, min(high, sum(adjustments.values())))
+        
+        return adjustments
+    
+    def _calculate_feeding_recommendations(self, fish_count, latest_sampling, rule_adjustments):
+        """Calculate feeding recommendations using scientific formulas based on %BW/day"""
+        
+        # Get fish weight in grams
+        avg_weight_g = float(latest_sampling.average_weight_kg) * 1000
+        
+        # Get feeding stage and %BW/day from scientific feeding table
+        feeding_stage = self._get_feeding_stage(avg_weight_g)
+        base_rate = feeding_stage['percent_bw_per_day']
+        protein_requirement = feeding_stage['protein_percent']
+        pellet_size = feeding_stage['pellet_size']
+        
+        # Core formula: Daily feed (kg) = (Number of fish × Average weight (g) ÷ 1000) × (%BW/day ÷ 100)
+        total_biomass_kg = (fish_count * avg_weight_g) / 1000
+        base_daily_feed_kg = total_biomass_kg * (base_rate / 100)
+        
+        # Apply environmental and condition adjustments (±10-30%)
+        adjustments = self._calculate_feeding_adjustments(rule_adjustments)
+        
+        # Apply medical adjustments
+        medical_adjustment = rule_adjustments['medical']
+        adjustments['medical_adjustment'] = medical_adjustment
+        adjustments['total_adjustment'] += medical_adjustment
+        
+        # Calculate final feeding rate with adjustments
+        adjustment_factor = 1 + (adjustments['total_adjustment'] / 100)
+        final_rate = base_rate * adjustment_factor
+        final_daily_feed_kg = base_daily_feed_kg * adjustment_factor
+        
+        # Determine feeding frequency based on fish size
+        feeding_frequency = self._get_feeding_frequency(avg_weight_g)
+        
+        return {
+            'base_rate': base_rate,
+            'final_rate': round(final_rate, 2),
+            'recommended_feed_kg': round(final_daily_feed_kg, 2),
+            'feeding_frequency': feeding_frequency,
+            'protein_requirement': protein_requirement,
+            'pellet_size': pellet_size,
+            'feeding_stage': feeding_stage['stage_name'],
+            'adjustments': adjustments,
+            'total_biomass_kg': round(total_biomass_kg, 2),
+            'base_daily_feed_kg': round(base_daily_feed_kg, 2)
+        }
+    
+    def _generate_comprehensive_notes(self, pond, species, fish_analysis, water_quality, 
+                                    mortality, feeding, environmental, growth, recommendations, medical=None):
+        """Generate detailed notes explaining the recommendations"""
+        
+        notes = [
+            f"=== SCIENTIFIC FEEDING ADVICE FOR {species.name.upper()} IN {pond.name.upper()} ===",
+            f"Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M')}",
+            "",
+            "📊 SCIENTIFIC FEEDING STAGE ANALYSIS:",
+            f"• Current Stage: {recommendations.get('feeding_stage', 'Unknown')}",
+            f"• Fish Weight: {float(recommendations.get('total_biomass_kg', 0) / fish_analysis.get('current_count', 1)) * 1000:.1f} g average",
+            f"• Pieces per kg: {recommendations.get('pcs_per_kg', 'N/A')}",
+            f"• Protein Requirement: {recommendations.get('protein_requirement', 'N/A')}%",
+            f"• Recommended Pellet Size: {recommendations.get('pellet_size', 'N/A')}",
+            f"• Feeding Frequency: {recommendations.get('feeding_frequency', 'N/A')} times per day",
+            f"• Feeding Times: {recommendations.get('feeding_times', 'N/A')}",
+            f"• Feeding Split: {recommendations.get('feeding_split', 'N/A')}",
+            "",
+            "🧮 DAILY FEEDING CALCULATION:",
+            f"• Formula: Daily feed (kg) = (Fish count × Avg weight (g) ÷ 1000) × (%BW/day ÷ 100)",
+            f"• Fish Count: {fish_analysis.get('current_count', 0):,} fish",
+            f"• Total Biomass: {recommendations.get('total_biomass_kg', 0):.2f} kg",
+            f"• Base %BW/day: {recommendations.get('base_rate', 0):.1f}%",
+            f"• Base Daily Feed: {recommendations.get('base_daily_feed_kg', 0):.2f} kg",
+            f"• Final %BW/day: {recommendations.get('final_rate', 0):.1f}% (after adjustments)",
+            f"• Final Daily Feed: {recommendations.get('recommended_feed_kg', 0):.2f} kg",
+            f"• Feeding Frequency: {recommendations.get('feeding_frequency', 2)} times per day",
+            "",
+            "⚖️ FEEDING ADJUSTMENTS:",
+            f"• Water Quality: {recommendations.get('adjustments', {}).get('water_quality', 0):+.0f}%",
+            f"• Temperature: {recommendations.get('adjustments', {}).get('temperature', 0):+.0f}%",
+            f"• Mortality Risk: {recommendations.get('adjustments', {}).get('mortality', 0):+.0f}%",
+            f"• Growth Quality: {recommendations.get('adjustments', {}).get('growth', 0):+.0f}%",
+            f"• Seasonal: {recommendations.get('adjustments', {}).get('seasonal', 0):+.0f}%",
+            f"• Feeding Consistency: {recommendations.get('adjustments', {}).get('feeding_consistency', 0):+.0f}%",
+            f"• Total Adjustment: {recommendations.get('adjustments', {}).get('total_adjustment', 0):+.0f}%",
+            "",
+            "=== FISH POPULATION ANALYSIS ===",
+            f"Current fish count: {fish_analysis['current_count']:,}",
+            f"Survival rate: {fish_analysis['survival_rate']:.1f}%",
+            f"Mortality trend: {fish_analysis['mortality_trend']}",
+            "",
+            "=== WATER QUALITY ANALYSIS ===",
+            f"Quality status: {water_quality['quality_status'].upper()} (Score: {water_quality['quality_score']}/100)",
+            f"Temperature: {water_quality['temperature']}°C" if water_quality['temperature'] else "Temperature: Not available",
+            f"pH: {water_quality['ph']}" if water_quality['ph'] else "pH: Not available",
+            f"Dissolved Oxygen: {water_quality['dissolved_oxygen']} mg/L" if water_quality['dissolved_oxygen'] else "Dissolved Oxygen: Not available",
+            "",
+            "=== MORTALITY ANALYSIS ===",
+            f"Recent deaths (30d): {mortality['total_recent_deaths']}",
+            f"Mortality events: {mortality['mortality_events']}",
+            f"Risk factors: {', '.join(mortality['risk_factors']) if mortality['risk_factors'] else 'None identified'}",
+            "",
+            "=== FEEDING PATTERN ANALYSIS ===",
+            f"Average daily feed (30d): {feeding['avg_daily_feed']:.2f} kg",
+            f"Feeding consistency: {feeding['feeding_consistency']}",
+            f"Feed types used: {len(feeding['feed_types_used'])}",
+            "",
+            "=== GROWTH ANALYSIS ===",
+            f"Growth rate: {growth['growth_rate_kg_per_day']:.4f} kg/day",
+            f"Growth trend: {growth['growth_trend']}",
+            f"Growth quality: {growth['growth_quality']}",
+            "",
+            "=== ENVIRONMENTAL FACTORS ===",
+            f"Season: {environmental['season'].title()}",
+            f"Temperature trend: {environmental['temperature_trend']}",
+            f"Seasonal factors: {', '.join(environmental['seasonal_factors'])}",
+            "",
+        ]
+        
+        # Add medical considerations if available
+        if medical and medical.get('active_diseases'):
+            notes.extend([
+                "=== MEDICAL CONSIDERATIONS ===",
+                f"Disease severity: {medical['disease_severity'].title()}",
+                f"Active diseases: {len(medical['active_diseases'])}",
+            ])
+            
+            for disease in medical['active_diseases']:
+                status = "Applied" if disease['is_applied'] else "Pending"
+                notes.append(f"• {disease['disease_name']} ({disease['confidence']:.0f}% confidence) - {status}")
+            
+            if medical.get('medical_warnings'):
+                notes.append("Medical warnings:")
+                for warning in medical['medical_warnings']:
+                    notes.append(f"• {warning}")
+            
+            if medical.get('recommended_feed_changes'):
+                notes.append("Feed recommendations:")
+                for change in medical['recommended_feed_changes']:
+                    notes.append(f"• {change}")
+            
+            notes.append("")
+        
+        notes.extend([
+            "=== RECOMMENDATIONS ===",
+            f"Recommended feeding rate: {recommendations['final_rate']:.1f}% of biomass",
+            f"Daily feed amount: {recommendations['recommended_feed_kg']:.2f} kg",
+            f"Feeding frequency: {recommendations['feeding_frequency']} times per day",
+            "",
+            "=== ADJUSTMENT FACTORS APPLIED ===",
+            f"Water quality impact: {recommendations['adjustments']['water_quality']:+.0f}%",
+            f"Temperature impact: {recommendations['adjustments']['temperature']:+.0f}%",
+            f"Mortality risk level: {recommendations['adjustments']['mortality']:+.0f}%",
+            f"Growth quality: {recommendations['adjustments']['growth']:+.0f}%",
+            f"Seasonal impact: {recommendations['adjustments']['seasonal']:+.0f}%",
+        ])
+        
+        # Add medical adjustment if available
+        if medical and 'medical_adjustment' in recommendations['adjustments']:
+            notes.append(f"Medical conditions impact: {recommendations['adjustments']['medical_adjustment']:+.0f}%")
+        
+        notes.extend([
+            f"Total adjustment: {recommendations['adjustments']['total_adjustment']:+.0f}%",
+        ])
+        
+        return '\n'.join(notes)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FishFarmingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'fish_farming'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,178 @@
+from datetime import date
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Sum
+
+from .caching import get_cache_version
+from .models import Stocking, Mortality, Harvest, FishSampling
+
+
+INTERPOLATION_METHODS = ('linear', 'log')
+BIOMASS_SERIES_TIMEOUT = 60 * 60
+
+
+def _daily_totals(queryset, count_field):
+    """[(pond_id, species_id, date, total)] of a count column summed per day"""
+    return list(queryset.filter(species__isnull=False).values_list('pond_id', 'species_id', 'date').annotate(
+        total=Sum(count_field)
+    ).order_by())
+
+
+def compute_biomass_series(user, pairs=None, pond_ids=None, species_ids=None, method='linear', end_date=None):
+    """Daily alive count, average weight and biomass per pond/species, from first stocking to ``end_date``.
+
+    Every stocked pond/species pair of the user is included, narrowed by
+    ``pairs`` ([(pond_id, species_id)]), ``pond_ids`` and ``species_ids``.
+    Stockings, mortalities, harvests and samplings are each read in one
+    query; the alive count is the running sum of the daily deltas and the
+    average weight is interpolated between the first stocking's average
+    weight and every sampling (linearly, or linearly in log space with
+    ``method='log'``), held flat after the last point. All pairs share one
+    day axis so each step is a single NumPy operation over every pair.
+    """
+    end_date = end_date or date.today()
+    stockings = Stocking.objects.filter(owner=user, date__lte=end_date)
+    if pairs is not None:
+        stockings = stockings.filter(
+            pond_id__in={pond_id for pond_id, _ in pairs}, species_id__in={species_id for _, species_id in pairs}
+        )
+    if pond_ids:
+        stockings = stockings.filter(pond_id__in=pond_ids)
+    if species_ids:
+        stockings = stockings.filter(species_id__in=species_ids)
+    stocking_rows = list(stockings.order_by('pond_id', 'species_id', 'date').values_list(
+        'pond_id', 'species_id', 'date', 'pcs', 'initial_avg_weight_kg', 'pond__name', 'species__name'
+    ))
+    if pairs is not None:
+        wanted = set(pairs)
+        stocking_rows = [row for row in stocking_rows if (row[0], row[1]) in wanted]
+    if not stocking_rows:
+        return []
+
+    # One row per pair, indexed in (pond, species) order
+    pair_index = {}
+    first_stockings = []
+    for row in stocking_rows:
+        if (row[0], row[1]) not in pair_index:
+            pair_index[(row[0], row[1])] = len(first_stockings)
+            first_stockings.append(row)
+    pair_ponds = sorted({pond_id for pond_id, _ in pair_index})
+    pair_species = sorted({species_id for _, species_id in pair_index})
+
+    def scoped(model):
+        # The ponds come from the user's own stockings
+        return model.objects.filter(pond_id__in=pair_ponds, species_id__in=pair_species, date__lte=end_date)
+
+    start_ordinal = min(row[2] for row in first_stockings).toordinal()
+    day_count = end_date.toordinal() - start_ordinal + 1
+    pair_count = len(first_stockings)
+
+    # Alive count: cumulative stocked - dead - harvested per day
+    events = [(row[0], row[1], row[2], row[3]) for row in stocking_rows]
+    events += [(pond, species, day, -total) for pond, species, day, total in _daily_totals(scoped(Mortality), 'count')]
+    events += [(pond, species, day, -(total or 0)) for pond, species, day, total in _daily_totals(scoped(Harvest), 'total_count')]
+    events = [event for event in events if (event[0], event[1]) in pair_index]
+    deltas = np.zeros((pair_count, day_count))
+    np.add.at(
+        deltas,
+        (
+            np.array([pair_index[(event[0], event[1])] for event in events]),
+            np.array([event[2].toordinal() - start_ordinal for event in events]),
+        ),
+        np.array([float(event[3]) for event in events]),
+    )
+    alive = np.maximum(np.cumsum(deltas, axis=1), 0)
+
+    # Average weight anchors: the first stocking, then every sampling (which wins on the same day)
+    anchors = [
+        (pair_index[(row[0], row[1])], row[2].toordinal() - start_ordinal, float(row[4]), 0)
+        for row in first_stockings
+    ]
+    samplings = scoped(FishSampling).filter(average_weight_kg__gt=0).values_list(
+        'pond_id', 'species_id', 'date', 'average_weight_kg'
+    )
+    anchors += [
+        (pair_index[(pond, species)], day.toordinal() - start_ordinal, float(weight), 1)
+        for pond, species, day, weight in samplings
+        if (pond, species) in pair_index and day.toordinal() >= first_stockings[pair_index[(pond, species)]][2].toordinal()
+    ]
+    anchor_pairs, anchor_days, anchor_weights, anchor_priority = (np.array(column) for column in zip(*anchors))
+    order = np.lexsort((anchor_priority, anchor_days, anchor_pairs))
+    anchor_pairs, anchor_days, anchor_weights = anchor_pairs[order], anchor_days[order], anchor_weights[order]
+    # Keep the last (highest priority) anchor of each pair/day
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = (anchor_pairs[1:] != anchor_pairs[:-1]) | (anchor_days[1:] != anchor_days[:-1])
+    anchor_pairs, anchor_days, anchor_weights = anchor_pairs[last], anchor_days[last], anchor_weights[last]
+
+    if method == 'log':
+        usable = anchor_weights > 0
+        anchor_pairs, anchor_days, anchor_weights = anchor_pairs[usable], anchor_days[usable], np.log(anchor_weights[usable])
+
+    # Interpolate every pair at once on a flattened axis where each pair owns a
+    # [pair * stride, pair * stride + day_count) segment, bounded by copies of its
+    # first and last anchors so values never bleed across pairs
+    weights = np.zeros((pair_count, day_count))
+    if len(anchor_pairs):
+        stride = day_count + 2
+        first = np.ones(len(anchor_pairs), dtype=bool)
+        first[1:] = anchor_pairs[1:] != anchor_pairs[:-1]
+        final = np.ones(len(anchor_pairs), dtype=bool)
+        final[:-1] = anchor_pairs[1:] != anchor_pairs[:-1]
+        x = np.concatenate((
+            anchor_pairs[first] * stride - 1,
+            anchor_pairs * stride + anchor_days,
+            anchor_pairs[final] * stride + day_count,
+        ))
+        y = np.concatenate((anchor_weights[first], anchor_weights, anchor_weights[final]))
+        order = np.argsort(x, kind='stable')
+        points = (np.arange(pair_count)[:, None] * stride + np.arange(day_count)[None, :]).ravel()
+        weights = np.interp(points, x[order], y[order]).reshape(pair_count, day_count)
+        if method == 'log':
+            weights = np.exp(weights)
+
+    # Pairs without a usable weight anchor (log of a zero stocking weight) have no weights
+    has_weight = np.zeros(pair_count, dtype=bool)
+    has_weight[np.unique(anchor_pairs)] = True
+    weights[~has_weight] = 0
+    biomass = alive * weights
+
+    series = []
+    for pond_id, species_id, first_date, _, _, pond_name, species_name in first_stockings:
+        index = pair_index[(pond_id, species_id)]
+        offset = first_date.toordinal() - start_ordinal
+        series.append({
+            'pond_id': pond_id,
+            'pond_name': pond_name,
+            'species_id': species_id,
+            'species_name': species_name,
+            'start_date': first_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'alive_count': alive[index, offset:].astype(int).tolist(),
+            'average_weight_kg': np.round(weights[index, offset:], 6).tolist(),
+            'biomass_kg': np.round(biomass[index, offset:], 4).tolist(),
+            'current_alive_count': int(alive[index, -1]),
+            'current_average_weight_kg': round(float(weights[index, -1]), 6),
+            'current_biomass_kg': round(float(biomass[index, -1]), 4),
+        })
+    return series
+
+
+def biomass_series_namespace(user_id):
+    return f'biomass-series:{user_id}'
+
+
+def get_biomass_series(user, pairs=None, pond_ids=None, species_ids=None, method='linear', end_date=None):
+    """compute_biomass_series, cached until the user's stockings, mortalities, harvests or samplings change"""
+    end_date = end_date or date.today()
+    version = get_cache_version(biomass_series_namespace(user.pk))
+    key = 'fish_farming:biomass-series:{}:{}:{}:{}:{}:{}:{}'.format(
+        user.pk, version, method, end_date,
+        ','.join(f'{pond}-{species}' for pond, species in sorted(pairs)) if pairs is not None else '*',
+        ','.join(map(str, sorted(pond_ids or []))), ','.join(map(str, sorted(species_ids or []))),
+    )
+    data = cache.get(key)
+    if data is None:
+        data = compute_biomass_series(user, pairs, pond_ids, species_ids, method, end_date)
+        cache.set(key, data, BIOMASS_SERIES_TIMEOUT)
+    return data
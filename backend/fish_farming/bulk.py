@@ -0,0 +1,219 @@
+from django.db import transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .eager_loading import optimize_queryset
+from .models import Pond, FishSampling, Stocking
+from .signals import apply_bulk_created
+
+
+MAX_BULK_ROWS = 1000
+BULK_BATCH_SIZE = 500
+
+
+class PreloadedRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField resolved from objects fetched up front instead of one query per row"""
+
+    def __init__(self, objects, **kwargs):
+        self.objects = objects
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return self.objects[int(data)]
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+
+
+def _pk_values(values):
+    pks = set()
+    for value in values:
+        try:
+            if not isinstance(value, bool):
+                pks.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    return pks
+
+
+def preload_related_fields(serializer, rows, querysets=None):
+    """Resolve every writable primary key field of a ``many=True`` serializer with one query per relation.
+
+    ``querysets`` overrides a field's queryset by name, e.g. to limit ponds
+    to the requesting user's so ownership is checked in the same query.
+    """
+    querysets = querysets or {}
+    child = serializer.child
+    for name, field in list(child.fields.items()):
+        if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.read_only:
+            continue
+        queryset = querysets.get(name, field.get_queryset())
+        pks = _pk_values(row.get(name) for row in rows if isinstance(row, dict))
+        child.fields[name] = PreloadedRelatedField(
+            queryset.in_bulk(pks) if pks else {},
+            queryset=queryset,
+            required=field.required,
+            allow_null=field.allow_null,
+        )
+
+
+def latest_average_weights(pairs):
+    """{(pond_id, species_id): latest sampled average weight, falling back to the latest stocking's} in two queries"""
+    pond_ids = {pond_id for pond_id, _ in pairs}
+    weights = {}
+    stockings = Stocking.objects.filter(pond_id__in=pond_ids, initial_avg_weight_kg__gt=0).order_by('date', 'pk')
+    for pond_id, species_id, weight in stockings.values_list('pond_id', 'species_id', 'initial_avg_weight_kg'):
+        weights[(pond_id, species_id)] = weight
+    sampled = {}
+    samplings = FishSampling.objects.filter(pond_id__in=pond_ids, average_weight_kg__gt=0).order_by('date', 'created_at', 'id')
+    for pond_id, species_id, weight in samplings.values_list('pond_id', 'species_id', 'average_weight_kg'):
+        sampled[(pond_id, species_id)] = weight
+    weights.update(sampled)
+    return {pair: weights[pair] for pair in pairs if pair in weights}
+
+
+def fill_mortality_weights(mortalities):
+    """Set avg_weight_kg (when missing) and total_weight_kg like Mortality.save, from one preloaded weight map"""
+    weights = latest_average_weights({
+        (mortality.pond_id, mortality.species_id) for mortality in mortalities
+        if mortality.species_id and not mortality.avg_weight_kg
+    })
+    for mortality in mortalities:
+        if not mortality.avg_weight_kg and mortality.species_id:
+            mortality.avg_weight_kg = weights.get((mortality.pond_id, mortality.species_id))
+        if mortality.count and mortality.avg_weight_kg:
+            mortality.total_weight_kg = mortality.count * mortality.avg_weight_kg
+
+
+def fill_feed_derived_fields(feeds):
+    """Set total_cost and feeding_rate_percent like Feed.save (no queries)"""
+    for feed in feeds:
+        feed.calculate_derived_fields()
+
+
+class BulkCreateMixin:
+    """Adds ``POST <collection>/bulk/``: create many pond-scoped rows in one request and one transaction.
+
+    The body is a list of rows (or ``{"rows": [...]}``), validated with the
+    viewset serializer; ponds are checked against the requesting user in one
+    query and every other relation is resolved with one query. Rows are
+    inserted with ``bulk_create`` and the signal bookkeeping is applied
+    set-wise. Viewsets that set ``bulk_upsert_fields`` accept ``?upsert=true``
+    to update the existing row with the same key instead of failing.
+    """
+    bulk_upsert_fields = None
+
+    def prepare_bulk_instances(self, instances):
+        """Fill derived fields of the unsaved instances (hook for subclasses)"""
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        rows = request.data if isinstance(request.data, list) else request.data.get('rows')
+        if not isinstance(rows, list) or not rows:
+            return Response({'error': 'Send a non-empty list of rows'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > MAX_BULK_ROWS:
+            return Response(
+                {'error': f'At most {MAX_BULK_ROWS} rows can be created at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        upsert = request.query_params.get('upsert', '').lower() in ('1', 'true', 'yes')
+        if upsert and not self.bulk_upsert_fields:
+            return Response({'error': 'Upsert is not supported for these records'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(data=rows, many=True)
+        preload_related_fields(serializer, rows, {'pond': Pond.objects.filter(user=request.user)})
+        # Unique keys are checked below with one query instead of one per row
+        serializer.child.validators = []
+        if not serializer.is_valid():
+            return Response({'error': 'Invalid rows', 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        model = serializer.child.Meta.model
+        attrs_list = serializer.validated_data
+        updated_count = 0
+        if self.bulk_upsert_fields:
+            keys = [tuple(attrs[field] for field in self.bulk_upsert_fields) for attrs in attrs_list]
+            seen = set()
+            duplicates = []
+            for index, key in enumerate(keys):
+                if key in seen:
+                    duplicates.append(index)
+                seen.add(key)
+            if duplicates and not upsert:
+                return Response(
+                    {'error': f"Rows {', '.join(map(str, duplicates))} repeat the {' and '.join(self.bulk_upsert_fields)} of an earlier row"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            existing = self.existing_bulk_keys(model, keys)
+            if existing and not upsert:
+                clashes = [index for index, key in enumerate(keys) if key in existing]
+                return Response(
+                    {'error': f"Rows {', '.join(map(str, clashes))} already exist; use ?upsert=true to update them"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # The last row for a key wins
+            attrs_list = list({key: attrs for key, attrs in zip(keys, attrs_list)}.values())
+            updated_count = len(existing)
+
+        instances = [model(**attrs) for attrs in attrs_list]
+        for instance in instances:
+            instance.owner_id = instance.pond.user_id
+        self.prepare_bulk_instances(instances)
+
+        with transaction.atomic():
+            if upsert:
+                self.upsert_instances(model, instances, attrs_list)
+                # Updated rows keep stored values the request omitted, so serialize what was saved
+                instances = self.stored_bulk_instances(model, instances)
+            else:
+                model.objects.bulk_create(instances, batch_size=BULK_BATCH_SIZE)
+                apply_bulk_created(model, instances)
+
+        return Response({
+            'created': len(instances) - updated_count,
+            'updated': updated_count,
+            'results': self.get_serializer(instances, many=True).data,
+        }, status=status.HTTP_201_CREATED)
+
+    def bulk_key_columns(self, model):
+        """Column names of bulk_upsert_fields (``<field>_id`` for relations)"""
+        return [f'{field}_id' if model._meta.get_field(field).is_relation else field for field in self.bulk_upsert_fields]
+
+    def existing_bulk_keys(self, model, keys):
+        """The subset of ``keys`` (values of bulk_upsert_fields) already stored, in one query"""
+        fields = self.bulk_key_columns(model)
+        lookup = {}
+        for index, field in enumerate(fields):
+            lookup[f'{field}__in'] = {getattr(key[index], 'pk', key[index]) for key in keys}
+        stored = set(model.objects.filter(**lookup).values_list(*fields))
+        return {
+            key for key in keys
+            if tuple(getattr(value, 'pk', value) for value in key) in stored
+        }
+
+    def stored_bulk_instances(self, model, instances):
+        """Re-read the rows with the keys of ``instances`` from the database, in the same order"""
+        fields = self.bulk_key_columns(model)
+        keys = [tuple(getattr(instance, field) for field in fields) for instance in instances]
+        lookup = {f'{field}__in': {key[index] for key in keys} for index, field in enumerate(fields)}
+        stored = {
+            tuple(getattr(row, field) for field in fields): row
+            for row in optimize_queryset(self.get_queryset(), self.get_serializer_class()).filter(**lookup)
+        }
+        return [stored[key] for key in keys]
+
+    def upsert_instances(self, model, instances, attrs_list):
+        """Insert or update on bulk_upsert_fields; rows are grouped by the fields they set so omitted fields are kept"""
+        groups = {}
+        for instance, attrs in zip(instances, attrs_list):
+            groups.setdefault(frozenset(attrs), []).append(instance)
+        for fields, group in groups.items():
+            update_fields = sorted(fields - set(self.bulk_upsert_fields)) + ['owner']
+            model.objects.bulk_create(
+                group, batch_size=BULK_BATCH_SIZE, update_conflicts=True,
+                unique_fields=self.bulk_upsert_fields, update_fields=update_fields,
+            )
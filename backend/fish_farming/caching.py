@@ -0,0 +1,28 @@
+import uuid
+
+from django.core.cache import cache
+
+
+# Cached data is stored under a version token that every relevant write
+# replaces, so stale entries are never read back (even if the token itself is
+# evicted, a fresh one is issued) and simply expire
+VERSION_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(namespace):
+    return f'fish_farming:version:{namespace}'
+
+
+def get_cache_version(namespace):
+    """Current version token of a cache namespace, created on first use"""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, VERSION_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def bump_cache_version(namespace):
+    """Invalidate everything cached in a namespace by giving it a fresh version token"""
+    cache.set(_version_key(namespace), uuid.uuid4().hex, VERSION_TIMEOUT)
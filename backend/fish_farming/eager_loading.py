@@ -0,0 +1,110 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+
+
+class RelatedLookups:
+    """select_related paths and nested prefetches needed to serialize one model"""
+
+    def __init__(self, model, parent_link=None):
+        self.model = model
+        # Foreign key back to the prefetching row, which Django fills in without a join
+        self.parent_link = parent_link
+        self.select = set()
+        self.prefetch = {}
+
+    def add_prefetch(self, path, field):
+        if path not in self.prefetch:
+            parent_link = field.field.name if field.one_to_many else None
+            self.prefetch[path] = RelatedLookups(field.related_model, parent_link)
+        return self.prefetch[path]
+
+    def add_source(self, source_attrs, prefix=(), model=None):
+        """Follow a dotted source across relations, starting ``prefix`` below this model.
+
+        Returns (lookups, prefix, model, followed): the lookups the last relation
+        belongs to, the select_related path to it within them, the model
+        reached and whether any relation was followed at all.
+        """
+        lookups, path, model = self, list(prefix), model or self.model
+        followed = False
+        for attr in source_attrs:
+            try:
+                field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # A property or method (e.g. get_type_display, stockings.first)
+                break
+            if not field.is_relation or field.related_model is None:
+                break
+            path.append(attr)
+            if field.many_to_many or field.one_to_many:
+                lookups = lookups.add_prefetch('__'.join(path), field)
+                path = []
+            elif path != [lookups.parent_link]:
+                lookups.select.add('__'.join(path))
+            model = field.related_model
+            followed = True
+        return lookups, path, model, followed
+
+    def apply(self, queryset, parent_link=None):
+        select = self.select - {parent_link}
+        if select:
+            queryset = queryset.select_related(*sorted(select))
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*(
+                Prefetch(path, queryset=nested.apply(nested.model._default_manager.all()))
+                for path, nested in sorted(self.prefetch.items())
+            ))
+        return queryset
+
+
+def collect_related_lookups(serializer, lookups, prefix=(), model=None):
+    """Add the relations a serializer reads (dotted sources and nested serializers) to ``lookups``"""
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+
+        if isinstance(field, PrimaryKeyRelatedField):
+            # Serialized from the local <field>_id column
+            continue
+
+        if isinstance(field, (serializers.BaseSerializer, ManyRelatedField)):
+            target, path, related_model, followed = lookups.add_source(field.source_attrs, prefix, model)
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if followed and isinstance(nested, serializers.Serializer):
+                collect_related_lookups(nested, target, path, related_model)
+            continue
+
+        if len(field.source_attrs) > 1 or isinstance(field, serializers.RelatedField):
+            lookups.add_source(field.source_attrs, prefix, model)
+
+
+_lookups_cache = {}
+
+
+def get_related_lookups(serializer_class, model):
+    """Related lookups for a serializer class, derived once per process"""
+    key = (serializer_class, model)
+    if key not in _lookups_cache:
+        lookups = RelatedLookups(model)
+        collect_related_lookups(serializer_class(), lookups)
+        _lookups_cache[key] = lookups
+    return _lookups_cache[key]
+
+
+def optimize_queryset(queryset, serializer_class, parent_link=None):
+    """Apply the select_related/prefetch_related a serializer needs to avoid per-row queries.
+
+    ``parent_link`` names a foreign key Django already fills in (the row the
+    queryset is prefetched or fetched for), which is then not joined.
+    """
+    return get_related_lookups(serializer_class, queryset.model).apply(queryset, parent_link)
+
+
+class EagerLoadingMixin:
+    """Loads the relations the viewset's serializer reads together with the rows it lists"""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return optimize_queryset(queryset, self.get_serializer_class())
@@ -0,0 +1,165 @@
+from datetime import date, datetime
+
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncQuarter, TruncYear
+
+from .finance import period_label
+from .models import Feed, Mortality, Harvest, Stocking, Expense, Income, PondMonthlyFact
+
+
+# Source model -> (owner lookup, species lookup or None, {fact metric: source field})
+FACT_SOURCES = {
+    Feed: ('owner_id', None, {'feed_kg': 'amount_kg', 'feed_cost': 'total_cost'}),
+    Mortality: ('owner_id', 'species_id', {'mortality_count': 'count', 'mortality_kg': 'total_weight_kg'}),
+    Harvest: ('owner_id', 'species_id', {'harvest_kg': 'total_weight_kg', 'harvest_revenue': 'total_revenue'}),
+    Stocking: ('owner_id', 'species_id', {'stocking_cost': 'cost'}),
+    Expense: ('user_id', 'species_id', {'expenses': 'amount'}),
+    Income: ('user_id', 'species_id', {'incomes': 'amount'}),
+}
+
+ROLLUP_PERIODS = {
+    'month': TruncMonth,
+    'quarter': TruncQuarter,
+    'year': TruncYear,
+}
+ROLLUP_DIMENSIONS = {
+    'pond': ('pond_id', 'pond__name'),
+    'species': ('species_id', 'species__name'),
+}
+
+
+def month_start(value):
+    """First day of the month containing a date (or an ISO date string)"""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.replace(day=1)
+
+
+def parse_month(value):
+    """Parse YYYY-MM or YYYY-MM-DD into the first day of that month (ValueError if invalid)"""
+    for fmt in ('%Y-%m', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).date().replace(day=1)
+        except ValueError:
+            continue
+    raise ValueError(f'Invalid month {value!r}. Use YYYY-MM')
+
+
+def fact_contribution(sender, values):
+    """Return (user_id, pond_id, species_id, month) and {metric: amount} for a source row"""
+    owner_lookup, species_lookup, metrics = FACT_SOURCES[sender]
+    key = (
+        values[owner_lookup],
+        values['pond_id'],
+        values[species_lookup] if species_lookup else None,
+        month_start(values['date']),
+    )
+    return key, {metric: values[field] or 0 for metric, field in metrics.items()}
+
+
+def stored_values(sender, pk):
+    """The fact-relevant columns of a stored source row, or None"""
+    owner_lookup, species_lookup, metrics = FACT_SOURCES[sender]
+    lookups = {owner_lookup, 'pond_id', 'date', *metrics.values()}
+    if species_lookup:
+        lookups.add(species_lookup)
+    return sender.objects.filter(pk=pk).values(*lookups).first()
+
+
+def instance_values(sender, instance):
+    """The fact-relevant values of an in-memory source row"""
+    owner_lookup, species_lookup, metrics = FACT_SOURCES[sender]
+    values = {'pond_id': instance.pond_id, 'date': instance.date, owner_lookup: getattr(instance, owner_lookup)}
+    if species_lookup:
+        values[species_lookup] = instance.species_id
+    for field in metrics.values():
+        values[field] = getattr(instance, field)
+    return values
+
+
+def apply_contribution(key, amounts, sign=1):
+    PondMonthlyFact.apply_delta(*key, {metric: sign * amount for metric, amount in amounts.items()})
+
+
+def rebuild_facts(user_id=None):
+    """Recompute the fact table (for one user or everyone) from the source tables.
+
+    Each source is grouped by (owner, pond, species, month) in one query and
+    the rows are replaced in a single transaction. Returns the number of fact
+    rows written.
+    """
+    totals = {}
+    for model, (owner_lookup, species_lookup, metrics) in FACT_SOURCES.items():
+        rows = model.objects.all()
+        if user_id is not None:
+            rows = rows.filter(**{owner_lookup: user_id})
+        group_fields = [owner_lookup, 'pond_id'] + ([species_lookup] if species_lookup else [])
+        rows = rows.annotate(fact_month=TruncMonth('date')).values(*group_fields, 'fact_month').annotate(**{
+            metric: Sum(field) for metric, field in metrics.items()
+        }).order_by()
+        for row in rows:
+            key = (
+                row[owner_lookup],
+                row['pond_id'],
+                row[species_lookup] if species_lookup else None,
+                row['fact_month'],
+            )
+            entry = totals.setdefault(key, {})
+            for metric in metrics:
+                entry[metric] = entry.get(metric, 0) + (row[metric] or 0)
+
+    facts = [
+        PondMonthlyFact(user_id=user, pond_id=pond, species_id=species, month=month, **entry)
+        for (user, pond, species, month), entry in totals.items()
+        if any(entry.values())
+    ]
+    with transaction.atomic():
+        existing = PondMonthlyFact.objects.all()
+        if user_id is not None:
+            existing = existing.filter(user_id=user_id)
+        existing.delete()
+        PondMonthlyFact.objects.bulk_create(facts, batch_size=1000)
+    return len(facts)
+
+
+def _metric_values(row):
+    values = {metric: row[metric] or 0 for metric in PondMonthlyFact.METRIC_FIELDS}
+    values['profit_loss'] = values['incomes'] - values['expenses']
+    return {
+        metric: value if metric == 'mortality_count' else float(value)
+        for metric, value in values.items()
+    }
+
+
+def rollup_facts(queryset, period=None, group_by=()):
+    """Sum fact rows by an optional period (month, quarter or year) and dimensions (pond, species).
+
+    Returns {'rows': [...], 'totals': {...}}: one row per group with its keys
+    and metric totals, plus the totals over every row, from one grouped query
+    and one aggregate.
+    """
+    dimensions = []
+    if period:
+        queryset = queryset.annotate(period=ROLLUP_PERIODS[period]('month'))
+        dimensions.append('period')
+    for name in group_by:
+        dimensions.extend(ROLLUP_DIMENSIONS[name])
+
+    sums = {metric: Sum(metric) for metric in PondMonthlyFact.METRIC_FIELDS}
+    rows = []
+    if dimensions:
+        for row in queryset.values(*dimensions).annotate(**sums).order_by(*dimensions):
+            group = {}
+            if period:
+                group['period'] = str(row['period'].year) if period == 'year' else period_label(row['period'], period)
+            for name in group_by:
+                id_lookup, name_lookup = ROLLUP_DIMENSIONS[name]
+                group[id_lookup] = row[id_lookup]
+                group[f'{name}_name'] = row[name_lookup]
+            group.update(_metric_values(row))
+            rows.append(group)
+
+    totals = queryset.aggregate(**sums)
+    return {'rows': rows, 'totals': _metric_values(totals)}
+
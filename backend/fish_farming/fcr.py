@@ -0,0 +1,193 @@
+from datetime import date, timedelta
+
+import numpy as np
+from django.db.models import Sum, Count
+
+from .models import Feed, FishSampling, Harvest, PondSpeciesPopulation
+
+
+# Final/initial weight ratio below which a sampling series is considered unreliable
+SUSPECT_FINAL_WEIGHT_RATIO = 0.5
+# Days either side of the last sampling searched for a harvest weight
+HARVEST_MATCH_DAYS = 7
+# Assumed total biomass (kg) when a pond/species has no stocking on record
+FALLBACK_BIOMASS_KG = 100
+
+
+def fcr_status(fcr):
+    """Label an FCR value"""
+    if fcr <= 1.2:
+        return 'Excellent'
+    if fcr <= 1.5:
+        return 'Good'
+    if fcr <= 2.0:
+        return 'Needs Improvement'
+    return 'Poor'
+
+
+def _round4(values):
+    """Round element-wise with Python's round() so results match the scalar calculation exactly"""
+    return np.array([round(value, 4) for value in values.tolist()], dtype=float)
+
+
+def _safe_divide(numerator, denominator):
+    """Element-wise division that yields 0 where the denominator is not positive"""
+    return np.divide(
+        numerator, denominator,
+        out=np.zeros(len(numerator), dtype=float), where=denominator > 0
+    )
+
+
+def compute_fcr_analysis(user, start_date, end_date, pond_id=None, species_id=None):
+    """Compute FCR for every pond/species combination sampled in a date window.
+
+    Feeds, samplings, population counts and harvests are each fetched with a
+    single query for the whole window; the per-combination figures are then
+    computed over NumPy arrays. Returns the rows used by
+    ``FishSamplingViewSet.fcr_analysis``, sorted by FCR (best first).
+    """
+    feeds = Feed.objects.filter(owner=user, date__gte=start_date, date__lte=end_date)
+    samplings = FishSampling.objects.filter(
+        pond__user=user, species__isnull=False, date__gte=start_date, date__lte=end_date
+    )
+    populations = PondSpeciesPopulation.objects.filter(pond__user=user)
+    harvests = Harvest.objects.filter(
+        owner=user,
+        date__gte=start_date - timedelta(days=HARVEST_MATCH_DAYS),
+        date__lte=end_date + timedelta(days=HARVEST_MATCH_DAYS)
+    )
+
+    if pond_id:
+        feeds = feeds.filter(pond_id=pond_id)
+        samplings = samplings.filter(pond_id=pond_id)
+        populations = populations.filter(pond_id=pond_id)
+        harvests = harvests.filter(pond_id=pond_id)
+    if species_id:
+        samplings = samplings.filter(species_id=species_id)
+        populations = populations.filter(species_id=species_id)
+        harvests = harvests.filter(species_id=species_id)
+
+    rows = list(samplings.order_by('pond_id', 'species_id', 'date').values_list(
+        'pond_id', 'species_id', 'date', 'average_weight_kg', 'fish_per_kg',
+        'pond__name', 'species__name'
+    ))
+    if not rows:
+        return []
+
+    # Sampling series as arrays, grouped by pond/species in query order
+    pond_ids = np.array([row[0] for row in rows])
+    species_ids = np.array([row[1] for row in rows])
+    dates = np.array([row[2].toordinal() for row in rows])
+    weights = np.array([float(row[3]) for row in rows])
+    fish_per_kg = np.array([float(row[4] or 0) for row in rows])
+
+    boundaries = np.flatnonzero(
+        (pond_ids[1:] != pond_ids[:-1]) | (species_ids[1:] != species_ids[:-1])
+    ) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(rows)])) - 1
+
+    # FCR needs at least an initial and a final sampling
+    enough = ends > starts
+    starts, ends = starts[enough], ends[enough]
+    if not len(starts):
+        return []
+
+    initial_weights = weights[starts]
+    final_weights = weights[ends]
+    end_dates = dates[ends]
+
+    # Data quality check: a final weight far below the initial one is replaced by
+    # a harvest weight from around the last sampling, or the combination is skipped
+    reliable = np.ones(len(starts), dtype=bool)
+    suspect = np.flatnonzero(final_weights < initial_weights * SUSPECT_FINAL_WEIGHT_RATIO)
+    if len(suspect):
+        harvests_by_combo = {}
+        for harvest in harvests.order_by('-date', '-pk').values('pond_id', 'species_id', 'date', 'avg_weight_kg'):
+            harvests_by_combo.setdefault((harvest['pond_id'], harvest['species_id']), []).append(harvest)
+
+        for index in suspect.tolist():
+            row = rows[starts[index]]
+            harvest = next((
+                harvest for harvest in harvests_by_combo.get((row[0], row[1]), [])
+                if abs(harvest['date'].toordinal() - end_dates[index]) <= HARVEST_MATCH_DAYS
+            ), None)
+            if harvest and harvest['avg_weight_kg']:
+                final_weights[index] = float(harvest['avg_weight_kg'])
+                end_dates[index] = harvest['date'].toordinal()
+            else:
+                reliable[index] = False
+
+    starts, ends = starts[reliable], ends[reliable]
+    initial_weights, final_weights, end_dates = initial_weights[reliable], final_weights[reliable], end_dates[reliable]
+    if not len(starts):
+        return []
+
+    combo_ponds = pond_ids[starts]
+    combo_species = species_ids[starts]
+
+    # Feed totals per pond
+    feed_totals = {
+        row['pond_id']: (float(row['total_feed_kg'] or 0), row['feeding_days'])
+        for row in feeds.values('pond_id').annotate(
+            total_feed_kg=Sum('amount_kg'), feeding_days=Count('id')
+        ).order_by()
+    }
+    total_feed_kg = np.array([feed_totals.get(pond, (0.0, 0))[0] for pond in combo_ponds.tolist()])
+    feeding_days = [feed_totals.get(pond, (0.0, 0))[1] for pond in combo_ponds.tolist()]
+
+    # Estimated fish count from the population ledger (stocked - mortality - harvest)
+    alive_counts = {
+        (row['pond_id'], row['species_id']): float(row['alive_count'])
+        for row in populations.filter(stocked_count__gt=0).values('pond_id', 'species_id', 'alive_count')
+    }
+    combos = list(zip(combo_ponds.tolist(), combo_species.tolist()))
+    stocked = np.array([combo in alive_counts for combo in combos])
+    estimated_fish_count = np.array([alive_counts.get(combo, 0.0) for combo in combos])
+
+    # Without stocking data, fall back to fish_per_kg from the first sampling
+    # over an assumed total biomass
+    fallback = (estimated_fish_count == 0) & (fish_per_kg[starts] != 0)
+    estimated_fish_count = np.where(fallback, fish_per_kg[starts] * FALLBACK_BIOMASS_KG, estimated_fish_count)
+    has_estimate = stocked | fallback
+
+    weight_gain_per_fish = _round4(final_weights - initial_weights)
+    total_weight_gain_kg = _round4(estimated_fish_count * weight_gain_per_fish)
+    days = end_dates - dates[starts]
+
+    fcr = _round4(_safe_divide(total_feed_kg, total_weight_gain_kg))
+    avg_daily_feed = _round4(_safe_divide(total_feed_kg, days.astype(float)))
+    avg_daily_weight_gain = _round4(_safe_divide(total_weight_gain_kg, days.astype(float)))
+
+    has_gain = total_weight_gain_kg > 0
+    has_days = days > 0
+
+    fcr_data = []
+    for index in range(len(starts)):
+        first_row = rows[starts[index]]
+        combo_fcr = fcr[index].item() if has_gain[index] else 0
+        fcr_data.append({
+            'pond_id': first_row[0],
+            'pond_name': first_row[5],
+            'species_id': first_row[1],
+            'species_name': first_row[6],
+            'start_date': first_row[2].isoformat(),
+            'end_date': date.fromordinal(int(end_dates[index])).isoformat(),
+            'days': int(days[index]),
+            'estimated_fish_count': estimated_fish_count[index].item() if has_estimate[index] else 0,
+            'initial_weight_kg': initial_weights[index].item(),
+            'final_weight_kg': final_weights[index].item(),
+            'weight_gain_per_fish_kg': weight_gain_per_fish[index].item(),
+            'total_weight_gain_kg': total_weight_gain_kg[index].item(),
+            'total_feed_kg': total_feed_kg[index].item(),
+            'avg_daily_feed_kg': avg_daily_feed[index].item() if has_days[index] else 0,
+            'avg_daily_weight_gain_kg': avg_daily_weight_gain[index].item() if has_days[index] else 0,
+            'fcr': combo_fcr,
+            'fcr_status': fcr_status(combo_fcr),
+            'sampling_count': int(ends[index] - starts[index] + 1),
+            'feeding_days': feeding_days[index]
+        })
+
+    # Sort by FCR (best first)
+    fcr_data.sort(key=lambda row: row['fcr'])
+    return fcr_data
@@ -0,0 +1,182 @@
+import bisect
+import math
+import threading
+
+import numpy as np
+from django.db.models import Count, Max
+
+
+# Scientific feeding table, sorted by upper weight bound (g, inclusive).
+# The last row has no upper bound and covers everything heavier.
+# (max_weight_g, stage_name, percent_bw_per_day, protein_percent, pellet_size,
+#  pcs_per_kg, feeding_frequency, feeding_times, feeding_split)
+FEEDING_STAGE_ROWS = [
+    (0.33, 'Starter (3000 pcs/kg)', 28.0, 40, '0.5-0.8 mm', 3000, 6, '7:30 • 9:30 • 11:30 • 13:30 • 15:30 • 17:30', '20•20•15•15•15•15%'),
+    (0.67, 'Starter (1500 pcs/kg)', 24.0, 40, '0.5-0.8 mm', 1500, 6, '7:30 • 9:30 • 11:30 • 13:30 • 15:30 • 17:30', '20•20•15•15•15•15%'),
+    (1.0, 'Starter (1000 pcs/kg)', 20.0, 40, '0.5-0.8 mm', 1000, 6, '7:30 • 9:30 • 11:30 • 13:30 • 15:30 • 17:30', '20•20•15•15•15•15%'),
+    (2.0, 'Nursery-1 (500 pcs/kg)', 18.0, 38, '0.8-1.2 mm', 500, 5, '7:30 • 10:00 • 12:30 • 15:00 • 17:30', '25•20•20•20•15%'),
+    (5.0, 'Nursery-1 (200 pcs/kg)', 14.0, 38, '0.8-1.2 mm', 200, 5, '7:30 • 10:00 • 12:30 • 15:00 • 17:30', '25•20•20•20•15%'),
+    (6.7, 'Nursery-2 (150 pcs/kg)', 11.0, 36, '1.2-1.5 mm', 150, 4, '8:00 • 11:00 • 14:00 • 17:00', '30•25•25•20%'),
+    (10.0, 'Nursery-2 (100 pcs/kg)', 9.0, 36, '1.2-1.5 mm', 100, 4, '8:00 • 11:00 • 14:00 • 17:00', '30•25•25•20%'),
+    (12.5, 'Grower-1 (80 pcs/kg)', 7.0, 34, '1.5-2.0 mm', 80, 4, '8:00 • 11:00 • 14:30 • 17:30', '30•25•25•20%'),
+    (25.0, 'Grower-1 (40 pcs/kg)', 5.5, 34, '1.5-2.0 mm', 40, 4, '8:00 • 11:00 • 14:30 • 17:30', '30•25•25•20%'),
+    (33.0, 'Grower-2 (30 pcs/kg)', 4.8, 32, '2.0-2.5 mm', 30, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (50.0, 'Grower-2 (20 pcs/kg)', 3.8, 32, '2.0-2.5 mm', 20, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (67.0, 'Grower-3 (15 pcs/kg)', 3.6, 30, '2.5-3.0 mm', 15, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (100.0, 'Grower-3 (10 pcs/kg)', 2.8, 30, '2.5-3.0 mm', 10, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (125.0, 'Grower-4 (8 pcs/kg)', 2.6, 30, '3.0 mm', 8, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (167.0, 'Grower-4 (6 pcs/kg)', 2.2, 30, '3.0 mm', 6, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (200.0, 'Grower-5 (5 pcs/kg)', 2.1, 30, '3.0-3.5 mm', 5, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (250.0, 'Grower-5 (4 pcs/kg)', 1.9, 30, '3.0-3.5 mm', 4, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (300.0, 'Grower-6 (3.3 pcs/kg)', 1.9, 30, '3.5 mm', 3.3, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (333.0, 'Grower-6 (3 pcs/kg)', 1.7, 30, '3.5 mm', 3, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (400.0, 'Grower-7 (2.5 pcs/kg)', 1.7, 30, '3.5-4.0 mm', 2.5, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (500.0, 'Grower-7 (2 pcs/kg)', 1.5, 30, '3.5-4.0 mm', 2, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (600.0, 'Grower-8 (1.7 pcs/kg)', 1.5, 30, '4.0 mm', 1.7, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (667.0, 'Grower-8 (1.5 pcs/kg)', 1.3, 30, '4.0 mm', 1.5, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (800.0, 'Grower-9 (1.25 pcs/kg)', 1.3, 30, '4.0-4.5 mm', 1.25, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (1000.0, 'Grower-9 (1 pcs/kg)', 1.1, 30, '4.0-4.5 mm', 1, 3, '8:00 • 12:30 • 17:00', '40•30•30%'),
+    (1250.0, 'Finisher-1 (0.8 pcs/kg)', 1.1, 28, '4.5-5.0 mm', 0.8, 2, '8:30 • 16:30', '60•40%'),
+    (1500.0, 'Finisher-1 (0.67 pcs/kg)', 1.0, 28, '4.5-5.0 mm', 0.67, 2, '8:30 • 16:30', '60•40%'),
+    (1750.0, 'Finisher-2 (0.57 pcs/kg)', 1.0, 26, '5.0 mm', 0.57, 2, '8:30 • 16:30', '60•40%'),
+    (None, 'Finisher-2 (0.5 pcs/kg)', 0.9, 26, '5.0 mm', 0.5, 2, '8:30 • 16:30', '60•40%'),
+]
+
+FEEDING_STAGE_FIELDS = [
+    'stage_name', 'percent_bw_per_day', 'protein_percent', 'pellet_size',
+    'pcs_per_kg', 'feeding_frequency', 'feeding_times', 'feeding_split'
+]
+
+FEEDING_STAGES = [dict(zip(FEEDING_STAGE_FIELDS, row[1:])) for row in FEEDING_STAGE_ROWS]
+FEEDING_STAGE_BOUNDS = [row[0] for row in FEEDING_STAGE_ROWS[:-1]]
+
+def feeding_stage_index(avg_weight_g):
+    """Index into FEEDING_STAGES for a fish weight in grams"""
+    if avg_weight_g != avg_weight_g:
+        # NaN matches no upper bound
+        return len(FEEDING_STAGE_BOUNDS)
+    return bisect.bisect_left(FEEDING_STAGE_BOUNDS, avg_weight_g)
+
+
+def get_feeding_stage(avg_weight_g):
+    """Get feeding stage information based on fish weight using scientific feeding table"""
+    return dict(FEEDING_STAGES[feeding_stage_index(avg_weight_g)])
+
+
+def feeding_stage_indices(weights_g):
+    """Vectorized feeding_stage_index for an array of weights in grams"""
+    weights_g = np.asarray(weights_g, dtype=float)
+    return np.searchsorted(FEEDING_STAGE_BOUNDS, weights_g, side='left')
+
+
+def get_feeding_stages(weights_g):
+    """Feeding stage rows for an array of weights in grams"""
+    return [dict(FEEDING_STAGES[index]) for index in feeding_stage_indices(weights_g).tolist()]
+
+
+def feeding_stage_column(field):
+    """One feeding stage field as an array, indexable by feeding_stage_indices()"""
+    return np.array([stage[field] for stage in FEEDING_STAGES])
+
+
+class FeedingBandTable:
+    """Sorted interval table over FeedingBand rows searched with bisect.
+
+    Matches ``FeedingBand.objects.filter(min_weight_g__lte=w,
+    max_weight_g__gte=w).first()``: of the bands containing the weight, the
+    one with the lowest minimum wins, even when bands overlap.
+    """
+
+    def __init__(self, bands):
+        self.bands = sorted(bands, key=lambda band: (band.min_weight_g, band.pk))
+        self.version = feeding_bands_version(self.bands)
+        self.min_weights = [band.min_weight_g for band in self.bands]
+        # Running maximum of the upper bounds; the first band whose running
+        # maximum reaches the weight is the first band that contains it
+        self.max_weights_so_far = []
+        highest = None
+        for band in self.bands:
+            highest = band.max_weight_g if highest is None else max(highest, band.max_weight_g)
+            self.max_weights_so_far.append(highest)
+
+    @classmethod
+    def load(cls):
+        from .models import FeedingBand
+        return cls(FeedingBand.objects.all())
+
+    def lookup(self, avg_weight_g):
+        """Feeding band containing the weight in grams, or None"""
+        if avg_weight_g is None or (isinstance(avg_weight_g, float) and math.isnan(avg_weight_g)):
+            return None
+        candidates = bisect.bisect_right(self.min_weights, avg_weight_g)
+        index = bisect.bisect_left(self.max_weights_so_far, avg_weight_g, 0, candidates)
+        return self.bands[index] if index < candidates else None
+
+    def lookup_many(self, weights_g):
+        """Vectorized lookup: a list of bands (or None) for an array of weights in grams"""
+        weights_g = np.asarray(weights_g, dtype=float)
+        if not self.bands:
+            return [None] * len(weights_g)
+        min_weights = np.array(self.min_weights, dtype=float)
+        max_weights_so_far = np.array(self.max_weights_so_far, dtype=float)
+        candidates = np.searchsorted(min_weights, weights_g, side='right')
+        indices = np.searchsorted(max_weights_so_far, weights_g, side='left')
+        found = (indices < candidates) & ~np.isnan(weights_g)
+        return [
+            self.bands[index] if matched else None
+            for index, matched in zip(indices.tolist(), found.tolist())
+        ]
+
+
+_feeding_band_table = None
+_feeding_band_lock = threading.Lock()
+
+
+def feeding_bands_version(bands=None):
+    """Count, highest id and latest updated_at of the FeedingBand rows.
+
+    Reads them from the database in one query, or from already loaded
+    ``bands``. Saving a band moves its updated_at and deleting one lowers the
+    count, so any change through the models gives a new version.
+    """
+    if bands is None:
+        from .models import FeedingBand
+        return tuple(FeedingBand.objects.aggregate(
+            count=Count('id'), last_id=Max('id'), updated_at=Max('updated_at')
+        ).values())
+    return (
+        len(bands),
+        max((band.pk for band in bands), default=None),
+        max((band.updated_at for band in bands), default=None),
+    )
+
+
+def get_feeding_band_table():
+    """Process-wide FeedingBand table, kept until the bands change.
+
+    Every call checks the bands' version in the database, so a band saved in
+    any process reloads the table in the others on their next use.
+    """
+    global _feeding_band_table
+    version = feeding_bands_version()
+    table = _feeding_band_table
+    if table is None or table.version != version:
+        table = FeedingBandTable.load()
+        with _feeding_band_lock:
+            _feeding_band_table = table
+    return table
+
+
+def set_feeding_band_table(bands):
+    """Make already loaded FeedingBand rows the process-wide table"""
+    global _feeding_band_table
+    table = FeedingBandTable(bands)
+    with _feeding_band_lock:
+        _feeding_band_table = table
+    return table
+
+
+def invalidate_feeding_band_table():
+    """Drop the cached FeedingBand table so the next lookup reloads it"""
+    global _feeding_band_table
+    _feeding_band_table = None
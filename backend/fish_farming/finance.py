@@ -0,0 +1,208 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncWeek, TruncMonth, TruncQuarter
+
+from .caching import get_cache_version
+from .models import AccountType, Expense, Income
+
+
+PERIOD_FUNCTIONS = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'quarter': TruncQuarter,
+}
+# Trend periods shown when no date range is given
+DEFAULT_TREND_PERIODS = 12
+FINANCIAL_SUMMARY_TIMEOUT = 60 * 60
+
+
+def period_start(day, granularity):
+    """First day of the week (Monday), month or quarter containing ``day``"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'quarter':
+        return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+    return date(day.year, day.month, 1)
+
+
+def next_period_start(start, granularity):
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    months = 3 if granularity == 'quarter' else 1
+    month_index = start.month - 1 + months
+    return date(start.year + month_index // 12, month_index % 12 + 1, 1)
+
+
+def period_label(start, granularity):
+    """2025-03 for months, 2025-Q1 for quarters, the Monday (2025-03-03) for weeks"""
+    if granularity == 'quarter':
+        return f'{start.year}-Q{(start.month - 1) // 3 + 1}'
+    if granularity == 'month':
+        return start.strftime('%Y-%m')
+    return start.isoformat()
+
+
+def period_starts(first, last, granularity):
+    """Start of every period from the one containing ``first`` to the one containing ``last``"""
+    start, end = period_start(first, granularity), period_start(last, granularity)
+    starts = []
+    while start <= end:
+        starts.append(start)
+        start = next_period_start(start, granularity)
+    return starts
+
+
+def _grouped_totals(model, pond, granularity, start_date, end_date):
+    """{(period start, account type id): total} for a pond in one grouped query"""
+    rows = model.objects.filter(pond=pond)
+    if start_date:
+        rows = rows.filter(date__gte=start_date)
+    if end_date:
+        rows = rows.filter(date__lte=end_date)
+    rows = rows.annotate(period=PERIOD_FUNCTIONS[granularity]('date')).values(
+        'period', 'account_type_id'
+    ).annotate(total=Sum('amount')).order_by()
+    return {(row['period'], row['account_type_id']): row['total'] or Decimal('0') for row in rows}
+
+
+def _account_type_breakdown(totals_by_account_type, account_types):
+    """Roll totals up the AccountType tree.
+
+    Returns (tree, by_root_name): nested nodes for every account type with
+    transactions (and their ancestors), each with its own and cumulative
+    total, and the cumulative totals of the top-level account types by name.
+    """
+    nodes = {}
+
+    def node_for(account_type_id):
+        if account_type_id not in nodes:
+            account_type = account_types.get(account_type_id)
+            nodes[account_type_id] = {
+                'id': account_type_id,
+                'name': account_type['name'] if account_type else None,
+                'type': account_type['type'] if account_type else None,
+                'own_total': Decimal('0'),
+                'total': Decimal('0'),
+                'children': [],
+                'parent_id': account_type['parent_id'] if account_type else None,
+            }
+        return nodes[account_type_id]
+
+    for account_type_id, total in totals_by_account_type.items():
+        node = node_for(account_type_id)
+        node['own_total'] += total
+        # Add to the node and every ancestor
+        while node is not None:
+            node['total'] += total
+            node = node_for(node['parent_id']) if node['parent_id'] in account_types else None
+
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node['parent_id'])
+        (parent['children'] if parent else roots).append(node)
+
+    def finish(node_list):
+        node_list.sort(key=lambda node: (node['type'] or '', node['name'] or ''))
+        for node in node_list:
+            node['own_total'] = float(node['own_total'])
+            node['total'] = float(node['total'])
+            del node['parent_id']
+            finish(node['children'])
+        return node_list
+
+    by_root_name = {}
+    for root in roots:
+        by_root_name[root['name']] = by_root_name.get(root['name'], Decimal('0')) + root['total']
+    return finish(roots), {name: float(total) for name, total in by_root_name.items()}
+
+
+def compute_financial_summary(pond, granularity='month', start_date=None, end_date=None, today=None):
+    """Expense/income totals, AccountType breakdown and trends for a pond.
+
+    Expenses and incomes are each grouped by (period, account type) in a
+    single query, and the user's account types are loaded once to roll the
+    totals up their tree, so the cost does not depend on the number of
+    transactions. Without a date range the totals cover all time and the
+    trends the last DEFAULT_TREND_PERIODS periods.
+    """
+    today = today or date.today()
+    expense_totals = _grouped_totals(Expense, pond, granularity, start_date, end_date)
+    income_totals = _grouped_totals(Income, pond, granularity, start_date, end_date)
+    used_account_type_ids = {account_type_id for _, account_type_id in list(expense_totals) + list(income_totals)}
+    account_types = {
+        row['id']: row for row in AccountType.objects.filter(
+            Q(user_id=pond.user_id) | Q(id__in=used_account_type_ids)
+        ).values('id', 'parent_id', 'name', 'type')
+    }
+
+    if start_date or end_date:
+        periods = sorted({period for period, _ in list(expense_totals) + list(income_totals)})
+        last = end_date or max([today] + periods[-1:])
+        first = start_date or (periods[0] if periods else last)
+    else:
+        last = today
+        first = period_start(today, granularity)
+        for _ in range(DEFAULT_TREND_PERIODS - 1):
+            first = period_start(first - timedelta(days=1), granularity)
+
+    trends = {}
+    for start in period_starts(first, last, granularity):
+        trends[start] = {'expenses': Decimal('0'), 'income': Decimal('0')}
+    expenses_by_account_type, income_by_account_type = {}, {}
+    for (period, account_type_id), total in expense_totals.items():
+        if period in trends:
+            trends[period]['expenses'] += total
+        expenses_by_account_type[account_type_id] = expenses_by_account_type.get(account_type_id, Decimal('0')) + total
+    for (period, account_type_id), total in income_totals.items():
+        if period in trends:
+            trends[period]['income'] += total
+        income_by_account_type[account_type_id] = income_by_account_type.get(account_type_id, Decimal('0')) + total
+
+    total_expenses = sum(expenses_by_account_type.values(), Decimal('0'))
+    total_income = sum(income_by_account_type.values(), Decimal('0'))
+    expense_tree, expenses_by_category = _account_type_breakdown(expenses_by_account_type, account_types)
+    income_tree, income_by_category = _account_type_breakdown(income_by_account_type, account_types)
+
+    trend_data = {
+        period_label(start, granularity): {
+            'expenses': float(values['expenses']),
+            'income': float(values['income']),
+            'profit_loss': float(values['income'] - values['expenses'])
+        }
+        for start, values in trends.items()
+    }
+
+    return {
+        'granularity': granularity,
+        'start_date': start_date,
+        'end_date': end_date,
+        'total_expenses': total_expenses,
+        'total_income': total_income,
+        'profit_loss': total_income - total_expenses,
+        'expenses_by_category': expenses_by_category,
+        'income_by_category': income_by_category,
+        'expenses_by_account_type': expense_tree,
+        'income_by_account_type': income_tree,
+        'trends': trend_data,
+        # Kept under its original name for existing clients
+        'monthly_trends': trend_data,
+    }
+
+
+def financial_summary_namespace(user_id):
+    return f'financial-summary:{user_id}'
+
+
+def get_financial_summary(pond, granularity='month', start_date=None, end_date=None):
+    """compute_financial_summary, cached per pond until the owner's expenses, incomes or account types change"""
+    today = date.today()
+    version = get_cache_version(financial_summary_namespace(pond.user_id))
+    key = f'fish_farming:financial-summary:{pond.pk}:{version}:{granularity}:{start_date}:{end_date}:{today}'
+    data = cache.get(key)
+    if data is None:
+        data = compute_financial_summary(pond, granularity, start_date, end_date, today)
+        cache.set(key, data, FINANCIAL_SUMMARY_TIMEOUT)
+    return data
@@ -0,0 +1,132 @@
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .models import FishSampling, Stocking, PondSpeciesPopulation
+
+
+GROWTH_FIELDS = ['growth_rate_kg_per_day', 'biomass_difference_kg', 'updated_at']
+QUANTUM = Decimal('1e-10')
+
+
+def _quantize(value):
+    """Match the 10 decimal places stored by the growth fields so unchanged rows compare equal"""
+    return value.quantize(QUANTUM) if value is not None else None
+
+
+def recompute_growth_rates(pond, since=None):
+    """Recompute growth rate and biomass difference for every fish sampling in a pond.
+
+    Produces the same values as ``FishSampling.calculate_growth_rate`` but
+    loads the pond's sampling series in date order with a single query and
+    walks it once, so the cost is linear in the number of samplings instead
+    of several queries per row. The whole pond is loaded (not just one
+    species) because a species' first sampling falls back to the previous
+    sampling of any species in the pond.
+
+    If ``since`` is given only samplings dated on or after it are rewritten;
+    earlier rows are still read as the reference points.
+
+    Returns a tuple of (updated_count, total_count) for the rewritten range.
+    """
+    pond_id = getattr(pond, 'pk', pond)
+
+    samplings = list(
+        FishSampling.objects.filter(pond_id=pond_id)
+        .only('id', 'pond_id', 'species_id', 'date', 'created_at', 'average_weight_kg',
+              'growth_rate_kg_per_day', 'biomass_difference_kg')
+        .order_by('date', 'created_at', 'id')
+    )
+    if not samplings:
+        return 0, 0
+
+    # Latest stocking per species, plus the latest of any species for mixed samplings
+    latest_stockings = {}
+    latest_any_stocking = None
+    stockings = Stocking.objects.filter(pond_id=pond_id).values(
+        'species_id', 'date', 'pcs', 'total_weight_kg'
+    ).order_by('-date', '-pk')
+    for stocking in stockings:
+        latest_stockings.setdefault(stocking['species_id'], stocking)
+        if latest_any_stocking is None:
+            latest_any_stocking = stocking
+
+    # Current alive counts from the population ledger
+    alive_by_species = {}
+    pond_totals = {'stocked': 0, 'dead': 0, 'harvested': 0}
+    for row in PondSpeciesPopulation.objects.filter(pond_id=pond_id).values(
+        'species_id', 'alive_count', 'stocked_count', 'dead_count', 'harvested_count'
+    ):
+        alive_by_species[row['species_id']] = row['alive_count']
+        pond_totals['stocked'] += row['stocked_count']
+        pond_totals['dead'] += row['dead_count']
+        pond_totals['harvested'] += row['harvested_count']
+    pond_alive = max(0, pond_totals['stocked'] - pond_totals['dead'] - pond_totals['harvested'])
+
+    last_by_species = {}      # species_id -> latest sampling on an earlier date
+    last_any = None           # latest sampling of any species on an earlier date
+    pending_by_species = {}   # samplings on the current date, published when the date changes
+    pending_any = None
+    current_date = None
+
+    now = timezone.now()
+    changed = []
+    total = 0
+
+    for sampling in samplings:
+        if sampling.date != current_date:
+            # Only strictly earlier samplings may serve as the previous point
+            last_by_species.update(pending_by_species)
+            if pending_any is not None:
+                last_any = pending_any
+            pending_by_species = {}
+            pending_any = None
+            current_date = sampling.date
+
+        if since is None or sampling.date >= since:
+            previous = None
+            if sampling.species_id is not None:
+                previous = last_by_species.get(sampling.species_id)
+            if previous is None:
+                previous = last_any
+
+            reference = None
+            if previous is None:
+                if sampling.species_id is not None:
+                    stocking = latest_stockings.get(sampling.species_id)
+                else:
+                    stocking = latest_any_stocking
+                if stocking and stocking['total_weight_kg'] and stocking['pcs']:
+                    initial_avg_weight = float(stocking['total_weight_kg']) / float(stocking['pcs'])
+                    reference = (initial_avg_weight, stocking['date'])
+            elif previous.average_weight_kg:
+                reference = (previous.average_weight_kg, previous.date)
+
+            growth_rate, biomass_difference = None, None
+            if reference is not None:
+                if sampling.species_id is not None:
+                    fish_count = alive_by_species.get(sampling.species_id, 0)
+                else:
+                    fish_count = pond_alive
+                growth_rate, biomass_difference = FishSampling.growth_metrics(
+                    sampling.average_weight_kg, sampling.date, reference[0], reference[1], fish_count
+                )
+
+            growth_rate = _quantize(growth_rate)
+            biomass_difference = _quantize(biomass_difference)
+            if (growth_rate != sampling.growth_rate_kg_per_day
+                    or biomass_difference != sampling.biomass_difference_kg):
+                sampling.growth_rate_kg_per_day = growth_rate
+                sampling.biomass_difference_kg = biomass_difference
+                sampling.updated_at = now
+                changed.append(sampling)
+            total += 1
+
+        if sampling.species_id is not None:
+            pending_by_species[sampling.species_id] = sampling
+        pending_any = sampling
+
+    if changed:
+        FishSampling.objects.bulk_update(changed, GROWTH_FIELDS, batch_size=500)
+
+    return len(changed), total
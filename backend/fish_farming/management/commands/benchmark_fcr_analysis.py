@@ -0,0 +1,208 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+
+from fish_farming.fcr import compute_fcr_analysis, fcr_status
+from fish_farming.models import (
+    Pond, Species, FeedType, Feed, Stocking, FishSampling, Mortality, Harvest,
+    PondSpeciesPopulation
+)
+
+
+class RollbackBenchmark(Exception):
+    """Raised to discard the generated benchmark data"""
+
+
+def per_combination_fcr_analysis(user, start_date, end_date):
+    """Reference implementation issuing queries per pond/species combination (the previous fcr_analysis)"""
+    feeds = Feed.objects.filter(pond__user=user, date__gte=start_date, date__lte=end_date)
+    samplings = FishSampling.objects.filter(pond__user=user, date__gte=start_date, date__lte=end_date)
+
+    combinations = set((combo['pond'], combo['species']) for combo in samplings.values('pond', 'species'))
+
+    fcr_data = []
+    for pond_id, species_id in combinations:
+        try:
+            pond = Pond.objects.get(id=pond_id, user=user)
+            species = Species.objects.get(id=species_id)
+        except (Pond.DoesNotExist, Species.DoesNotExist):
+            continue
+
+        combo_feeds = feeds.filter(pond_id=pond_id)
+        total_feed_kg = float(combo_feeds.aggregate(total=Sum('amount_kg'))['total'] or 0)
+
+        combo_samplings = samplings.filter(pond_id=pond_id, species_id=species_id).order_by('date')
+        if combo_samplings.count() < 2:
+            continue
+
+        earliest_sampling = combo_samplings.first()
+        latest_sampling = combo_samplings.last()
+        initial_weight = float(earliest_sampling.average_weight_kg)
+        final_weight = float(latest_sampling.average_weight_kg)
+
+        if final_weight < initial_weight * 0.5:
+            harvest = Harvest.objects.filter(
+                pond_id=pond_id, species_id=species_id, pond__user=user,
+                date__gte=latest_sampling.date - timedelta(days=7),
+                date__lte=latest_sampling.date + timedelta(days=7)
+            ).order_by('-date', '-pk').first()
+            if harvest and harvest.avg_weight_kg:
+                final_weight = float(harvest.avg_weight_kg)
+                latest_sampling_date = harvest.date
+            else:
+                continue
+        else:
+            latest_sampling_date = latest_sampling.date
+
+        weight_gain_per_fish = round(final_weight - initial_weight, 4)
+
+        estimated_fish_count = 0
+        population = PondSpeciesPopulation.get_for(pond, species)
+        if population.stocked_count:
+            estimated_fish_count = float(population.alive_count)
+        if not estimated_fish_count and earliest_sampling.fish_per_kg:
+            estimated_fish_count = float(earliest_sampling.fish_per_kg) * 100
+
+        total_weight_gain_kg = round(estimated_fish_count * weight_gain_per_fish, 4)
+        fcr = round(total_feed_kg / total_weight_gain_kg, 4) if total_weight_gain_kg > 0 else 0
+        days = (latest_sampling_date - earliest_sampling.date).days
+
+        fcr_data.append({
+            'pond_id': pond_id,
+            'pond_name': pond.name,
+            'species_id': species_id,
+            'species_name': species.name,
+            'start_date': earliest_sampling.date.isoformat(),
+            'end_date': latest_sampling_date.isoformat(),
+            'days': days,
+            'estimated_fish_count': estimated_fish_count,
+            'initial_weight_kg': initial_weight,
+            'final_weight_kg': final_weight,
+            'weight_gain_per_fish_kg': weight_gain_per_fish,
+            'total_weight_gain_kg': total_weight_gain_kg,
+            'total_feed_kg': total_feed_kg,
+            'avg_daily_feed_kg': round(total_feed_kg / days, 4) if days > 0 else 0,
+            'avg_daily_weight_gain_kg': round(total_weight_gain_kg / days, 4) if days > 0 else 0,
+            'fcr': fcr,
+            'fcr_status': fcr_status(fcr),
+            'sampling_count': combo_samplings.count(),
+            'feeding_days': combo_feeds.count()
+        })
+
+    fcr_data.sort(key=lambda row: (row['fcr'], row['pond_id'], row['species_id']))
+    return fcr_data
+
+
+class Command(BaseCommand):
+    help = 'Benchmark FCR analysis (per-combination queries vs. batched engine) on generated data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ponds', type=int, default=50, help='Number of ponds')
+        parser.add_argument('--species', type=int, default=3, help='Species stocked in every pond')
+        parser.add_argument('--days', type=int, default=730, help='Days of daily feed logs')
+        parser.add_argument('--sampling-interval', type=int, default=14, help='Days between fish samplings')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per implementation (best is reported)')
+
+    def handle(self, *args, **options):
+        # Everything runs inside a transaction that is rolled back, so no data is left behind
+        try:
+            with transaction.atomic():
+                user, start_date, end_date = self.generate_data(options)
+                self.run_benchmark(user, start_date, end_date, options['repeat'])
+                raise RollbackBenchmark
+        except RollbackBenchmark:
+            pass
+
+    def generate_data(self, options):
+        rng = random.Random(42)
+        start_date = date.today() - timedelta(days=options['days'] - 1)
+        end_date = date.today()
+
+        user = User.objects.create(username=f'fcr-benchmark-{int(time.time())}')
+        feed_type = FeedType.objects.create(user=user, name='Benchmark Feed')
+        species_list = [
+            Species.objects.create(user=user, name=f'Benchmark Species {index + 1}')
+            for index in range(options['species'])
+        ]
+
+        self.stdout.write(
+            f"Generating {options['ponds']} ponds x {options['species']} species x {options['days']} days..."
+        )
+        feeds = []
+        samplings = []
+        for pond_index in range(options['ponds']):
+            pond = Pond.objects.create(
+                user=user, name=f'Benchmark Pond {pond_index + 1}',
+                area_decimal=Decimal('20'), depth_ft=Decimal('5')
+            )
+            for species in species_list:
+                Stocking.objects.create(
+                    pond=pond, species=species, date=start_date,
+                    pcs=10000, total_weight_kg=Decimal('50')
+                )
+                Mortality.objects.create(
+                    pond=pond, species=species, date=start_date + timedelta(days=30),
+                    count=rng.randint(50, 500)
+                )
+
+                # Fortnightly samplings along a noisy growth curve
+                for day in range(0, options['days'], options['sampling_interval']):
+                    average_weight = Decimal(str(round(0.005 + 0.0012 * day * rng.uniform(0.8, 1.2), 6)))
+                    samplings.append(FishSampling(
+                        pond=pond, species=species, user=user,
+                        date=start_date + timedelta(days=day), sample_size=20,
+                        total_weight_kg=average_weight * 20, average_weight_kg=average_weight,
+                        fish_per_kg=(Decimal('1') / average_weight).quantize(Decimal('0.0001'))
+                    ))
+
+            for day in range(options['days']):
+                feeds.append(Feed(
+                    pond=pond, owner=user, feed_type=feed_type, date=start_date + timedelta(days=day),
+                    amount_kg=Decimal(str(round(rng.uniform(5, 40), 2)))
+                ))
+
+        Feed.objects.bulk_create(feeds, batch_size=2000)
+        FishSampling.objects.bulk_create(samplings, batch_size=2000)
+        self.stdout.write(f'Created {len(feeds)} feed logs and {len(samplings)} fish samplings')
+        return user, start_date, end_date
+
+    def measure(self, label, function, repeat):
+        with CaptureQueriesContext(connection) as context:
+            result = function()
+        query_count = len(context.captured_queries)
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+
+        self.stdout.write(f'{label:<28} {query_count:>8} queries   {min(timings) * 1000:>10.1f} ms')
+        return result, min(timings)
+
+    def run_benchmark(self, user, start_date, end_date, repeat):
+        before, before_time = self.measure(
+            'Per-combination queries',
+            lambda: per_combination_fcr_analysis(user, start_date, end_date),
+            repeat
+        )
+        after, after_time = self.measure(
+            'Batched engine',
+            lambda: compute_fcr_analysis(user, start_date, end_date),
+            repeat
+        )
+
+        after.sort(key=lambda row: (row['fcr'], row['pond_id'], row['species_id']))
+        if before == after:
+            self.stdout.write(self.style.SUCCESS(
+                f'Identical output for {len(after)} combinations; {before_time / after_time:.1f}x faster'
+            ))
+        else:
+            self.stdout.write(self.style.ERROR('Outputs differ between implementations'))
@@ -0,0 +1,242 @@
+import random
+import re
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from fish_farming.models import (
+    Pond, Species, FeedType, Feed, Stocking, DailyLog, SampleType, Sampling,
+    FishSampling, Mortality, Harvest
+)
+
+
+# Tables whose Meta.indexes are benchmarked; they are dropped for the "before" run
+HOT_PATH_MODELS = [FishSampling, Stocking, Mortality, Harvest, Feed, DailyLog, Sampling]
+
+# SQLite reports unindexed reads as "SCAN <table>" (an index walk says "USING ... INDEX")
+FULL_SCAN = re.compile(r'\bSCAN (\w+)\b(?! USING)')
+
+
+class RollbackBenchmark(Exception):
+    """Raised to discard the generated benchmark data"""
+
+
+def hot_queries(ctx):
+    """(label, queryset) for the pond/species/date query shapes used by views.py, advice.py, fcr.py and growth.py"""
+    user, pond, pond_ids, species = ctx['user'], ctx['pond'], ctx['pond_ids'], ctx['species']
+    today, start_date = ctx['today'], ctx['start_date']
+    window_start = today - timedelta(days=30)
+    return [
+        ('Feeds for a pond in a date range',
+         Feed.objects.filter(pond=pond, date__gte=window_start, date__lte=today).order_by('date')),
+        ('Latest feed of a pond',
+         Feed.objects.filter(pond=pond).order_by('-date')[:1]),
+        ('Recent feeds of the farm',
+         Feed.objects.filter(pond_id__in=pond_ids, date__gte=today - timedelta(days=7)).order_by('-date')),
+        ('Latest fish sampling of a pond/species',
+         FishSampling.objects.filter(pond=pond, species=species).order_by('-date')[:1]),
+        ('Previous fish sampling of a pond',
+         FishSampling.objects.filter(pond=pond, date__lt=today).order_by('-date', '-created_at', '-id')[:1]),
+        ('Fish samplings of a pond in order',
+         FishSampling.objects.filter(pond_id=pond.pk).order_by('date', 'created_at', 'id')),
+        ('Feeds of a user in a date range',
+         Feed.objects.filter(owner=user, date__gte=window_start, date__lte=today)),
+        ('First page of a user\'s fish samplings',
+         FishSampling.objects.filter(pond__user=user).order_by('-date', '-created_at', '-pk')[:100]),
+        ('Fish samplings of the farm in a range',
+         FishSampling.objects.filter(pond_id__in=pond_ids, date__gte=start_date, date__lte=today).order_by('date')),
+        ('Latest stocking of a pond/species',
+         Stocking.objects.filter(pond=pond, species=species).order_by('-date')[:1]),
+        ('Stockings of a pond, latest first',
+         Stocking.objects.filter(pond_id=pond.pk).order_by('-date', '-pk')),
+        ('Stockings of the farm, latest first',
+         Stocking.objects.filter(pond_id__in=pond_ids).order_by('-date')),
+        ('Recent mortalities of the farm',
+         Mortality.objects.filter(pond_id__in=pond_ids, date__gte=today - timedelta(days=7))),
+        ('First page of a user\'s mortalities',
+         Mortality.objects.filter(owner=user).order_by('-date', '-pk')[:100]),
+        ('Mortalities of a pond/species',
+         Mortality.objects.filter(pond=pond, species=species).order_by('-date')),
+        ('Harvests of a pond/species near a date',
+         Harvest.objects.filter(pond=pond, species=species, date__gte=window_start, date__lte=today).order_by('-date')),
+        ('Recent water samples of the farm',
+         Sampling.objects.filter(pond_id__in=pond_ids, date__gte=window_start).order_by('-date', '-id')),
+        ('Recent daily logs of the farm',
+         DailyLog.objects.filter(pond_id__in=pond_ids, date__gte=today - timedelta(days=7)).order_by('-date')),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Show query plans and timings of the pond/species/date hot queries without and with the composite indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ponds', type=int, default=50, help='Number of ponds')
+        parser.add_argument('--species', type=int, default=3, help='Species stocked in every pond')
+        parser.add_argument('--days', type=int, default=730, help='Days of daily feed and daily logs')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query (best is reported)')
+
+    def handle(self, *args, **options):
+        # Everything, including the index drops, runs inside a transaction that is rolled back
+        try:
+            with transaction.atomic():
+                ctx = self.generate_data(options)
+                self.drop_hot_path_indexes()
+                before = self.run_queries(ctx, options['repeat'])
+                self.create_hot_path_indexes()
+                after = self.run_queries(ctx, options['repeat'])
+                self.report(before, after)
+                raise RollbackBenchmark
+        except RollbackBenchmark:
+            pass
+
+    def generate_data(self, options):
+        rng = random.Random(42)
+        today = date.today()
+        start_date = today - timedelta(days=options['days'] - 1)
+
+        user = User.objects.create(username=f'query-plan-benchmark-{int(time.time())}')
+        feed_type = FeedType.objects.create(user=user, name='Benchmark Feed')
+        sample_type = SampleType.objects.create(name=f'Benchmark water {int(time.time())}')
+        species_list = [
+            Species.objects.create(user=user, name=f'Benchmark Species {index + 1}')
+            for index in range(options['species'])
+        ]
+
+        self.stdout.write(
+            f"Generating {options['ponds']} ponds x {options['species']} species x {options['days']} days..."
+        )
+        ponds = Pond.objects.bulk_create([
+            Pond(
+                user=user, name=f'Benchmark Pond {index + 1}',
+                area_decimal=Decimal('20'), depth_ft=Decimal('5'), volume_m3=Decimal('246.6')
+            )
+            for index in range(options['ponds'])
+        ])
+
+        rows = {model: [] for model in HOT_PATH_MODELS}
+        for pond in ponds:
+            for day in range(options['days']):
+                current = start_date + timedelta(days=day)
+                rows[Feed].append(Feed(
+                    pond=pond, owner=user, feed_type=feed_type, date=current,
+                    amount_kg=Decimal(str(round(rng.uniform(5, 40), 2)))
+                ))
+                rows[DailyLog].append(DailyLog(pond=pond, owner=user, date=current, ph=Decimal('7.2')))
+                if day % 7 == 0:
+                    rows[Sampling].append(Sampling(
+                        pond=pond, owner=user, date=current, sample_type=sample_type,
+                        dissolved_oxygen=Decimal(str(round(rng.uniform(3, 8), 2)))
+                    ))
+
+            for species in species_list:
+                for day in range(0, options['days'], 90):
+                    rows[Stocking].append(Stocking(
+                        pond=pond, owner=user, species=species, date=start_date + timedelta(days=day),
+                        pcs=10000, total_weight_kg=Decimal('50')
+                    ))
+                for day in range(0, options['days'], 14):
+                    average_weight = Decimal(str(round(0.005 + 0.0012 * (day % 180) * rng.uniform(0.8, 1.2), 6)))
+                    rows[FishSampling].append(FishSampling(
+                        pond=pond, species=species, user=user, date=start_date + timedelta(days=day),
+                        sample_size=20, total_weight_kg=average_weight * 20, average_weight_kg=average_weight,
+                        fish_per_kg=(Decimal('1') / average_weight).quantize(Decimal('0.0001'))
+                    ))
+                for day in range(0, options['days'], 3):
+                    rows[Mortality].append(Mortality(
+                        pond=pond, owner=user, species=species, date=start_date + timedelta(days=day),
+                        count=rng.randint(1, 50)
+                    ))
+                for day in range(89, options['days'], 90):
+                    rows[Harvest].append(Harvest(
+                        pond=pond, owner=user, species=species, date=start_date + timedelta(days=day),
+                        total_weight_kg=Decimal(str(round(rng.uniform(100, 500), 2)))
+                    ))
+
+        for model, objects in rows.items():
+            model.objects.bulk_create(objects, batch_size=2000)
+        self.stdout.write(', '.join(
+            f'{len(objects)} {model._meta.verbose_name_plural}' for model, objects in rows.items()
+        ))
+
+        return {
+            'user': user,
+            'pond': ponds[len(ponds) // 2],
+            'pond_ids': [pond.pk for pond in ponds[:10]],
+            'species': species_list[0],
+            'today': today,
+            'start_date': start_date,
+        }
+
+    def index_statements(self, action):
+        # The schema editor is only used to render SQL: entering it is not allowed inside a transaction on SQLite
+        editor = connection.schema_editor()
+        for model in HOT_PATH_MODELS:
+            for index in model._meta.indexes:
+                if action == 'create':
+                    yield str(index.create_sql(model, editor))
+                else:
+                    yield editor.sql_delete_index % {
+                        'table': editor.quote_name(model._meta.db_table),
+                        'name': editor.quote_name(index.name),
+                    }
+
+    def drop_hot_path_indexes(self):
+        with connection.cursor() as cursor:
+            for statement in self.index_statements('remove'):
+                cursor.execute(statement)
+
+    def create_hot_path_indexes(self):
+        with connection.cursor() as cursor:
+            for statement in self.index_statements('create'):
+                cursor.execute(statement)
+
+    def run_queries(self, ctx, repeat):
+        """(label, plan, best time) per hot query; only SQL execution and fetching is timed, not model building"""
+        results = []
+        with connection.cursor() as cursor:
+            for label, queryset in hot_queries(ctx):
+                plan = queryset.explain()
+                sql, params = queryset.query.sql_with_params()
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+                    timings.append(time.perf_counter() - started)
+                results.append((label, plan, min(timings)))
+        return results
+
+    def full_scans(self, plan):
+        return sorted(set(FULL_SCAN.findall(plan)))
+
+    def report(self, before, after):
+        remaining = []
+        for (label, before_plan, before_time), (_, after_plan, after_time) in zip(before, after):
+            self.stdout.write('')
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f'  before: {before_time * 1000:>8.2f} ms')
+            for line in before_plan.splitlines():
+                self.stdout.write(f'    {line}')
+            self.stdout.write(f'  after:  {after_time * 1000:>8.2f} ms')
+            for line in after_plan.splitlines():
+                self.stdout.write(f'    {line}')
+            scans = self.full_scans(after_plan)
+            if scans:
+                remaining.append((label, scans))
+
+        self.stdout.write('')
+        total_before = sum(timing for _, _, timing in before)
+        total_after = sum(timing for _, _, timing in after)
+        self.stdout.write(
+            f'Total: {total_before * 1000:.1f} ms before, {total_after * 1000:.1f} ms after '
+            f'({total_before / total_after:.1f}x)'
+        )
+        if remaining:
+            for label, scans in remaining:
+                self.stdout.write(self.style.WARNING(f"Full scan remains in '{label}': {', '.join(scans)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('No full table scans remain in the hot queries'))
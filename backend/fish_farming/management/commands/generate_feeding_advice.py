@@ -0,0 +1,51 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from fish_farming.advice_generation import generate_farm_advice
+from fish_farming.models import Pond
+
+
+class Command(BaseCommand):
+    help = 'Generate feeding advice for every active pond/species in one batch per user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', help='Only generate for this username (repeatable)')
+        parser.add_argument('--pond', action='append', type=int, dest='pond_ids', help='Only generate for this pond ID (repeatable)')
+        parser.add_argument('--force', action='store_true', help='Regenerate advice even when its inputs have not changed')
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+            if not users.exists():
+                raise CommandError(f"No users found matching: {', '.join(options['usernames'])}")
+
+        total_generated = 0
+
+        for user in users:
+            ponds = Pond.objects.filter(user=user, is_active=True)
+            if options['pond_ids']:
+                ponds = Pond.objects.filter(user=user, id__in=options['pond_ids'])
+            if not ponds.exists():
+                continue
+
+            result = generate_farm_advice(user, ponds, force=options['force'])
+            total_generated += len(result['advice'])
+
+            self.stdout.write(
+                f"{user.username}: generated {len(result['advice'])} advice across {result['ponds_processed']} ponds"
+            )
+            for advice in result['advice']:
+                self.stdout.write(
+                    f"  {advice.pond.name} - {advice.species.name}: "
+                    f"{advice.recommended_feed_kg:.2f} kg/day at {advice.feeding_rate_percent:.2f}% "
+                    f"x{advice.feeding_frequency}"
+                )
+            for advice in result['unchanged']:
+                self.stdout.write(f'  {advice.pond.name} - {advice.species.name}: unchanged since {advice.date}')
+            for failure in result['failed_species']:
+                self.stdout.write(self.style.WARNING(f'  Failed: {failure}'))
+            for pond_name in result['ponds_without_stocking']:
+                self.stdout.write(self.style.WARNING(f'  Skipped {pond_name}: no stocking data'))
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully generated {total_generated} feeding advice records'))
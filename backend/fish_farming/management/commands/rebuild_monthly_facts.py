@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from fish_farming.facts import rebuild_facts
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the pond x species x month fact table from the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', help='Only rebuild for this username (repeatable)')
+
+    def handle(self, *args, **options):
+        if not options['usernames']:
+            count = rebuild_facts()
+            self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {count} monthly fact rows'))
+            return
+
+        users = User.objects.filter(username__in=options['usernames'])
+        if not users.exists():
+            raise CommandError(f"No users found matching: {', '.join(options['usernames'])}")
+
+        total = 0
+        for user in users:
+            count = rebuild_facts(user.pk)
+            total += count
+            self.stdout.write(f'{user.username}: {count} monthly fact rows')
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {total} monthly fact rows'))
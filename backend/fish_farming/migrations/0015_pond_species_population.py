@@ -0,0 +1,82 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_ledger(apps, schema_editor):
+    """Backfill the population ledger from existing stocking, mortality and harvest rows"""
+    from django.db.models import Sum
+
+    PondSpeciesPopulation = apps.get_model('fish_farming', 'PondSpeciesPopulation')
+    Stocking = apps.get_model('fish_farming', 'Stocking')
+    Mortality = apps.get_model('fish_farming', 'Mortality')
+    Harvest = apps.get_model('fish_farming', 'Harvest')
+    FishSampling = apps.get_model('fish_farming', 'FishSampling')
+
+    totals = {}
+    sources = [
+        (Stocking, 'stocked', 'pcs'),
+        (Mortality, 'dead', 'count'),
+        (Harvest, 'harvested', 'total_count'),
+    ]
+    for model, prefix, count_field in sources:
+        rows = model.objects.values('pond_id', 'species_id').annotate(
+            count=Sum(count_field), weight=Sum('total_weight_kg')
+        )
+        for row in rows:
+            entry = totals.setdefault((row['pond_id'], row['species_id']), {})
+            entry[f'{prefix}_count'] = row['count'] or 0
+            entry[f'{prefix}_weight_kg'] = row['weight'] or 0
+
+    for (pond_id, species_id), entry in totals.items():
+        alive = max(0, entry.get('stocked_count', 0) - entry.get('dead_count', 0) - entry.get('harvested_count', 0))
+        average_weight = FishSampling.objects.filter(
+            pond_id=pond_id, species_id=species_id
+        ).order_by('-date').values_list('average_weight_kg', flat=True).first()
+        if not average_weight:
+            average_weight = Stocking.objects.filter(
+                pond_id=pond_id, species_id=species_id
+            ).order_by('-date').values_list('initial_avg_weight_kg', flat=True).first() or 0
+        PondSpeciesPopulation.objects.create(
+            pond_id=pond_id,
+            species_id=species_id,
+            alive_count=alive,
+            average_weight_kg=average_weight,
+            alive_weight_kg=alive * average_weight,
+            **entry
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fish_farming', '0014_itemservice_feed_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PondSpeciesPopulation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stocked_count', models.IntegerField(default=0)),
+                ('stocked_weight_kg', models.DecimalField(decimal_places=10, default=0, max_digits=20)),
+                ('dead_count', models.IntegerField(default=0)),
+                ('dead_weight_kg', models.DecimalField(decimal_places=10, default=0, max_digits=20)),
+                ('harvested_count', models.IntegerField(default=0)),
+                ('harvested_weight_kg', models.DecimalField(decimal_places=10, default=0, max_digits=20)),
+                ('alive_count', models.IntegerField(default=0, help_text='Stocked minus dead minus harvested (never negative)')),
+                ('average_weight_kg', models.DecimalField(decimal_places=10, default=0, help_text='Latest sampled average weight, falling back to the latest stocking weight', max_digits=15)),
+                ('alive_weight_kg', models.DecimalField(decimal_places=10, default=0, help_text='Alive count multiplied by the average weight', max_digits=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('pond', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='populations', to='fish_farming.pond')),
+                ('species', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='populations', to='fish_farming.species')),
+            ],
+            options={
+                'verbose_name': 'Pond Species Population',
+                'verbose_name_plural': 'Pond Species Populations',
+                'unique_together': {('pond', 'species')},
+            },
+        ),
+        migrations.RunPython(populate_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_facts(apps, schema_editor):
+    """Backfill the monthly facts from existing feed, mortality, harvest, stocking, expense and income rows"""
+    from django.db.models import Sum
+    from django.db.models.functions import TruncMonth
+
+    PondMonthlyFact = apps.get_model('fish_farming', 'PondMonthlyFact')
+    sources = [
+        ('Feed', 'pond__user_id', None, {'feed_kg': 'amount_kg', 'feed_cost': 'total_cost'}),
+        ('Mortality', 'pond__user_id', 'species_id', {'mortality_count': 'count', 'mortality_kg': 'total_weight_kg'}),
+        ('Harvest', 'pond__user_id', 'species_id', {'harvest_kg': 'total_weight_kg', 'harvest_revenue': 'total_revenue'}),
+        ('Stocking', 'pond__user_id', 'species_id', {'stocking_cost': 'cost'}),
+        ('Expense', 'user_id', 'species_id', {'expenses': 'amount'}),
+        ('Income', 'user_id', 'species_id', {'incomes': 'amount'}),
+    ]
+
+    totals = {}
+    for model_name, owner_lookup, species_lookup, metrics in sources:
+        group_fields = [owner_lookup, 'pond_id'] + ([species_lookup] if species_lookup else [])
+        rows = apps.get_model('fish_farming', model_name).objects.annotate(
+            fact_month=TruncMonth('date')
+        ).values(*group_fields, 'fact_month').annotate(**{
+            metric: Sum(field) for metric, field in metrics.items()
+        }).order_by()
+        for row in rows:
+            key = (row[owner_lookup], row['pond_id'], row[species_lookup] if species_lookup else None, row['fact_month'])
+            entry = totals.setdefault(key, {})
+            for metric in metrics:
+                entry[metric] = entry.get(metric, 0) + (row[metric] or 0)
+
+    PondMonthlyFact.objects.bulk_create([
+        PondMonthlyFact(user_id=user_id, pond_id=pond_id, species_id=species_id, month=month, **entry)
+        for (user_id, pond_id, species_id, month), entry in totals.items()
+        if any(entry.values())
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fish_farming', '0015_pond_species_population'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PondMonthlyFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('feed_kg', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('feed_cost', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('mortality_count', models.IntegerField(default=0)),
+                ('mortality_kg', models.DecimalField(decimal_places=10, default=0, max_digits=20)),
+                ('harvest_kg', models.DecimalField(decimal_places=10, default=0, max_digits=20)),
+                ('harvest_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('expenses', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('incomes', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('stocking_cost', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('pond', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_facts', to='fish_farming.pond')),
+                ('species', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_facts', to='fish_farming.species')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_facts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Pond Monthly Fact',
+                'verbose_name_plural': 'Pond Monthly Facts',
+                'ordering': ['month', 'pond', 'species'],
+                'indexes': [models.Index(fields=['user', 'month'], name='fish_farmin_user_id_a8fd51_idx')],
+                'unique_together': {('user', 'pond', 'species', 'month')},
+            },
+        ),
+        migrations.RunPython(populate_facts, migrations.RunPython.noop),
+    ]
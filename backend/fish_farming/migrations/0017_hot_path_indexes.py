@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fish_farming', '0016_pond_monthly_fact'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feed',
+            index=models.Index(fields=['pond', 'date'], name='fish_farmin_pond_id_7cec80_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fishsampling',
+            index=models.Index(fields=['pond', 'date', 'created_at'], name='fish_farmin_pond_id_88c985_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='harvest',
+            index=models.Index(fields=['pond', 'species', 'date'], name='fish_farmin_pond_id_bca571_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mortality',
+            index=models.Index(fields=['pond', 'species', 'date'], name='fish_farmin_pond_id_6e45fa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mortality',
+            index=models.Index(fields=['pond', 'date'], name='fish_farmin_pond_id_53a902_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sampling',
+            index=models.Index(fields=['pond', 'date'], name='fish_farmin_pond_id_1d8c58_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stocking',
+            index=models.Index(fields=['pond', 'date'], name='fish_farmin_pond_id_db807a_idx'),
+        ),
+    ]
@@ -0,0 +1,188 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+POND_OWNED_MODELS = [
+    'Stocking', 'DailyLog', 'Feed', 'Sampling', 'Mortality', 'Harvest', 'Treatment',
+    'Alert', 'EnvAdjustment', 'KPIDashboard', 'SurvivalRate',
+]
+
+
+def populate_owner(apps, schema_editor):
+    """Copy each row's pond owner into the new owner column"""
+    from django.db.models import OuterRef, Subquery
+
+    Pond = apps.get_model('fish_farming', 'Pond')
+    for model_name in POND_OWNED_MODELS:
+        apps.get_model('fish_farming', model_name).objects.update(
+            owner_id=Subquery(Pond.objects.filter(pk=OuterRef('pond_id')).values('user_id')[:1])
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fish_farming', '0017_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='dailylog',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='envadjustment',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='harvest',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='kpidashboard',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='mortality',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='sampling',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='stocking',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='survivalrate',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='treatment',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(populate_owner, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='alert',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='dailylog',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='envadjustment',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='feed',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='harvest',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='kpidashboard',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='mortality',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='sampling',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='stocking',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='survivalrate',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='treatment',
+            name='owner',
+            field=models.ForeignKey(editable=False, help_text='Pond owner, kept in sync with pond.user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['owner', 'created_at'], name='fish_farmin_owner_i_22d736_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailylog',
+            index=models.Index(fields=['owner', 'date'], name='fish_farmin_owner_i_894f74_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='envadjustment',
+            index=models.Index(fields=['owner', 'date'], name='fish_farmin_owner_i_c78305_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feed',
+            index=models.Index(fields=['owner', 'date'], name='fish_farmin_owner_i_5424e4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='harvest',
+            index=models.Index(fields=['owner', 'date'], name='fish_farmin_owner_i_353666_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kpidashboard',
+            index=models.Index(fields=['owner', 'date'], name='fish_farmin_owner_i_cbca0d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mortality',
+            index=models.Index(fields=['owner', 'date'], name='fish_farmin_owner_i_2ac687_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sampling',
+            index=models.Index(fields=['owner', 'date'], name='fish_farmin_owner_i_b59d7e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stocking',
+            index=models.Index(fields=['owner', 'date'], name='fish_farmin_owner_i_1bb58c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='survivalrate',
+            index=models.Index(fields=['owner', 'date'], name='fish_farmin_owner_i_e106a0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatment',
+            index=models.Index(fields=['owner', 'date'], name='fish_farmin_owner_i_6e16cc_idx'),
+        ),
+    ]
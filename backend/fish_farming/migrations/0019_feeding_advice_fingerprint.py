@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fish_farming', '0018_pond_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedingadvice',
+            name='input_fingerprint',
+            field=models.CharField(blank=True, default='', help_text='Digest of the input rows this advice was generated from', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='feedingadvice',
+            index=models.Index(fields=['pond', 'input_fingerprint'], name='fish_farmin_pond_id_604a15_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fish_farming', '0019_feeding_advice_fingerprint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedingRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.SlugField(help_text="Rule key; a default rule's key overrides that rule")),
+                ('group', models.CharField(choices=[('water_quality', 'Water quality'), ('temperature', 'Temperature'), ('mortality', 'Mortality'), ('growth', 'Growth'), ('seasonal', 'Season'), ('feeding_consistency', 'Feeding consistency'), ('medical', 'Medical'), ('rate_temperature', 'Base rate: temperature'), ('rate_season', 'Base rate: season'), ('rate_medical', 'Base rate: medical'), ('history_rate', 'Applied advice: rate'), ('history_feed', 'Applied advice: feed')], max_length=30)),
+                ('feature', models.CharField(help_text='Feature of the pond/species the rule tests', max_length=50)),
+                ('operator', models.CharField(choices=[('lt', '<'), ('lte', '<='), ('gt', '>'), ('gte', '>='), ('eq', '='), ('ne', '!=')], max_length=3)),
+                ('value', models.CharField(help_text='Number, category or true/false the feature is compared with', max_length=50)),
+                ('adjustment_percent', models.DecimalField(decimal_places=2, help_text='Feeding adjustment in % when the rule matches', max_digits=6)),
+                ('priority', models.PositiveIntegerField(default=100, help_text='Lower priorities are checked first; the first matching rule of a group wins')),
+                ('is_active', models.BooleanField(default=True, help_text='An inactive rule switches off the default rule with the same key')),
+                ('description', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feeding_rules', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['group', 'priority', 'key'],
+                'unique_together': {('user', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:13
+
+from django.db import migrations, models
+
+
+def flag_water_sample_types(apps, schema_editor):
+    """Flag the sample types the water analyses used to find by name"""
+    SampleType = apps.get_model('fish_farming', 'SampleType')
+    SampleType.objects.filter(name__icontains='water').update(is_water=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fish_farming', '0020_feeding_rule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sampletype',
+            name='is_water',
+            field=models.BooleanField(db_index=True, default=False, help_text='Samples of this type are water quality readings'),
+        ),
+        migrations.RunPython(flag_water_sample_types, migrations.RunPython.noop),
+    ]
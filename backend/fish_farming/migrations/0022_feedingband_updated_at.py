@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-17 12:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fish_farming', '0021_sample_type_is_water'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedingband',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
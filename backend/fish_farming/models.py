@@ -2,9 +2,12 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db.models import Sum
+from django.db.models.functions import Greatest
 from decimal import Decimal
 from mptt.models import MPTTModel, TreeForeignKey
 
+from .rules import RULE_GROUP_CHOICES, RULE_OPERATOR_CHOICES
+
 
 class Pond(models.Model):
     """Pond management model"""
@@ -83,6 +86,7 @@ class Stocking(models.Model):
     """Fish stocking records - based on the sheet data"""
     stocking_id = models.AutoField(primary_key=True)
     pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='stockings')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', editable=False, help_text="Pond owner, kept in sync with pond.user")
     species = models.ForeignKey(Species, on_delete=models.CASCADE, related_name='stockings')
     date = models.DateField()
     pcs = models.PositiveIntegerField(help_text="Number of pieces stocked")
@@ -99,6 +103,11 @@ class Stocking(models.Model):
     class Meta:
         ordering = ['-date']
         unique_together = ['pond', 'species', 'date']
+        indexes = [
+            # unique_together covers pond/species lookups; this serves pond-wide latest-first scans
+            models.Index(fields=['pond', 'date']),
+            models.Index(fields=['owner', 'date']),
+        ]
     
     def __str__(self):
         return f"{self.pond.name} - {self.species.name} ({self.date})"
@@ -122,6 +131,7 @@ class Stocking(models.Model):
 class DailyLog(models.Model):
     """Daily operations log"""
     pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='daily_logs')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', editable=False, help_text="Pond owner, kept in sync with pond.user")
     date = models.DateField()
     weather = models.CharField(max_length=100, blank=True)
     water_temp_c = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
@@ -135,6 +145,7 @@ class DailyLog(models.Model):
     class Meta:
         ordering = ['-date']
         unique_together = ['pond', 'date']
+        indexes = [models.Index(fields=['owner', 'date'])]
     
     def __str__(self):
         return f"{self.pond.name} - {self.date}"
@@ -163,6 +174,7 @@ class FeedType(MPTTModel):
 class Feed(models.Model):
     """Feed management"""
     pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='feeds')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', editable=False, help_text="Pond owner, kept in sync with pond.user")
     feed_type = models.ForeignKey(FeedType, on_delete=models.CASCADE, related_name='feeds')
     date = models.DateField()
     amount_kg = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
@@ -182,11 +194,16 @@ class Feed(models.Model):
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['pond', 'date']),
+            models.Index(fields=['owner', 'date']),
+        ]
     
     def __str__(self):
         return f"{self.pond.name} - {self.feed_type.name} ({self.date})"
     
-    def save(self, *args, **kwargs):
+    def calculate_derived_fields(self):
+        """Fill total_cost and feeding_rate_percent from the entered amounts (no queries)"""
         # Auto-calculate total cost based on input method
         if self.cost_per_packet and self.packet_size_kg and not self.total_cost:
             # Calculate cost when using packets
@@ -229,7 +246,9 @@ class Feed(models.Model):
             else:
                 biomass_decimal = self.biomass_at_feeding_kg
             self.feeding_rate_percent = (amount_kg_decimal / biomass_decimal) * 100
-        
+    
+    def save(self, *args, **kwargs):
+        self.calculate_derived_fields()
         super().save(*args, **kwargs)
 
 
@@ -239,6 +258,7 @@ class SampleType(models.Model):
     description = models.TextField(blank=True)
     icon = models.CharField(max_length=50, default='test-tube', help_text="Icon name for UI display")
     color = models.CharField(max_length=20, default='blue', help_text="Color theme for UI display")
+    is_water = models.BooleanField(default=False, db_index=True, help_text="Samples of this type are water quality readings")
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -249,11 +269,18 @@ class SampleType(models.Model):
     
     def __str__(self):
         return self.name
+    
+    def save(self, *args, **kwargs):
+        # New types named like water samples start out flagged as water samples
+        if self._state.adding and not self.is_water and 'water' in self.name.lower():
+            self.is_water = True
+        super().save(*args, **kwargs)
 
 
 class Sampling(models.Model):
     """Water and fish sampling records"""
     pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='samplings')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', editable=False, help_text="Pond owner, kept in sync with pond.user")
     date = models.DateField()
     sample_type = models.ForeignKey(SampleType, on_delete=models.CASCADE, related_name='samplings')
     ph = models.DecimalField(max_digits=3, decimal_places=1, null=True, blank=True)
@@ -272,6 +299,10 @@ class Sampling(models.Model):
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['pond', 'date']),
+            models.Index(fields=['owner', 'date']),
+        ]
     
     def __str__(self):
         return f"{self.pond.name} - {self.sample_type.name} ({self.date})"
@@ -280,6 +311,7 @@ class Sampling(models.Model):
 class Mortality(models.Model):
     """Mortality tracking"""
     pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='mortalities')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', editable=False, help_text="Pond owner, kept in sync with pond.user")
     species = models.ForeignKey(Species, on_delete=models.CASCADE, related_name='mortalities', null=True, blank=True)
     date = models.DateField()
     count = models.PositiveIntegerField()
@@ -291,6 +323,11 @@ class Mortality(models.Model):
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['pond', 'species', 'date']),
+            models.Index(fields=['pond', 'date']),
+            models.Index(fields=['owner', 'date']),
+        ]
         verbose_name_plural = 'Mortalities'
     
     def __str__(self):
@@ -328,6 +365,7 @@ class Mortality(models.Model):
 class Harvest(models.Model):
     """Harvest records"""
     pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='harvests')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', editable=False, help_text="Pond owner, kept in sync with pond.user")
     species = models.ForeignKey(Species, on_delete=models.CASCADE, related_name='harvests', null=True, blank=True)
     date = models.DateField()
     total_weight_kg = models.DecimalField(max_digits=15, decimal_places=10, validators=[MinValueValidator(Decimal('0.01'))])
@@ -341,6 +379,10 @@ class Harvest(models.Model):
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['pond', 'species', 'date']),
+            models.Index(fields=['owner', 'date']),
+        ]
     
     def __str__(self):
         species_name = self.species.name if self.species else "Mixed"
@@ -363,6 +405,189 @@ class Harvest(models.Model):
         super().save(*args, **kwargs)
 
 
+class PondSpeciesPopulation(models.Model):
+    """Running population totals per pond and species.
+
+    Maintained incrementally by the Stocking, Mortality and Harvest signal
+    handlers in ``signals.py`` so the live fish count is a single row lookup
+    instead of three aggregates over the source tables.
+    """
+    pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='populations')
+    species = models.ForeignKey(Species, on_delete=models.CASCADE, related_name='populations', null=True, blank=True)
+
+    stocked_count = models.IntegerField(default=0)
+    stocked_weight_kg = models.DecimalField(max_digits=20, decimal_places=10, default=0)
+    dead_count = models.IntegerField(default=0)
+    dead_weight_kg = models.DecimalField(max_digits=20, decimal_places=10, default=0)
+    harvested_count = models.IntegerField(default=0)
+    harvested_weight_kg = models.DecimalField(max_digits=20, decimal_places=10, default=0)
+
+    # Derived fields, recomputed on every ledger write
+    alive_count = models.IntegerField(default=0, help_text="Stocked minus dead minus harvested (never negative)")
+    average_weight_kg = models.DecimalField(max_digits=15, decimal_places=10, default=0, help_text="Latest sampled average weight, falling back to the latest stocking weight")
+    alive_weight_kg = models.DecimalField(max_digits=20, decimal_places=10, default=0, help_text="Alive count multiplied by the average weight")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['pond', 'species']
+        verbose_name = 'Pond Species Population'
+        verbose_name_plural = 'Pond Species Populations'
+
+    def __str__(self):
+        species_name = self.species.name if self.species else "Mixed"
+        return f"{self.pond.name} - {species_name}: {self.alive_count} alive"
+
+    @classmethod
+    def get_for(cls, pond, species):
+        """Return the ledger row for a pond/species pair (unsaved zero row if none exists)"""
+        pond_id = getattr(pond, 'pk', pond)
+        species_id = getattr(species, 'pk', species)
+        row = cls.objects.filter(pond_id=pond_id, species_id=species_id).first()
+        return row or cls(pond_id=pond_id, species_id=species_id)
+
+    @classmethod
+    def pond_totals(cls, pond):
+        """Aggregate the ledger rows of every species in a pond"""
+        totals = cls.objects.filter(pond=pond).aggregate(
+            stocked=Sum('stocked_count'),
+            dead=Sum('dead_count'),
+            harvested=Sum('harvested_count'),
+        )
+        return {key: value or 0 for key, value in totals.items()}
+
+    @classmethod
+    def apply_delta(cls, pond_id, species_id, prefix, count, weight_kg):
+        """Add ``count``/``weight_kg`` to the ``<prefix>_count``/``<prefix>_weight_kg`` totals"""
+        updated = cls.objects.filter(pond_id=pond_id, species_id=species_id).update(**{
+            f'{prefix}_count': models.F(f'{prefix}_count') + count,
+            f'{prefix}_weight_kg': models.F(f'{prefix}_weight_kg') + weight_kg,
+        })
+        if not updated:
+            if count <= 0 and weight_kg <= 0:
+                # Nothing to subtract from, e.g. the pond itself is being deleted
+                return
+            cls.objects.create(pond_id=pond_id, species_id=species_id, **{
+                f'{prefix}_count': count,
+                f'{prefix}_weight_kg': weight_kg,
+            })
+        cls.recompute_alive(pond_id, species_id)
+
+    @classmethod
+    def refresh_average_weight(cls, pond_id, species_id):
+        """Re-read the current average weight from the latest sampling or stocking"""
+        latest_sampling = FishSampling.objects.filter(
+            pond_id=pond_id, species_id=species_id
+        ).order_by('-date').values_list('average_weight_kg', flat=True).first()
+
+        if latest_sampling:
+            average_weight = latest_sampling
+        else:
+            average_weight = Stocking.objects.filter(
+                pond_id=pond_id, species_id=species_id
+            ).order_by('-date').values_list('initial_avg_weight_kg', flat=True).first() or Decimal('0')
+
+        cls.objects.filter(pond_id=pond_id, species_id=species_id).update(average_weight_kg=average_weight)
+        cls.recompute_alive(pond_id, species_id)
+
+    @classmethod
+    def recompute_alive(cls, pond_id, species_id):
+        alive = Greatest(
+            models.F('stocked_count') - models.F('dead_count') - models.F('harvested_count'),
+            models.Value(0),
+        )
+        cls.objects.filter(pond_id=pond_id, species_id=species_id).update(
+            alive_count=alive,
+            alive_weight_kg=models.ExpressionWrapper(
+                alive * models.F('average_weight_kg'),
+                output_field=models.DecimalField(max_digits=20, decimal_places=10),
+            ),
+        )
+
+    @classmethod
+    def rebuild(cls, pond_id, species_id):
+        """Recompute a ledger row from scratch (for repairs after bulk writes that skip signals)"""
+        source = {'pond_id': pond_id, 'species_id': species_id}
+        stocked = Stocking.objects.filter(**source).aggregate(
+            count=Sum('pcs'), weight=Sum('total_weight_kg')
+        )
+        dead = Mortality.objects.filter(**source).aggregate(
+            count=Sum('count'), weight=Sum('total_weight_kg')
+        )
+        harvested = Harvest.objects.filter(**source).aggregate(
+            count=Sum('total_count'), weight=Sum('total_weight_kg')
+        )
+        cls.objects.update_or_create(pond_id=pond_id, species_id=species_id, defaults={
+            'stocked_count': stocked['count'] or 0,
+            'stocked_weight_kg': stocked['weight'] or 0,
+            'dead_count': dead['count'] or 0,
+            'dead_weight_kg': dead['weight'] or 0,
+            'harvested_count': harvested['count'] or 0,
+            'harvested_weight_kg': harvested['weight'] or 0,
+        })
+        cls.refresh_average_weight(pond_id, species_id)
+
+
+class PondMonthlyFact(models.Model):
+    """Pre-aggregated monthly totals per user, pond and species.
+
+    Maintained incrementally by the Feed, Mortality, Harvest, Stocking, Expense
+    and Income signal handlers in ``signals.py`` (see ``facts.py`` for which
+    source fields feed which metric), so reports read a handful of rows
+    instead of scanning the source tables. Feeds have no species and farm-level
+    expenses and incomes no pond; their rows leave those keys empty.
+    """
+    METRIC_FIELDS = (
+        'feed_kg', 'feed_cost', 'mortality_count', 'mortality_kg', 'harvest_kg',
+        'harvest_revenue', 'expenses', 'incomes', 'stocking_cost',
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_facts')
+    pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='monthly_facts', null=True, blank=True)
+    species = models.ForeignKey(Species, on_delete=models.CASCADE, related_name='monthly_facts', null=True, blank=True)
+    month = models.DateField(help_text="First day of the month")
+
+    feed_kg = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    feed_cost = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    mortality_count = models.IntegerField(default=0)
+    mortality_kg = models.DecimalField(max_digits=20, decimal_places=10, default=0)
+    harvest_kg = models.DecimalField(max_digits=20, decimal_places=10, default=0)
+    harvest_revenue = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    expenses = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    incomes = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    stocking_cost = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['month', 'pond', 'species']
+        unique_together = ['user', 'pond', 'species', 'month']
+        indexes = [models.Index(fields=['user', 'month'])]
+        verbose_name = 'Pond Monthly Fact'
+        verbose_name_plural = 'Pond Monthly Facts'
+
+    def __str__(self):
+        pond_name = self.pond.name if self.pond else "Farm"
+        species_name = self.species.name if self.species else "Mixed"
+        return f"{pond_name} - {species_name} - {self.month:%Y-%m}"
+
+    @classmethod
+    def apply_delta(cls, user_id, pond_id, species_id, month, deltas):
+        """Add ``deltas`` ({metric: amount}) to the row for a user/pond/species/month"""
+        deltas = {field: value for field, value in deltas.items() if value}
+        if not deltas:
+            return
+        key = {'user_id': user_id, 'pond_id': pond_id, 'species_id': species_id, 'month': month}
+        updated = cls.objects.filter(**key).update(**{
+            field: models.F(field) + value for field, value in deltas.items()
+        })
+        if not updated:
+            if all(value <= 0 for value in deltas.values()):
+                # Nothing to subtract from, e.g. the pond itself is being deleted
+                return
+            cls.objects.create(**key, **deltas)
+
+
 class AccountType(MPTTModel):
     """Unified account type model for all financial accounts with hierarchical structure"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='account_types')
@@ -518,6 +743,7 @@ class InventoryFeed(models.Model):
 class Treatment(models.Model):
     """Treatment records"""
     pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='treatments')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', editable=False, help_text="Pond owner, kept in sync with pond.user")
     date = models.DateField()
     treatment_type = models.CharField(max_length=100)
     product_name = models.CharField(max_length=200)
@@ -529,6 +755,7 @@ class Treatment(models.Model):
     
     class Meta:
         ordering = ['-date']
+        indexes = [models.Index(fields=['owner', 'date'])]
     
     def __str__(self):
         return f"{self.pond.name} - {self.treatment_type} ({self.date})"
@@ -544,6 +771,7 @@ class Alert(models.Model):
     ]
     
     pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='alerts')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', editable=False, help_text="Pond owner, kept in sync with pond.user")
     alert_type = models.CharField(max_length=100)
     severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES)
     message = models.TextField()
@@ -554,6 +782,7 @@ class Alert(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['owner', 'created_at'])]
     
     def __str__(self):
         return f"{self.pond.name} - {self.alert_type} ({self.severity})"
@@ -585,6 +814,7 @@ class FeedingBand(models.Model):
     frequency_per_day = models.PositiveIntegerField(default=1)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['min_weight_g']
@@ -593,9 +823,41 @@ class FeedingBand(models.Model):
         return f"{self.name} ({self.min_weight_g}-{self.max_weight_g}g)"
 
 
+class FeedingRule(models.Model):
+    """A user's override of, or addition to, the default feeding adjustment rules in rules.py"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='feeding_rules')
+    key = models.SlugField(max_length=50, help_text="Rule key; a default rule's key overrides that rule")
+    group = models.CharField(max_length=30, choices=RULE_GROUP_CHOICES)
+    feature = models.CharField(max_length=50, help_text="Feature of the pond/species the rule tests")
+    operator = models.CharField(max_length=3, choices=RULE_OPERATOR_CHOICES)
+    value = models.CharField(max_length=50, help_text="Number, category or true/false the feature is compared with")
+    adjustment_percent = models.DecimalField(max_digits=6, decimal_places=2, help_text="Feeding adjustment in % when the rule matches")
+    priority = models.PositiveIntegerField(default=100, help_text="Lower priorities are checked first; the first matching rule of a group wins")
+    is_active = models.BooleanField(default=True, help_text="An inactive rule switches off the default rule with the same key")
+    description = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['group', 'priority', 'key']
+        unique_together = ['user', 'key']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.key}"
+    
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        from .rules import parse_rule_value
+        try:
+            parse_rule_value(self.feature, self.value)
+        except ValueError as e:
+            raise ValidationError({'value': str(e)})
+
+
 class EnvAdjustment(models.Model):
     """Environmental adjustments"""
     pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='env_adjustments')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', editable=False, help_text="Pond owner, kept in sync with pond.user")
     date = models.DateField()
     adjustment_type = models.CharField(max_length=100, choices=[
         ('water_change', 'Water Change'),
@@ -612,6 +874,7 @@ class EnvAdjustment(models.Model):
     
     class Meta:
         ordering = ['-date']
+        indexes = [models.Index(fields=['owner', 'date'])]
     
     def __str__(self):
         return f"{self.pond.name} - {self.adjustment_type} ({self.date})"
@@ -620,6 +883,7 @@ class EnvAdjustment(models.Model):
 class KPIDashboard(models.Model):
     """Key Performance Indicators Dashboard"""
     pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='kpis')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', editable=False, help_text="Pond owner, kept in sync with pond.user")
     date = models.DateField()
     
     # Growth metrics
@@ -647,6 +911,7 @@ class KPIDashboard(models.Model):
     class Meta:
         ordering = ['-date']
         unique_together = ['pond', 'date']
+        indexes = [models.Index(fields=['owner', 'date'])]
     
     def __str__(self):
         return f"{self.pond.name} - KPIs ({self.date})"
@@ -684,6 +949,8 @@ class FishSampling(models.Model):
     class Meta:
         ordering = ['-date', '-created_at']
         unique_together = ['pond', 'species', 'date']
+        # Pond-wide scans in (date, created_at) order, e.g. growth rate recomputation
+        indexes = [models.Index(fields=['pond', 'date', 'created_at'])]
     
     def __str__(self):
         species_name = self.species.name if self.species else "Mixed"
@@ -717,22 +984,23 @@ class FishSampling(models.Model):
                 pond=self.pond,
                 species=self.species,
                 date__lt=self.date
-            ).order_by('-date').first()
+            ).order_by('-date', '-created_at', '-id').first()
             
             # If no same species found, look for any previous sampling in the same pond
             if not previous_sampling:
                 previous_sampling = FishSampling.objects.filter(
                     pond=self.pond,
                     date__lt=self.date
-                ).order_by('-date').first()
+                ).order_by('-date', '-created_at', '-id').first()
         else:
             # If no species specified, look for any previous sampling in the same pond
             previous_sampling = FishSampling.objects.filter(
                 pond=self.pond,
                 date__lt=self.date
-            ).order_by('-date').first()
+            ).order_by('-date', '-created_at', '-id').first()
         
         # If no previous sampling found, compare with initial stocking data
+        reference = None
         if not previous_sampling:
             # This is the first sampling - compare with initial stocking
             if self.species:
@@ -740,104 +1008,55 @@ class FishSampling(models.Model):
                 latest_stocking = Stocking.objects.filter(
                     pond=self.pond,
                     species=self.species
-                ).order_by('-date').first()
+                ).order_by('-date', '-pk').first()
             else:
                 # Find the most recent stocking for this pond (any species)
                 latest_stocking = Stocking.objects.filter(
                     pond=self.pond
-                ).order_by('-date').first()
+                ).order_by('-date', '-pk').first()
             
             if latest_stocking and latest_stocking.total_weight_kg and latest_stocking.pcs:
-                # Calculate days since stocking
-                days_diff = (self.date - latest_stocking.date).days
-                
-                if days_diff > 0:
-                    # Calculate initial average weight from stocking
-                    initial_avg_weight = float(latest_stocking.total_weight_kg) / float(latest_stocking.pcs)
-                    
-                    # Calculate weight difference per fish
-                    weight_diff = float(self.average_weight_kg) - initial_avg_weight
-                    
-                    # Calculate daily growth rate (can be positive or negative)
-                    growth_rate_value = weight_diff / days_diff
-                    self.growth_rate_kg_per_day = Decimal(str(growth_rate_value))
-                    
-                    # Calculate total biomass difference
-                    # Use current fish count (stocked - mortality - harvested)
-                    total_fish_count = self.estimate_total_fish_count()
-                    if total_fish_count:
-                        self.biomass_difference_kg = Decimal(str(weight_diff * total_fish_count))
-                    else:
-                        self.biomass_difference_kg = None
-                else:
-                    self.growth_rate_kg_per_day = None
-                    self.biomass_difference_kg = None
-            else:
-                self.growth_rate_kg_per_day = None
-                self.biomass_difference_kg = None
-        else:
+                # Initial average weight from stocking
+                initial_avg_weight = float(latest_stocking.total_weight_kg) / float(latest_stocking.pcs)
+                reference = (initial_avg_weight, latest_stocking.date)
+        elif previous_sampling.average_weight_kg:
             # Compare with previous sampling
-            if previous_sampling.average_weight_kg:
-                # Calculate days difference
-                days_diff = (self.date - previous_sampling.date).days
-                
-                if days_diff > 0:
-                    # Calculate weight difference per fish
-                    weight_diff = float(self.average_weight_kg) - float(previous_sampling.average_weight_kg)
-                    
-                    # Calculate daily growth rate (can be positive or negative)
-                    self.growth_rate_kg_per_day = Decimal(str(weight_diff / days_diff))
-                    
-                    # Calculate total biomass difference
-                    # Estimate total fish count in pond based on stocking and mortality data
-                    total_fish_count = self.estimate_total_fish_count()
-                    if total_fish_count:
-                        self.biomass_difference_kg = Decimal(str(weight_diff * total_fish_count))
-                    else:
-                        self.biomass_difference_kg = None
-                else:
-                    self.growth_rate_kg_per_day = None
-                    self.biomass_difference_kg = None
-            else:
-                self.growth_rate_kg_per_day = None
-                self.biomass_difference_kg = None
+            reference = (previous_sampling.average_weight_kg, previous_sampling.date)
+        
+        if reference is None:
+            self.growth_rate_kg_per_day = None
+            self.biomass_difference_kg = None
+            return
+        
+        # Total fish count in pond (stocked - mortality - harvested)
+        self.growth_rate_kg_per_day, self.biomass_difference_kg = self.growth_metrics(
+            self.average_weight_kg, self.date, reference[0], reference[1],
+            self.estimate_total_fish_count()
+        )
+    
+    @staticmethod
+    def growth_metrics(average_weight_kg, sample_date, reference_weight_kg, reference_date, fish_count):
+        """Return (growth_rate_kg_per_day, biomass_difference_kg) relative to a reference weight and date"""
+        days_diff = (sample_date - reference_date).days
+        if days_diff <= 0:
+            return None, None
+        
+        # Weight difference per fish; the daily growth rate can be positive or negative
+        weight_diff = float(average_weight_kg) - float(reference_weight_kg)
+        growth_rate = Decimal(str(weight_diff / days_diff))
+        biomass_difference = Decimal(str(weight_diff * fish_count)) if fish_count else None
+        return growth_rate, biomass_difference
     
     def estimate_total_fish_count(self):
         """Estimate total fish count in pond based on stocking, mortality, and harvest data"""
         try:
-            # Get total stocked fish for this species (or all species if no species specified)
             if self.species:
-                total_stocked = Stocking.objects.filter(pond=self.pond, species=self.species).aggregate(
-                    total=models.Sum('pcs')
-                )['total'] or 0
-                
-                # Get total mortality for this species
-                total_mortality = Mortality.objects.filter(pond=self.pond, species=self.species).aggregate(
-                    total=models.Sum('count')
-                )['total'] or 0
-                
-                # Get total harvested for this species
-                total_harvested = Harvest.objects.filter(pond=self.pond, species=self.species).aggregate(
-                    total=models.Sum('total_count')
-                )['total'] or 0
-            else:
-                # If no species specified, use all species in the pond
-                total_stocked = Stocking.objects.filter(pond=self.pond).aggregate(
-                    total=models.Sum('pcs')
-                )['total'] or 0
-                
-                # Get total mortality
-                total_mortality = Mortality.objects.filter(pond=self.pond).aggregate(
-                    total=models.Sum('count')
-                )['total'] or 0
-                
-                # Get total harvested
-                total_harvested = Harvest.objects.filter(pond=self.pond).aggregate(
-                    total=models.Sum('total_count')
-                )['total'] or 0
+                # Single ledger row for this species
+                return PondSpeciesPopulation.get_for(self.pond_id, self.species_id).alive_count
             
-            # Calculate current alive fish
-            current_alive = total_stocked - total_mortality - total_harvested
+            # If no species specified, use all species in the pond
+            totals = PondSpeciesPopulation.pond_totals(self.pond_id)
+            current_alive = totals['stocked'] - totals['dead'] - totals['harvested']
             
             return max(0, current_alive)
         except Exception:
@@ -896,18 +1115,28 @@ class FeedingAdvice(models.Model):
     applied_date = models.DateTimeField(null=True, blank=True)
     
     notes = models.TextField(blank=True, help_text="Additional notes and observations")
+    input_fingerprint = models.CharField(
+        max_length=64, blank=True, default='',
+        help_text="Digest of the input rows this advice was generated from"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-date', '-created_at']
+        # Finding an earlier advice generated from the same inputs
+        indexes = [models.Index(fields=['pond', 'input_fingerprint'])]
     
     def __str__(self):
         species_name = self.species.name if self.species else "Mixed"
         return f"{self.pond.name} - {species_name} Feeding Advice ({self.date})"
     
     def save(self, *args, **kwargs):
-        # Auto-calculate derived metrics
+        self.calculate_metrics()
+        super().save(*args, **kwargs)
+    
+    def calculate_metrics(self, rule_plan=None, band_table=None):
+        """Auto-calculate derived metrics (``rule_plan`` and ``band_table`` default to the current RulePlan and FeedingBand table)"""
         if self.estimated_fish_count and self.average_fish_weight_kg:
             # Calculate total biomass
             self.total_biomass_kg = self.estimated_fish_count * self.average_fish_weight_kg
@@ -920,11 +1149,11 @@ class FeedingAdvice(models.Model):
                 except (ValueError, TypeError):
                     avg_weight_g = 0
                 
-                # Find the appropriate feeding band
-                feeding_band = FeedingBand.objects.filter(
-                    min_weight_g__lte=avg_weight_g,
-                    max_weight_g__gte=avg_weight_g
-                ).first()
+                # Find the appropriate feeding band in the cached interval table
+                if band_table is None:
+                    from .feeding_stages import get_feeding_band_table
+                    band_table = get_feeding_band_table()
+                feeding_band = band_table.lookup(avg_weight_g)
                 
                 if feeding_band:
                     # Use the feeding band's rate
@@ -935,18 +1164,14 @@ class FeedingAdvice(models.Model):
                     base_rate = Decimal('3.0')  # 3% of biomass as base rate
                     self.feeding_frequency = 2
                 
-                # Temperature adjustment
-                if self.water_temp_c:
-                    if self.water_temp_c < 15:
-                        base_rate *= Decimal('0.5')  # Reduce feeding in cold water
-                    elif self.water_temp_c > 30:
-                        base_rate *= Decimal('0.8')  # Reduce feeding in very warm water
-                
-                # Season adjustment
-                if self.season == 'winter':
-                    base_rate *= Decimal('0.6')
-                elif self.season == 'summer':
-                    base_rate *= Decimal('1.2')
+                # Temperature and season adjustments from the user's feeding rules
+                from .rules import apply_rate_adjustments, get_rule_plan
+                groups = ['rate_temperature', 'rate_season']
+                rule_plan = rule_plan or get_rule_plan(self.user_id)
+                adjustments = rule_plan.evaluate(
+                    [{'water_temp_c': self.water_temp_c or None, 'season': self.season}], groups=groups
+                ).row(0)
+                base_rate = apply_rate_adjustments(base_rate, adjustments, groups)
                 
                 self.feeding_rate_percent = base_rate
                 try:
@@ -960,13 +1185,12 @@ class FeedingAdvice(models.Model):
                         self.daily_feed_cost = self.recommended_feed_kg * self.feed_cost_per_kg
                     except (ValueError, TypeError):
                         self.daily_feed_cost = Decimal('0')
-        
-        super().save(*args, **kwargs)
 
 
 class SurvivalRate(models.Model):
     """Survival rate tracking for ponds and species"""
     pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='survival_rates')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', editable=False, help_text="Pond owner, kept in sync with pond.user")
     species = models.ForeignKey(Species, on_delete=models.CASCADE, related_name='survival_rates', null=True, blank=True)
     date = models.DateField()
     
@@ -989,6 +1213,7 @@ class SurvivalRate(models.Model):
     class Meta:
         ordering = ['-date']
         unique_together = ['pond', 'species', 'date']
+        indexes = [models.Index(fields=['owner', 'date'])]
     
     def __str__(self):
         species_name = self.species.name if self.species else "Mixed"
@@ -0,0 +1,72 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+MAX_PAGE_SIZE = 1000
+
+# Leading Meta.ordering fields that make a table a time-ordered log
+CURSOR_ORDERING_FIELDS = ('-date', '-created_at')
+
+
+def cursor_ordering(model):
+    """Cursor ordering for a model (its date ordering plus pk), or None if it is not a log table"""
+    ordering = list(model._meta.ordering)
+    if not ordering or ordering[0] not in CURSOR_ORDERING_FIELDS:
+        return None
+    return tuple(ordering) + ('-pk',)
+
+
+class StandardPageNumberPagination(PageNumberPagination):
+    """Numbered pages with a total count, as used by the frontend's Pagination component"""
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
+
+class DateCursorPagination(CursorPagination):
+    """Cursor pages over (date, id), newest first; stable while rows are being added"""
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        return cursor_ordering(queryset.model)
+
+
+class StandardPagination(DateCursorPagination):
+    """Default pagination for every list endpoint.
+
+    Date-ordered log tables (feeds, daily logs, samplings, expenses, ...) are
+    cursor paginated on (date, id). Passing ``?page=N``, or listing a table
+    without a date ordering (ponds, species, vendors, ...), gives numbered
+    pages instead. Both honour ``?page_size=`` up to MAX_PAGE_SIZE.
+    """
+    page_number_paginator = None
+
+    def use_page_numbers(self, queryset, request):
+        return (
+            StandardPageNumberPagination.page_query_param in request.query_params
+            or cursor_ordering(queryset.model) is None
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_page_numbers(queryset, request):
+            self.page_number_paginator = StandardPageNumberPagination()
+            return self.page_number_paginator.paginate_queryset(queryset, request, view)
+        self.page_number_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        names = {parameter['name'] for parameter in parameters}
+        return parameters + [
+            parameter for parameter in StandardPageNumberPagination().get_schema_operation_parameters(view)
+            if parameter['name'] not in names
+        ]
@@ -0,0 +1,497 @@
+import itertools
+import math
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from django.db.models import Sum
+
+from .feeding_stages import FEEDING_STAGES, feeding_stage_column, feeding_stage_indices
+from .models import DailyLog, Feed, FishSampling, Mortality, PondSpeciesPopulation, Sampling, Stocking
+from .rules import ADJUSTMENT_LIMITS
+
+
+DEFAULT_GROWTH_PERCENTILES = (10, 25, 50, 75, 90)
+# Multipliers applied to the observed FCR when no FCR values are given
+DEFAULT_FCR_FACTORS = (0.9, 1.0, 1.1)
+# Multipliers applied to the observed daily mortality rate, and the rates (% per day) used when none is observed
+DEFAULT_MORTALITY_FACTORS = (0.5, 1.0, 1.5)
+DEFAULT_MORTALITY_RATES = (0.0, 0.05, 0.1)
+# Specific growth rate (fraction of body weight per day) when no sampling interval is usable
+DEFAULT_SPECIFIC_GROWTH_RATE = 0.01
+DEFAULT_FCR = 1.5
+MORTALITY_WINDOW_DAYS = 30
+PROJECTION_MAX_DAYS = 730
+MAX_SCENARIOS = 5000
+RESULT_PERCENTILES = (10, 25, 50, 75, 90)
+# Required-ration search: candidate rations per round and rounds (resolution 1 / points ** rounds)
+RATION_SEARCH_POINTS = 16
+RATION_SEARCH_ROUNDS = 3
+MAX_RATION_REQUESTS = 200
+
+# Daily ration of each feeding stage as a fraction of body weight
+STAGE_RATIONS = feeding_stage_column('percent_bw_per_day') / 100
+
+
+def temperature_factor(rule_plan, temperatures_c):
+    """Growth and ration multiplier per water temperature (NaN = no reading).
+
+    Uses the temperature group of the user's feeding rules, clamped to the
+    adjustment limits, as the sampling-based feeding advice and the what-if
+    grid do.
+    """
+    temperatures_c = np.asarray(temperatures_c, dtype=float)
+    # Advice treats a 0 °C reading as no reading
+    columns = {'water_temp_c': np.where(temperatures_c == 0, np.nan, temperatures_c)}
+    evaluation = rule_plan.evaluate_columns(columns, temperatures_c.shape, ['temperature'])
+    low, high = ADJUSTMENT_LIMITS
+    return 1 + np.clip(evaluation.adjustments['temperature'], low, high) / 100
+
+
+def _number_list(data, key, minimum=None, maximum=None):
+    values = data.get(key)
+    if values is None or values == '':
+        return None
+    if not isinstance(values, (list, tuple)):
+        values = str(values).split(',')
+    try:
+        numbers = [float(value) for value in values]
+    except (TypeError, ValueError):
+        raise ValueError(f'{key} must be a list of numbers')
+    if not numbers or any(math.isnan(number) for number in numbers):
+        raise ValueError(f'{key} must be a list of numbers')
+    if minimum is not None and min(numbers) < minimum or maximum is not None and max(numbers) > maximum:
+        raise ValueError(f'{key} values must be between {minimum} and {maximum}')
+    return numbers
+
+
+def parse_scenario_grid(data):
+    """Read the optional scenario grid from request data (ValueError if invalid).
+
+    ``growth_percentiles`` (0-100), ``fcr_values``, ``mortality_rates`` (% per
+    day) and ``temperatures_c`` are lists or comma-separated strings;
+    ``max_days`` bounds the projection.
+    """
+    grid = {
+        'growth_percentiles': _number_list(data, 'growth_percentiles', 0, 100),
+        'fcr_values': _number_list(data, 'fcr_values', 0.1, 10),
+        'mortality_rates': _number_list(data, 'mortality_rates', 0, 100),
+        'temperatures_c': _number_list(data, 'temperatures_c', -5, 45),
+    }
+    max_days = data.get('max_days')
+    if max_days is None or max_days == '':
+        max_days = PROJECTION_MAX_DAYS
+    try:
+        max_days = int(max_days)
+    except (TypeError, ValueError):
+        raise ValueError('max_days must be a whole number of days')
+    if not 1 <= max_days <= 3650:
+        raise ValueError('max_days must be between 1 and 3650')
+    grid['max_days'] = max_days
+    return grid
+
+
+def gather_projection_inputs(pond, species, current_date):
+    """Observed state of a pond/species: alive count, weight, growth intervals, FCR, mortality and temperature.
+
+    Feeds are fetched once and bucketed into the sampling intervals with
+    NumPy instead of one query per interval.
+    """
+    population = PondSpeciesPopulation.get_for(pond, species)
+    latest_stocking = Stocking.objects.filter(pond=pond, species=species).order_by('-date').first()
+    samplings = list(FishSampling.objects.filter(pond=pond, species=species).order_by('date', 'created_at', 'id').values_list(
+        'date', 'average_weight_kg', 'biomass_difference_kg'
+    ))
+    if latest_stocking is None or not samplings:
+        return None
+
+    # Specific growth rate (ln weight gain per day) of every interval from the stocking on
+    anchors = [(latest_stocking.date, float(latest_stocking.initial_avg_weight_kg or 0))]
+    anchors += [(day, float(weight or 0)) for day, weight, _ in samplings if day >= latest_stocking.date]
+    anchor_days = np.array([day.toordinal() for day, _ in anchors], dtype=float)
+    anchor_weights = np.array([weight for _, weight in anchors])
+    interval_days = np.diff(anchor_days)
+    usable = (interval_days > 0) & (anchor_weights[:-1] > 0) & (anchor_weights[1:] > 0)
+    growth_rates = np.log(anchor_weights[1:][usable] / anchor_weights[:-1][usable]) / interval_days[usable]
+
+    # FCR per sampling interval from one feed query
+    feeds = list(Feed.objects.filter(pond=pond, date__gte=latest_stocking.date).values_list('date', 'amount_kg'))
+    sampling_days = np.array([day.toordinal() for day, _, _ in samplings])
+    gains = np.array([float(difference or 0) for _, _, difference in samplings])
+    period_feed = np.zeros(len(samplings))
+    if feeds:
+        feed_days = np.array([day.toordinal() for day, _ in feeds])
+        feed_amounts = np.array([float(amount or 0) for _, amount in feeds])
+        # Feed on (previous sampling, sampling] belongs to that sampling's period
+        periods = np.searchsorted(sampling_days, feed_days, side='left')
+        inside = (periods > 0) & (periods < len(samplings))
+        period_feed = np.bincount(periods[inside], weights=feed_amounts[inside], minlength=len(samplings))
+    valid = (gains > 0) & (period_feed > 0)
+    valid[0] = False
+    period_fcrs = period_feed[valid] / gains[valid]
+    total_gain = gains.sum()
+    total_feed = sum(amount for _, amount in feeds if amount)
+    if len(period_fcrs) >= 2:
+        fcr = 0.7 * period_fcrs[-2:].mean() + 0.3 * period_fcrs.mean()
+    elif len(period_fcrs) == 1:
+        fcr = period_fcrs[0]
+    elif total_gain > 0 and total_feed:
+        fcr = float(total_feed) / total_gain
+    else:
+        fcr = DEFAULT_FCR
+    fcr = min(max(float(fcr), 0.8), 3.0)
+
+    # Observed daily mortality rate over the last window
+    recent_dead = Mortality.objects.filter(
+        pond=pond, species=species,
+        date__gt=current_date - timedelta(days=MORTALITY_WINDOW_DAYS), date__lte=current_date
+    ).aggregate(total=Sum('count'))['total'] or 0
+    alive_count = population.alive_count
+    mortality_rate = recent_dead / (alive_count + recent_dead) / MORTALITY_WINDOW_DAYS if alive_count + recent_dead else 0
+
+    temperature = DailyLog.objects.filter(pond=pond, water_temp_c__isnull=False).order_by('-date').values_list(
+        'water_temp_c', flat=True
+    ).first()
+    if temperature is None:
+        temperature = Sampling.objects.filter(pond=pond, temperature_c__isnull=False).order_by('-date').values_list(
+            'temperature_c', flat=True
+        ).first()
+
+    average_weight_kg = float(samplings[-1][1] or 0) or float(population.average_weight_kg or 0)
+    return {
+        'latest_stocking': latest_stocking,
+        'latest_sampling_date': samplings[-1][0],
+        'alive_count': alive_count,
+        'average_weight_kg': average_weight_kg,
+        'current_biomass_kg': alive_count * average_weight_kg,
+        'growth_rates': growth_rates,
+        'feed_conversion_ratio': fcr,
+        'period_fcrs': period_fcrs.tolist(),
+        'mortality_rate': mortality_rate,
+        'temperature_c': float(temperature) if temperature is not None else None,
+    }
+
+
+def daily_gain(weight, growth, factor, fcr, ration_fraction=1.0):
+    """Per-fish gain for a day: the growth potential, limited by what the feeding-stage ration (times
+    ``ration_fraction``) converts into at the FCR. Works element-wise on arrays of any shape."""
+    stage_ration = ration_fraction * STAGE_RATIONS[feeding_stage_indices(weight * 1000)] * factor * weight
+    return np.minimum(weight * growth, stage_ration / fcr)
+
+
+def build_scenarios(inputs, grid):
+    """Cartesian product of the scenario axes as parallel arrays (ValueError if the grid is too large)"""
+    percentiles = grid['growth_percentiles'] or list(DEFAULT_GROWTH_PERCENTILES)
+    growth_rates = inputs['growth_rates']
+    if len(growth_rates):
+        rates = np.maximum(np.percentile(growth_rates, percentiles), 0)
+    else:
+        rates = np.full(len(percentiles), DEFAULT_SPECIFIC_GROWTH_RATE)
+    fcrs = grid['fcr_values'] or [round(inputs['feed_conversion_ratio'] * factor, 4) for factor in DEFAULT_FCR_FACTORS]
+    if grid['mortality_rates'] is not None:
+        mortality_rates = grid['mortality_rates']
+    elif inputs['mortality_rate'] > 0:
+        mortality_rates = [inputs['mortality_rate'] * 100 * factor for factor in DEFAULT_MORTALITY_FACTORS]
+    else:
+        mortality_rates = list(DEFAULT_MORTALITY_RATES)
+    temperatures = grid['temperatures_c'] or [inputs['temperature_c'] if inputs['temperature_c'] is not None else math.nan]
+
+    count = len(percentiles) * len(fcrs) * len(mortality_rates) * len(temperatures)
+    if count > MAX_SCENARIOS:
+        raise ValueError(f'The scenario grid has {count} scenarios; at most {MAX_SCENARIOS} are allowed')
+    axes = np.array(list(itertools.product(
+        range(len(percentiles)), range(len(fcrs)), range(len(mortality_rates)), range(len(temperatures))
+    ))).T
+    return {
+        'growth_percentile': np.asarray(percentiles, dtype=float)[axes[0]],
+        'specific_growth_rate': np.asarray(rates, dtype=float)[axes[0]],
+        'fcr': np.asarray(fcrs, dtype=float)[axes[1]],
+        'mortality_rate_percent': np.asarray(mortality_rates, dtype=float)[axes[2]],
+        'temperature_c': np.asarray(temperatures, dtype=float)[axes[3]],
+    }
+
+
+def simulate_scenarios(rule_plan, average_weight_kg, alive_count, target_biomass_kg, scenarios, max_days=PROJECTION_MAX_DAYS):
+    """Project every scenario day by day until it reaches the target biomass.
+
+    Each day a fish can gain its specific growth rate (scaled by the
+    temperature factor of ``rule_plan``), capped by what the feeding-stage ration for its
+    weight can produce at the scenario's FCR; feed is the gain times the FCR
+    and the stock shrinks by the daily mortality rate. All scenarios advance
+    together as arrays, so the cost is one set of NumPy operations per day.
+    Returns per-scenario ``days`` (-1 if the target is not reached within
+    ``max_days``), ``feed_kg`` up to that day, and the final weight and count.
+    """
+    factor = temperature_factor(rule_plan, scenarios['temperature_c'])
+    growth = np.expm1(scenarios['specific_growth_rate'] * factor)
+    fcr = scenarios['fcr']
+    survival = 1 - scenarios['mortality_rate_percent'] / 100
+
+    size = len(fcr)
+    weight = np.full(size, float(average_weight_kg))
+    count = np.full(size, float(alive_count))
+    feed = np.zeros(size)
+    days = np.full(size, -1, dtype=int)
+    reached = weight * count >= target_biomass_kg
+    days[reached] = 0
+
+    for day in range(1, max_days + 1):
+        active = ~reached
+        if not active.any():
+            break
+        gain = daily_gain(weight, growth, factor, fcr)
+        feed += np.where(active, gain * fcr * count, 0)
+        weight = np.where(active, weight + gain, weight)
+        count = np.where(active, count * survival, count)
+        newly = active & (weight * count >= target_biomass_kg)
+        days[newly] = day
+        reached |= newly
+
+    return {'days': days, 'feed_kg': feed, 'final_weight_kg': weight, 'final_count': count}
+
+
+def summarize_projection(result, scenarios, current_date):
+    """Percentiles of the target date and feed over the scenarios that reach the target"""
+    days = result['days']
+    reached = days >= 0
+    summary = {
+        'scenario_count': int(len(days)),
+        'reached_count': int(reached.sum()),
+        'reached_fraction': round(float(reached.mean()), 4) if len(days) else 0,
+        'median_specific_growth_rate': round(float(np.median(scenarios['specific_growth_rate'])), 6),
+        'median_feed_kg': round(float(np.median(result['feed_kg'])), 2),
+        'days': None,
+        'target_dates': None,
+        'feed_kg': None,
+    }
+    if reached.any():
+        day_percentiles = np.percentile(days[reached], RESULT_PERCENTILES, method='nearest')
+        feed_percentiles = np.percentile(result['feed_kg'][reached], RESULT_PERCENTILES)
+        summary['days'] = {f'p{p}': int(value) for p, value in zip(RESULT_PERCENTILES, day_percentiles)}
+        summary['target_dates'] = {
+            f'p{p}': (current_date + timedelta(days=int(value))).isoformat()
+            for p, value in zip(RESULT_PERCENTILES, day_percentiles)
+        }
+        summary['feed_kg'] = {f'p{p}': round(float(value), 2) for p, value in zip(RESULT_PERCENTILES, feed_percentiles)}
+
+    summary['scenarios'] = [
+        {
+            'growth_percentile': percentile,
+            'specific_growth_rate': round(rate, 6),
+            'fcr': round(fcr, 4),
+            'mortality_rate_percent': round(mortality, 4),
+            'temperature_c': None if math.isnan(temperature) else temperature,
+            'days': day if day >= 0 else None,
+            'target_date': (current_date + timedelta(days=day)).isoformat() if day >= 0 else None,
+            'feed_kg': round(feed, 2),
+            'final_average_weight_kg': round(weight, 6),
+            'final_alive_count': int(count),
+        }
+        for percentile, rate, fcr, mortality, temperature, day, feed, weight, count in zip(
+            scenarios['growth_percentile'].tolist(), scenarios['specific_growth_rate'].tolist(),
+            scenarios['fcr'].tolist(), scenarios['mortality_rate_percent'].tolist(),
+            scenarios['temperature_c'].tolist(), days.tolist(), result['feed_kg'].tolist(),
+            result['final_weight_kg'].tolist(), result['final_count'].tolist(),
+        )
+    ]
+    return summary
+
+
+def parse_ration_requests(data):
+    """Read a batch of (pond_id, species_id, target_biomass_kg, target_date[, current_date]) requests (ValueError if invalid)"""
+    items = data.get('requests')
+    if not isinstance(items, list) or not items:
+        raise ValueError('requests must be a non-empty list')
+    if len(items) > MAX_RATION_REQUESTS:
+        raise ValueError(f'At most {MAX_RATION_REQUESTS} requests can be solved at once')
+
+    parsed = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f'requests[{index}] must be an object')
+        try:
+            pond_id = int(item['pond_id'])
+            species_id = int(item['species_id'])
+            target_biomass_kg = float(item['target_biomass_kg'])
+            target_date = datetime.strptime(item['target_date'], '%Y-%m-%d').date()
+            current_date = (
+                datetime.strptime(item['current_date'], '%Y-%m-%d').date()
+                if item.get('current_date') else date.today()
+            )
+        except KeyError as e:
+            raise ValueError(f'requests[{index}] is missing {e.args[0]}')
+        except (TypeError, ValueError):
+            raise ValueError(
+                f'requests[{index}]: pond_id and species_id must be ids, target_biomass_kg a number '
+                'and dates YYYY-MM-DD'
+            )
+        if not target_biomass_kg > 0:
+            raise ValueError(f'requests[{index}]: target_biomass_kg must be greater than 0')
+        horizon = (target_date - current_date).days
+        if not 1 <= horizon <= 3650:
+            raise ValueError(f'requests[{index}]: target_date must be 1 to 3650 days after current_date')
+        parsed.append({
+            'pond_id': pond_id,
+            'species_id': species_id,
+            'target_biomass_kg': target_biomass_kg,
+            'target_date': target_date,
+            'current_date': current_date,
+        })
+    return parsed
+
+
+def project_rations(lanes, ration_fraction, record=False):
+    """Grow every lane for its own horizon at a fixed fraction of the feeding-stage ration.
+
+    ``lanes`` holds 1-D arrays (one entry per request); ``ration_fraction`` is
+    an array of shape (requests,) or (requests, candidates) and every
+    candidate is simulated in the same pass. Returns the biomass and feed
+    at each horizon, plus the day-by-day feed, weight and count if ``record``.
+    """
+    ration_fraction = np.asarray(ration_fraction, dtype=float)
+    shape = ration_fraction.shape
+
+    def lane(values):
+        values = np.asarray(values, dtype=float)
+        return np.broadcast_to(values.reshape(values.shape + (1,) * (len(shape) - 1)), shape)
+
+    growth, factor, fcr, survival = lane(lanes['growth']), lane(lanes['factor']), lane(lanes['fcr']), lane(lanes['survival'])
+    horizons = lane(lanes['horizon'])
+    weight = lane(lanes['average_weight_kg']).copy()
+    count = lane(lanes['alive_count']).copy()
+    feed = np.zeros(shape)
+    history = {'daily_feed_kg': [], 'average_weight_kg': [], 'alive_count': []}
+
+    for day in range(1, int(horizons.max()) + 1):
+        active = day <= horizons
+        gain = daily_gain(weight, growth, factor, fcr, ration_fraction)
+        day_feed = np.where(active, gain * fcr * count, 0)
+        feed += day_feed
+        weight = np.where(active, weight + gain, weight)
+        count = np.where(active, count * survival, count)
+        if record:
+            history['daily_feed_kg'].append(day_feed)
+            history['average_weight_kg'].append(weight)
+            history['alive_count'].append(count)
+
+    result = {'biomass_kg': weight * count, 'feed_kg': feed}
+    if record:
+        result.update({key: np.stack(values, axis=-1) for key, values in history.items()})
+    return result
+
+
+def solve_required_rations(lanes, targets):
+    """Smallest fraction of the feeding-stage ration that reaches each target biomass by its horizon.
+
+    A vectorized k-section search: each round simulates RATION_SEARCH_POINTS
+    evenly spaced candidates inside every request's bracket in one pass and
+    narrows the bracket to the first candidate that reaches the target.
+    Requests that miss the target even at the full stage ration are
+    reported as infeasible with a fraction of 1.
+    """
+    targets = np.asarray(targets, dtype=float)
+    size = len(targets)
+    feasible = project_rations(lanes, np.ones(size))['biomass_kg'] >= targets
+    low = np.zeros(size)
+    high = np.ones(size)
+    steps = np.linspace(0, 1, RATION_SEARCH_POINTS + 1)[1:]
+    rows = np.arange(size)
+    for _ in range(RATION_SEARCH_ROUNDS):
+        candidates = low[:, None] + (high - low)[:, None] * steps[None, :]
+        reached = project_rations(lanes, candidates)['biomass_kg'] >= targets[:, None]
+        # The bracket top always reaches the target for feasible requests
+        first = np.where(reached.any(axis=1), reached.argmax(axis=1), RATION_SEARCH_POINTS - 1)
+        new_high = candidates[rows, first]
+        new_low = np.where(first > 0, candidates[rows, np.maximum(first - 1, 0)], low)
+        low = np.where(feasible, new_low, low)
+        high = np.where(feasible, new_high, high)
+    return high, feasible
+
+
+def required_ration_plan(rule_plan, requests, inputs):
+    """Solve every request with observed inputs and the user's RulePlan; returns one result dict per request.
+
+    ``inputs`` maps (pond_id, species_id, current_date) to
+    gather_projection_inputs() output (None if the pair has no data).
+    """
+    results = [None] * len(requests)
+    solvable = []
+    for index, request in enumerate(requests):
+        observed = inputs.get((request['pond_id'], request['species_id'], request['current_date']))
+        if observed is None:
+            results[index] = {'error': 'Stocking and fish sampling data are required for this pond and species'}
+        elif observed['alive_count'] <= 0:
+            results[index] = {'error': 'No fish are alive in this pond for this species'}
+        else:
+            solvable.append((index, request, observed))
+
+    if solvable:
+        growth_rates = [
+            max(float(np.median(observed['growth_rates'])), 0) if len(observed['growth_rates'])
+            else DEFAULT_SPECIFIC_GROWTH_RATE
+            for _, _, observed in solvable
+        ]
+        factors = temperature_factor(rule_plan, [
+            observed['temperature_c'] if observed['temperature_c'] is not None else math.nan
+            for _, _, observed in solvable
+        ])
+        lanes = {
+            'average_weight_kg': [observed['average_weight_kg'] for _, _, observed in solvable],
+            'alive_count': [observed['alive_count'] for _, _, observed in solvable],
+            'growth': np.expm1(np.array(growth_rates) * factors),
+            'factor': factors,
+            'fcr': [observed['feed_conversion_ratio'] for _, _, observed in solvable],
+            'survival': [1 - observed['mortality_rate'] for _, _, observed in solvable],
+            'horizon': [(request['target_date'] - request['current_date']).days for _, request, _ in solvable],
+        }
+        fractions, feasible = solve_required_rations(lanes, [request['target_biomass_kg'] for _, request, _ in solvable])
+        plan = project_rations(lanes, fractions, record=True)
+
+        for lane_index, (index, request, observed) in enumerate(solvable):
+            horizon = lanes['horizon'][lane_index]
+            daily_feed = plan['daily_feed_kg'][lane_index, :horizon]
+            weights = plan['average_weight_kg'][lane_index, :horizon]
+            counts = plan['alive_count'][lane_index, :horizon]
+            # Stage of the fish at the start of each day
+            start_weights = np.concatenate(([observed['average_weight_kg']], weights[:-1]))
+            stages = feeding_stage_indices(start_weights * 1000)
+            changes = np.flatnonzero(np.diff(stages, prepend=-1))
+            stage_percent = STAGE_RATIONS[stages] * lanes['factor'][lane_index] * 100
+            total_feed = float(plan['feed_kg'][lane_index])
+            results[index] = {
+                'feasible': bool(feasible[lane_index]),
+                'ration_fraction': round(float(fractions[lane_index]), 4),
+                'current_biomass_kg': round(observed['current_biomass_kg'], 3),
+                'projected_biomass_kg': round(float(plan['biomass_kg'][lane_index]), 3),
+                'total_feed_kg': round(total_feed, 2),
+                'average_daily_feed_kg': round(total_feed / horizon, 2),
+                'feed_conversion_ratio': round(observed['feed_conversion_ratio'], 2),
+                'specific_growth_rate': round(growth_rates[lane_index], 6),
+                'daily_survival_rate': round(1 - observed['mortality_rate'], 6),
+                'temperature_c': observed['temperature_c'],
+                'schedule': {
+                    'start_date': (request['current_date'] + timedelta(days=1)).isoformat(),
+                    'feed_kg': np.round(daily_feed, 3).tolist(),
+                    'percent_bw_per_day': np.round(stage_percent * fractions[lane_index], 4).tolist(),
+                    'average_weight_kg': np.round(weights, 6).tolist(),
+                    'alive_count': counts.astype(int).tolist(),
+                    'stage_changes': [
+                        {
+                            'date': (request['current_date'] + timedelta(days=int(day) + 1)).isoformat(),
+                            'stage_name': FEEDING_STAGES[stages[day]]['stage_name'],
+                        }
+                        for day in changes.tolist()
+                    ],
+                },
+            }
+
+    return [
+        {
+            'pond_id': request['pond_id'],
+            'species_id': request['species_id'],
+            'target_biomass_kg': request['target_biomass_kg'],
+            'current_date': request['current_date'].isoformat(),
+            'target_date': request['target_date'].isoformat(),
+            **result,
+        }
+        for request, result in zip(requests, results)
+    ]
@@ -0,0 +1,267 @@
+import hashlib
+import operator
+import threading
+from decimal import Decimal
+
+import numpy as np
+from django.db.models import Count, Max
+
+
+# Groups a rule contributes to. In each group the first matching rule (lowest
+# priority) sets the group's percent adjustment for a feature row; a row no
+# rule matches gets 0.
+RULE_GROUP_CHOICES = [
+    # Summed into the advice's total adjustment (clamped to ADJUSTMENT_LIMITS)
+    ('water_quality', 'Water quality'),
+    ('temperature', 'Temperature'),
+    ('mortality', 'Mortality'),
+    ('growth', 'Growth'),
+    ('seasonal', 'Season'),
+    ('feeding_consistency', 'Feeding consistency'),
+    # Added after the clamp
+    ('medical', 'Medical'),
+    # Multiplied into a base feeding rate as (100 + percent) / 100
+    ('rate_temperature', 'Base rate: temperature'),
+    ('rate_season', 'Base rate: season'),
+    ('rate_medical', 'Base rate: medical'),
+    # Learning from applied advice, averaged over the advice evaluated
+    ('history_rate', 'Applied advice: rate'),
+    ('history_feed', 'Applied advice: feed'),
+]
+
+RULE_OPERATOR_CHOICES = [
+    ('lt', '<'),
+    ('lte', '<='),
+    ('gt', '>'),
+    ('gte', '>='),
+    ('eq', '='),
+    ('ne', '!='),
+]
+
+OPERATORS = {
+    'lt': operator.lt,
+    'lte': operator.le,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'eq': operator.eq,
+    'ne': operator.ne,
+}
+
+# Feature a rule can test and its kind: numbers are compared as floats (a
+# missing value matches nothing), categories as strings and flags as booleans
+FEATURES = {
+    'water_quality_status': 'category',
+    'water_temp_c': 'number',
+    'high_mortality_rate': 'flag',
+    'disease_present': 'flag',
+    'growth_quality': 'category',
+    'season': 'category',
+    'feeding_consistency': 'category',
+    'disease_count': 'number',
+    'max_disease_confidence': 'number',
+    'has_medical_warnings': 'flag',
+    'post_advice_growth_kg_per_day': 'number',
+}
+
+# Value of a feature that was not observed, per kind
+MISSING_VALUES = {'number': np.nan, 'category': '', 'flag': False}
+
+# Limits of the summed adjustment groups, in percent
+ADJUSTMENT_LIMITS = (-50, 30)
+
+ADJUSTMENT_GROUPS = ['water_quality', 'temperature', 'mortality', 'growth', 'seasonal', 'feeding_consistency']
+
+# (key, group, feature, operator, value, adjustment_percent, priority, description)
+DEFAULT_RULE_ROWS = [
+    ('poor_water', 'water_quality', 'water_quality_status', 'eq', 'poor', -20, 10, 'Reduce feeding in poor water quality'),
+    ('excellent_water', 'water_quality', 'water_quality_status', 'eq', 'excellent', 5, 20, 'Slight increase in excellent conditions'),
+    ('cold_water', 'temperature', 'water_temp_c', 'lt', '15', -50, 10, 'Significantly reduce in cold water'),
+    ('cool_water', 'temperature', 'water_temp_c', 'lt', '20', -20, 20, 'Reduce in cool water'),
+    ('below_optimal_water', 'temperature', 'water_temp_c', 'lt', '26', -10, 30, 'Slight reduction below optimal'),
+    ('hot_water', 'temperature', 'water_temp_c', 'gt', '35', -40, 40, 'Significantly reduce in hot water'),
+    ('warm_water', 'temperature', 'water_temp_c', 'gt', '30', -20, 50, 'Reduce in very warm water'),
+    ('disease_present', 'mortality', 'disease_present', 'eq', 'true', -30, 10, 'Further reduce if disease present'),
+    ('high_mortality', 'mortality', 'high_mortality_rate', 'eq', 'true', -20, 20, 'Reduce feeding if high mortality'),
+    ('excellent_growth', 'growth', 'growth_quality', 'eq', 'excellent', 10, 10, 'Slight increase for excellent growth'),
+    ('poor_growth', 'growth', 'growth_quality', 'eq', 'poor', -10, 20, 'Slight decrease for poor growth'),
+    ('winter', 'seasonal', 'season', 'eq', 'winter', -40, 10, 'Significant reduction in winter'),
+    ('summer', 'seasonal', 'season', 'eq', 'summer', 10, 20, 'Increase in summer'),
+    ('inconsistent_feeding', 'feeding_consistency', 'feeding_consistency', 'eq', 'inconsistent', -10, 10, 'Slight reduction for inconsistent feeding'),
+    ('high_confidence_disease', 'medical', 'max_disease_confidence', 'gte', '80', -50, 10, 'Reduce feeding by 50% for high severity diseases'),
+    ('medium_confidence_disease', 'medical', 'max_disease_confidence', 'gte', '60', -30, 20, 'Reduce feeding by 30% for medium severity diseases'),
+    ('low_confidence_disease', 'medical', 'disease_count', 'gt', '0', -10, 30, 'Reduce feeding by 10% for low severity diseases'),
+    ('rate_cold_water', 'rate_temperature', 'water_temp_c', 'lt', '15', -50, 10, 'Reduce feeding in cold water'),
+    ('rate_warm_water', 'rate_temperature', 'water_temp_c', 'gt', '30', -20, 20, 'Reduce feeding in very warm water'),
+    ('rate_winter', 'rate_season', 'season', 'eq', 'winter', -40, 10, 'Winter feeding rate'),
+    ('rate_summer', 'rate_season', 'season', 'eq', 'summer', 20, 20, 'Summer feeding rate'),
+    ('rate_health_issues', 'rate_medical', 'has_medical_warnings', 'eq', 'true', -20, 10, 'Reduce feeding if health issues'),
+    # Expected growth is 1.5 g/day; above 120% of it the previous advice worked well, below 80% it was too aggressive
+    ('history_good_growth', 'history_rate', 'post_advice_growth_kg_per_day', 'gt', '0.018', 10, 10, 'Previous advice worked well'),
+    ('history_poor_growth', 'history_rate', 'post_advice_growth_kg_per_day', 'lt', '0.012', -10, 20, 'Previous advice may have been too aggressive'),
+    ('history_good_growth_feed', 'history_feed', 'post_advice_growth_kg_per_day', 'gt', '0.018', 5, 10, 'Previous advice worked well'),
+    ('history_poor_growth_feed', 'history_feed', 'post_advice_growth_kg_per_day', 'lt', '0.012', -5, 20, 'Previous advice may have been too aggressive'),
+]
+
+RULE_FIELDS = ['key', 'group', 'feature', 'operator', 'value', 'adjustment_percent', 'priority', 'description']
+
+DEFAULT_RULES = [dict(zip(RULE_FIELDS, row)) for row in DEFAULT_RULE_ROWS]
+
+DEFAULT_RULES_BY_KEY = {rule['key']: rule for rule in DEFAULT_RULES}
+
+
+def parse_rule_value(feature, value):
+    """The value a rule compares a feature against; raises ValueError for an unknown feature or bad value"""
+    kind = FEATURES.get(feature)
+    if kind is None:
+        raise ValueError(f'Unknown feature: {feature}')
+    if kind == 'number':
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = float('nan')
+        if number != number:
+            raise ValueError(f'{feature} rules compare against a number')
+        return number
+    if kind == 'flag':
+        text = str(value).strip().lower()
+        if text not in ('true', 'false', '1', '0'):
+            raise ValueError('Flag rules compare against true or false')
+        return text in ('true', '1')
+    return str(value)
+
+
+def feature_columns(rows, features):
+    """Columns of the given features over a list of feature dicts"""
+    columns = {}
+    for feature in features:
+        values = [row.get(feature) for row in rows]
+        kind = FEATURES[feature]
+        if kind == 'number':
+            columns[feature] = np.array([np.nan if value is None else float(value) for value in values], dtype=float)
+        elif kind == 'flag':
+            columns[feature] = np.array([bool(value) for value in values], dtype=bool)
+        else:
+            columns[feature] = np.array(['' if value is None else str(value) for value in values], dtype=str)
+    return columns
+
+
+class RuleEvaluation:
+    """Percent adjustment and matching rule key per group for every evaluated feature row"""
+
+    def __init__(self, adjustments, matches):
+        self.adjustments = adjustments
+        self.matches = matches
+
+    def row(self, index):
+        """{group: percent} of one feature row"""
+        return {group: float(values[index]) for group, values in self.adjustments.items()}
+
+    def matched_rules(self, index):
+        """{group: rule key} of the rules that matched one feature row"""
+        return {group: str(keys[index]) for group, keys in self.matches.items() if keys[index]}
+
+
+class RulePlan:
+    """Rules compiled into per-group condition lists.
+
+    Each group is evaluated over all feature rows at once: every rule's
+    condition is one array comparison, and the rows it matches first take its
+    adjustment. Groups without an active rule evaluate to 0.
+    """
+
+    def __init__(self, rules):
+        self.rules = sorted(rules, key=lambda rule: (rule['group'], rule['priority'], rule['key']))
+        # Identifies the compiled rules, e.g. in the input fingerprint of saved advice
+        self.digest = hashlib.sha256(repr([sorted(rule.items()) for rule in self.rules]).encode()).hexdigest()
+        self.groups = {group: [] for group, _ in RULE_GROUP_CHOICES}
+        for rule in self.rules:
+            self.groups.setdefault(rule['group'], []).append((
+                rule['key'], rule['feature'], OPERATORS[rule['operator']],
+                parse_rule_value(rule['feature'], rule['value']), float(rule['adjustment_percent']),
+            ))
+
+    def evaluate(self, rows, groups=None):
+        """RuleEvaluation of the given groups (all by default) for a list of feature dicts"""
+        groups = list(self.groups) if groups is None else groups
+        features = {feature for group in groups for _, feature, _, _, _ in self.groups.get(group, [])}
+        return self.evaluate_columns(feature_columns(rows, features), len(rows), groups)
+
+    def evaluate_columns(self, columns, shape, groups=None):
+        """RuleEvaluation over feature arrays (or scalars) that broadcast to ``shape``.
+
+        Features missing from ``columns`` are treated as missing values, so
+        no rule testing them matches.
+        """
+        groups = list(self.groups) if groups is None else groups
+        adjustments = {}
+        matches = {}
+        for group in groups:
+            values = np.zeros(shape)
+            keys = np.full(shape, '', dtype=object)
+            unmatched = np.ones(shape, dtype=bool)
+            for key, feature, compare, value, percent in self.groups.get(group, []):
+                column = columns.get(feature, MISSING_VALUES[FEATURES[feature]])
+                hit = unmatched & compare(column, value)
+                values[hit] = percent
+                keys[hit] = key
+                unmatched &= ~hit
+            adjustments[group] = values
+            matches[group] = keys
+        return RuleEvaluation(adjustments, matches)
+
+
+def apply_rate_adjustments(base_rate, adjustments, groups):
+    """Multiply a Decimal base rate by (100 + percent) / 100 for each base rate group that matched"""
+    for group in groups:
+        if adjustments[group]:
+            base_rate *= (Decimal('100') + Decimal(str(adjustments[group]))) / Decimal('100')
+    return base_rate
+
+
+def effective_rules(user_id):
+    """The default rules with the user's FeedingRule rows applied: same key overrides, inactive removes, new keys add"""
+    from .models import FeedingRule
+
+    rules = {rule['key']: dict(rule) for rule in DEFAULT_RULES}
+    if user_id is not None:
+        for rule in FeedingRule.objects.filter(user_id=user_id):
+            if not rule.is_active:
+                rules.pop(rule.key, None)
+                continue
+            rules[rule.key] = {field: getattr(rule, field) for field in RULE_FIELDS}
+    return list(rules.values())
+
+
+_rule_plans = {}
+_rule_plan_lock = threading.Lock()
+
+
+def rules_version(user_id):
+    """Count, highest id and latest updated_at of the user's FeedingRule rows, in one query.
+
+    Saving a rule moves its updated_at and deleting one lowers the count, so
+    any change through the models gives a new version.
+    """
+    from .models import FeedingRule
+
+    if user_id is None:
+        return None
+    return tuple(FeedingRule.objects.filter(user_id=user_id).aggregate(
+        count=Count('id'), last_id=Max('id'), updated_at=Max('updated_at')
+    ).values())
+
+
+def get_rule_plan(user_id):
+    """The user's compiled RulePlan, kept per process until the user's rules change.
+
+    Every call checks the rules' version in the database, so a rule saved in
+    any process recompiles the plan in the others on their next use.
+    """
+    version = rules_version(user_id)
+    cached = _rule_plans.get(user_id)
+    if cached is None or cached[0] != version:
+        plan = RulePlan(effective_rules(user_id))
+        with _rule_plan_lock:
+            _rule_plans[user_id] = (version, plan)
+        return plan
+    return cached[1]
@@ -1,12 +1,24 @@
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 from django.contrib.auth.models import User
 from .models import (
     Pond, Species, Stocking, DailyLog, FeedType, Feed, SampleType, Sampling, 
     Mortality, Harvest, AccountType, ExpenseType, IncomeType, Expense, Income,
-    InventoryFeed, Treatment, Alert, Setting, FeedingBand, 
+    InventoryFeed, Treatment, Alert, Setting, FeedingBand, FeedingRule,
     EnvAdjustment, KPIDashboard, FishSampling, FeedingAdvice, SurvivalRate,
-    MedicalDiagnostic, Vendor, Customer, ItemService
+    MedicalDiagnostic, Vendor, Customer, ItemService, PondMonthlyFact
 )
+from .rules import DEFAULT_RULES_BY_KEY, FEATURES, parse_rule_value
+
+
+class TreeNodeSerializerMixin:
+    """Omits the nested children field when the context asks for flat nodes"""
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get('flat'):
+            fields.pop('children', None)
+        return fields
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -16,7 +28,7 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class SpeciesSerializer(serializers.ModelSerializer):
+class SpeciesSerializer(TreeNodeSerializerMixin, serializers.ModelSerializer):
     user_username = serializers.CharField(source='user.username', read_only=True)
     parent_name = serializers.CharField(source='parent.name', read_only=True)
     children = serializers.SerializerMethodField()
@@ -62,7 +74,7 @@ class DailyLogSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
 
-class FeedTypeSerializer(serializers.ModelSerializer):
+class FeedTypeSerializer(TreeNodeSerializerMixin, serializers.ModelSerializer):
     user_username = serializers.CharField(source='user.username', read_only=True)
     parent_name = serializers.CharField(source='parent.name', read_only=True)
     children = serializers.SerializerMethodField()
@@ -78,7 +90,7 @@ class FeedTypeSerializer(serializers.ModelSerializer):
         return FeedTypeSerializer(children, many=True, context=self.context).data
 
 
-class AccountTypeSerializer(serializers.ModelSerializer):
+class AccountTypeSerializer(TreeNodeSerializerMixin, serializers.ModelSerializer):
     user_username = serializers.CharField(source='user.username', read_only=True)
     parent_name = serializers.CharField(source='parent.name', read_only=True)
     type_display = serializers.CharField(source='get_type_display', read_only=True)
@@ -144,7 +156,7 @@ class HarvestSerializer(serializers.ModelSerializer):
         read_only_fields = ['avg_weight_kg', 'total_count', 'total_revenue', 'created_at']
 
 
-class ExpenseTypeSerializer(serializers.ModelSerializer):
+class ExpenseTypeSerializer(TreeNodeSerializerMixin, serializers.ModelSerializer):
     parent_name = serializers.CharField(source='parent.name', read_only=True)
     children = serializers.SerializerMethodField()
     
@@ -159,7 +171,7 @@ class ExpenseTypeSerializer(serializers.ModelSerializer):
         return ExpenseTypeSerializer(children, many=True, context=self.context).data
 
 
-class IncomeTypeSerializer(serializers.ModelSerializer):
+class IncomeTypeSerializer(TreeNodeSerializerMixin, serializers.ModelSerializer):
     parent_name = serializers.CharField(source='parent.name', read_only=True)
     children = serializers.SerializerMethodField()
     
@@ -244,6 +256,40 @@ class FeedingBandSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
 
+class FeedingRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FeedingRule
+        fields = '__all__'
+        read_only_fields = ['user', 'created_at', 'updated_at']
+    
+    def validate(self, data):
+        """Check the feature and value compile, and that the key is not already used by the user"""
+        feature = data.get('feature', getattr(self.instance, 'feature', None))
+        value = data.get('value', getattr(self.instance, 'value', None))
+        if feature not in FEATURES:
+            raise serializers.ValidationError({
+                'feature': f"Unknown feature. Choose one of: {', '.join(sorted(FEATURES))}"
+            })
+        try:
+            parse_rule_value(feature, value)
+        except ValueError as e:
+            raise serializers.ValidationError({'value': str(e)})
+        
+        request = self.context.get('request')
+        key = data.get('key')
+        if request and key:
+            existing = FeedingRule.objects.filter(user=request.user, key=key)
+            if self.instance:
+                existing = existing.exclude(pk=self.instance.pk)
+            if existing.exists():
+                raise serializers.ValidationError({'key': 'You already have a rule with this key'})
+        
+        # An override of a default rule keeps its place in the group unless given another
+        if self.instance is None and 'priority' not in data and key in DEFAULT_RULES_BY_KEY:
+            data['priority'] = DEFAULT_RULES_BY_KEY[key]['priority']
+        return data
+
+
 class EnvAdjustmentSerializer(serializers.ModelSerializer):
     pond_name = serializers.CharField(source='pond.name', read_only=True)
     
@@ -264,32 +310,56 @@ class KPIDashboardSerializer(serializers.ModelSerializer):
 
 # Nested serializers for detailed views
 class PondDetailSerializer(serializers.ModelSerializer):
+    """Pond with its most recent records for the collections named in the ``expand`` context.
+
+    Each collection is read from a ``recent_<name>`` list prefetched by
+    PondViewSet.retrieve; ``links`` point to the paginated full collections.
+    """
+    COLLECTIONS = {
+        'stockings': StockingSerializer,
+        'daily_logs': DailyLogSerializer,
+        'feeds': FeedSerializer,
+        'samplings': SamplingSerializer,
+        'mortalities': MortalitySerializer,
+        'harvests': HarvestSerializer,
+        'expenses': ExpenseSerializer,
+        'incomes': IncomeSerializer,
+        'treatments': TreatmentSerializer,
+        'alerts': AlertSerializer,
+        'env_adjustments': EnvAdjustmentSerializer,
+        'kpis': KPIDashboardSerializer,
+    }
+    
     user_username = serializers.CharField(source='user.username', read_only=True)
-    stockings = StockingSerializer(many=True, read_only=True)
-    daily_logs = DailyLogSerializer(many=True, read_only=True)
-    feeds = FeedSerializer(many=True, read_only=True)
-    samplings = SamplingSerializer(many=True, read_only=True)
-    mortalities = MortalitySerializer(many=True, read_only=True)
-    harvests = HarvestSerializer(many=True, read_only=True)
-    expenses = ExpenseSerializer(many=True, read_only=True)
-    incomes = IncomeSerializer(many=True, read_only=True)
-    treatments = TreatmentSerializer(many=True, read_only=True)
-    alerts = AlertSerializer(many=True, read_only=True)
-    env_adjustments = EnvAdjustmentSerializer(many=True, read_only=True)
-    kpis = KPIDashboardSerializer(many=True, read_only=True)
+    links = serializers.SerializerMethodField()
     
     class Meta:
         model = Pond
         fields = '__all__'
         read_only_fields = ['volume_m3', 'created_at', 'updated_at']
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in self.context.get('expand', []):
+            fields[name] = self.COLLECTIONS[name](source=f'recent_{name}', many=True, read_only=True)
+        return fields
+    
+    def get_links(self, obj):
+        """Paginated endpoints for every collection"""
+        request = self.context.get('request')
+        return {
+            name: reverse('pond-related', kwargs={'pk': obj.pk, 'collection': name}, request=request)
+            for name in self.COLLECTIONS
+        }
 
 
 # Dashboard summary serializers
 class PondSummarySerializer(serializers.ModelSerializer):
+    """Pond summary; reads the totals and latest records PondViewSet annotates and prefetches when present"""
     user_username = serializers.CharField(source='user.username', read_only=True)
-    latest_stocking = StockingSerializer(source='stockings.first', read_only=True)
-    latest_daily_log = DailyLogSerializer(source='daily_logs.first', read_only=True)
-    latest_harvest = HarvestSerializer(source='harvests.first', read_only=True)
+    latest_stocking = serializers.SerializerMethodField()
+    latest_daily_log = serializers.SerializerMethodField()
+    latest_harvest = serializers.SerializerMethodField()
     total_expenses = serializers.SerializerMethodField()
     total_income = serializers.SerializerMethodField()
     active_alerts_count = serializers.SerializerMethodField()
@@ -304,23 +374,61 @@ class PondSummarySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['volume_m3', 'created_at', 'updated_at']
     
+    def _latest(self, obj, name, serializer_class):
+        records = getattr(obj, f'latest_{name}', None)
+        if records is None:
+            record = getattr(obj, name).first()
+        else:
+            record = records[0] if records else None
+        return serializer_class(record, context=self.context).data if record else None
+    
+    def get_latest_stocking(self, obj):
+        return self._latest(obj, 'stockings', StockingSerializer)
+    
+    def get_latest_daily_log(self, obj):
+        return self._latest(obj, 'daily_logs', DailyLogSerializer)
+    
+    def get_latest_harvest(self, obj):
+        return self._latest(obj, 'harvests', HarvestSerializer)
+    
     def get_total_expenses(self, obj):
+        if hasattr(obj, 'expenses_total'):
+            return obj.expenses_total
         return sum(expense.amount for expense in obj.expenses.all())
     
     def get_total_income(self, obj):
+        if hasattr(obj, 'income_total'):
+            return obj.income_total
         return sum(income.amount for income in obj.incomes.all())
     
     def get_active_alerts_count(self, obj):
+        if hasattr(obj, 'active_alerts'):
+            return obj.active_alerts
         return obj.alerts.filter(is_resolved=False).count()
 
 
 # Financial summary serializers
+class PondMonthlyFactSerializer(serializers.ModelSerializer):
+    pond_name = serializers.CharField(source='pond.name', read_only=True)
+    species_name = serializers.CharField(source='species.name', read_only=True)
+    
+    class Meta:
+        model = PondMonthlyFact
+        exclude = ['user']
+
+
 class FinancialSummarySerializer(serializers.Serializer):
-    total_expenses = serializers.DecimalField(max_digits=12, decimal_places=2)
-    total_income = serializers.DecimalField(max_digits=12, decimal_places=2)
-    profit_loss = serializers.DecimalField(max_digits=12, decimal_places=2)
+    granularity = serializers.CharField()
+    start_date = serializers.DateField(allow_null=True)
+    end_date = serializers.DateField(allow_null=True)
+    total_expenses = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_income = serializers.DecimalField(max_digits=14, decimal_places=2)
+    profit_loss = serializers.DecimalField(max_digits=14, decimal_places=2)
     expenses_by_category = serializers.DictField()
     income_by_category = serializers.DictField()
+    expenses_by_account_type = serializers.ListField(child=serializers.DictField())
+    income_by_account_type = serializers.ListField(child=serializers.DictField())
+    trends = serializers.DictField()
     monthly_trends = serializers.DictField()
 
 
@@ -361,24 +469,35 @@ class FishSamplingSerializer(serializers.ModelSerializer):
         return data
 
 
+# Medical Diagnostic serializers
+class MedicalDiagnosticSerializer(serializers.ModelSerializer):
+    pond_name = serializers.CharField(source='pond.name', read_only=True)
+    pond_area = serializers.DecimalField(source='pond.area_decimal', max_digits=8, decimal_places=3, read_only=True)
+    pond_location = serializers.CharField(source='pond.location', read_only=True)
+    
+    class Meta:
+        model = MedicalDiagnostic
+        fields = '__all__'
+        read_only_fields = ['user', 'created_at', 'updated_at', 'applied_at']
+    
+    def create(self, validated_data):
+        # Automatically set the user from the request
+        validated_data['user'] = self.context['request'].user
+        return super().create(validated_data)
+
+
 # Feeding Advice serializers
 class FeedingAdviceSerializer(serializers.ModelSerializer):
     pond_name = serializers.CharField(source='pond.name', read_only=True)
     species_name = serializers.CharField(source='species.name', read_only=True)
     user_username = serializers.CharField(source='user.username', read_only=True)
     feed_type_name = serializers.CharField(source='feed_type.name', read_only=True)
-    medical_diagnostics_data = serializers.SerializerMethodField()
+    medical_diagnostics_data = MedicalDiagnosticSerializer(source='medical_diagnostics', many=True, read_only=True)
     
     class Meta:
         model = FeedingAdvice
         fields = '__all__'
-        read_only_fields = ['user', 'total_biomass_kg', 'recommended_feed_kg', 'feeding_rate_percent', 'daily_feed_cost', 'created_at', 'updated_at']
-    
-    def get_medical_diagnostics_data(self, obj):
-        """Get related medical diagnostics data"""
-        from .models import MedicalDiagnostic
-        diagnostics = obj.medical_diagnostics.all()
-        return MedicalDiagnosticSerializer(diagnostics, many=True).data
+        read_only_fields = ['user', 'total_biomass_kg', 'recommended_feed_kg', 'feeding_rate_percent', 'daily_feed_cost', 'input_fingerprint', 'created_at', 'updated_at']
 
 
 # Survival Rate serializers
@@ -392,23 +511,6 @@ class SurvivalRateSerializer(serializers.ModelSerializer):
         read_only_fields = ['survival_rate_percent', 'total_mortality', 'total_survival_kg', 'created_at', 'updated_at']
 
 
-# Medical Diagnostic serializers
-class MedicalDiagnosticSerializer(serializers.ModelSerializer):
-    pond_name = serializers.CharField(source='pond.name', read_only=True)
-    pond_area = serializers.DecimalField(source='pond.area_decimal', max_digits=8, decimal_places=3, read_only=True)
-    pond_location = serializers.CharField(source='pond.location', read_only=True)
-    
-    class Meta:
-        model = MedicalDiagnostic
-        fields = '__all__'
-        read_only_fields = ['user', 'created_at', 'updated_at', 'applied_at']
-    
-    def create(self, validated_data):
-        # Automatically set the user from the request
-        validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
-
-
 class VendorSerializer(serializers.ModelSerializer):
     user_username = serializers.CharField(source='user.username', read_only=True)
     business_type_display = serializers.CharField(source='get_business_type_display', read_only=True)
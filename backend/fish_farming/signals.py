@@ -0,0 +1,296 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from mptt.signals import node_moved
+
+from .feeding_stages import invalidate_feeding_band_table
+from .models import (
+    Pond, Stocking, DailyLog, Feed, Sampling, Mortality, Harvest, Treatment, Alert,
+    EnvAdjustment, KPIDashboard, SurvivalRate, FishSampling, FeedingBand,
+    PondSpeciesPopulation, Species, FeedType, AccountType, Expense, Income
+)
+from .biomass import biomass_series_namespace
+from .caching import bump_cache_version
+from .facts import FACT_SOURCES, fact_contribution, stored_values, instance_values, apply_contribution, rebuild_facts
+from .finance import financial_summary_namespace
+from .trees import bump_tree_version
+
+
+# Pond-scoped tables carrying a copy of the pond owner, so per-user queries need no join to Pond
+POND_OWNED_MODELS = [
+    Stocking, DailyLog, Feed, Sampling, Mortality, Harvest, Treatment, Alert,
+    EnvAdjustment, KPIDashboard, SurvivalRate,
+]
+
+
+def sync_pond_owner(sender, instance, raw=False, **kwargs):
+    if raw and instance.owner_id:
+        return
+    instance.owner_id = instance.pond.user_id
+
+
+for model in POND_OWNED_MODELS:
+    pre_save.connect(sync_pond_owner, sender=model, dispatch_uid=f'sync_pond_owner_{model.__name__}')
+
+
+@receiver(pre_save, sender=Pond)
+def remember_pond_owner(sender, instance, raw=False, **kwargs):
+    instance._previous_user_id = None
+    if not raw and instance.pk is not None:
+        instance._previous_user_id = Pond.objects.filter(pk=instance.pk).values_list('user_id', flat=True).first()
+
+
+@receiver(post_save, sender=Pond)
+def reassign_pond_owner(sender, instance, raw=False, **kwargs):
+    """Move the pond's rows (and monthly facts) to its new owner when the pond is reassigned"""
+    previous_user_id = getattr(instance, '_previous_user_id', None)
+    if raw or previous_user_id is None or previous_user_id == instance.user_id:
+        return
+
+    for model in POND_OWNED_MODELS:
+        model.objects.filter(pond=instance).update(owner_id=instance.user_id)
+    rebuild_facts(previous_user_id)
+    rebuild_facts(instance.user_id)
+
+
+# Source model -> (ledger prefix, count field, weight field)
+POPULATION_SOURCES = {
+    Stocking: ('stocked', 'pcs', 'total_weight_kg'),
+    Mortality: ('dead', 'count', 'total_weight_kg'),
+    Harvest: ('harvested', 'total_count', 'total_weight_kg'),
+}
+
+
+def _population_contribution(sender, values):
+    """Return (pond_id, species_id, count, weight) for a source row"""
+    _, count_field, weight_field = POPULATION_SOURCES[sender]
+    return (
+        values['pond_id'],
+        values['species_id'],
+        values[count_field] or 0,
+        values[weight_field] or Decimal('0'),
+    )
+
+
+def _instance_values(sender, instance):
+    _, count_field, weight_field = POPULATION_SOURCES[sender]
+    return {
+        'pond_id': instance.pond_id,
+        'species_id': instance.species_id,
+        count_field: getattr(instance, count_field),
+        weight_field: getattr(instance, weight_field),
+    }
+
+
+@receiver(pre_save, sender=Stocking)
+@receiver(pre_save, sender=Mortality)
+@receiver(pre_save, sender=Harvest)
+def remember_population_contribution(sender, instance, raw=False, **kwargs):
+    """Snapshot the stored row so post_save can apply only the difference"""
+    instance._population_previous = None
+    if raw or instance.pk is None:
+        return
+
+    _, count_field, weight_field = POPULATION_SOURCES[sender]
+    previous = sender.objects.filter(pk=instance.pk).values(
+        'pond_id', 'species_id', count_field, weight_field
+    ).first()
+    if previous:
+        instance._population_previous = _population_contribution(sender, previous)
+
+
+@receiver(post_save, sender=Stocking)
+@receiver(post_save, sender=Mortality)
+@receiver(post_save, sender=Harvest)
+def update_population_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    prefix = POPULATION_SOURCES[sender][0]
+    pond_id, species_id, count, weight = _population_contribution(
+        sender, _instance_values(sender, instance)
+    )
+    previous = getattr(instance, '_population_previous', None)
+
+    if previous and previous[:2] == (pond_id, species_id):
+        # Same pond/species: apply the net change in one write
+        PondSpeciesPopulation.apply_delta(
+            pond_id, species_id, prefix, count - previous[2], weight - previous[3]
+        )
+    else:
+        if previous:
+            PondSpeciesPopulation.apply_delta(
+                previous[0], previous[1], prefix, -previous[2], -previous[3]
+            )
+        PondSpeciesPopulation.apply_delta(pond_id, species_id, prefix, count, weight)
+
+    if sender is Stocking:
+        PondSpeciesPopulation.refresh_average_weight(pond_id, species_id)
+        if previous and previous[:2] != (pond_id, species_id):
+            PondSpeciesPopulation.refresh_average_weight(previous[0], previous[1])
+
+
+@receiver(post_delete, sender=Stocking)
+@receiver(post_delete, sender=Mortality)
+@receiver(post_delete, sender=Harvest)
+def update_population_on_delete(sender, instance, **kwargs):
+    prefix = POPULATION_SOURCES[sender][0]
+    pond_id, species_id, count, weight = _population_contribution(
+        sender, _instance_values(sender, instance)
+    )
+    PondSpeciesPopulation.apply_delta(pond_id, species_id, prefix, -count, -weight)
+
+    if sender is Stocking:
+        PondSpeciesPopulation.refresh_average_weight(pond_id, species_id)
+
+
+@receiver(pre_save, sender=Feed)
+@receiver(pre_save, sender=Mortality)
+@receiver(pre_save, sender=Harvest)
+@receiver(pre_save, sender=Stocking)
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=Income)
+def remember_fact_contribution(sender, instance, raw=False, **kwargs):
+    """Snapshot the stored row so post_save can apply only the difference"""
+    instance._fact_previous = None
+    if raw or instance.pk is None:
+        return
+
+    previous = stored_values(sender, instance.pk)
+    if previous:
+        instance._fact_previous = fact_contribution(sender, previous)
+
+
+@receiver(post_save, sender=Feed)
+@receiver(post_save, sender=Mortality)
+@receiver(post_save, sender=Harvest)
+@receiver(post_save, sender=Stocking)
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=Income)
+def update_facts_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    key, amounts = fact_contribution(sender, instance_values(sender, instance))
+    previous = getattr(instance, '_fact_previous', None)
+
+    if previous and previous[0] == key:
+        # Same user/pond/species/month: apply the net change in one write
+        apply_contribution(key, {metric: amount - previous[1][metric] for metric, amount in amounts.items()})
+    else:
+        if previous:
+            apply_contribution(*previous, sign=-1)
+        apply_contribution(key, amounts)
+
+
+@receiver(post_delete, sender=Feed)
+@receiver(post_delete, sender=Mortality)
+@receiver(post_delete, sender=Harvest)
+@receiver(post_delete, sender=Stocking)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Income)
+def update_facts_on_delete(sender, instance, **kwargs):
+    key, amounts = fact_contribution(sender, instance_values(sender, instance))
+    apply_contribution(key, amounts, sign=-1)
+
+
+@receiver(post_save, sender=FishSampling)
+@receiver(post_delete, sender=FishSampling)
+def update_population_average_weight(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    PondSpeciesPopulation.refresh_average_weight(instance.pond_id, instance.species_id)
+
+
+@receiver(post_save, sender=FeedingBand)
+@receiver(post_delete, sender=FeedingBand)
+def invalidate_feeding_bands(sender, instance, **kwargs):
+    # Reload now for this transaction and again once it commits
+    invalidate_feeding_band_table()
+    transaction.on_commit(invalidate_feeding_band_table)
+
+
+@receiver(post_save, sender=Species)
+@receiver(post_save, sender=FeedType)
+@receiver(post_save, sender=AccountType)
+@receiver(post_delete, sender=Species)
+@receiver(post_delete, sender=FeedType)
+@receiver(post_delete, sender=AccountType)
+@receiver(node_moved, sender=Species)
+@receiver(node_moved, sender=FeedType)
+@receiver(node_moved, sender=AccountType)
+def invalidate_cached_tree(sender, instance, **kwargs):
+    # Bump again on commit so a tree read mid-transaction is not cached as current
+    bump_tree_version(sender, instance.user_id)
+    transaction.on_commit(lambda: bump_tree_version(sender, instance.user_id))
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=AccountType)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=AccountType)
+@receiver(node_moved, sender=AccountType)
+def invalidate_financial_summaries(sender, instance, **kwargs):
+    # Bump again on commit so a summary computed mid-transaction is not cached as current
+    namespace = financial_summary_namespace(instance.user_id)
+    bump_cache_version(namespace)
+    transaction.on_commit(lambda: bump_cache_version(namespace))
+
+
+@receiver(post_save, sender=Stocking)
+@receiver(post_save, sender=Mortality)
+@receiver(post_save, sender=Harvest)
+@receiver(post_save, sender=FishSampling)
+@receiver(post_delete, sender=Stocking)
+@receiver(post_delete, sender=Mortality)
+@receiver(post_delete, sender=Harvest)
+@receiver(post_delete, sender=FishSampling)
+def invalidate_biomass_series(sender, instance, **kwargs):
+    # Fish samplings carry no owner copy, so fall back to the pond's owner
+    owner_id = instance.owner_id if sender is not FishSampling else instance.pond.user_id
+    namespace = biomass_series_namespace(owner_id)
+    bump_cache_version(namespace)
+    transaction.on_commit(lambda: bump_cache_version(namespace))
+
+
+def apply_bulk_created(sender, instances):
+    """Bookkeeping of the post_save receivers for rows inserted with bulk_create (which sends no signals).
+
+    Population and monthly fact deltas are summed per ledger row first, so
+    each affected row is written once however many records were inserted.
+    """
+    if not instances:
+        return
+
+    if sender in POPULATION_SOURCES:
+        prefix = POPULATION_SOURCES[sender][0]
+        totals = {}
+        for instance in instances:
+            pond_id, species_id, count, weight = _population_contribution(sender, _instance_values(sender, instance))
+            entry = totals.setdefault((pond_id, species_id), [0, Decimal('0')])
+            entry[0] += count
+            entry[1] += weight
+        for (pond_id, species_id), (count, weight) in totals.items():
+            PondSpeciesPopulation.apply_delta(pond_id, species_id, prefix, count, weight)
+            if sender is Stocking:
+                PondSpeciesPopulation.refresh_average_weight(pond_id, species_id)
+
+    if sender in FACT_SOURCES:
+        totals = {}
+        for instance in instances:
+            key, amounts = fact_contribution(sender, instance_values(sender, instance))
+            entry = totals.setdefault(key, {})
+            for metric, amount in amounts.items():
+                entry[metric] = entry.get(metric, 0) + amount
+        for key, amounts in totals.items():
+            apply_contribution(key, amounts)
+
+    if sender in (Stocking, Mortality, Harvest):
+        for owner_id in {instance.owner_id for instance in instances}:
+            namespace = biomass_series_namespace(owner_id)
+            bump_cache_version(namespace)
+            transaction.on_commit(lambda namespace=namespace: bump_cache_version(namespace))
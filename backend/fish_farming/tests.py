@@ -1,3 +1,877 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import (
+    Pond, Species, FeedType, Feed, AccountType, ExpenseType, Expense, FishSampling,
+    FeedingAdvice, MedicalDiagnostic, Stocking, Mortality, Harvest, PondSpeciesPopulation, Income,
+    PondMonthlyFact, DailyLog, FeedingBand, FeedingRule
+)
+from .advice import AdviceDataContext
+from .advice_generation import generate_farm_advice
+from . import feeding_stages
+from .facts import rebuild_facts
+from .fcr import compute_fcr_analysis, fcr_status
+from .projection import temperature_factor
+from .rules import get_rule_plan
+
+
+# Tests keep their cache in memory instead of the on-disk cache the server uses
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def tree_names(nodes):
+    """Flatten a serialized tree into (name, parent_name) pairs"""
+    names = []
+    for node in nodes:
+        names.append((node['name'], node.get('parent_name')))
+        names.extend(tree_names(node['children']))
+    return names
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TreeCacheTests(TestCase):
+    """Cached /tree/ responses must never be stale after a write"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='farmer', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tilapia = Species.objects.create(user=self.user, name='Tilapia')
+        self.nile = Species.objects.create(user=self.user, name='Nile Tilapia', parent=self.tilapia)
+        self.carp = Species.objects.create(user=self.user, name='Carp')
+
+    def get_tree(self, route='species', **headers):
+        return self.client.get(f'/api/fish-farming/{route}/tree/', headers=headers)
+
+    def test_tree_is_cached_and_revalidated_with_etag(self):
+        first = self.get_tree()
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('ETag', first)
+
+        with self.assertNumQueries(0):
+            second = self.get_tree()
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['ETag'], first['ETag'])
+
+        not_modified = self.get_tree(if_none_match=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], first['ETag'])
+
+    def test_create_update_and_delete_invalidate_tree(self):
+        etag = self.get_tree()['ETag']
+
+        Species.objects.create(user=self.user, name='Mirror Carp', parent=self.carp)
+        response = self.get_tree(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(('Mirror Carp', 'Carp'), tree_names(response.json()))
+        etag = response['ETag']
+
+        self.carp.name = 'Common Carp'
+        self.carp.save()
+        response = self.get_tree(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(('Mirror Carp', 'Common Carp'), tree_names(response.json()))
+        etag = response['ETag']
+
+        self.nile.delete()
+        response = self.get_tree(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Nile Tilapia', [name for name, _ in tree_names(response.json())])
+
+    def test_move_invalidates_tree(self):
+        etag = self.get_tree()['ETag']
+
+        self.nile.move_to(self.carp)
+        response = self.get_tree(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(('Nile Tilapia', 'Carp'), tree_names(response.json()))
+
+    def test_writes_through_the_api_invalidate_tree(self):
+        self.get_tree()
+        created = self.client.post('/api/fish-farming/species/', {'name': 'Pangas'}, format='json')
+        self.assertEqual(created.status_code, 201)
+        self.assertIn(('Pangas', None), tree_names(self.get_tree().json()))
+
+    def test_trees_are_cached_per_user_and_per_model(self):
+        other = User.objects.create_user(username='other', password='x')
+        Species.objects.create(user=other, name='Rohu')
+        FeedType.objects.create(user=self.user, name='Starter Feed')
+        AccountType.objects.create(user=self.user, name='Feed Expense', type='expense')
+
+        self.assertEqual(
+            [name for name, _ in tree_names(self.get_tree().json())],
+            ['Carp', 'Tilapia', 'Nile Tilapia']
+        )
+        self.assertEqual([name for name, _ in tree_names(self.get_tree('feed-types').json())], ['Starter Feed'])
+        self.assertEqual([name for name, _ in tree_names(self.get_tree('account-types').json())], ['Feed Expense'])
+
+        self.client.force_authenticate(other)
+        self.assertEqual([name for name, _ in tree_names(self.get_tree().json())], ['Rohu'])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TreeCacheTransactionTests(TransactionTestCase):
+    """A tree read while a write is still uncommitted must not outlive the commit"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='farmer', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_tree_cached_inside_transaction_is_replaced_on_commit(self):
+        with transaction.atomic():
+            FeedType.objects.create(user=self.user, name='Grower Feed')
+            # Reading inside the transaction caches a tree under the current version
+            self.client.get('/api/fish-farming/feed-types/tree/')
+            FeedType.objects.filter(name='Grower Feed').update(name='Finisher Feed')
+
+        response = self.client.get('/api/fish-farming/feed-types/tree/')
+        self.assertEqual([name for name, _ in tree_names(response.json())], ['Finisher Feed'])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ListQueryCountTests(TestCase):
+    """List endpoints load related rows in a fixed number of queries"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='farmer', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.feed_type = FeedType.objects.create(user=self.user, name='Grower Feed')
+        self.account_type = AccountType.objects.create(user=self.user, name='Feed Expense', type='expense')
+        self.expense_type = ExpenseType.objects.create(name='Feed')
+        self.pond_count = 0
+
+    def add_rows(self, count):
+        """Add ``count`` ponds, each with one row per listed table"""
+        for _ in range(count):
+            self.pond_count += 1
+            pond = Pond.objects.create(
+                user=self.user, name=f'Pond {self.pond_count}',
+                area_decimal=Decimal('10'), depth_ft=Decimal('5')
+            )
+            species = Species.objects.create(user=self.user, name=f'Species {self.pond_count}')
+            day = date(2025, 1, 1) + timedelta(days=self.pond_count)
+            Feed.objects.create(pond=pond, feed_type=self.feed_type, date=day, amount_kg=Decimal('12.5'))
+            Expense.objects.create(
+                user=self.user, pond=pond, species=species, account_type=self.account_type,
+                expense_type=self.expense_type, date=day, amount=Decimal('100')
+            )
+            FishSampling.objects.create(
+                pond=pond, species=species, user=self.user, date=day,
+                sample_size=10, total_weight_kg=Decimal('2')
+            )
+            advice = FeedingAdvice.objects.create(
+                pond=pond, species=species, user=self.user, date=day, feed_type=self.feed_type,
+                estimated_fish_count=1000, average_fish_weight_kg=Decimal('0.2'),
+                total_biomass_kg=Decimal('200'), recommended_feed_kg=Decimal('6'),
+                feeding_rate_percent=Decimal('3')
+            )
+            for disease in ('Aeromonas', 'White spot'):
+                advice.medical_diagnostics.add(MedicalDiagnostic.objects.create(
+                    user=self.user, pond=pond, disease_name=disease, confidence_percentage=Decimal('60'),
+                    recommended_treatment='Salt bath', dosage_application='1%'
+                ))
+
+    def count_list_queries(self, route):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f'/api/fish-farming/{route}/')
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), len(response.json()['results'])
+
+    def test_list_query_counts_do_not_grow_with_rows(self):
+        routes = ['feeds', 'expenses', 'fish-sampling', 'feeding-advice', 'medical-diagnostics', 'ponds']
+        self.add_rows(2)
+        small = {route: self.count_list_queries(route) for route in routes}
+        self.add_rows(8)
+        large = {route: self.count_list_queries(route) for route in routes}
+
+        for route in routes:
+            with self.subTest(route=route):
+                self.assertEqual(large[route][1], 5 * small[route][1])
+                self.assertEqual(large[route][0], small[route][0])
+
+    def test_feeding_advice_includes_prefetched_diagnostics(self):
+        self.add_rows(3)
+        response = self.client.get('/api/fish-farming/feeding-advice/')
+        for advice in response.json()['results']:
+            self.assertEqual(
+                sorted(diagnostic['disease_name'] for diagnostic in advice['medical_diagnostics_data']),
+                ['Aeromonas', 'White spot']
+            )
+            self.assertEqual(
+                {diagnostic['pond_name'] for diagnostic in advice['medical_diagnostics_data']},
+                {advice['pond_name']}
+            )
+
+
+LEDGER_FIELDS = (
+    'stocked_count', 'stocked_weight_kg', 'dead_count', 'dead_weight_kg', 'harvested_count',
+    'harvested_weight_kg', 'alive_count', 'average_weight_kg', 'alive_weight_kg',
+)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class PopulationLedgerTests(TestCase):
+    """Stocking, mortality and harvest writes keep PondSpeciesPopulation equal to a rebuild"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='farmer', password='x')
+        self.pond = Pond.objects.create(user=self.user, name='Pond 1', area_decimal=Decimal('10'), depth_ft=Decimal('5'))
+        self.other_pond = Pond.objects.create(user=self.user, name='Pond 2', area_decimal=Decimal('10'), depth_ft=Decimal('5'))
+        self.tilapia = Species.objects.create(user=self.user, name='Tilapia')
+        self.carp = Species.objects.create(user=self.user, name='Carp')
+
+    def ledger(self, pond, species):
+        return PondSpeciesPopulation.objects.filter(pond=pond, species=species).values(*LEDGER_FIELDS).first()
+
+    def assertLedgersRebuild(self):
+        """Every ledger row must equal what rebuild() derives from the source tables"""
+        pairs = [(pond, species) for pond in (self.pond, self.other_pond) for species in (self.tilapia, self.carp)]
+        maintained = {(pond.id, species.id): self.ledger(pond, species) for pond, species in pairs}
+        for pond, species in pairs:
+            PondSpeciesPopulation.rebuild(pond.id, species.id)
+        for pond, species in pairs:
+            with self.subTest(pond=pond.name, species=species.name):
+                rebuilt = self.ledger(pond, species)
+                if maintained[pond.id, species.id] is None:
+                    self.assertFalse(any(rebuilt[field] for field in LEDGER_FIELDS))
+                else:
+                    self.assertEqual(maintained[pond.id, species.id], rebuilt)
+
+    def test_save_and_edit_apply_the_difference(self):
+        stocking = Stocking.objects.create(
+            pond=self.pond, species=self.tilapia, date=date(2025, 1, 1), pcs=1000, total_weight_kg=Decimal('20')
+        )
+        mortality = Mortality.objects.create(pond=self.pond, species=self.tilapia, date=date(2025, 1, 10), count=50)
+        Harvest.objects.create(
+            pond=self.pond, species=self.tilapia, date=date(2025, 2, 1), total_weight_kg=Decimal('30'), total_count=150
+        )
+        ledger = self.ledger(self.pond, self.tilapia)
+        self.assertEqual((ledger['stocked_count'], ledger['dead_count'], ledger['harvested_count']), (1000, 50, 150))
+        self.assertEqual(ledger['alive_count'], 800)
+        self.assertEqual(ledger['alive_weight_kg'], Decimal('16'))
+        self.assertLedgersRebuild()
+
+        stocking.pcs = 1200
+        stocking.save()
+        mortality.count = 80
+        mortality.save()
+        ledger = self.ledger(self.pond, self.tilapia)
+        self.assertEqual((ledger['stocked_count'], ledger['dead_count'], ledger['alive_count']), (1200, 80, 970))
+        self.assertLedgersRebuild()
+
+    def test_moving_a_row_to_another_pond_or_species(self):
+        stocking = Stocking.objects.create(
+            pond=self.pond, species=self.tilapia, date=date(2025, 1, 1), pcs=1000, total_weight_kg=Decimal('20')
+        )
+        Stocking.objects.create(
+            pond=self.other_pond, species=self.carp, date=date(2025, 1, 1), pcs=500, total_weight_kg=Decimal('25')
+        )
+        harvest = Harvest.objects.create(
+            pond=self.pond, species=self.tilapia, date=date(2025, 2, 1), total_weight_kg=Decimal('10'), total_count=100
+        )
+
+        stocking.pond = self.other_pond
+        stocking.save()
+        self.assertEqual(self.ledger(self.pond, self.tilapia)['stocked_count'], 0)
+        self.assertEqual(self.ledger(self.other_pond, self.tilapia)['stocked_count'], 1000)
+        self.assertLedgersRebuild()
+
+        harvest.pond = self.other_pond
+        harvest.species = self.carp
+        harvest.save()
+        self.assertEqual(self.ledger(self.pond, self.tilapia)['harvested_count'], 0)
+        self.assertEqual(self.ledger(self.other_pond, self.carp)['harvested_count'], 100)
+        self.assertEqual(self.ledger(self.other_pond, self.carp)['alive_count'], 400)
+        self.assertLedgersRebuild()
+
+    def test_delete_removes_the_contribution(self):
+        first = Stocking.objects.create(
+            pond=self.pond, species=self.tilapia, date=date(2025, 1, 1), pcs=1000, total_weight_kg=Decimal('20')
+        )
+        Stocking.objects.create(
+            pond=self.pond, species=self.tilapia, date=date(2025, 3, 1), pcs=400, total_weight_kg=Decimal('40')
+        )
+        mortality = Mortality.objects.create(pond=self.pond, species=self.tilapia, date=date(2025, 3, 5), count=20)
+
+        mortality.delete()
+        Stocking.objects.get(date=date(2025, 3, 1)).delete()
+        ledger = self.ledger(self.pond, self.tilapia)
+        self.assertEqual((ledger['stocked_count'], ledger['dead_count'], ledger['alive_count']), (1000, 0, 1000))
+        # The average weight falls back to the remaining stocking
+        self.assertEqual(ledger['average_weight_kg'], first.initial_avg_weight_kg)
+        self.assertLedgersRebuild()
+
+        first.delete()
+        self.assertEqual(self.ledger(self.pond, self.tilapia)['alive_count'], 0)
+        self.assertLedgersRebuild()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class MonthlyFactTests(TestCase):
+    """Creating, editing and deleting source rows leaves the same facts as rebuild_facts()"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='farmer', password='x')
+        self.pond = Pond.objects.create(user=self.user, name='Pond 1', area_decimal=Decimal('10'), depth_ft=Decimal('5'))
+        self.other_pond = Pond.objects.create(user=self.user, name='Pond 2', area_decimal=Decimal('10'), depth_ft=Decimal('5'))
+        self.tilapia = Species.objects.create(user=self.user, name='Tilapia')
+        self.carp = Species.objects.create(user=self.user, name='Carp')
+        self.feed_type = FeedType.objects.create(user=self.user, name='Grower Feed')
+        self.expense_account = AccountType.objects.create(user=self.user, name='Feed Expense', type='expense')
+        self.income_account = AccountType.objects.create(user=self.user, name='Fish Sales', type='income')
+
+    def fact_rows(self):
+        """Fact rows with any non-zero metric, keyed by pond/species/month"""
+        rows = {}
+        for fact in PondMonthlyFact.objects.filter(user=self.user).values(
+            'pond_id', 'species_id', 'month', *PondMonthlyFact.METRIC_FIELDS
+        ):
+            metrics = {metric: fact[metric] for metric in PondMonthlyFact.METRIC_FIELDS}
+            if any(metrics.values()):
+                rows[fact['pond_id'], fact['species_id'], fact['month']] = metrics
+        return rows
+
+    def assertFactsRebuild(self):
+        maintained = self.fact_rows()
+        rebuild_facts(self.user.id)
+        self.assertEqual(maintained, self.fact_rows())
+
+    def test_create_edit_and_delete_match_a_rebuild(self):
+        Stocking.objects.create(
+            pond=self.pond, species=self.tilapia, date=date(2025, 1, 1), pcs=1000,
+            total_weight_kg=Decimal('20'), cost=Decimal('500')
+        )
+        feed = Feed.objects.create(
+            pond=self.pond, feed_type=self.feed_type, date=date(2025, 1, 15), amount_kg=Decimal('12.5'),
+            cost_per_kg=Decimal('2')
+        )
+        mortality = Mortality.objects.create(pond=self.pond, species=self.tilapia, date=date(2025, 1, 20), count=30)
+        harvest = Harvest.objects.create(
+            pond=self.pond, species=self.tilapia, date=date(2025, 2, 10), total_weight_kg=Decimal('40'),
+            total_count=200, price_per_kg=Decimal('3')
+        )
+        expense = Expense.objects.create(
+            user=self.user, pond=self.pond, species=self.tilapia, account_type=self.expense_account,
+            date=date(2025, 1, 5), amount=Decimal('100')
+        )
+        Expense.objects.create(
+            user=self.user, account_type=self.expense_account, date=date(2025, 2, 1), amount=Decimal('60')
+        )
+        Income.objects.create(
+            user=self.user, pond=self.pond, species=self.tilapia, account_type=self.income_account,
+            date=date(2025, 2, 10), amount=Decimal('120')
+        )
+        self.assertEqual(self.fact_rows()[self.pond.id, self.tilapia.id, date(2025, 1, 1)]['expenses'], Decimal('100'))
+        self.assertFactsRebuild()
+
+        # Edits: amounts, a move to another month, pond and species
+        feed.amount_kg = Decimal('20')
+        feed.date = date(2025, 2, 3)
+        feed.save()
+        mortality.count = 10
+        mortality.save()
+        harvest.pond = self.other_pond
+        harvest.species = self.carp
+        harvest.save()
+        expense.amount = Decimal('75')
+        expense.species = None
+        expense.save()
+        self.assertFactsRebuild()
+
+        feed.delete()
+        harvest.delete()
+        expense.delete()
+        self.assertFactsRebuild()
+        self.assertNotIn((self.other_pond.id, self.carp.id, date(2025, 2, 1)), self.fact_rows())
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BulkCreateTests(TestCase):
+    """POST <collection>/bulk/ writes rows and their bookkeeping exactly like per-row POSTs"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='farmer', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.bulk_pond = Pond.objects.create(user=self.user, name='Bulk', area_decimal=Decimal('10'), depth_ft=Decimal('5'))
+        self.single_pond = Pond.objects.create(user=self.user, name='Single', area_decimal=Decimal('10'), depth_ft=Decimal('5'))
+        self.species = Species.objects.create(user=self.user, name='Tilapia')
+        self.feed_type = FeedType.objects.create(user=self.user, name='Grower Feed')
+        for pond in (self.bulk_pond, self.single_pond):
+            Stocking.objects.create(
+                pond=pond, species=self.species, date=date(2025, 1, 1), pcs=1000, total_weight_kg=Decimal('20')
+            )
+
+    def post_rows(self, route, pond, rows):
+        """Post rows for ``pond`` to the bulk endpoint, or one at a time for the single pond"""
+        rows = [{**row, 'pond': pond.id} for row in rows]
+        if pond == self.single_pond:
+            for row in rows:
+                self.assertEqual(self.client.post(f'/api/fish-farming/{route}/', row, format='json').status_code, 201)
+            return None
+        response = self.client.post(f'/api/fish-farming/{route}/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def test_bulk_rows_update_ledger_and_facts_like_single_rows(self):
+        mortalities = [
+            {'species': self.species.id, 'date': '2025-01-10', 'count': 20},
+            {'species': self.species.id, 'date': '2025-02-03', 'count': 5, 'avg_weight_kg': '0.05'},
+        ]
+        feeds = [
+            {'feed_type': self.feed_type.id, 'date': f'2025-01-{day:02d}', 'amount_kg': '2.50', 'cost_per_kg': '1.20'}
+            for day in (5, 20, 31)
+        ] + [{'feed_type': self.feed_type.id, 'date': '2025-02-01', 'amount_kg': '3', 'biomass_at_feeding_kg': '60'}]
+        for pond in (self.bulk_pond, self.single_pond):
+            self.post_rows('mortality', pond, mortalities)
+            self.post_rows('feeds', pond, feeds)
+
+        ledgers = {
+            pond: PondSpeciesPopulation.objects.filter(pond=pond, species=self.species).values(*LEDGER_FIELDS).get()
+            for pond in (self.bulk_pond, self.single_pond)
+        }
+        self.assertEqual(ledgers[self.bulk_pond], ledgers[self.single_pond])
+        self.assertEqual(ledgers[self.bulk_pond]['alive_count'], 975)
+
+        facts = {
+            pond: list(PondMonthlyFact.objects.filter(pond=pond).order_by('month', 'species').values(
+                'species_id', 'month', *PondMonthlyFact.METRIC_FIELDS
+            ))
+            for pond in (self.bulk_pond, self.single_pond)
+        }
+        self.assertEqual(facts[self.bulk_pond], facts[self.single_pond])
+
+        feed_fields = ('date', 'total_cost', 'biomass_at_feeding_kg', 'feeding_rate_percent')
+        self.assertEqual(
+            list(Feed.objects.filter(pond=self.bulk_pond).order_by('date').values_list(*feed_fields)),
+            list(Feed.objects.filter(pond=self.single_pond).order_by('date').values_list(*feed_fields))
+        )
+
+    def test_rows_for_another_users_pond_are_rejected(self):
+        other = User.objects.create_user(username='other', password='x')
+        other_pond = Pond.objects.create(user=other, name='Other', area_decimal=Decimal('10'), depth_ft=Decimal('5'))
+        response = self.client.post('/api/fish-farming/mortality/bulk/', [
+            {'pond': self.bulk_pond.id, 'species': self.species.id, 'date': '2025-01-10', 'count': 1},
+            {'pond': other_pond.id, 'species': self.species.id, 'date': '2025-01-10', 'count': 1},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('pond', response.json()['errors'][1])
+        self.assertFalse(Mortality.objects.exists())
+
+    def test_daily_log_key_clashes_and_upsert(self):
+        rows = [{'pond': self.bulk_pond.id, 'date': '2025-02-01', 'ph': '7.0', 'water_temp_c': '26.00'}]
+        self.assertEqual(self.client.post('/api/fish-farming/daily-logs/bulk/', rows, format='json').status_code, 201)
+        stored = DailyLog.objects.get(pond=self.bulk_pond, date=date(2025, 2, 1))
+
+        clash = self.client.post('/api/fish-farming/daily-logs/bulk/', rows, format='json')
+        self.assertEqual(clash.status_code, 400)
+        self.assertIn('already exist', clash.json()['error'])
+        repeated = self.client.post('/api/fish-farming/daily-logs/bulk/', [
+            {'pond': self.bulk_pond.id, 'date': '2025-03-01'}, {'pond': self.bulk_pond.id, 'date': '2025-03-01'}
+        ], format='json')
+        self.assertEqual(repeated.status_code, 400)
+        self.assertEqual(DailyLog.objects.count(), 1)
+
+        response = self.client.post('/api/fish-farming/daily-logs/bulk/?upsert=true', [
+            {'pond': self.bulk_pond.id, 'date': '2025-02-01', 'water_temp_c': '24.50'},
+            {'pond': self.bulk_pond.id, 'date': '2025-02-02', 'ph': '6.8'},
+        ], format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual((response.json()['created'], response.json()['updated']), (1, 1))
+        self.assertEqual(DailyLog.objects.count(), 2)
+
+        updated, created = response.json()['results']
+        # Fields the request left out keep their stored values, in the database and the response
+        self.assertEqual(updated['id'], stored.id)
+        self.assertEqual(updated['ph'], '7.0')
+        self.assertEqual(updated['water_temp_c'], '24.50')
+        self.assertEqual(updated['created_at'], self.client.get(f'/api/fish-farming/daily-logs/{stored.id}/').json()['created_at'])
+        self.assertIsNotNone(created['id'])
+        stored.refresh_from_db()
+        self.assertEqual((stored.ph, stored.water_temp_c), (Decimal('7.0'), Decimal('24.50')))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AdviceContextLoadTests(TransactionTestCase):
+    """AdviceDataContext loads the same tables on the calling thread and on a thread pool"""
+
+    def test_threaded_and_sequential_loads_agree(self):
+        user = User.objects.create_user(username='farmer', password='x')
+        pond = Pond.objects.create(user=user, name='Pond 1', area_decimal=Decimal('10'), depth_ft=Decimal('5'))
+        species = Species.objects.create(user=user, name='Tilapia')
+        feed_type = FeedType.objects.create(user=user, name='Grower Feed')
+        today = date.today()
+        Stocking.objects.create(pond=pond, species=species, date=today - timedelta(days=60), pcs=1000, total_weight_kg=Decimal('10'))
+        Feed.objects.create(pond=pond, feed_type=feed_type, date=today - timedelta(days=2), amount_kg=Decimal('3'))
+
+        contexts = {}
+        for workers in (1, 3):
+            with self.settings(ADVICE_CONTEXT_LOAD_WORKERS=workers):
+                contexts[workers] = AdviceDataContext(user)
+        for context in contexts.values():
+            self.assertEqual(len(context.load_timings), 11)
+            self.assertEqual([item.name for item in context.species_in_pond(pond.id)], ['Tilapia'])
+            self.assertEqual(len(context.recent_feeds(pond.id)), 1)
+        self.assertEqual(contexts[1].input_fingerprint(pond, species), contexts[3].input_fingerprint(pond, species))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FeedingAdviceReuseTests(TestCase):
+    """Batch advice is reused while its inputs are unchanged and regenerated once they change"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='farmer', password='x')
+        self.pond = Pond.objects.create(user=self.user, name='Pond 1', area_decimal=Decimal('10'), depth_ft=Decimal('5'))
+        self.species = Species.objects.create(user=self.user, name='Tilapia')
+        self.feed_type = FeedType.objects.create(user=self.user, name='Grower Feed')
+        self.today = date.today()
+        Stocking.objects.create(
+            pond=self.pond, species=self.species, date=self.today - timedelta(days=60), pcs=1000,
+            total_weight_kg=Decimal('10')
+        )
+        FishSampling.objects.create(
+            pond=self.pond, species=self.species, user=self.user, date=self.today - timedelta(days=5),
+            sample_size=10, total_weight_kg=Decimal('0.5'), average_weight_kg=Decimal('0.05')
+        )
+        self.feed = Feed.objects.create(
+            pond=self.pond, feed_type=self.feed_type, date=self.today - timedelta(days=2), amount_kg=Decimal('3')
+        )
+        self.mortality = Mortality.objects.create(
+            pond=self.pond, species=self.species, date=self.today - timedelta(days=3), count=5
+        )
+        self.band = FeedingBand.objects.create(
+            name='Fingerling', min_weight_g=Decimal('10'), max_weight_g=Decimal('100'),
+            feeding_rate_percent=Decimal('4'), frequency_per_day=3
+        )
+
+    def fingerprint(self):
+        return AdviceDataContext(self.user).input_fingerprint(self.pond, self.species)
+
+    def test_unchanged_inputs_reuse_advice_unless_forced(self):
+        first = generate_farm_advice(self.user)
+        self.assertEqual(len(first['advice']), 1)
+
+        second = generate_farm_advice(self.user)
+        self.assertEqual(second['advice'], [])
+        self.assertEqual([advice.pk for advice in second['unchanged']], [first['advice'][0].pk])
+
+        forced = generate_farm_advice(self.user, force=True)
+        self.assertEqual(len(forced['advice']), 1)
+        self.assertEqual(forced['unchanged'], [])
+        self.assertEqual(FeedingAdvice.objects.count(), 2)
+
+    def test_new_edited_and_deleted_rows_change_the_fingerprint(self):
+        seen = [self.fingerprint()]
+        self.assertEqual(self.fingerprint(), seen[0])
+
+        Feed.objects.create(pond=self.pond, feed_type=self.feed_type, date=self.today - timedelta(days=1), amount_kg=Decimal('4'))
+        seen.append(self.fingerprint())
+        self.feed.amount_kg = Decimal('3.5')
+        self.feed.save()
+        seen.append(self.fingerprint())
+        self.mortality.delete()
+        seen.append(self.fingerprint())
+        self.assertEqual(len(set(seen)), len(seen))
+
+        generate_farm_advice(self.user)
+        Feed.objects.create(pond=self.pond, feed_type=self.feed_type, date=self.today, amount_kg=Decimal('2'))
+        self.assertEqual(len(generate_farm_advice(self.user)['advice']), 1)
+
+    def test_feeding_band_edits_regenerate_advice(self):
+        first = generate_farm_advice(self.user)['advice'][0]
+        self.assertEqual(first.feeding_frequency, 3)
+
+        self.band.frequency_per_day = 2
+        self.band.save()
+        result = generate_farm_advice(self.user)
+        self.assertEqual(result['unchanged'], [])
+        self.assertEqual(result['advice'][0].feeding_frequency, 2)
+        self.assertNotEqual(result['advice'][0].input_fingerprint, first.input_fingerprint)
+
+    def test_band_edits_in_another_process_reload_the_table(self):
+        stale = feeding_stages.get_feeding_band_table()
+        self.assertEqual(stale.lookup(50).frequency_per_day, 3)
+        with self.assertNumQueries(1):
+            self.assertIs(feeding_stages.get_feeding_band_table(), stale)
+
+        # Another worker edits the band; this process never sees the signal
+        FeedingBand.objects.filter(pk=self.band.pk).update(frequency_per_day=2, updated_at=timezone.now())
+        self.assertEqual(feeding_stages.get_feeding_band_table().lookup(50).frequency_per_day, 2)
+        FeedingBand.objects.create(
+            name='Grower', min_weight_g=Decimal('100'), max_weight_g=Decimal('500'),
+            feeding_rate_percent=Decimal('3'), frequency_per_day=2
+        )
+        feeding_stages._feeding_band_table = stale
+        self.assertEqual(feeding_stages.get_feeding_band_table().lookup(200).name, 'Grower')
+        self.band.delete()
+        feeding_stages._feeding_band_table = stale
+        self.assertIsNone(feeding_stages.get_feeding_band_table().lookup(50))
+
+    def test_feeding_rule_edits_regenerate_advice(self):
+        first = generate_farm_advice(self.user)['advice'][0]
+
+        rule = FeedingRule.objects.create(
+            user=self.user, key='always-more', group='rate_season', feature='season', operator='ne',
+            value='none', adjustment_percent=Decimal('10'), priority=1
+        )
+        raised = generate_farm_advice(self.user)['advice']
+        self.assertEqual(len(raised), 1)
+        self.assertGreater(raised[0].recommended_feed_kg, first.recommended_feed_kg)
+
+        rule.adjustment_percent = Decimal('20')
+        rule.save()
+        edited = generate_farm_advice(self.user)['advice']
+        self.assertEqual(len(edited), 1)
+        self.assertGreater(edited[0].recommended_feed_kg, raised[0].recommended_feed_kg)
+
+        rule.delete()
+        restored = generate_farm_advice(self.user)
+        self.assertEqual(restored['advice'], [])
+        self.assertEqual([advice.pk for advice in restored['unchanged']], [first.pk])
+
+    def test_batch_generate_rejects_malformed_pond_ids(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = '/api/fish-farming/feeding-advice/batch_generate/'
+        for ponds in ('1,2', [1, 'two'], [{'id': 1}], [True]):
+            response = client.post(url, {'ponds': ponds}, format='json')
+            self.assertEqual(response.status_code, 400, ponds)
+        response = client.post(url, {'ponds': [self.pond.id]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item['pond'] for item in response.data['advice']], [self.pond.id])
+
+    def test_what_if_needs_the_users_own_species(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        other = User.objects.create_user(username='other', password='x')
+        foreign = Species.objects.create(user=other, name='Carp')
+        url = '/api/fish-farming/feeding-advice/what_if/'
+        response = client.post(url, {'pond': self.pond.id, 'species': foreign.id}, format='json')
+        self.assertEqual(response.status_code, 404)
+        response = client.post(url, {'pond': self.pond.id, 'species': self.species.id}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class GrowthRateTests(TestCase):
+    """The per-pond growth pass gives the same values as FishSampling.calculate_growth_rate"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='farmer', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tilapia = Species.objects.create(user=self.user, name='Tilapia')
+        self.carp = Species.objects.create(user=self.user, name='Carp')
+        self.ponds = [
+            Pond.objects.create(user=self.user, name=f'Pond {index}', area_decimal=Decimal('10'), depth_ft=Decimal('5'))
+            for index in range(2)
+        ]
+        for pond in self.ponds:
+            for species in (self.tilapia, self.carp):
+                Stocking.objects.create(pond=pond, species=species, date=date(2025, 1, 1), pcs=1000, total_weight_kg=Decimal('10'))
+            Mortality.objects.create(pond=pond, species=self.tilapia, date=date(2025, 1, 15), count=40)
+            # Samplings of different species (or none) tied on the same dates
+            for day, species, weight in [
+                (10, self.tilapia, '0.02'), (10, None, '0.025'), (10, self.carp, '0.03'),
+                (25, self.tilapia, '0.05'), (25, None, '0.04'), (40, self.carp, '0.08'), (40, self.tilapia, '0.09'),
+            ]:
+                FishSampling.objects.create(
+                    pond=pond, species=species, user=self.user, date=date(2025, 1, 1) + timedelta(days=day),
+                    sample_size=10, total_weight_kg=Decimal(weight) * 10, average_weight_kg=Decimal(weight)
+                )
+
+    def test_recalculation_matches_per_row_calculation(self):
+        FishSampling.objects.update(growth_rate_kg_per_day=None, biomass_difference_kg=None)
+        response = self.client.post('/api/fish-farming/fish-sampling/recalculate_growth_rates/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_records'], FishSampling.objects.count())
+
+        for sampling in FishSampling.objects.all():
+            stored = (sampling.growth_rate_kg_per_day, sampling.biomass_difference_kg)
+            sampling.calculate_growth_rate()
+            expected = tuple(
+                value if value is None else Decimal(value).quantize(Decimal('1e-10'))
+                for value in (sampling.growth_rate_kg_per_day, sampling.biomass_difference_kg)
+            )
+            with self.subTest(pond=sampling.pond.name, date=sampling.date, species=sampling.species_id):
+                self.assertEqual(stored, expected)
+                self.assertIsNotNone(stored[0])
+
+
+def per_pond_fcr(user, start_date, end_date):
+    """FCR rows computed the way fcr_analysis did before compute_fcr_analysis: queries per pond/species"""
+    feeds = Feed.objects.filter(pond__user=user, date__gte=start_date, date__lte=end_date)
+    samplings = FishSampling.objects.filter(pond__user=user, date__gte=start_date, date__lte=end_date)
+    rows = []
+    for pond_id, species_id in {(combo['pond'], combo['species']) for combo in samplings.values('pond', 'species')}:
+        pond = Pond.objects.get(id=pond_id)
+        species = Species.objects.get(id=species_id)
+        combo_feeds = feeds.filter(pond_id=pond_id)
+        total_feed_kg = float(combo_feeds.aggregate(total=Sum('amount_kg'))['total'] or 0)
+        combo_samplings = samplings.filter(pond_id=pond_id, species_id=species_id).order_by('date')
+        if combo_samplings.count() < 2:
+            continue
+        earliest, latest = combo_samplings.first(), combo_samplings.last()
+        initial_weight = float(earliest.average_weight_kg)
+        final_weight = float(latest.average_weight_kg)
+        end = latest.date
+        if final_weight < initial_weight * 0.5:
+            harvest = Harvest.objects.filter(
+                pond_id=pond_id, species_id=species_id,
+                date__gte=latest.date - timedelta(days=7), date__lte=latest.date + timedelta(days=7)
+            ).first()
+            if not (harvest and harvest.avg_weight_kg):
+                continue
+            final_weight = float(harvest.avg_weight_kg)
+            end = harvest.date
+        weight_gain_per_fish = round(final_weight - initial_weight, 4)
+        estimated_fish_count = 0
+        population = PondSpeciesPopulation.get_for(pond, species)
+        if population.stocked_count:
+            estimated_fish_count = float(population.alive_count)
+        if not estimated_fish_count and earliest.fish_per_kg:
+            estimated_fish_count = float(earliest.fish_per_kg) * 100
+        total_weight_gain_kg = round(estimated_fish_count * weight_gain_per_fish, 4)
+        fcr = round(total_feed_kg / total_weight_gain_kg, 4) if total_weight_gain_kg > 0 else 0
+        days = (end - earliest.date).days
+        rows.append({
+            'pond_id': pond_id, 'pond_name': pond.name, 'species_id': species_id, 'species_name': species.name,
+            'start_date': earliest.date.isoformat(), 'end_date': end.isoformat(), 'days': days,
+            'estimated_fish_count': estimated_fish_count, 'initial_weight_kg': initial_weight,
+            'final_weight_kg': final_weight, 'weight_gain_per_fish_kg': weight_gain_per_fish,
+            'total_weight_gain_kg': total_weight_gain_kg, 'total_feed_kg': total_feed_kg,
+            'avg_daily_feed_kg': round(total_feed_kg / days, 4) if days > 0 else 0,
+            'avg_daily_weight_gain_kg': round(total_weight_gain_kg / days, 4) if days > 0 else 0,
+            'fcr': fcr, 'fcr_status': fcr_status(fcr),
+            'sampling_count': combo_samplings.count(), 'feeding_days': combo_feeds.count(),
+        })
+    return rows
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FcrAnalysisTests(TestCase):
+    """compute_fcr_analysis gives the same rows as the per-pond calculation it replaced"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='farmer', password='x')
+        feed_type = FeedType.objects.create(user=self.user, name='Grower Feed')
+        tilapia = Species.objects.create(user=self.user, name='Tilapia')
+        carp = Species.objects.create(user=self.user, name='Carp')
+        ponds = [
+            Pond.objects.create(user=self.user, name=f'Pond {index}', area_decimal=Decimal('10'), depth_ft=Decimal('5'))
+            for index in range(4)
+        ]
+        start = date(2025, 1, 1)
+
+        def sample(pond, species, day, weight, fish_per_kg=None):
+            FishSampling.objects.create(
+                pond=pond, species=species, user=self.user, date=start + timedelta(days=day), sample_size=10,
+                total_weight_kg=Decimal(weight) * 10, average_weight_kg=Decimal(weight), fish_per_kg=fish_per_kg
+            )
+
+        for pond in ponds[:3]:
+            for day in range(0, 60, 3):
+                Feed.objects.create(pond=pond, feed_type=feed_type, date=start + timedelta(days=day), amount_kg=Decimal('7.35'))
+        # Pond 0: two stocked species with mortalities and a harvest
+        for species, pcs in ((tilapia, 2000), (carp, 800)):
+            Stocking.objects.create(pond=ponds[0], species=species, date=start, pcs=pcs, total_weight_kg=Decimal('20'))
+            for day, weight in ((1, '0.011'), (20, '0.043'), (45, '0.097')):
+                sample(ponds[0], species, day, weight)
+        Mortality.objects.create(pond=ponds[0], species=tilapia, date=start + timedelta(days=10), count=125)
+        Harvest.objects.create(pond=ponds[0], species=carp, date=start + timedelta(days=50), total_weight_kg=Decimal('30'), total_count=300)
+        # Pond 1: the last sampling drops below half the first, with a harvest weight nearby
+        Stocking.objects.create(pond=ponds[1], species=tilapia, date=start, pcs=1500, total_weight_kg=Decimal('30'))
+        sample(ponds[1], tilapia, 2, '0.06')
+        sample(ponds[1], tilapia, 40, '0.02')
+        Harvest.objects.create(pond=ponds[1], species=tilapia, date=start + timedelta(days=44), total_weight_kg=Decimal('50'), pieces_per_kg=Decimal('8'))
+        # Pond 1 carp: the same drop without a harvest is skipped; a single sampling is skipped too
+        Stocking.objects.create(pond=ponds[1], species=carp, date=start, pcs=500, total_weight_kg=Decimal('10'))
+        sample(ponds[1], carp, 2, '0.06')
+        sample(ponds[1], carp, 40, '0.02')
+        sample(ponds[2], carp, 5, '0.05', Decimal('20'))
+        # Pond 2 tilapia and pond 3 (no feeds): no stocking, so fish_per_kg gives the count
+        sample(ponds[2], tilapia, 3, '0.04', Decimal('25'))
+        sample(ponds[2], tilapia, 30, '0.12', Decimal('8.33'))
+        sample(ponds[3], tilapia, 3, '0.04', Decimal('25'))
+        sample(ponds[3], tilapia, 30, '0.05', Decimal('20'))
+        self.start, self.end = start, start + timedelta(days=59)
+
+    def test_matches_the_per_pond_calculation(self):
+        key = lambda row: (row['pond_id'], row['species_id'])
+        expected = sorted(per_pond_fcr(self.user, self.start, self.end), key=key)
+        computed = compute_fcr_analysis(self.user, self.start, self.end)
+        self.assertEqual(len(expected), 5)
+        self.assertEqual(sorted(computed, key=key), expected)
+        self.assertEqual([row['fcr'] for row in computed], sorted(row['fcr'] for row in expected))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ProjectionTests(TestCase):
+    """Projections scale growth and ration by the user's temperature feeding rules"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='farmer', password='x')
+        self.pond = Pond.objects.create(user=self.user, name='Pond 1', area_decimal=Decimal('10'), depth_ft=Decimal('5'))
+        self.species = Species.objects.create(user=self.user, name='Tilapia')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_temperature_factor_follows_the_feeding_rules(self):
+        temperatures = [10, 18, 25, 28, 32, 36, float('nan'), 0]
+        self.assertEqual(
+            temperature_factor(get_rule_plan(self.user.pk), temperatures).tolist(),
+            [0.5, 0.8, 0.9, 1.0, 0.8, 0.6, 1.0, 1.0]
+        )
+
+        FeedingRule.objects.create(
+            user=self.user, key='hot_water', group='temperature', feature='water_temp_c', operator='gt',
+            value='35', adjustment_percent=Decimal('-10'), priority=40
+        )
+        self.assertEqual(temperature_factor(get_rule_plan(self.user.pk), [36, 32]).tolist(), [0.9, 0.8])
+
+    def test_projection_needs_the_users_own_species(self):
+        other = User.objects.create_user(username='other', password='x')
+        foreign = Species.objects.create(user=other, name='Carp')
+        response = self.client.post('/api/fish-farming/target-biomass/calculate/', {
+            'pond_id': self.pond.id, 'species_id': foreign.id, 'target_biomass_kg': 100, 'current_date': '2025-01-01'
+        }, format='json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_required_ration_uses_only_the_users_ponds_and_species(self):
+        start = date(2025, 1, 1)
+        Stocking.objects.create(pond=self.pond, species=self.species, date=start, pcs=1000, total_weight_kg=Decimal('10'))
+        for day, weight in ((20, '0.02'), (40, '0.04')):
+            FishSampling.objects.create(
+                pond=self.pond, species=self.species, user=self.user, date=start + timedelta(days=day), sample_size=10,
+                total_weight_kg=Decimal(weight) * 10, average_weight_kg=Decimal(weight)
+            )
+        other = User.objects.create_user(username='other', password='x')
+        foreign = Species.objects.create(user=other, name='Carp')
+
+        def solve(species_id):
+            return self.client.post('/api/fish-farming/target-biomass/required_ration/', {'requests': [{
+                'pond_id': self.pond.id, 'species_id': species_id, 'target_biomass_kg': 60,
+                'target_date': '2025-04-01', 'current_date': '2025-02-10',
+            }]}, format='json')
+
+        response = solve(foreign.id)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown pond or species', response.data['error'])
+        response = solve(self.species.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['species_name'], 'Tilapia')
+        self.assertIn('ration_fraction', response.data['results'][0])
@@ -0,0 +1,62 @@
+from django.core.cache import cache
+
+from .caching import get_cache_version, bump_cache_version
+
+
+# Serialized trees are cached per user under a version token that every write
+# to the tree replaces, so a stale tree can never be read back
+TREE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def build_tree(nodes):
+    """Nest MPTT nodes in memory and return the top-level ones.
+
+    ``nodes`` should be in tree order (``tree_id``, ``lft``). Each node gets
+    its parent and children cached, so ``get_children()`` and ``node.parent``
+    no longer hit the database. Nodes whose parent is not among ``nodes`` are
+    treated as roots.
+    """
+    nodes = list(nodes)
+    if not nodes:
+        return []
+
+    parent_field = nodes[0]._meta.get_field(nodes[0]._mptt_meta.parent_attr)
+    nodes_by_id = {node.pk: node for node in nodes}
+    for node in nodes:
+        node._cached_children = []
+
+    roots = []
+    for node in nodes:
+        parent = nodes_by_id.get(getattr(node, parent_field.attname))
+        if parent is None:
+            roots.append(node)
+        else:
+            parent_field.set_cached_value(node, parent)
+            parent._cached_children.append(node)
+    return roots
+
+
+def _tree_namespace(model, user_id):
+    return f'tree:{model._meta.label_lower}:{user_id}'
+
+
+def _tree_data_key(model, user_id, version):
+    return f'fish_farming:tree:{model._meta.label_lower}:{user_id}:{version}'
+
+
+def get_tree_version(model, user_id):
+    """Current cache version token of a user's tree, created on first use"""
+    return get_cache_version(_tree_namespace(model, user_id))
+
+
+def bump_tree_version(model, user_id):
+    """Invalidate a user's cached tree by giving it a fresh version token"""
+    bump_cache_version(_tree_namespace(model, user_id))
+
+
+def get_cached_tree(model, user_id, version):
+    return cache.get(_tree_data_key(model, user_id, version))
+
+
+def set_cached_tree(model, user_id, version, data):
+    cache.set(_tree_data_key(model, user_id, version), data, TREE_CACHE_TIMEOUT)
@@ -18,11 +18,13 @@ router.register(r'expense-types', views.ExpenseTypeViewSet)
 router.register(r'income-types', views.IncomeTypeViewSet)
 router.register(r'expenses', views.ExpenseViewSet)
 router.register(r'incomes', views.IncomeViewSet)
+router.register(r'monthly-facts', views.PondMonthlyFactViewSet)
 router.register(r'inventory-feed', views.InventoryFeedViewSet)
 router.register(r'treatments', views.TreatmentViewSet)
 router.register(r'alerts', views.AlertViewSet)
 router.register(r'settings', views.SettingViewSet)
 router.register(r'feeding-bands', views.FeedingBandViewSet)
+router.register(r'feeding-rules', views.FeedingRuleViewSet)
 router.register(r'env-adjustments', views.EnvAdjustmentViewSet)
 router.register(r'kpi-dashboard', views.KPIDashboardViewSet)
 router.register(r'fish-sampling', views.FishSamplingViewSet)
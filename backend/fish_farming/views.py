@@ -1,18 +1,23 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum, Count, Avg
+from django.db.models import Q, Sum, Count, Avg, Prefetch, OuterRef, Subquery, Value, DecimalField
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 from .models import (
     Pond, Species, Stocking, DailyLog, FeedType, Feed, SampleType, Sampling, 
     Mortality, Harvest, AccountType, ExpenseType, IncomeType, Expense, Income,
-    InventoryFeed, Treatment, Alert, Setting, FeedingBand, 
+    InventoryFeed, Treatment, Alert, Setting, FeedingBand, FeedingRule,
     EnvAdjustment, KPIDashboard, FishSampling, FeedingAdvice, SurvivalRate,
-    MedicalDiagnostic, Vendor, Customer, ItemService
+    MedicalDiagnostic, Vendor, Customer, ItemService, PondSpeciesPopulation, PondMonthlyFact
 )
 from .serializers import (
     PondSerializer, PondDetailSerializer, PondSummarySerializer,
@@ -21,32 +26,152 @@ from .serializers import (
     MortalitySerializer, HarvestSerializer, AccountTypeSerializer,
     ExpenseTypeSerializer, IncomeTypeSerializer, ExpenseSerializer, IncomeSerializer,
     InventoryFeedSerializer, TreatmentSerializer, AlertSerializer,
-    SettingSerializer, FeedingBandSerializer, EnvAdjustmentSerializer,
+    SettingSerializer, FeedingBandSerializer, FeedingRuleSerializer, EnvAdjustmentSerializer,
     KPIDashboardSerializer, FinancialSummarySerializer,
     FishSamplingSerializer, FeedingAdviceSerializer, SurvivalRateSerializer,
-    MedicalDiagnosticSerializer, VendorSerializer, CustomerSerializer, ItemServiceSerializer
+    MedicalDiagnosticSerializer, VendorSerializer, CustomerSerializer, ItemServiceSerializer,
+    PondMonthlyFactSerializer
 )
+from .eager_loading import EagerLoadingMixin, optimize_queryset
+from .growth import recompute_growth_rates
+from .trees import build_tree, get_tree_version, get_cached_tree, set_cached_tree
+from .fcr import compute_fcr_analysis, fcr_status
+from .finance import PERIOD_FUNCTIONS, get_financial_summary
+from .facts import ROLLUP_PERIODS, ROLLUP_DIMENSIONS, parse_month, rollup_facts
+from .advice import AdviceDataContext
+from .advice_generation import FeedingAdviceGenerator, advice_by_fingerprint, generate_farm_advice
+from .rules import DEFAULT_RULES, get_rule_plan
+from .bulk import BulkCreateMixin, fill_feed_derived_fields, fill_mortality_weights
+from .biomass import INTERPOLATION_METHODS, get_biomass_series
+from .projection import (
+    parse_scenario_grid, gather_projection_inputs, build_scenarios, simulate_scenarios, summarize_projection,
+    parse_ration_requests, required_ration_plan
+)
+from .what_if import DEFAULT_FISH_COUNT, compute_what_if_grid, parse_what_if_grid
+from .water_quality import farm_water_quality
 
 
-class PondViewSet(viewsets.ModelViewSet):
+class PondViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for pond management"""
     queryset = Pond.objects.all()
     serializer_class = PondSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Records per expanded collection on retrieve (?limit= up to the maximum)
+    detail_recent_items = 10
+    detail_max_recent_items = 100
     
     def get_queryset(self):
-        return Pond.objects.filter(user=self.request.user)
+        queryset = Pond.objects.filter(user=self.request.user)
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(*self._recent_collection_prefetches())
+        elif self.action in ('summary', 'overview'):
+            queryset = self._with_summaries(queryset)
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return PondDetailSerializer
-        elif self.action == 'summary':
+        elif self.action in ('summary', 'overview'):
             return PondSummarySerializer
         return PondSerializer
     
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'retrieve':
+            context['expand'] = self._expanded_collections()
+        return context
+    
+    def _expanded_collections(self):
+        """Collections named in ?expand= (comma separated, or 'all'); none by default"""
+        expand = self.request.query_params.get('expand', '')
+        names = [name.strip() for name in expand.split(',') if name.strip()]
+        if 'all' in names:
+            return list(PondDetailSerializer.COLLECTIONS)
+        return [name for name in PondDetailSerializer.COLLECTIONS if name in names]
+    
+    def _recent_collection_prefetches(self):
+        """Most recent records of each expanded collection, as sliced (windowed) prefetches"""
+        try:
+            limit = int(self.request.query_params.get('limit', self.detail_recent_items))
+        except ValueError:
+            limit = self.detail_recent_items
+        limit = min(max(limit, 1), self.detail_max_recent_items)
+        
+        prefetches = []
+        for name in self._expanded_collections():
+            serializer_class = PondDetailSerializer.COLLECTIONS[name]
+            model = Pond._meta.get_field(name).related_model
+            queryset = optimize_queryset(
+                model.objects.order_by(*model._meta.ordering, '-pk'), serializer_class, parent_link='pond'
+            )
+            prefetches.append(Prefetch(name, queryset=queryset[:limit], to_attr=f'recent_{name}'))
+        return prefetches
+    
+    def _with_summaries(self, queryset):
+        """Annotate the totals and prefetch the latest records PondSummarySerializer shows"""
+        def per_pond(model, aggregate, default, **filters):
+            rows = model.objects.filter(pond=OuterRef('pk'), **filters).order_by().values('pond')
+            return Coalesce(Subquery(rows.annotate(value=aggregate).values('value')), default)
+        
+        money = DecimalField(max_digits=14, decimal_places=2)
+        queryset = queryset.annotate(
+            expenses_total=per_pond(Expense, Sum('amount'), Value(Decimal('0'), output_field=money)),
+            income_total=per_pond(Income, Sum('amount'), Value(Decimal('0'), output_field=money)),
+            active_alerts=per_pond(Alert, Count('pk'), Value(0), is_resolved=False),
+        )
+        
+        # Latest record per pond as a sliced (windowed) prefetch, one query each
+        latest = (('stockings', StockingSerializer), ('daily_logs', DailyLogSerializer), ('harvests', HarvestSerializer))
+        for name, serializer_class in latest:
+            model = Pond._meta.get_field(name).related_model
+            records = optimize_queryset(
+                model.objects.order_by(*model._meta.ordering, '-pk'), serializer_class, parent_link='pond'
+            )
+            queryset = queryset.prefetch_related(Prefetch(name, queryset=records[:1], to_attr=f'latest_{name}'))
+        return queryset
+    
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
+    @action(detail=False, methods=['get'])
+    def overview(self, request):
+        """Get the summary of every pond, plus farm-wide totals, in one request"""
+        ponds = list(self.filter_queryset(self.get_queryset()))
+        serializer = self.get_serializer(ponds, many=True)
+        
+        total_expenses = sum((pond.expenses_total for pond in ponds), Decimal('0'))
+        total_income = sum((pond.income_total for pond in ponds), Decimal('0'))
+        return Response({
+            'pond_count': len(ponds),
+            'active_pond_count': sum(1 for pond in ponds if pond.is_active),
+            'total_expenses': float(total_expenses),
+            'total_income': float(total_income),
+            'profit_loss': float(total_income - total_expenses),
+            'active_alerts_count': sum(pond.active_alerts for pond in ponds),
+            'ponds': serializer.data
+        })
+    
+    @action(detail=False, methods=['get'])
+    def water_quality(self, request):
+        """Latest water quality of every active pond (?include_inactive=true for all), scored against its species' optimal ranges"""
+        ponds = Pond.objects.filter(user=request.user).order_by('name')
+        if request.query_params.get('include_inactive', '').lower() not in ('1', 'true', 'yes'):
+            ponds = ponds.filter(is_active=True)
+        return Response(farm_water_quality(ponds, timezone.now().date()))
+    
+    @action(detail=True, methods=['get'], url_path=r'related/(?P<collection>[a-z_]+)')
+    def related(self, request, pk=None, collection=None):
+        """Get one of a pond's collections (feeds, expenses, ...), paginated"""
+        serializer_class = PondDetailSerializer.COLLECTIONS.get(collection)
+        if serializer_class is None:
+            return Response({'error': f'Unknown collection: {collection}'}, status=status.HTTP_404_NOT_FOUND)
+        
+        pond = self.get_object()
+        queryset = optimize_queryset(getattr(pond, collection).all(), serializer_class, parent_link='pond')
+        page = self.paginate_queryset(queryset)
+        serializer = serializer_class(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+    
     @action(detail=True, methods=['get'])
     def summary(self, request, pk=None):
         """Get comprehensive summary of a pond"""
@@ -56,68 +181,75 @@ class PondViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def financial_summary(self, request, pk=None):
-        """Get financial summary for a pond"""
+        """Get financial summary for a pond (?granularity=week|month|quarter, ?start_date=, ?end_date=)"""
         pond = self.get_object()
         
-        # Calculate totals
-        total_expenses = pond.expenses.aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        total_income = pond.incomes.aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        profit_loss = total_income - total_expenses
-        
-        # Expenses by category
-        expenses_by_category = {}
-        for expense in pond.expenses.all():
-            category = expense.expense_type.category
-            if category not in expenses_by_category:
-                expenses_by_category[category] = Decimal('0')
-            expenses_by_category[category] += expense.amount
-        
-        # Income by category
-        income_by_category = {}
-        for income in pond.incomes.all():
-            category = income.income_type.category
-            if category not in income_by_category:
-                income_by_category[category] = Decimal('0')
-            income_by_category[category] += income.amount
-        
-        # Monthly trends (last 12 months)
-        monthly_trends = {}
-        for i in range(12):
-            month_start = timezone.now().replace(day=1) - timedelta(days=30*i)
-            month_end = month_start + timedelta(days=30)
-            
-            month_expenses = pond.expenses.filter(
-                date__gte=month_start, date__lt=month_end
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-            
-            month_income = pond.incomes.filter(
-                date__gte=month_start, date__lt=month_end
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-            
-            monthly_trends[month_start.strftime('%Y-%m')] = {
-                'expenses': float(month_expenses),
-                'income': float(month_income),
-                'profit_loss': float(month_income - month_expenses)
-            }
-        
-        data = {
-            'total_expenses': total_expenses,
-            'total_income': total_income,
-            'profit_loss': profit_loss,
-            'expenses_by_category': {k: float(v) for k, v in expenses_by_category.items()},
-            'income_by_category': {k: float(v) for k, v in income_by_category.items()},
-            'monthly_trends': monthly_trends
-        }
+        granularity = request.query_params.get('granularity', 'month')
+        if granularity not in PERIOD_FUNCTIONS:
+            return Response(
+                {'error': f"granularity must be one of: {', '.join(PERIOD_FUNCTIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
+        try:
+            start_date = request.query_params.get('start_date')
+            end_date = request.query_params.get('end_date')
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        except ValueError:
+            return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        if start_date and end_date and start_date > end_date:
+            return Response({'error': 'start_date must not be after end_date'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = get_financial_summary(pond, granularity, start_date, end_date)
         serializer = FinancialSummarySerializer(data)
         return Response(serializer.data)
 
 
-class SpeciesViewSet(viewsets.ModelViewSet):
+class TreeViewSetMixin:
+    """Single-query tree and flat listing for MPTT viewsets"""
+    tree_select_related = []
+    # Cache /tree/ per user (versioned, served with an ETag); needs a user-owned model
+    tree_cache = False
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # ?flat=true returns plain nodes without nested children (ignored by /tree/)
+        if self.request is not None and self.action != 'tree':
+            context['flat'] = self.request.query_params.get('flat', '').lower() in ('1', 'true', 'yes')
+        return context
+    
+    def _serialize_tree(self):
+        nodes = self.get_queryset().select_related(*self.tree_select_related).order_by('tree_id', 'lft')
+        return self.get_serializer(build_tree(nodes), many=True).data
+    
+    @action(detail=False, methods=['get'])
+    def tree(self, request):
+        """Get the whole tree in one query, each node nested once under its parent"""
+        if not self.tree_cache:
+            return Response(self._serialize_tree())
+        
+        model = self.get_queryset().model
+        version = get_tree_version(model, request.user.pk)
+        etag = quote_etag(version)
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        data = get_cached_tree(model, request.user.pk, version)
+        if data is None:
+            data = self._serialize_tree()
+            set_cached_tree(model, request.user.pk, version, data)
+        return Response(data, headers={'ETag': etag})
+
+
+class SpeciesViewSet(EagerLoadingMixin, TreeViewSetMixin, viewsets.ModelViewSet):
     """ViewSet for fish species with hierarchical support"""
     queryset = Species.objects.none()  # Will be overridden by get_queryset
     serializer_class = SpeciesSerializer
     permission_classes = [permissions.IsAuthenticated]
+    tree_select_related = ['user']
+    tree_cache = True
     
     def get_queryset(self):
         return Species.objects.filter(user=self.request.user)
@@ -157,14 +289,14 @@ class SpeciesViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class StockingViewSet(viewsets.ModelViewSet):
+class StockingViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for fish stocking records"""
     queryset = Stocking.objects.all()
     serializer_class = StockingSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        queryset = Stocking.objects.filter(pond__user=self.request.user)
+        queryset = Stocking.objects.filter(owner=self.request.user)
         
         # Filter by pond
         pond_id = self.request.query_params.get('pond')
@@ -184,14 +316,15 @@ class StockingViewSet(viewsets.ModelViewSet):
         serializer.save(pond=pond)
 
 
-class DailyLogViewSet(viewsets.ModelViewSet):
+class DailyLogViewSet(EagerLoadingMixin, BulkCreateMixin, viewsets.ModelViewSet):
     """ViewSet for daily logs"""
     queryset = DailyLog.objects.all()
     serializer_class = DailyLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    bulk_upsert_fields = ['pond', 'date']
     
     def get_queryset(self):
-        return DailyLog.objects.filter(pond__user=self.request.user)
+        return DailyLog.objects.filter(owner=self.request.user)
     
     def perform_create(self, serializer):
         pond_id = self.request.data.get('pond')
@@ -199,11 +332,13 @@ class DailyLogViewSet(viewsets.ModelViewSet):
         serializer.save(pond=pond)
 
 
-class FeedTypeViewSet(viewsets.ModelViewSet):
+class FeedTypeViewSet(EagerLoadingMixin, TreeViewSetMixin, viewsets.ModelViewSet):
     """ViewSet for feed types with hierarchical support"""
     queryset = FeedType.objects.all()
     serializer_class = FeedTypeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    tree_select_related = ['user']
+    tree_cache = True
     
     def get_queryset(self):
         return FeedType.objects.filter(user=self.request.user)
@@ -243,11 +378,13 @@ class FeedTypeViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class AccountTypeViewSet(viewsets.ModelViewSet):
+class AccountTypeViewSet(EagerLoadingMixin, TreeViewSetMixin, viewsets.ModelViewSet):
     """ViewSet for account types with hierarchical support"""
     queryset = AccountType.objects.all()
     serializer_class = AccountTypeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    tree_select_related = ['user']
+    tree_cache = True
     
     def get_queryset(self):
         return AccountType.objects.filter(user=self.request.user)
@@ -336,22 +473,25 @@ class AccountTypeViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class FeedViewSet(viewsets.ModelViewSet):
+class FeedViewSet(EagerLoadingMixin, BulkCreateMixin, viewsets.ModelViewSet):
     """ViewSet for feed records"""
     queryset = Feed.objects.all()
     serializer_class = FeedSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Feed.objects.filter(pond__user=self.request.user)
+        return Feed.objects.filter(owner=self.request.user)
     
     def perform_create(self, serializer):
         pond_id = self.request.data.get('pond')
         pond = get_object_or_404(Pond, id=pond_id, user=self.request.user)
         serializer.save(pond=pond)
+    
+    def prepare_bulk_instances(self, instances):
+        fill_feed_derived_fields(instances)
 
 
-class SampleTypeViewSet(viewsets.ModelViewSet):
+class SampleTypeViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for sample types"""
     queryset = SampleType.objects.filter(is_active=True)
     serializer_class = SampleTypeSerializer
@@ -361,14 +501,14 @@ class SampleTypeViewSet(viewsets.ModelViewSet):
         return SampleType.objects.filter(is_active=True)
 
 
-class SamplingViewSet(viewsets.ModelViewSet):
+class SamplingViewSet(EagerLoadingMixin, BulkCreateMixin, viewsets.ModelViewSet):
     """ViewSet for sampling records"""
     queryset = Sampling.objects.all()
     serializer_class = SamplingSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Sampling.objects.filter(pond__user=self.request.user)
+        return Sampling.objects.filter(owner=self.request.user)
     
     def perform_create(self, serializer):
         pond_id = self.request.data.get('pond')
@@ -376,14 +516,14 @@ class SamplingViewSet(viewsets.ModelViewSet):
         serializer.save(pond=pond)
 
 
-class MortalityViewSet(viewsets.ModelViewSet):
+class MortalityViewSet(EagerLoadingMixin, BulkCreateMixin, viewsets.ModelViewSet):
     """ViewSet for mortality records"""
     queryset = Mortality.objects.all()
     serializer_class = MortalitySerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        queryset = Mortality.objects.filter(pond__user=self.request.user)
+        queryset = Mortality.objects.filter(owner=self.request.user)
         
         # Filter by pond
         pond_id = self.request.query_params.get('pond')
@@ -401,16 +541,19 @@ class MortalityViewSet(viewsets.ModelViewSet):
         pond_id = self.request.data.get('pond')
         pond = get_object_or_404(Pond, id=pond_id, user=self.request.user)
         serializer.save(pond=pond)
+    
+    def prepare_bulk_instances(self, instances):
+        fill_mortality_weights(instances)
 
 
-class HarvestViewSet(viewsets.ModelViewSet):
+class HarvestViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for harvest records"""
     queryset = Harvest.objects.all()
     serializer_class = HarvestSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        queryset = Harvest.objects.filter(pond__user=self.request.user)
+        queryset = Harvest.objects.filter(owner=self.request.user)
         
         # Filter by pond
         pond_id = self.request.query_params.get('pond')
@@ -430,7 +573,7 @@ class HarvestViewSet(viewsets.ModelViewSet):
         serializer.save(pond=pond)
 
 
-class ExpenseTypeViewSet(viewsets.ModelViewSet):
+class ExpenseTypeViewSet(EagerLoadingMixin, TreeViewSetMixin, viewsets.ModelViewSet):
     """ViewSet for expense types with hierarchical support"""
     queryset = ExpenseType.objects.all()
     serializer_class = ExpenseTypeSerializer
@@ -468,7 +611,7 @@ class ExpenseTypeViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class IncomeTypeViewSet(viewsets.ModelViewSet):
+class IncomeTypeViewSet(EagerLoadingMixin, TreeViewSetMixin, viewsets.ModelViewSet):
     """ViewSet for income types with hierarchical support"""
     queryset = IncomeType.objects.all()
     serializer_class = IncomeTypeSerializer
@@ -506,7 +649,7 @@ class IncomeTypeViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for expense records"""
     queryset = Expense.objects.all()
     serializer_class = ExpenseSerializer
@@ -519,7 +662,7 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class IncomeViewSet(viewsets.ModelViewSet):
+class IncomeViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for income records"""
     queryset = Income.objects.all()
     serializer_class = IncomeSerializer
@@ -532,21 +675,73 @@ class IncomeViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class InventoryFeedViewSet(viewsets.ModelViewSet):
+class PondMonthlyFactViewSet(EagerLoadingMixin, viewsets.ReadOnlyModelViewSet):
+    """Pre-aggregated monthly pond/species totals (?pond=, ?species=, ?start=YYYY-MM, ?end=YYYY-MM)"""
+    queryset = PondMonthlyFact.objects.all()
+    serializer_class = PondMonthlyFactSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = PondMonthlyFact.objects.filter(user=self.request.user)
+        
+        # Filter by pond and species (repeatable, e.g. ?pond=1&pond=2)
+        pond_ids = self.request.query_params.getlist('pond')
+        if pond_ids:
+            queryset = queryset.filter(pond_id__in=pond_ids)
+        species_ids = self.request.query_params.getlist('species')
+        if species_ids:
+            queryset = queryset.filter(species_id__in=species_ids)
+        
+        # Filter by month range
+        try:
+            start = self.request.query_params.get('start')
+            end = self.request.query_params.get('end')
+            if start:
+                queryset = queryset.filter(month__gte=parse_month(start))
+            if end:
+                queryset = queryset.filter(month__lte=parse_month(end))
+        except ValueError as e:
+            raise ParseError({'error': str(e)})
+        
+        return queryset
+    
+    @action(detail=False, methods=['get'])
+    def rollup(self, request):
+        """Totals grouped by ?period=month|quarter|year and/or ?group_by=pond,species"""
+        period = request.query_params.get('period') or None
+        if period and period not in ROLLUP_PERIODS:
+            return Response(
+                {'error': f"period must be one of: {', '.join(ROLLUP_PERIODS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        group_by = list(dict.fromkeys(name for name in request.query_params.get('group_by', '').split(',') if name))
+        unknown = [name for name in group_by if name not in ROLLUP_DIMENSIONS]
+        if unknown:
+            return Response(
+                {'error': f"group_by must be a comma-separated list of: {', '.join(ROLLUP_DIMENSIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        data = rollup_facts(self.get_queryset(), period, group_by)
+        return Response({'period': period, 'group_by': group_by, **data})
+
+
+class InventoryFeedViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for feed inventory"""
     queryset = InventoryFeed.objects.all()
     serializer_class = InventoryFeedSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 
-class TreatmentViewSet(viewsets.ModelViewSet):
+class TreatmentViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for treatment records"""
     queryset = Treatment.objects.all()
     serializer_class = TreatmentSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Treatment.objects.filter(pond__user=self.request.user)
+        return Treatment.objects.filter(owner=self.request.user)
     
     def perform_create(self, serializer):
         pond_id = self.request.data.get('pond')
@@ -554,14 +749,14 @@ class TreatmentViewSet(viewsets.ModelViewSet):
         serializer.save(pond=pond)
 
 
-class AlertViewSet(viewsets.ModelViewSet):
+class AlertViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for alerts"""
     queryset = Alert.objects.all()
     serializer_class = AlertSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Alert.objects.filter(pond__user=self.request.user)
+        return Alert.objects.filter(owner=self.request.user)
     
     @action(detail=True, methods=['post'])
     def resolve(self, request, pk=None):
@@ -574,7 +769,7 @@ class AlertViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Alert resolved'})
 
 
-class SettingViewSet(viewsets.ModelViewSet):
+class SettingViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for user settings"""
     queryset = Setting.objects.all()
     serializer_class = SettingSerializer
@@ -587,21 +782,47 @@ class SettingViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class FeedingBandViewSet(viewsets.ModelViewSet):
+class FeedingBandViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for feeding bands"""
     queryset = FeedingBand.objects.all()
     serializer_class = FeedingBandSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 
-class EnvAdjustmentViewSet(viewsets.ModelViewSet):
+class FeedingRuleViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
+    """ViewSet for the user's overrides of the default feeding adjustment rules"""
+    queryset = FeedingRule.objects.all()
+    serializer_class = FeedingRuleSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return FeedingRule.objects.filter(user=self.request.user)
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+    
+    @action(detail=False, methods=['get'])
+    def defaults(self, request):
+        """The built-in rule set the user's rules override"""
+        return Response(DEFAULT_RULES)
+    
+    @action(detail=False, methods=['get'])
+    def effective(self, request):
+        """The rules feeding advice is generated with: the defaults with the user's rules applied"""
+        return Response([
+            dict(rule, adjustment_percent=float(rule['adjustment_percent']))
+            for rule in get_rule_plan(request.user.pk).rules
+        ])
+
+
+class EnvAdjustmentViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for environmental adjustments"""
     queryset = EnvAdjustment.objects.all()
     serializer_class = EnvAdjustmentSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return EnvAdjustment.objects.filter(pond__user=self.request.user)
+        return EnvAdjustment.objects.filter(owner=self.request.user)
     
     def perform_create(self, serializer):
         pond_id = self.request.data.get('pond')
@@ -609,14 +830,14 @@ class EnvAdjustmentViewSet(viewsets.ModelViewSet):
         serializer.save(pond=pond)
 
 
-class KPIDashboardViewSet(viewsets.ModelViewSet):
+class KPIDashboardViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for KPI dashboard"""
     queryset = KPIDashboard.objects.all()
     serializer_class = KPIDashboardSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return KPIDashboard.objects.filter(pond__user=self.request.user)
+        return KPIDashboard.objects.filter(owner=self.request.user)
     
     def perform_create(self, serializer):
         pond_id = self.request.data.get('pond')
@@ -624,7 +845,7 @@ class KPIDashboardViewSet(viewsets.ModelViewSet):
         serializer.save(pond=pond)
 
 
-class FishSamplingViewSet(viewsets.ModelViewSet):
+class FishSamplingViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for fish sampling"""
     queryset = FishSampling.objects.all()
     serializer_class = FishSamplingSerializer
@@ -657,47 +878,52 @@ class FishSamplingViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         pond_id = self.request.data.get('pond')
         pond = get_object_or_404(Pond, id=pond_id, user=self.request.user)
-        serializer.save(pond=pond, user=self.request.user)
+        instance = serializer.save(pond=pond, user=self.request.user)
+        
+        # A back-dated sampling becomes the reference point for later records
+        recompute_growth_rates(instance.pond_id, since=instance.date)
     
     def perform_update(self, serializer):
         """Override update to recalculate growth rates for affected records"""
+        previous_pond_id = serializer.instance.pond_id
+        previous_date = serializer.instance.date
         instance = serializer.save()
         
-        # Recalculate growth rates for all records in the same pond
+        # Recalculate growth rates for the records in the same pond
         # that come after this one chronologically
-        later_samplings = FishSampling.objects.filter(
-            pond=instance.pond,
-            date__gte=instance.date
-        ).exclude(id=instance.id).order_by('date')
+        recompute_growth_rates(instance.pond_id, since=min(previous_date, instance.date)
+                               if previous_pond_id == instance.pond_id else instance.date)
         
-        for sampling in later_samplings:
-            sampling.calculate_growth_rate()
-            sampling.save()
+        # Records that used this sampling as their reference in its old pond
+        if previous_pond_id != instance.pond_id:
+            recompute_growth_rates(previous_pond_id, since=previous_date)
+    
+    def perform_destroy(self, instance):
+        pond_id, sampling_date = instance.pond_id, instance.date
+        instance.delete()
+        recompute_growth_rates(pond_id, since=sampling_date)
     
     @action(detail=False, methods=['post'])
     def recalculate_growth_rates(self, request):
         """Recalculate growth rates for all fish sampling records"""
         try:
-            # Get all fish sampling records for the user
-            samplings = FishSampling.objects.filter(pond__user=request.user).order_by('pond', 'date')
+            # One linear pass per pond that has fish sampling records
+            pond_ids = FishSampling.objects.filter(
+                pond__user=request.user
+            ).values_list('pond_id', flat=True).order_by().distinct()
             
             updated_count = 0
+            total_records = 0
             
-            for sampling in samplings:
-                old_growth_rate = sampling.growth_rate_kg_per_day
-                
-                # Recalculate growth rate
-                sampling.calculate_growth_rate()
-                
-                # Save if growth rate changed
-                if old_growth_rate != sampling.growth_rate_kg_per_day:
-                    sampling.save()
-                    updated_count += 1
+            for pond_id in pond_ids:
+                pond_updated, pond_total = recompute_growth_rates(pond_id)
+                updated_count += pond_updated
+                total_records += pond_total
             
             return Response({
                 'message': f'Successfully recalculated growth rates for {updated_count} fish sampling records',
                 'updated_count': updated_count,
-                'total_records': samplings.count()
+                'total_records': total_records
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -708,6 +934,9 @@ class FishSamplingViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def biomass_analysis(self, request):
         """Calculate biomass analysis with filtering options"""
+        from django.db.models import F, Min, Window
+        from django.db.models.functions import RowNumber
+        
         try:
             # Get filter parameters
             pond_id = request.query_params.get('pond')
@@ -728,135 +957,129 @@ class FishSamplingViewSet(viewsets.ModelViewSet):
             if end_date:
                 queryset = queryset.filter(date__lte=end_date)
             
-            # Order by date for proper analysis
-            samplings = queryset.order_by('pond', 'species', 'date')
-            
-            # Calculate biomass metrics
-            total_biomass_gain = 0
-            total_biomass_loss = 0
-            biomass_changes = []
-            
-            for sampling in samplings:
-                if sampling.biomass_difference_kg:
-                    if sampling.biomass_difference_kg > 0:
-                        total_biomass_gain += float(sampling.biomass_difference_kg)
-                    else:
-                        total_biomass_loss += abs(float(sampling.biomass_difference_kg))
-                    
-                    biomass_changes.append({
-                        'id': sampling.id,
-                        'pond_name': sampling.pond.name,
-                        'species_name': sampling.species.name if sampling.species else 'Mixed',
-                        'date': sampling.date,
-                        'biomass_difference_kg': float(sampling.biomass_difference_kg),
-                        'growth_rate_kg_per_day': float(sampling.growth_rate_kg_per_day) if sampling.growth_rate_kg_per_day else None,
-                        'average_weight_kg': float(sampling.average_weight_kg),
-                        'sample_size': sampling.sample_size
-                    })
+            # Gain/loss sums and sampling counts, grouped in SQL
+            biomass_aggregates = {
+                'total_gain': Sum('biomass_difference_kg', filter=Q(biomass_difference_kg__gt=0)),
+                'total_loss': Sum('biomass_difference_kg', filter=Q(biomass_difference_kg__lt=0)),
+                'sampling_count': Count('id'),
+            }
             
-            # Calculate net biomass change
-            net_biomass_change = total_biomass_gain - total_biomass_loss
+            def summarize(row):
+                total_gain = float(row['total_gain'] or 0)
+                total_loss = abs(float(row['total_loss'] or 0))
+                return {
+                    'total_gain': total_gain,
+                    'total_loss': total_loss,
+                    'net_change': total_gain - total_loss,
+                    'sampling_count': row['sampling_count']
+                }
             
             # Group by pond and species for summary
             pond_summary = {}
+            pond_rows = queryset.values('pond_id', 'pond__name').annotate(
+                **biomass_aggregates
+            ).order_by('pond__name', 'pond_id')
+            for row in pond_rows:
+                pond_summary[row['pond__name']] = summarize(row)
+            
             species_summary = {}
+            species_rows = queryset.values('species__name').annotate(
+                first_pond=Min('pond__name'), **biomass_aggregates
+            ).order_by('first_pond', 'species__name')
+            for row in species_rows:
+                species_name = row['species__name'] or 'Mixed'
+                summary = summarize(row)
+                if species_name in species_summary:
+                    # A species literally named "Mixed" shares the bucket with unassigned samplings
+                    existing = species_summary[species_name]
+                    for key in ('total_gain', 'total_loss', 'sampling_count'):
+                        existing[key] += summary[key]
+                    existing['net_change'] = existing['total_gain'] - existing['total_loss']
+                else:
+                    species_summary[species_name] = summary
             
-            for sampling in samplings:
-                pond_name = sampling.pond.name
-                species_name = sampling.species.name if sampling.species else 'Mixed'
-                
-                # Pond summary
-                if pond_name not in pond_summary:
-                    pond_summary[pond_name] = {
-                        'total_gain': 0,
-                        'total_loss': 0,
-                        'net_change': 0,
-                        'sampling_count': 0
-                    }
-                
-                if sampling.biomass_difference_kg:
-                    if sampling.biomass_difference_kg > 0:
-                        pond_summary[pond_name]['total_gain'] += float(sampling.biomass_difference_kg)
-                    else:
-                        pond_summary[pond_name]['total_loss'] += abs(float(sampling.biomass_difference_kg))
-                
-                pond_summary[pond_name]['sampling_count'] += 1
-                pond_summary[pond_name]['net_change'] = pond_summary[pond_name]['total_gain'] - pond_summary[pond_name]['total_loss']
-                
-                # Species summary
-                if species_name not in species_summary:
-                    species_summary[species_name] = {
-                        'total_gain': 0,
-                        'total_loss': 0,
-                        'net_change': 0,
-                        'sampling_count': 0
-                    }
-                
-                if sampling.biomass_difference_kg:
-                    if sampling.biomass_difference_kg > 0:
-                        species_summary[species_name]['total_gain'] += float(sampling.biomass_difference_kg)
-                    else:
-                        species_summary[species_name]['total_loss'] += abs(float(sampling.biomass_difference_kg))
-                
-                species_summary[species_name]['sampling_count'] += 1
-                species_summary[species_name]['net_change'] = species_summary[species_name]['total_gain'] - species_summary[species_name]['total_loss']
+            # Calculate biomass metrics
+            total_biomass_gain = sum(summary['total_gain'] for summary in pond_summary.values())
+            total_biomass_loss = sum(summary['total_loss'] for summary in pond_summary.values())
+            total_samplings = sum(summary['sampling_count'] for summary in pond_summary.values())
+            
+            # Calculate net biomass change
+            net_biomass_change = total_biomass_gain - total_biomass_loss
+            
+            # Per-row changes, with pond and species joined in
+            biomass_changes = []
+            changed_samplings = queryset.filter(
+                biomass_difference_kg__isnull=False
+            ).exclude(
+                biomass_difference_kg=0
+            ).select_related('pond', 'species').order_by('pond', 'species', 'date')
+            
+            for sampling in changed_samplings:
+                biomass_changes.append({
+                    'id': sampling.id,
+                    'pond_name': sampling.pond.name,
+                    'species_name': sampling.species.name if sampling.species else 'Mixed',
+                    'date': sampling.date,
+                    'biomass_difference_kg': float(sampling.biomass_difference_kg),
+                    'growth_rate_kg_per_day': float(sampling.growth_rate_kg_per_day) if sampling.growth_rate_kg_per_day else None,
+                    'average_weight_kg': float(sampling.average_weight_kg),
+                    'sample_size': sampling.sample_size
+                })
             
             # Calculate total current biomass for each pond/species combination
             total_current_biomass = 0
             pond_species_biomass = {}
             
-            # Get all unique pond/species combinations from STOCKING data (not just samplings)
+            # Get all pond/species combinations from STOCKING data (not just samplings)
             # This ensures we include all stocked fish, even if they don't have sampling data yet
-            stocking_combinations = Stocking.objects.filter(pond__user=request.user).values('pond', 'species').distinct()
+            stockings = Stocking.objects.filter(owner=request.user)
+            combo_samplings = FishSampling.objects.filter(pond__user=request.user, species__isnull=False)
             
             # Apply filters to stocking combinations
             if pond_id:
-                stocking_combinations = stocking_combinations.filter(pond_id=pond_id)
+                stockings = stockings.filter(pond_id=pond_id)
+                combo_samplings = combo_samplings.filter(pond_id=pond_id)
             if species_id:
-                stocking_combinations = stocking_combinations.filter(species_id=species_id)
+                stockings = stockings.filter(species_id=species_id)
+                combo_samplings = combo_samplings.filter(species_id=species_id)
+            
+            # Latest stocking per pond/species
+            latest_stockings = stockings.annotate(
+                stocking_rank=Window(
+                    expression=RowNumber(),
+                    partition_by=[F('pond_id'), F('species_id')],
+                    order_by=F('date').desc()
+                )
+            ).filter(stocking_rank=1).values(
+                'pond_id', 'species_id', 'pond__name', 'species__name', 'total_weight_kg'
+            ).order_by('-date')
+            
+            # Cumulative biomass change from ALL samplings (not just date-filtered ones)
+            cumulative_changes = {
+                (row['pond_id'], row['species_id']): float(row['cumulative_change'] or 0)
+                for row in combo_samplings.values('pond_id', 'species_id').annotate(
+                    cumulative_change=Sum('biomass_difference_kg')
+                ).order_by()
+            }
             
-            for combo in stocking_combinations:
-                pond_id = combo['pond']
-                species_id = combo['species']
+            for latest_stocking in latest_stockings:
+                cumulative_biomass_change = cumulative_changes.get(
+                    (latest_stocking['pond_id'], latest_stocking['species_id']), 0
+                )
                 
-                # Get pond and species objects
-                pond = Pond.objects.get(id=pond_id)
-                species = Species.objects.get(id=species_id) if species_id else None
+                # Current biomass = Initial stocking + Cumulative growth
+                initial_biomass = float(latest_stocking['total_weight_kg'])
+                current_biomass = initial_biomass + cumulative_biomass_change
                 
-                # Get latest stocking for this pond/species
-                if species:
-                    latest_stocking = Stocking.objects.filter(
-                        pond=pond, species=species
-                    ).order_by('-date').first()
-                else:
-                    latest_stocking = Stocking.objects.filter(
-                        pond=pond
-                    ).order_by('-date').first()
+                total_current_biomass += current_biomass
                 
-                if latest_stocking:
-                    # Calculate cumulative biomass change from ALL samplings (not just filtered ones)
-                    cumulative_biomass_change = 0
-                    combo_samplings = FishSampling.objects.filter(
-                        pond=pond, species=species
-                    ).order_by('date')
-                    
-                    for sampling in combo_samplings:
-                        if sampling.biomass_difference_kg:
-                            cumulative_biomass_change += float(sampling.biomass_difference_kg)
-                    
-                    # Current biomass = Initial stocking + Cumulative growth
-                    initial_biomass = float(latest_stocking.total_weight_kg)
-                    current_biomass = initial_biomass + cumulative_biomass_change
-                    
-                    total_current_biomass += current_biomass
-                    
-                    # Store for detailed breakdown
-                    key = f"{pond.name} - {species.name if species else 'Mixed'}"
-                    pond_species_biomass[key] = {
-                        'initial_biomass': initial_biomass,
-                        'growth_biomass': cumulative_biomass_change,
-                        'current_biomass': current_biomass
-                    }
+                # Store for detailed breakdown
+                key = f"{latest_stocking['pond__name']} - {latest_stocking['species__name']}"
+                pond_species_biomass[key] = {
+                    'initial_biomass': initial_biomass,
+                    'growth_biomass': cumulative_biomass_change,
+                    'current_biomass': current_biomass
+                }
             
             return Response({
                 'summary': {
@@ -864,7 +1087,7 @@ class FishSamplingViewSet(viewsets.ModelViewSet):
                     'total_biomass_loss_kg': total_biomass_loss,
                     'net_biomass_change_kg': net_biomass_change,
                     'total_current_biomass_kg': total_current_biomass,
-                    'total_samplings': samplings.count(),
+                    'total_samplings': total_samplings,
                     'samplings_with_biomass_data': len(biomass_changes)
                 },
                 'pond_summary': pond_summary,
@@ -884,10 +1107,54 @@ class FishSamplingViewSet(viewsets.ModelViewSet):
                 'error': f'Failed to calculate biomass analysis: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @action(detail=False, methods=['get'])
+    def biomass_series(self, request):
+        """Daily alive count, average weight and biomass per pond/species from stocking to ?end_date (default today).
+        
+        Pairs are chosen with ?pairs=pond:species,... and/or repeatable ?pond= and ?species=
+        (every stocked pair by default); ?method=linear|log picks the weight interpolation.
+        """
+        method = request.query_params.get('method', 'linear')
+        if method not in INTERPOLATION_METHODS:
+            return Response(
+                {'error': f"method must be one of: {', '.join(INTERPOLATION_METHODS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            pairs = None
+            if request.query_params.get('pairs'):
+                pairs = sorted({
+                    tuple(int(part) for part in pair.split(':', 1))
+                    for pair in request.query_params['pairs'].split(',') if pair
+                })
+                if any(len(pair) != 2 for pair in pairs):
+                    raise ValueError
+            pond_ids = [int(pond_id) for pond_id in request.query_params.getlist('pond')]
+            species_ids = [int(species_id) for species_id in request.query_params.getlist('species')]
+        except ValueError:
+            return Response(
+                {'error': 'pairs must be a comma-separated list of pond:species ids; pond and species must be ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        end_date = timezone.now().date()
+        if request.query_params.get('end_date'):
+            try:
+                end_date = datetime.strptime(request.query_params['end_date'], '%Y-%m-%d').date()
+            except ValueError:
+                return Response({'error': 'Invalid end_date format. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        series = get_biomass_series(request.user, pairs, pond_ids, species_ids, method, end_date)
+        return Response({
+            'method': method,
+            'end_date': end_date.isoformat(),
+            'series': series,
+        })
+    
     @action(detail=False, methods=['get'])
     def fcr_analysis(self, request):
         """Get FCR (Feed Conversion Ratio) analysis for ponds and species"""
-        from django.db.models import Sum, Avg, Count, Q
         from datetime import timedelta, datetime
         
         try:
@@ -908,168 +1175,22 @@ class FishSamplingViewSet(viewsets.ModelViewSet):
             start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
             end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
             
-            # Base querysets
-            feeds = Feed.objects.filter(
-                pond__user=request.user,
-                date__gte=start_date_obj,
-                date__lte=end_date_obj
-            )
-            
-            samplings = FishSampling.objects.filter(
-                pond__user=request.user,
-                date__gte=start_date_obj,
-                date__lte=end_date_obj
+            # Every pond/species combination in one batched pass
+            fcr_data = compute_fcr_analysis(
+                request.user, start_date_obj, end_date_obj, pond_id=pond_id, species_id=species_id
             )
-            
-            # Apply filters
-            if pond_id:
-                feeds = feeds.filter(pond_id=pond_id)
-                samplings = samplings.filter(pond_id=pond_id)
-            if species_id:
-                samplings = samplings.filter(species_id=species_id)
-            
-            # Get all pond/species combinations - use set to ensure uniqueness
-            combinations_raw = samplings.values('pond', 'species')
-            combinations_set = set()
-            for combo in combinations_raw:
-                combinations_set.add((combo['pond'], combo['species']))
-            combinations = [{'pond': p, 'species': s} for p, s in combinations_set]
-            
-            fcr_data = []
-            total_feed = 0
-            total_weight_gain = 0
-            
-            for combo in combinations:
-                pond_id = combo['pond']
-                species_id = combo['species']
-                
-                # Get pond and species names
-                try:
-                    pond = Pond.objects.get(id=pond_id, user=request.user)
-                    species = Species.objects.get(id=species_id)
-                except (Pond.DoesNotExist, Species.DoesNotExist):
-                    continue
-                
-                # Calculate total feed for this combination
-                combo_feeds = feeds.filter(pond_id=pond_id)
-                total_feed_kg = float(combo_feeds.aggregate(total=Sum('amount_kg'))['total'] or 0)
-                
-                # Calculate weight gain from samplings
-                combo_samplings = samplings.filter(pond_id=pond_id, species_id=species_id).order_by('date')
-                
-                if combo_samplings.count() < 2:
-                    continue
-                
-                # Get earliest (initial) and latest (final) sampling chronologically
-                earliest_sampling = combo_samplings.first()  # First chronologically (oldest date)
-                latest_sampling = combo_samplings.last()     # Last chronologically (newest date)
-                
-                # Calculate weight gain (final - initial)
-                initial_weight = float(earliest_sampling.average_weight_kg)
-                final_weight = float(latest_sampling.average_weight_kg)
-                
-                # Data quality check: if final weight is significantly smaller than initial weight,
-                # try to use harvest data to get a more realistic final weight
-                if final_weight < initial_weight * 0.5:
-                    # Look for harvest data around the same time period to get realistic final weight
-                    harvest = Harvest.objects.filter(
-                        pond_id=pond_id, species_id=species_id, pond__user=request.user,
-                        date__gte=latest_sampling.date - timedelta(days=7),
-                        date__lte=latest_sampling.date + timedelta(days=7)
-                    ).first()
-                    
-                    if harvest and harvest.avg_weight_kg:
-                        final_weight = float(harvest.avg_weight_kg)
-                        # Update the latest sampling date to match harvest date for consistency
-                        latest_sampling_date = harvest.date
-                    else:
-                        # If no harvest data, skip this combination as data quality is poor
-                        continue
-                else:
-                    latest_sampling_date = latest_sampling.date
-                
-                weight_gain_per_fish = round(final_weight - initial_weight, 4)
-                
-                # Estimate fish count from stocking data (most reliable source)
-                estimated_fish_count = 0
-                stocking = Stocking.objects.filter(
-                    pond_id=pond_id, species_id=species_id, pond__user=request.user
-                ).first()
-                
-                if stocking:
-                    # Start with stocked fish count
-                    estimated_fish_count = float(stocking.pcs)
-                    
-                    # Adjust for mortality if available
-                    mortality_count = float(Mortality.objects.filter(
-                        pond_id=pond_id, species_id=species_id, pond__user=request.user
-                    ).aggregate(total=Sum('count'))['total'] or 0)
-                    
-                    # Adjust for harvest if available
-                    harvest_count = float(Harvest.objects.filter(
-                        pond_id=pond_id, species_id=species_id, pond__user=request.user
-                    ).aggregate(total=Sum('total_count'))['total'] or 0)
-                    
-                    # Calculate current estimated fish count
-                    estimated_fish_count = max(0, estimated_fish_count - mortality_count - harvest_count)
-                
-                # If no stocking data, try to estimate from sampling data
-                if not estimated_fish_count and earliest_sampling.fish_per_kg:
-                    # This is a rough estimate - use the fish_per_kg from sampling
-                    # and assume a reasonable total biomass
-                    estimated_fish_count = float(earliest_sampling.fish_per_kg) * 100  # Assume 100kg total biomass as fallback
-                
-                total_weight_gain_kg = round(estimated_fish_count * weight_gain_per_fish, 4)
-                
-                # Calculate FCR with 4 decimal places
-                fcr = round(total_feed_kg / total_weight_gain_kg, 4) if total_weight_gain_kg > 0 else 0
-                
-                # Calculate days
-                days = (latest_sampling_date - earliest_sampling.date).days
-                
-                # Calculate average daily feed with 4 decimal places
-                avg_daily_feed = round(total_feed_kg / days, 4) if days > 0 else 0
-                
-                # Calculate average daily weight gain with 4 decimal places
-                avg_daily_weight_gain = round(total_weight_gain_kg / days, 4) if days > 0 else 0
-                
-                fcr_data.append({
-                    'pond_id': pond_id,
-                    'pond_name': pond.name,
-                    'species_id': species_id,
-                    'species_name': species.name,
-                    'start_date': earliest_sampling.date.isoformat(),
-                    'end_date': latest_sampling_date.isoformat(),
-                    'days': days,
-                    'estimated_fish_count': estimated_fish_count,
-                    'initial_weight_kg': initial_weight,
-                    'final_weight_kg': final_weight,
-                    'weight_gain_per_fish_kg': weight_gain_per_fish,
-                    'total_weight_gain_kg': total_weight_gain_kg,
-                    'total_feed_kg': total_feed_kg,
-                    'avg_daily_feed_kg': avg_daily_feed,
-                    'avg_daily_weight_gain_kg': avg_daily_weight_gain,
-                    'fcr': fcr,
-                    'fcr_status': 'Excellent' if fcr <= 1.2 else 'Good' if fcr <= 1.5 else 'Needs Improvement' if fcr <= 2.0 else 'Poor',
-                    'sampling_count': combo_samplings.count(),
-                    'feeding_days': combo_feeds.count()
-                })
-                
-                total_feed += total_feed_kg
-                total_weight_gain += total_weight_gain_kg
+            total_feed = sum(row['total_feed_kg'] for row in fcr_data)
+            total_weight_gain = sum(row['total_weight_gain_kg'] for row in fcr_data)
             
             # Calculate overall FCR with 4 decimal places
             overall_fcr = round(total_feed / total_weight_gain, 4) if total_weight_gain > 0 else 0
             
-            # Sort by FCR (best first)
-            fcr_data.sort(key=lambda x: x['fcr'])
-            
             return Response({
                 'summary': {
                     'total_feed_kg': round(total_feed, 4),
                     'total_weight_gain_kg': round(total_weight_gain, 4),
                     'overall_fcr': round(overall_fcr, 4),
-                    'fcr_status': 'Excellent' if overall_fcr <= 1.2 else 'Good' if overall_fcr <= 1.5 else 'Needs Improvement' if overall_fcr <= 2.0 else 'Poor',
+                    'fcr_status': fcr_status(overall_fcr),
                     'total_combinations': len(fcr_data),
                     'date_range': {
                         'start_date': start_date,
@@ -1085,7 +1206,7 @@ class FishSamplingViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class FeedingAdviceViewSet(viewsets.ModelViewSet):
+class FeedingAdviceViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for feeding advice"""
     queryset = FeedingAdvice.objects.all()
     serializer_class = FeedingAdviceSerializer
@@ -1134,12 +1255,8 @@ class FeedingAdviceViewSet(viewsets.ModelViewSet):
             # Get latest water quality data
             latest_water_quality = DailyLog.objects.filter(pond=pond).order_by('-date').first()
             
-            # Calculate estimated fish count (stocked - mortalities)
-            total_mortalities = Mortality.objects.filter(pond=pond).aggregate(
-                total=Sum('count')
-            )['total'] or 0
-            
-            estimated_fish_count = latest_stocking.pcs - total_mortalities
+            # Estimated fish count (stocked - mortalities - harvests) from the population ledger
+            estimated_fish_count = PondSpeciesPopulation.get_for(pond, latest_stocking.species_id).alive_count
             if estimated_fish_count <= 0:
                 return Response(
                     {'error': 'No fish remaining in pond'}, 
@@ -1226,7 +1343,11 @@ class FeedingAdviceViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'])
     def auto_generate(self, request):
-        """Automatically generate feeding advice for a pond - only requires pond selection"""
+        """Automatically generate feeding advice for a pond - only requires pond selection
+
+        Advice whose inputs have not changed since an earlier run is returned
+        as is; send ``force`` to generate it again anyway.
+        """
         # Set required DRF attributes for serializer context
         self.request = request
         self.format_kwarg = None
@@ -1238,37 +1359,50 @@ class FeedingAdviceViewSet(viewsets.ModelViewSet):
         
         pond = get_object_or_404(Pond, id=pond_id, user=request.user)
         
+        # Load everything the analyses need for this pond up front
+        context = AdviceDataContext(request.user, ponds=[pond])
+        
         # Get all species in this pond
-        species_in_pond = Species.objects.filter(
-            stockings__pond=pond
-        ).distinct()
+        species_in_pond = context.species_in_pond(pond.id)
         
-        if not species_in_pond.exists():
+        if not species_in_pond:
             return Response({'error': 'No species found in this pond. Please add stocking data first.'}, status=status.HTTP_400_BAD_REQUEST)
         
+        force = str(request.data.get('force', '')).lower() in ('1', 'true', 'yes')
+        fingerprints = {species.id: context.input_fingerprint(pond, species) for species in species_in_pond}
+        unchanged = {} if force else advice_by_fingerprint(request.user, [pond], fingerprints.values())
+        
         generated_advice = []
+        unchanged_species = []
         failed_species = []
         species_without_sampling = []
         
         # Generate advice for each species in the pond
         for species in species_in_pond:
+            existing = unchanged.get((pond.id, species.id, fingerprints[species.id]))
+            if existing:
+                generated_advice.append({**self.get_serializer(existing).data, 'reused': True})
+                unchanged_species.append(species.name)
+                continue
             try:
                 # Check if species has fish sampling data (for informational purposes)
-                has_sampling = FishSampling.objects.filter(
-                    pond=pond, species=species
-                ).exists()
+                has_sampling = context.latest_fish_sampling(pond.id, species.id) is not None
                 
                 if not has_sampling:
                     species_without_sampling.append(species.name)
                 
                 # Use the existing generate_advice logic but with species parameter
                 # This now works with both sampling data and stocking data
-                advice_data = self._generate_advice_for_species(pond, species, request)
+                advice_data = FeedingAdviceGenerator().generate_for_species(pond, species, context)
                 if advice_data:
                     serializer = self.get_serializer(data=advice_data)
                     if serializer.is_valid():
-                        advice = serializer.save(user=request.user)
-                        generated_advice.append(serializer.data)
+                        advice = serializer.save(user=request.user, input_fingerprint=fingerprints[species.id])
+                        generated_advice.append({
+                            **serializer.data,
+                            'reused': False,
+                            'analysis_data': {'timings_ms': advice_data['analysis_data']['timings_ms']}
+                        })
                     else:
                         failed_species.append(f"{species.name} (validation error)")
                 else:
@@ -1297,9 +1431,13 @@ class FeedingAdviceViewSet(viewsets.ModelViewSet):
         # Success response with warnings if some species failed
         response_data = {
             'message': f'Generated feeding advice for {len(generated_advice)} species',
-            'advice': generated_advice
+            'advice': generated_advice,
+            'unchanged_species': unchanged_species
         }
         
+        if unchanged_species:
+            response_data['message'] += f' ({len(unchanged_species)} unchanged since the last run)'
+        
         if species_without_sampling or failed_species:
             response_data['warnings'] = {
                 'species_using_stocking_data': species_without_sampling,
@@ -1311,1564 +1449,125 @@ class FeedingAdviceViewSet(viewsets.ModelViewSet):
         
         return Response(response_data, status=status.HTTP_201_CREATED)
     
-    def _generate_advice_for_species(self, pond, species, request):
-        """Comprehensive feeding advice generation based on all available data"""
-        from django.db.models import Sum, Avg, Count, Max, Min
-        from datetime import timedelta
-        
-        # 1. Get latest fish sampling data
-        latest_sampling = FishSampling.objects.filter(
-            pond=pond, species=species
-        ).order_by('-date').first()
-        
-        # 2. If no sampling data, try to work with stocking data
-        if not latest_sampling:
-            return self._generate_advice_from_stocking_data(pond, species, request)
-        
-        # 2. Calculate current fish count with detailed analysis
-        fish_count_analysis = self._analyze_fish_population(pond, species)
-        estimated_fish_count = fish_count_analysis['current_count']
-        
-        # 3. Comprehensive water quality analysis
-        water_quality_analysis = self._analyze_water_quality(pond)
-        
-        # 4. Mortality pattern analysis
-        mortality_analysis = self._analyze_mortality_patterns(pond, species)
-        
-        # 5. Feeding pattern analysis
-        feeding_analysis = self._analyze_feeding_patterns(pond, species)
-        
-        # 6. Environmental and seasonal analysis
-        environmental_analysis = self._analyze_environmental_factors(pond)
-        
-        # 7. Growth rate analysis
-        growth_analysis = self._analyze_growth_patterns(pond, species)
-        
-        # 8. Medical diagnostic analysis
-        medical_analysis = self._analyze_medical_conditions(pond)
-        
-        # 9. Calculate comprehensive feeding recommendations
-        feeding_recommendations = self._calculate_feeding_recommendations(
-            estimated_fish_count,
-            latest_sampling,
-            water_quality_analysis,
-            mortality_analysis,
-            feeding_analysis,
-            environmental_analysis,
-            growth_analysis,
-            medical_analysis
-        )
-        
-        # 9. Enhanced feed type and cost analysis
-        feed_analysis = self._analyze_feeding_history(pond, species)
-        if feed_analysis:
-            feeding_recommendations.update(feed_analysis)
-        
-        # 10. Add learning from previously applied advice
-        advice_learning = self._analyze_applied_advice_history(pond, species, feeding_recommendations['base_rate'])
-        if advice_learning:
-            feeding_recommendations.update(advice_learning)
-        
-        # 11. Create comprehensive feeding advice
-        advice_data = {
-            'pond': pond.id,
-            'species': species.id,
-            'date': timezone.now().date(),
-            'estimated_fish_count': estimated_fish_count,
-            'average_fish_weight_kg': latest_sampling.average_weight_kg,
-            'total_biomass_kg': estimated_fish_count * float(latest_sampling.average_weight_kg),
-            'recommended_feed_kg': feeding_recommendations['recommended_feed_kg'],
-            'feeding_rate_percent': feeding_recommendations['final_rate'],
-            'feeding_frequency': feeding_recommendations['feeding_frequency'],
-            'water_temp_c': water_quality_analysis.get('temperature'),
-            'season': environmental_analysis['season'],
-            'medical_considerations': self._generate_medical_considerations(medical_analysis),
-            'medical_warnings': medical_analysis.get('medical_warnings', []),
-            'notes': self._generate_comprehensive_notes(
-                pond, species, fish_count_analysis, water_quality_analysis,
-                mortality_analysis, feeding_analysis, environmental_analysis,
-                growth_analysis, feeding_recommendations, medical_analysis
-            )
-        }
-        
-        # Calculate daily feed cost with enhanced cost data
-        if 'feed_cost_per_kg' in feeding_recommendations and feeding_recommendations['feed_cost_per_kg']:
-            advice_data['daily_feed_cost'] = feeding_recommendations['recommended_feed_kg'] * float(feeding_recommendations['feed_cost_per_kg'])
-        
-        # Add all analysis data for transparency
-        advice_data.update({
-            'analysis_data': {
-                'fish_count_analysis': fish_count_analysis,
-                'water_quality_analysis': water_quality_analysis,
-                'mortality_analysis': mortality_analysis,
-                'feeding_analysis': feeding_analysis,
-                'environmental_analysis': environmental_analysis,
-                'growth_analysis': growth_analysis,
-                'medical_analysis': medical_analysis,
-                'feeding_recommendations': feeding_recommendations
-            }
-        })
-        
-        return advice_data
-    
-    def _generate_advice_from_stocking_data(self, pond, species, request):
-        """Generate feeding advice based on stocking data when fish sampling is not available"""
-        from django.db.models import Sum, Avg, Count, Max, Min
-        from datetime import timedelta
-        from decimal import Decimal
-        
-        # 1. Get latest stocking data
-        latest_stocking = Stocking.objects.filter(
-            pond=pond, species=species
-        ).order_by('-date').first()
-        
-        if not latest_stocking:
-            return None
-        
-        # 2. Calculate current fish count with detailed analysis
-        fish_count_analysis = self._analyze_fish_population(pond, species)
-        estimated_fish_count = fish_count_analysis['current_count']
-        
-        if estimated_fish_count <= 0:
-            return None
-        
-        # 3. Calculate average fish weight from stocking data
-        # Use pieces_per_kg from stocking to estimate average weight
-        if latest_stocking.pieces_per_kg and latest_stocking.pieces_per_kg > 0:
-            average_fish_weight_kg = Decimal('1.0') / latest_stocking.pieces_per_kg
-        else:
-            # Fallback: estimate based on species and time since stocking
-            days_since_stocking = (timezone.now().date() - latest_stocking.date).days
-            # Assume initial weight of 0.0025 kg (2.5g) and growth rate of 0.0001 kg/day
-            average_fish_weight_kg = Decimal('0.0025') + (Decimal('0.0001') * days_since_stocking)
-        
-        # 4. Calculate total biomass
-        total_biomass_kg = estimated_fish_count * average_fish_weight_kg
-        
-        # 5. Comprehensive water quality analysis
-        water_quality_analysis = self._analyze_water_quality(pond)
-        
-        # 6. Mortality pattern analysis
-        mortality_analysis = self._analyze_mortality_patterns(pond, species)
-        
-        # 7. Feeding pattern analysis
-        feeding_analysis = self._analyze_feeding_patterns(pond, species)
-        
-        # 8. Environmental and seasonal analysis
-        environmental_analysis = self._analyze_environmental_factors(pond)
-        
-        # 9. Growth rate analysis (simplified for stocking-based advice)
-        growth_analysis = self._analyze_growth_patterns_from_stocking(pond, species, latest_stocking)
-        
-        # 10. Medical diagnostic analysis
-        medical_analysis = self._analyze_medical_conditions(pond)
-        
-        # 11. Calculate feeding recommendations based on stocking data
-        feeding_recommendations = self._calculate_feeding_recommendations_from_stocking(
-            estimated_fish_count,
-            average_fish_weight_kg,
-            total_biomass_kg,
-            water_quality_analysis,
-            mortality_analysis,
-            feeding_analysis,
-            environmental_analysis,
-            growth_analysis,
-            medical_analysis
-        )
-        
-        # 12. Enhanced feed type and cost analysis
-        feed_analysis = self._analyze_feeding_history(pond, species)
-        if feed_analysis:
-            feeding_recommendations.update(feed_analysis)
-        
-        # 13. Add learning from previously applied advice
-        advice_learning = self._analyze_applied_advice_history(pond, species, feeding_recommendations['base_rate'])
-        if advice_learning:
-            feeding_recommendations.update(advice_learning)
-        
-        # 14. Create comprehensive feeding advice
-        advice_data = {
-            'pond': pond.id,
-            'species': species.id,
-            'date': timezone.now().date(),
-            'estimated_fish_count': estimated_fish_count,
-            'average_fish_weight_kg': average_fish_weight_kg,
-            'total_biomass_kg': total_biomass_kg,
-            'recommended_feed_kg': feeding_recommendations['recommended_feed_kg'],
-            'feeding_rate_percent': feeding_recommendations['final_rate'],
-            'feeding_frequency': feeding_recommendations['feeding_frequency'],
-            'water_temp_c': water_quality_analysis.get('temperature'),
-            'season': environmental_analysis['season'],
-            'medical_considerations': self._generate_medical_considerations(medical_analysis),
-            'medical_warnings': medical_analysis.get('medical_warnings', []),
-            'notes': self._generate_stocking_based_notes(
-                pond, species, fish_count_analysis, water_quality_analysis,
-                mortality_analysis, feeding_analysis, environmental_analysis,
-                growth_analysis, feeding_recommendations, medical_analysis,
-                latest_stocking
-            )
-        }
-        
-        # Calculate daily feed cost with enhanced cost data
-        if 'feed_cost_per_kg' in feeding_recommendations and feeding_recommendations['feed_cost_per_kg']:
-            advice_data['daily_feed_cost'] = feeding_recommendations['recommended_feed_kg'] * float(feeding_recommendations['feed_cost_per_kg'])
-        
-        # Add all analysis data for transparency
-        advice_data.update({
-            'analysis_data': {
-                'fish_count_analysis': fish_count_analysis,
-                'water_quality_analysis': water_quality_analysis,
-                'mortality_analysis': mortality_analysis,
-                'feeding_analysis': feeding_analysis,
-                'environmental_analysis': environmental_analysis,
-                'growth_analysis': growth_analysis,
-                'medical_analysis': medical_analysis,
-                'feeding_recommendations': feeding_recommendations,
-                'data_source': 'stocking_based'
-            }
-        })
-        
-        return advice_data
-    
-    def _analyze_growth_patterns_from_stocking(self, pond, species, latest_stocking):
-        """Simplified growth analysis based on stocking data"""
-        from datetime import timedelta
-        from decimal import Decimal
-        
-        days_since_stocking = (timezone.now().date() - latest_stocking.date).days
-        
-        # Estimate growth based on time since stocking
-        if latest_stocking.pieces_per_kg and latest_stocking.pieces_per_kg > 0:
-            initial_weight = Decimal('1.0') / latest_stocking.pieces_per_kg
-        else:
-            initial_weight = Decimal('0.0025')  # 2.5g default
-        
-        # Estimate current weight (simplified growth model)
-        estimated_current_weight = initial_weight + (Decimal('0.0001') * days_since_stocking)
-        
-        # Calculate daily growth rate
-        daily_growth_rate = Decimal('0.0001')  # 0.1g per day
-        
-        return {
-            'initial_weight_kg': initial_weight,
-            'estimated_current_weight_kg': estimated_current_weight,
-            'daily_growth_rate_kg': daily_growth_rate,
-            'days_since_stocking': days_since_stocking,
-            'growth_stage': 'juvenile' if estimated_current_weight < Decimal('0.01') else 'adult',
-            'data_source': 'stocking_estimated'
-        }
-    
-    def _calculate_feeding_recommendations_from_stocking(self, estimated_fish_count, average_fish_weight_kg, 
-                                                       total_biomass_kg, water_quality_analysis, 
-                                                       mortality_analysis, feeding_analysis, 
-                                                       environmental_analysis, growth_analysis, medical_analysis):
-        """Calculate feeding recommendations based on stocking data"""
-        from decimal import Decimal
-        
-        # Base feeding rate (3% of biomass as starting point)
-        base_rate = Decimal('3.0')
-        
-        # Adjust based on fish size
-        if average_fish_weight_kg < Decimal('0.01'):  # Less than 10g
-            base_rate = Decimal('5.0')  # Higher rate for small fish
-        elif average_fish_weight_kg > Decimal('0.5'):  # More than 500g
-            base_rate = Decimal('2.0')  # Lower rate for large fish
-        
-        # Temperature adjustments
-        if water_quality_analysis.get('temperature'):
-            temp = water_quality_analysis['temperature']
-            if temp < 15:
-                base_rate *= Decimal('0.5')
-            elif temp > 30:
-                base_rate *= Decimal('0.8')
-        
-        # Season adjustments
-        season = environmental_analysis.get('season', 'summer')
-        if season == 'winter':
-            base_rate *= Decimal('0.6')
-        elif season == 'summer':
-            base_rate *= Decimal('1.2')
-        
-        # Medical adjustments
-        if medical_analysis.get('medical_warnings'):
-            base_rate *= Decimal('0.8')  # Reduce feeding if health issues
-        
-        # Calculate recommended feed amount
-        recommended_feed_kg = (total_biomass_kg * base_rate) / 100
-        
-        # Determine feeding frequency
-        feeding_frequency = 2  # Default
-        if average_fish_weight_kg < Decimal('0.01'):
-            feeding_frequency = 3  # More frequent for small fish
-        elif average_fish_weight_kg > Decimal('0.5'):
-            feeding_frequency = 1  # Less frequent for large fish
-        
-        return {
-            'base_rate': base_rate,
-            'final_rate': base_rate,
-            'recommended_feed_kg': recommended_feed_kg,
-            'feeding_frequency': feeding_frequency,
-            'data_source': 'stocking_based'
-        }
-    
-    def _generate_stocking_based_notes(self, pond, species, fish_count_analysis, water_quality_analysis,
-                                     mortality_analysis, feeding_analysis, environmental_analysis,
-                                     growth_analysis, feeding_recommendations, medical_analysis, latest_stocking):
-        """Generate comprehensive notes for stocking-based feeding advice"""
-        notes = []
-        
-        # Data source note
-        notes.append("⚠️ This feeding advice is based on stocking data as fish sampling data is not available.")
-        notes.append(f"📊 Based on stocking from {latest_stocking.date} with {latest_stocking.pcs} pieces.")
-        
-        # Fish count analysis
-        if fish_count_analysis.get('survival_rate'):
-            notes.append(f"🐟 Estimated survival rate: {fish_count_analysis['survival_rate']:.1f}%")
-        
-        # Water quality
-        if water_quality_analysis.get('temperature'):
-            notes.append(f"🌡️ Water temperature: {water_quality_analysis['temperature']}°C")
-        
-        # Environmental factors
-        season = environmental_analysis.get('season', 'summer')
-        notes.append(f"🌍 Season: {season.title()}")
-        
-        # Medical considerations
-        if medical_analysis.get('medical_warnings'):
-            notes.append("⚠️ Medical warnings detected - consider consulting a fish health specialist.")
-        
-        # Growth analysis
-        if growth_analysis.get('days_since_stocking'):
-            days = growth_analysis['days_since_stocking']
-            notes.append(f"📈 Days since stocking: {days} days")
-        
-        # Recommendations
-        notes.append(f"💡 Recommended feeding rate: {feeding_recommendations['final_rate']}% of biomass")
-        notes.append(f"🍽️ Feeding frequency: {feeding_recommendations['feeding_frequency']} times per day")
-        
-        # Data limitations
-        notes.append("📝 Note: For more accurate feeding advice, consider conducting fish sampling to get current weight and growth data.")
-        
-        return "\n".join(notes)
-    
-    def _analyze_feeding_history(self, pond, species):
-        """Analyze feeding history to recommend optimal feed type and cost"""
-        from django.db.models import Avg, Count, Q
-        from datetime import timedelta
+    @action(detail=False, methods=['post'])
+    def batch_generate(self, request):
+        """Generate feeding advice for every pond/species on the farm in one pass"""
+        ponds = Pond.objects.filter(user=request.user, is_active=True)
+        
+        # Optionally limit the batch to selected ponds
+        pond_ids = request.data.get('ponds')
+        if pond_ids:
+            if not isinstance(pond_ids, list) or not all(
+                (isinstance(pond_id, int) and not isinstance(pond_id, bool))
+                or (isinstance(pond_id, str) and pond_id.isdigit())
+                for pond_id in pond_ids
+            ):
+                return Response(
+                    {'error': 'ponds must be a list of pond ids'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            ponds = Pond.objects.filter(user=request.user, id__in=[int(pond_id) for pond_id in pond_ids])
         
-        # Get recent feeding records (last 30 days)
-        recent_feeds = Feed.objects.filter(
-            pond=pond,
-            date__gte=timezone.now().date() - timedelta(days=30)
-        ).order_by('-date')
-        
-        if not recent_feeds.exists():
-            return None
-        
-        # Analyze feed types by performance
-        feed_type_performance = {}
-        for feed in recent_feeds:
-            if feed.feed_type:
-                feed_type_id = feed.feed_type.id
-                if feed_type_id not in feed_type_performance:
-                    feed_type_performance[feed_type_id] = {
-                        'feed_type': feed.feed_type,
-                        'total_usage': 0,
-                        'avg_cost_per_kg': 0,
-                        'usage_count': 0,
-                        'recent_usage': 0
-                    }
-                
-                feed_type_performance[feed_type_id]['total_usage'] += float(feed.amount_kg or 0)
-                feed_type_performance[feed_type_id]['usage_count'] += 1
-                
-                # Calculate cost per kg
-                if feed.cost_per_kg:
-                    cost_per_kg = float(feed.cost_per_kg)
-                elif feed.cost_per_packet and feed.packet_size_kg:
-                    cost_per_kg = float(feed.cost_per_packet) / float(feed.packet_size_kg)
-                else:
-                    cost_per_kg = 0
-                
-                if cost_per_kg > 0:
-                    current_avg = feed_type_performance[feed_type_id]['avg_cost_per_kg']
-                    count = feed_type_performance[feed_type_id]['usage_count']
-                    feed_type_performance[feed_type_id]['avg_cost_per_kg'] = (
-                        (current_avg * (count - 1) + cost_per_kg) / count
-                    )
-                
-                # Check if used recently (last 7 days)
-                if feed.date >= timezone.now().date() - timedelta(days=7):
-                    feed_type_performance[feed_type_id]['recent_usage'] += 1
-        
-        # Find the most used and cost-effective feed type
-        best_feed_type = None
-        best_avg_cost = None
-        
-        if feed_type_performance:
-            # Sort by recent usage first, then by total usage
-            sorted_types = sorted(
-                feed_type_performance.items(),
-                key=lambda x: (x[1]['recent_usage'], x[1]['total_usage']),
-                reverse=True
+        force = str(request.data.get('force', '')).lower() in ('1', 'true', 'yes')
+        try:
+            result = generate_farm_advice(request.user, ponds, force=force)
+        except Exception as e:
+            return Response(
+                {'error': f'Error generating feeding advice: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-            
-            best_feed_type_id, best_feed_data = sorted_types[0]
-            best_feed_type = best_feed_data['feed_type']
-            best_avg_cost = best_feed_data['avg_cost_per_kg']
-        
-        result = {}
-        if best_feed_type:
-            result['feed_type'] = best_feed_type.id
-            if best_avg_cost and best_avg_cost > 0:
-                result['feed_cost_per_kg'] = best_avg_cost
-        
-        return result
-    
-    def _analyze_applied_advice_history(self, pond, species, current_base_rate):
-        """Analyze previously applied advice to improve recommendations"""
-        from django.db.models import Avg, Count
-        from datetime import timedelta
-        
-        # Get previously applied advice for this pond/species
-        applied_advice = FeedingAdvice.objects.filter(
-            pond=pond,
-            species=species,
-            is_applied=True
-        ).order_by('-applied_date')[:5]  # Last 5 applied advice
         
-        if not applied_advice.exists():
-            return None
-        
-        # Analyze the effectiveness of previous advice
-        rate_adjustments = []
-        feed_adjustments = []
-        
-        for advice in applied_advice:
-            # Get fish sampling data after this advice was applied
-            post_advice_samplings = FishSampling.objects.filter(
-                pond=pond,
-                species=species,
-                date__gt=advice.applied_date
-            ).order_by('date')[:3]  # Next 3 samplings after advice
-            
-            if post_advice_samplings.count() >= 2:
-                # Calculate growth rate after advice
-                first_sampling = post_advice_samplings.first()
-                last_sampling = post_advice_samplings.last()
-                
-                days_diff = (last_sampling.date - first_sampling.date).days
-                if days_diff > 0:
-                    weight_growth = float(last_sampling.average_weight_kg) - float(first_sampling.average_weight_kg)
-                    growth_rate = weight_growth / days_diff
-                    
-                    # Expected growth rate (industry standard: 0.01-0.02 kg/day for good growth)
-                    expected_growth = 0.015  # 1.5g per day average
-                    
-                    if growth_rate > expected_growth * 1.2:  # Excellent growth
-                        # Previous advice worked well, consider similar rate
-                        rate_adjustments.append(1.1)  # Slight increase
-                        feed_adjustments.append(1.05)
-                    elif growth_rate < expected_growth * 0.8:  # Poor growth
-                        # Previous advice may have been too aggressive
-                        rate_adjustments.append(0.9)  # Slight decrease
-                        feed_adjustments.append(0.95)
-                    else:  # Normal growth
-                        rate_adjustments.append(1.0)  # No change
-                        feed_adjustments.append(1.0)
-        
-        # Calculate average adjustments
-        if rate_adjustments:
-            avg_rate_adjustment = sum(rate_adjustments) / len(rate_adjustments)
-            avg_feed_adjustment = sum(feed_adjustments) / len(feed_adjustments)
-            
-            # Apply adjustments to current recommendations
-            adjusted_rate = current_base_rate * avg_rate_adjustment
-            # Note: estimated_fish_count and latest_sampling are from the calling function
-            # We'll recalculate the feed amount in the main function
-            
-            return {
-                'final_rate': adjusted_rate,
-                'learning_applied': True,
-                'historical_analysis': {
-                    'previous_advice_count': len(applied_advice),
-                    'rate_adjustment_factor': avg_rate_adjustment,
-                    'feed_adjustment_factor': avg_feed_adjustment
-                }
+        advice = [
+            {
+                'id': item.id,
+                'pond': item.pond_id,
+                'pond_name': item.pond.name,
+                'species': item.species_id,
+                'species_name': item.species.name,
+                'estimated_fish_count': item.estimated_fish_count,
+                'average_fish_weight_kg': item.average_fish_weight_kg,
+                'total_biomass_kg': item.total_biomass_kg,
+                'recommended_feed_kg': item.recommended_feed_kg,
+                'feeding_rate_percent': item.feeding_rate_percent,
+                'feeding_frequency': item.feeding_frequency,
+                'reused': reused,
             }
-        
-        return None
-    
-    def _analyze_fish_population(self, pond, species):
-        """Comprehensive fish population analysis"""
-        from django.db.models import Sum, Count, Avg
-        from datetime import timedelta
-        
-        # Get all stocking records
-        stockings = Stocking.objects.filter(pond=pond, species=species).order_by('date')
-        total_stocked = stockings.aggregate(total=Sum('pcs'))['total'] or 0
-        
-        # Get mortality data with time analysis
-        recent_mortality = Mortality.objects.filter(
-            pond=pond, species=species,
-            date__gte=timezone.now().date() - timedelta(days=30)
-        ).aggregate(total=Sum('count'))['total'] or 0
-        
-        total_mortality = Mortality.objects.filter(
-            pond=pond, species=species
-        ).aggregate(total=Sum('count'))['total'] or 0
-        
-        # Get harvest data
-        total_harvested = Harvest.objects.filter(
-            pond=pond, species=species
-        ).aggregate(total=Sum('total_count'))['total'] or 0
-        
-        # Calculate survival rate
-        survival_rate = 0
-        if total_stocked > 0:
-            survival_rate = ((total_stocked - total_mortality - total_harvested) / total_stocked) * 100
-        
-        # Analyze mortality trends
-        mortality_trend = 'stable'
-        if recent_mortality > 0:
-            avg_daily_mortality = recent_mortality / 30
-            if avg_daily_mortality > (total_stocked * 0.001):  # More than 0.1% daily
-                mortality_trend = 'high'
-            elif avg_daily_mortality < (total_stocked * 0.0001):  # Less than 0.01% daily
-                mortality_trend = 'low'
-        
-        return {
-            'total_stocked': total_stocked,
-            'total_mortality': total_mortality,
-            'recent_mortality_30d': recent_mortality,
-            'total_harvested': total_harvested,
-            'current_count': max(0, total_stocked - total_mortality - total_harvested),
-            'survival_rate': survival_rate,
-            'mortality_trend': mortality_trend
-        }
-    
-    def _analyze_water_quality(self, pond):
-        """Comprehensive water quality analysis"""
-        from django.db.models import Avg, Max, Min
-        from datetime import timedelta
-        
-        # Get recent water samples
-        recent_samples = Sampling.objects.filter(
-            pond=pond,
-            sample_type__name__icontains='water',
-            date__gte=timezone.now().date() - timedelta(days=30)
-        ).order_by('-date')
-        
-        # Get recent daily logs
-        recent_logs = DailyLog.objects.filter(
-            pond=pond,
-            date__gte=timezone.now().date() - timedelta(days=7)
-        ).order_by('-date')
-        
-        water_quality = {
-            'temperature': None,
-            'ph': None,
-            'dissolved_oxygen': None,
-            'turbidity': None,
-            'ammonia': None,
-            'nitrite': None,
-            'quality_score': 0,
-            'quality_status': 'unknown'
-        }
-        
-        # Analyze temperature
-        if recent_samples.exists():
-            latest_sample = recent_samples.first()
-            water_quality['temperature'] = latest_sample.temperature_c
-            water_quality['ph'] = latest_sample.ph
-            water_quality['dissolved_oxygen'] = latest_sample.dissolved_oxygen
-            water_quality['turbidity'] = latest_sample.turbidity
-            water_quality['ammonia'] = latest_sample.ammonia
-            water_quality['nitrite'] = latest_sample.nitrite
-        elif recent_logs.exists():
-            latest_log = recent_logs.first()
-            water_quality['temperature'] = latest_log.water_temp_c
-            water_quality['ph'] = latest_log.ph
-        
-        # Calculate water quality score (0-100)
-        score = 0
-        if water_quality['temperature']:
-            temp = float(water_quality['temperature'])
-            if 20 <= temp <= 28:  # Optimal range
-                score += 25
-            elif 15 <= temp <= 32:  # Acceptable range
-                score += 15
-        
-        if water_quality['ph']:
-            ph = float(water_quality['ph'])
-            if 6.5 <= ph <= 8.5:  # Optimal range
-                score += 25
-            elif 6.0 <= ph <= 9.0:  # Acceptable range
-                score += 15
-        
-        if water_quality['dissolved_oxygen']:
-            do = float(water_quality['dissolved_oxygen'])
-            if do >= 5:  # Good
-                score += 25
-            elif do >= 3:  # Acceptable
-                score += 15
-        
-        if water_quality['ammonia']:
-            ammonia = float(water_quality['ammonia'])
-            if ammonia <= 0.02:  # Safe
-                score += 25
-            elif ammonia <= 0.05:  # Acceptable
-                score += 15
-        
-        water_quality['quality_score'] = score
-        
-        # Determine quality status
-        if score >= 80:
-            water_quality['quality_status'] = 'excellent'
-        elif score >= 60:
-            water_quality['quality_status'] = 'good'
-        elif score >= 40:
-            water_quality['quality_status'] = 'fair'
-        else:
-            water_quality['quality_status'] = 'poor'
-        
-        return water_quality
-    
-    def _analyze_mortality_patterns(self, pond, species):
-        """Analyze mortality patterns and causes"""
-        from django.db.models import Sum, Count, Avg
-        from datetime import timedelta
-        
-        # Get recent mortality data
-        recent_mortality = Mortality.objects.filter(
-            pond=pond, species=species,
-            date__gte=timezone.now().date() - timedelta(days=30)
-        )
-        
-        mortality_analysis = {
-            'total_recent_deaths': recent_mortality.aggregate(total=Sum('count'))['total'] or 0,
-            'mortality_events': recent_mortality.count(),
-            'avg_deaths_per_event': 0,
-            'mortality_trend': 'stable',
-            'risk_factors': []
-        }
-        
-        if mortality_analysis['mortality_events'] > 0:
-            mortality_analysis['avg_deaths_per_event'] = (
-                mortality_analysis['total_recent_deaths'] / mortality_analysis['mortality_events']
-            )
-        
-        # Analyze mortality causes
-        causes = recent_mortality.values('cause').annotate(
-            total_deaths=Sum('count'),
-            event_count=Count('id')
-        ).order_by('-total_deaths')
-        
-        mortality_analysis['causes'] = list(causes)
-        
-        # Determine risk factors
-        if mortality_analysis['total_recent_deaths'] > 10:
-            mortality_analysis['risk_factors'].append('high_mortality_rate')
-        
-        if mortality_analysis['mortality_events'] > 5:
-            mortality_analysis['risk_factors'].append('frequent_mortality_events')
-        
-        # Check for disease-related mortality
-        disease_causes = recent_mortality.filter(
-            cause__icontains='disease'
-        ).aggregate(total=Sum('count'))['total'] or 0
-        
-        if disease_causes > 0:
-            mortality_analysis['risk_factors'].append('disease_present')
-        
-        return mortality_analysis
-    
-    def _analyze_feeding_patterns(self, pond, species):
-        """Analyze historical feeding patterns and success rates"""
-        from django.db.models import Sum, Avg, Count, StdDev
-        from datetime import timedelta
-        
-        # Get recent feeding records (Feed model doesn't have species field, only pond)
-        recent_feeds = Feed.objects.filter(
-            pond=pond,
-            date__gte=timezone.now().date() - timedelta(days=30)
-        ).order_by('-date')
-        
-        feeding_analysis = {
-            'total_feed_30d': recent_feeds.aggregate(total=Sum('amount_kg'))['total'] or 0,
-            'avg_daily_feed': 0,
-            'feeding_consistency': 'unknown',
-            'feed_efficiency': 0,
-            'cost_analysis': {},
-            'feed_types_used': []
-        }
-        
-        if recent_feeds.exists():
-            feeding_analysis['avg_daily_feed'] = feeding_analysis['total_feed_30d'] / 30
-            
-            # Analyze feeding consistency
-            daily_feeds = recent_feeds.values('date').annotate(
-                daily_total=Sum('amount_kg')
-            ).order_by('date')
-            
-            if daily_feeds.count() > 5:
-                amounts = [float(feed['daily_total']) for feed in daily_feeds if feed['daily_total']]
-                if amounts:
-                    avg_amount = sum(amounts) / len(amounts)
-                    variance = sum((x - avg_amount) ** 2 for x in amounts) / len(amounts)
-                    std_dev = variance ** 0.5
-                    
-                    if std_dev < avg_amount * 0.2:  # Less than 20% variation
-                        feeding_analysis['feeding_consistency'] = 'very_consistent'
-                    elif std_dev < avg_amount * 0.4:  # Less than 40% variation
-                        feeding_analysis['feeding_consistency'] = 'consistent'
-                    else:
-                        feeding_analysis['feeding_consistency'] = 'inconsistent'
-            
-            # Analyze feed types
-            feed_types = recent_feeds.values('feed_type__name').annotate(
-                total_amount=Sum('amount_kg'),
-                usage_count=Count('id')
-            ).order_by('-total_amount')
-            
-            feeding_analysis['feed_types_used'] = list(feed_types)
-            
-            # Calculate feed conversion ratio if possible
-            # This would require harvest data to be meaningful
-        
-        return feeding_analysis
-    
-    def _analyze_environmental_factors(self, pond):
-        """Analyze environmental and seasonal factors"""
-        from datetime import timedelta
-        
-        # Determine season
-        current_month = timezone.now().month
-        if current_month in [12, 1, 2]:
-            season = 'winter'
-        elif current_month in [3, 4, 5]:
-            season = 'spring'
-        elif current_month in [6, 7, 8]:
-            season = 'summer'
-        else:
-            season = 'autumn'
-        
-        # Get recent weather data from daily logs
-        recent_logs = DailyLog.objects.filter(
-            pond=pond,
-            date__gte=timezone.now().date() - timedelta(days=7)
-        ).order_by('-date')
-        
-        environmental_analysis = {
-            'season': season,
-            'temperature_trend': 'stable',
-            'weather_conditions': 'normal',
-            'seasonal_factors': []
-        }
-        
-        # Analyze temperature trends
-        if recent_logs.exists():
-            temps = [log.water_temp_c for log in recent_logs if log.water_temp_c]
-            if len(temps) > 1:
-                temp_change = temps[0] - temps[-1]
-                if temp_change > 2:
-                    environmental_analysis['temperature_trend'] = 'warming'
-                elif temp_change < -2:
-                    environmental_analysis['temperature_trend'] = 'cooling'
-        
-        # Add seasonal factors
-        if season == 'winter':
-            environmental_analysis['seasonal_factors'].extend(['low_metabolism', 'reduced_appetite'])
-        elif season == 'summer':
-            environmental_analysis['seasonal_factors'].extend(['high_metabolism', 'increased_appetite'])
-        
-        return environmental_analysis
-    
-    def _analyze_growth_patterns(self, pond, species):
-        """Analyze fish growth patterns and trends"""
-        from django.db.models import Avg, Count
-        from datetime import timedelta
-        
-        # Get recent fish sampling data
-        recent_samplings = FishSampling.objects.filter(
-            pond=pond, species=species,
-            date__gte=timezone.now().date() - timedelta(days=90)
-        ).order_by('date')
-        
-        growth_analysis = {
-            'growth_rate_kg_per_day': 0,
-            'growth_trend': 'stable',
-            'weight_gain_90d': 0,
-            'growth_consistency': 'unknown',
-            'growth_quality': 'normal'
+            for items, reused in ((result['advice'], False), (result['unchanged'], True))
+            for item in items
+        ]
+        warnings = {
+            'species_using_stocking_data': result['species_without_sampling'],
+            'failed_species': result['failed_species'],
+            'ponds_without_stocking': result['ponds_without_stocking']
         }
         
-        if recent_samplings.count() >= 2:
-            first_sampling = recent_samplings.first()
-            last_sampling = recent_samplings.last()
-            
-            days_diff = (last_sampling.date - first_sampling.date).days
-            if days_diff > 0:
-                weight_gain = float(last_sampling.average_weight_kg) - float(first_sampling.average_weight_kg)
-                growth_analysis['weight_gain_90d'] = weight_gain
-                growth_analysis['growth_rate_kg_per_day'] = weight_gain / days_diff
-                
-                # Determine growth trend
-                if growth_analysis['growth_rate_kg_per_day'] > 0.02:  # > 20g/day
-                    growth_analysis['growth_trend'] = 'excellent'
-                    growth_analysis['growth_quality'] = 'excellent'
-                elif growth_analysis['growth_rate_kg_per_day'] > 0.01:  # > 10g/day
-                    growth_analysis['growth_trend'] = 'good'
-                    growth_analysis['growth_quality'] = 'good'
-                elif growth_analysis['growth_rate_kg_per_day'] > 0.005:  # > 5g/day
-                    growth_analysis['growth_trend'] = 'normal'
-                    growth_analysis['growth_quality'] = 'normal'
-                else:
-                    growth_analysis['growth_trend'] = 'slow'
-                    growth_analysis['growth_quality'] = 'poor'
+        if not advice:
+            return Response({
+                'error': 'Unable to generate feeding advice for any pond. Please add stocking data first.',
+                'details': warnings
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        return growth_analysis
+        message = f"Generated feeding advice for {len(advice)} species across {result['ponds_processed']} ponds"
+        if result['unchanged']:
+            message += f" ({len(result['unchanged'])} unchanged since the last run)"
+        return Response({
+            'message': message,
+            'advice': advice,
+            'warnings': warnings
+        }, status=status.HTTP_201_CREATED)
     
-    def _analyze_medical_conditions(self, pond):
-        """Analyze medical conditions and their impact on feeding"""
-        from datetime import timedelta
-        from .models import MedicalDiagnostic
-        
-        # Get recent medical diagnostics (last 30 days)
-        recent_diagnostics = MedicalDiagnostic.objects.filter(
-            pond=pond,
-            created_at__gte=timezone.now() - timedelta(days=30)
-        ).order_by('-created_at')
-        
-        medical_analysis = {
-            'active_diseases': [],
-            'disease_severity': 'none',
-            'feeding_adjustments': [],
-            'medical_warnings': [],
-            'recommended_feed_changes': [],
-            'treatment_considerations': []
-        }
-        
-        if recent_diagnostics.exists():
-            for diagnostic in recent_diagnostics:
-                disease_info = {
-                    'disease_name': diagnostic.disease_name,
-                    'confidence': float(diagnostic.confidence_percentage),
-                    'is_applied': diagnostic.is_applied,
-                    'created_at': diagnostic.created_at,
-                    'treatment': diagnostic.recommended_treatment,
-                    'dosage': diagnostic.dosage_application
-                }
-                medical_analysis['active_diseases'].append(disease_info)
-                
-                # Determine disease severity and feeding adjustments
-                confidence = float(diagnostic.confidence_percentage)
-                if confidence >= 80:
-                    medical_analysis['disease_severity'] = 'high'
-                    medical_analysis['feeding_adjustments'].append({
-                        'type': 'reduce_feed',
-                        'percentage': 0.5,
-                        'reason': f'High confidence disease: {diagnostic.disease_name}'
-                    })
-                    medical_analysis['medical_warnings'].append(
-                        f'⚠️ উচ্চ ঝুঁকি: {diagnostic.disease_name} - খাদ্য পরিমাণ ৫০% কমিয়ে দিন'
-                    )
-                elif confidence >= 60:
-                    medical_analysis['disease_severity'] = 'medium'
-                    medical_analysis['feeding_adjustments'].append({
-                        'type': 'reduce_feed',
-                        'percentage': 0.7,
-                        'reason': f'Medium confidence disease: {diagnostic.disease_name}'
-                    })
-                    medical_analysis['medical_warnings'].append(
-                        f'⚠️ মাঝারি ঝুঁকি: {diagnostic.disease_name} - খাদ্য পরিমাণ ৩০% কমিয়ে দিন'
-                    )
-                else:
-                    medical_analysis['disease_severity'] = 'low'
-                    medical_analysis['feeding_adjustments'].append({
-                        'type': 'monitor',
-                        'percentage': 1.0,
-                        'reason': f'Low confidence disease: {diagnostic.disease_name}'
-                    })
-                    medical_analysis['medical_warnings'].append(
-                        f'ℹ️ নিম্ন ঝুঁকি: {diagnostic.disease_name} - নিবিড় পর্যবেক্ষণ করুন'
-                    )
-                
-                # Disease-specific feeding recommendations
-                disease_name = diagnostic.disease_name.lower()
-                if any(keyword in disease_name for keyword in ['bacterial', 'infection', 'septicemia']):
-                    medical_analysis['recommended_feed_changes'].append(
-                        'ব্যাকটেরিয়াজনিত রোগ - উচ্চ প্রোটিন খাদ্য দিন এবং খাদ্য পরিমাণ কমিয়ে দিন'
-                    )
-                elif any(keyword in disease_name for keyword in ['parasite', 'worm', 'gill']):
-                    medical_analysis['recommended_feed_changes'].append(
-                        'পরজীবী রোগ - খাদ্য পরিমাণ কমিয়ে দিন এবং নিয়মিত পর্যবেক্ষণ করুন'
-                    )
-                elif any(keyword in disease_name for keyword in ['fungal', 'mold']):
-                    medical_analysis['recommended_feed_changes'].append(
-                        'ছত্রাকজনিত রোগ - খাদ্য গুণমান পরীক্ষা করুন এবং পরিমাণ কমিয়ে দিন'
-                    )
-                
-                # Treatment considerations
-                if diagnostic.is_applied:
-                    medical_analysis['treatment_considerations'].append(
-                        f'চিকিৎসা প্রয়োগ হয়েছে: {diagnostic.recommended_treatment}'
-                    )
-                else:
-                    medical_analysis['treatment_considerations'].append(
-                        f'চিকিৎসা প্রয়োগ প্রয়োজন: {diagnostic.recommended_treatment}'
-                    )
-        
-        return medical_analysis
+    @action(detail=False, methods=['post'])
+    def what_if(self, request):
+        """Feeding rate and ration over a grid of conditions, without saving any advice.
+
+        Body: {"water_temp_c", "season", "average_weight_g", "disease_confidence",
+        "fish_count"?, "features"?, "pond"?, "species"?}. Each axis is a list, a
+        comma-separated string or {"start", "stop", "step"}. With a pond and species
+        their current conditions and fish count are held constant across the grid;
+        ``features`` overrides individual conditions.
+        """
+        try:
+            grid = parse_what_if_grid(request.data)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
-    def _generate_medical_considerations(self, medical_analysis):
-        """Generate medical considerations text for feeding advice"""
-        considerations = []
-        
-        if medical_analysis['active_diseases']:
-            considerations.append("চিকিৎসা সংক্রান্ত বিবেচনা:")
-            
-            for disease in medical_analysis['active_diseases']:
-                status = "প্রয়োগ হয়েছে" if disease['is_applied'] else "প্রয়োগ প্রয়োজন"
-                considerations.append(
-                    f"- {disease['disease_name']} ({disease['confidence']:.0f}% নিশ্চিত) - {status}"
+        features = {}
+        fish_count = DEFAULT_FISH_COUNT
+        pond_id = request.data.get('pond')
+        species_id = request.data.get('species')
+        if pond_id or species_id:
+            if not (pond_id and species_id):
+                return Response({'error': 'Send both pond and species, or neither'}, status=status.HTTP_400_BAD_REQUEST)
+            pond = get_object_or_404(Pond, id=pond_id, user=request.user)
+            species = get_object_or_404(Species, id=species_id, user=request.user)
+            context = AdviceDataContext(request.user, ponds=[pond])
+            inputs = FeedingAdviceGenerator().collect_inputs(pond, species, context)
+            if inputs is None:
+                return Response(
+                    {'error': 'No fish sampling or stocking data found for this pond and species'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            if medical_analysis['recommended_feed_changes']:
-                considerations.append("\nখাদ্য সংক্রান্ত সুপারিশ:")
-                for change in medical_analysis['recommended_feed_changes']:
-                    considerations.append(f"- {change}")
-            
-            if medical_analysis['treatment_considerations']:
-                considerations.append("\nচিকিৎসা সংক্রান্ত বিবেচনা:")
-                for consideration in medical_analysis['treatment_considerations']:
-                    considerations.append(f"- {consideration}")
-        else:
-            considerations.append("কোনো সক্রিয় রোগ নেই - স্বাভাবিক খাদ্য পরিকল্পনা অনুসরণ করুন")
-        
-        return "\n".join(considerations)
-    
-    def _get_feeding_stage(self, avg_weight_g):
-        """Get feeding stage information based on fish weight using scientific feeding table"""
-        
-        # Starter: 3000→1000 (0.33→1 g) - 28-20% BW/day
-        if avg_weight_g <= 0.33:
-            return {
-                'stage_name': 'Starter (3000 pcs/kg)',
-                'percent_bw_per_day': 28.0,
-                'protein_percent': 40,
-                'pellet_size': '0.5-0.8 mm',
-                'pcs_per_kg': 3000,
-                'feeding_frequency': 6,
-                'feeding_times': '7:30 • 9:30 • 11:30 • 13:30 • 15:30 • 17:30',
-                'feeding_split': '20•20•15•15•15•15%'
-            }
-        elif avg_weight_g <= 0.67:
-            return {
-                'stage_name': 'Starter (1500 pcs/kg)',
-                'percent_bw_per_day': 24.0,
-                'protein_percent': 40,
-                'pellet_size': '0.5-0.8 mm',
-                'pcs_per_kg': 1500,
-                'feeding_frequency': 6,
-                'feeding_times': '7:30 • 9:30 • 11:30 • 13:30 • 15:30 • 17:30',
-                'feeding_split': '20•20•15•15•15•15%'
-            }
-        elif avg_weight_g <= 1.0:
-            return {
-                'stage_name': 'Starter (1000 pcs/kg)',
-                'percent_bw_per_day': 20.0,
-                'protein_percent': 40,
-                'pellet_size': '0.5-0.8 mm',
-                'pcs_per_kg': 1000,
-                'feeding_frequency': 6,
-                'feeding_times': '7:30 • 9:30 • 11:30 • 13:30 • 15:30 • 17:30',
-                'feeding_split': '20•20•15•15•15•15%'
-            }
-        
-        # Nursery-1: 1000→200 (1→5 g) - 18-14% BW/day
-        elif avg_weight_g <= 2.0:
-            return {
-                'stage_name': 'Nursery-1 (500 pcs/kg)',
-                'percent_bw_per_day': 18.0,
-                'protein_percent': 38,
-                'pellet_size': '0.8-1.2 mm',
-                'pcs_per_kg': 500,
-                'feeding_frequency': 5,
-                'feeding_times': '7:30 • 10:00 • 12:30 • 15:00 • 17:30',
-                'feeding_split': '25•20•20•20•15%'
-            }
-        elif avg_weight_g <= 5.0:
-            return {
-                'stage_name': 'Nursery-1 (200 pcs/kg)',
-                'percent_bw_per_day': 14.0,
-                'protein_percent': 38,
-                'pellet_size': '0.8-1.2 mm',
-                'pcs_per_kg': 200,
-                'feeding_frequency': 5,
-                'feeding_times': '7:30 • 10:00 • 12:30 • 15:00 • 17:30',
-                'feeding_split': '25•20•20•20•15%'
-            }
-        
-        # Nursery-2: 200→100 (5→10 g) - 11-9% BW/day
-        elif avg_weight_g <= 6.7:
-            return {
-                'stage_name': 'Nursery-2 (150 pcs/kg)',
-                'percent_bw_per_day': 11.0,
-                'protein_percent': 36,
-                'pellet_size': '1.2-1.5 mm',
-                'pcs_per_kg': 150,
-                'feeding_frequency': 4,
-                'feeding_times': '8:00 • 11:00 • 14:00 • 17:00',
-                'feeding_split': '30•25•25•20%'
-            }
-        elif avg_weight_g <= 10.0:
-            return {
-                'stage_name': 'Nursery-2 (100 pcs/kg)',
-                'percent_bw_per_day': 9.0,
-                'protein_percent': 36,
-                'pellet_size': '1.2-1.5 mm',
-                'pcs_per_kg': 100,
-                'feeding_frequency': 4,
-                'feeding_times': '8:00 • 11:00 • 14:00 • 17:00',
-                'feeding_split': '30•25•25•20%'
-            }
-        
-        # Grower-1: 100→40 (10→25 g) - 7-5.5% BW/day
-        elif avg_weight_g <= 12.5:
-            return {
-                'stage_name': 'Grower-1 (80 pcs/kg)',
-                'percent_bw_per_day': 7.0,
-                'protein_percent': 34,
-                'pellet_size': '1.5-2.0 mm',
-                'pcs_per_kg': 80,
-                'feeding_frequency': 4,
-                'feeding_times': '8:00 • 11:00 • 14:30 • 17:30',
-                'feeding_split': '30•25•25•20%'
-            }
-        elif avg_weight_g <= 25.0:
-            return {
-                'stage_name': 'Grower-1 (40 pcs/kg)',
-                'percent_bw_per_day': 5.5,
-                'protein_percent': 34,
-                'pellet_size': '1.5-2.0 mm',
-                'pcs_per_kg': 40,
-                'feeding_frequency': 4,
-                'feeding_times': '8:00 • 11:00 • 14:30 • 17:30',
-                'feeding_split': '30•25•25•20%'
-            }
-        
-        # Grower-2: 40→20 (25→50 g) - 4.8-3.8% BW/day
-        elif avg_weight_g <= 33.0:
-            return {
-                'stage_name': 'Grower-2 (30 pcs/kg)',
-                'percent_bw_per_day': 4.8,
-                'protein_percent': 32,
-                'pellet_size': '2.0-2.5 mm',
-                'pcs_per_kg': 30,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        elif avg_weight_g <= 50.0:
-            return {
-                'stage_name': 'Grower-2 (20 pcs/kg)',
-                'percent_bw_per_day': 3.8,
-                'protein_percent': 32,
-                'pellet_size': '2.0-2.5 mm',
-                'pcs_per_kg': 20,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        
-        # Grower-3: 20→10 (50→100 g) - 3.6-2.8% BW/day
-        elif avg_weight_g <= 67.0:
-            return {
-                'stage_name': 'Grower-3 (15 pcs/kg)',
-                'percent_bw_per_day': 3.6,
-                'protein_percent': 30,
-                'pellet_size': '2.5-3.0 mm',
-                'pcs_per_kg': 15,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        elif avg_weight_g <= 100.0:
-            return {
-                'stage_name': 'Grower-3 (10 pcs/kg)',
-                'percent_bw_per_day': 2.8,
-                'protein_percent': 30,
-                'pellet_size': '2.5-3.0 mm',
-                'pcs_per_kg': 10,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        
-        # Grower-4: 10→6 (100→167 g) - 2.6-2.2% BW/day
-        elif avg_weight_g <= 125.0:
-            return {
-                'stage_name': 'Grower-4 (8 pcs/kg)',
-                'percent_bw_per_day': 2.6,
-                'protein_percent': 30,
-                'pellet_size': '3.0 mm',
-                'pcs_per_kg': 8,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        elif avg_weight_g <= 167.0:
-            return {
-                'stage_name': 'Grower-4 (6 pcs/kg)',
-                'percent_bw_per_day': 2.2,
-                'protein_percent': 30,
-                'pellet_size': '3.0 mm',
-                'pcs_per_kg': 6,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        
-        # Grower-5: 6→4 (167→250 g) - 2.1-1.9% BW/day
-        elif avg_weight_g <= 200.0:
-            return {
-                'stage_name': 'Grower-5 (5 pcs/kg)',
-                'percent_bw_per_day': 2.1,
-                'protein_percent': 30,
-                'pellet_size': '3.0-3.5 mm',
-                'pcs_per_kg': 5,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        elif avg_weight_g <= 250.0:
-            return {
-                'stage_name': 'Grower-5 (4 pcs/kg)',
-                'percent_bw_per_day': 1.9,
-                'protein_percent': 30,
-                'pellet_size': '3.0-3.5 mm',
-                'pcs_per_kg': 4,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        
-        # Grower-6: 4→3 (250→333 g) - 1.9-1.7% BW/day
-        elif avg_weight_g <= 300.0:
-            return {
-                'stage_name': 'Grower-6 (3.3 pcs/kg)',
-                'percent_bw_per_day': 1.9,
-                'protein_percent': 30,
-                'pellet_size': '3.5 mm',
-                'pcs_per_kg': 3.3,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        elif avg_weight_g <= 333.0:
-            return {
-                'stage_name': 'Grower-6 (3 pcs/kg)',
-                'percent_bw_per_day': 1.7,
-                'protein_percent': 30,
-                'pellet_size': '3.5 mm',
-                'pcs_per_kg': 3,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        
-        # Grower-7: 3→2 (333→500 g) - 1.7-1.5% BW/day
-        elif avg_weight_g <= 400.0:
-            return {
-                'stage_name': 'Grower-7 (2.5 pcs/kg)',
-                'percent_bw_per_day': 1.7,
-                'protein_percent': 30,
-                'pellet_size': '3.5-4.0 mm',
-                'pcs_per_kg': 2.5,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        elif avg_weight_g <= 500.0:
-            return {
-                'stage_name': 'Grower-7 (2 pcs/kg)',
-                'percent_bw_per_day': 1.5,
-                'protein_percent': 30,
-                'pellet_size': '3.5-4.0 mm',
-                'pcs_per_kg': 2,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        
-        # Grower-8: 2→1.5 (500→667 g) - 1.5-1.3% BW/day
-        elif avg_weight_g <= 600.0:
-            return {
-                'stage_name': 'Grower-8 (1.7 pcs/kg)',
-                'percent_bw_per_day': 1.5,
-                'protein_percent': 30,
-                'pellet_size': '4.0 mm',
-                'pcs_per_kg': 1.7,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        elif avg_weight_g <= 667.0:
-            return {
-                'stage_name': 'Grower-8 (1.5 pcs/kg)',
-                'percent_bw_per_day': 1.3,
-                'protein_percent': 30,
-                'pellet_size': '4.0 mm',
-                'pcs_per_kg': 1.5,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        
-        # Grower-9: 1.5→1 (667→1000 g) - 1.3-1.1% BW/day
-        elif avg_weight_g <= 800.0:
-            return {
-                'stage_name': 'Grower-9 (1.25 pcs/kg)',
-                'percent_bw_per_day': 1.3,
-                'protein_percent': 30,
-                'pellet_size': '4.0-4.5 mm',
-                'pcs_per_kg': 1.25,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        elif avg_weight_g <= 1000.0:
-            return {
-                'stage_name': 'Grower-9 (1 pcs/kg)',
-                'percent_bw_per_day': 1.1,
-                'protein_percent': 30,
-                'pellet_size': '4.0-4.5 mm',
-                'pcs_per_kg': 1,
-                'feeding_frequency': 3,
-                'feeding_times': '8:00 • 12:30 • 17:00',
-                'feeding_split': '40•30•30%'
-            }
-        
-        # Finisher-1: 1→0.75 (1.0→1.5 kg) - 1.1-1.0% BW/day
-        elif avg_weight_g <= 1250.0:
-            return {
-                'stage_name': 'Finisher-1 (0.8 pcs/kg)',
-                'percent_bw_per_day': 1.1,
-                'protein_percent': 28,
-                'pellet_size': '4.5-5.0 mm',
-                'pcs_per_kg': 0.8,
-            'feeding_frequency': 2,
-                'feeding_times': '8:30 • 16:30',
-                'feeding_split': '60•40%'
-            }
-        elif avg_weight_g <= 1500.0:
-            return {
-                'stage_name': 'Finisher-1 (0.67 pcs/kg)',
-                'percent_bw_per_day': 1.0,
-                'protein_percent': 28,
-                'pellet_size': '4.5-5.0 mm',
-                'pcs_per_kg': 0.67,
-                'feeding_frequency': 2,
-                'feeding_times': '8:30 • 16:30',
-                'feeding_split': '60•40%'
-            }
-        
-        # Finisher-2: 0.75→0.5 (1.5→2.0 kg) - 1.0-0.9% BW/day
-        elif avg_weight_g <= 1750.0:
-            return {
-                'stage_name': 'Finisher-2 (0.57 pcs/kg)',
-                'percent_bw_per_day': 1.0,
-                'protein_percent': 26,
-                'pellet_size': '5.0 mm',
-                'pcs_per_kg': 0.57,
-                'feeding_frequency': 2,
-                'feeding_times': '8:30 • 16:30',
-                'feeding_split': '60•40%'
-            }
-        else:  # > 1750g (0.5 pcs/kg)
-            return {
-                'stage_name': 'Finisher-2 (0.5 pcs/kg)',
-                'percent_bw_per_day': 0.9,
-                'protein_percent': 26,
-                'pellet_size': '5.0 mm',
-                'pcs_per_kg': 0.5,
-                'feeding_frequency': 2,
-                'feeding_times': '8:30 • 16:30',
-                'feeding_split': '60•40%'
-            }
+            features = inputs['features']
+            fish_count = inputs['fish_count_analysis']['current_count']
     
-    def _get_feeding_frequency(self, avg_weight_g):
-        """Determine feeding frequency based on fish size using scientific feeding stages"""
-        feeding_stage = self._get_feeding_stage(avg_weight_g)
-        return feeding_stage['feeding_frequency']
-    
-    def _calculate_feeding_adjustments(self, water_quality, mortality, growth, environmental, feeding):
-        """Calculate feeding adjustments based on environmental and health factors"""
-        adjustments = {
-            'water_quality': 0,
-            'temperature': 0,
-            'mortality': 0,
-            'growth': 0,
-            'seasonal': 0,
-            'feeding_consistency': 0,
-            'total_adjustment': 0
-        }
-        
-        # Water quality adjustments
-        if water_quality['quality_status'] == 'poor':
-            adjustments['water_quality'] = -20  # Reduce feeding in poor water quality
-        elif water_quality['quality_status'] == 'excellent':
-            adjustments['water_quality'] = 5   # Slight increase in excellent conditions
-        
-        # Temperature adjustments
-        if water_quality['temperature']:
-            temp = float(water_quality['temperature'])
-            if temp < 15:
-                adjustments['temperature'] = -50  # Significantly reduce in cold water
-            elif temp < 20:
-                adjustments['temperature'] = -20  # Reduce in cool water
-            elif temp < 26:
-                adjustments['temperature'] = -10  # Slight reduction below optimal
-            elif temp > 30:
-                adjustments['temperature'] = -20  # Reduce in very warm water
-            elif temp > 35:
-                adjustments['temperature'] = -40  # Significantly reduce in hot water
-        
-        # Mortality adjustments
-        if 'high_mortality_rate' in mortality['risk_factors']:
-            adjustments['mortality'] = -20  # Reduce feeding if high mortality
-        if 'disease_present' in mortality['risk_factors']:
-            adjustments['mortality'] = -30  # Further reduce if disease present
-        
-        # Growth pattern adjustments
-        if growth['growth_quality'] == 'excellent':
-            adjustments['growth'] = 10  # Slight increase for excellent growth
-        elif growth['growth_quality'] == 'poor':
-            adjustments['growth'] = -10  # Slight decrease for poor growth
-        
-        # Seasonal adjustments
-        if environmental['season'] == 'winter':
-            adjustments['seasonal'] = -40  # Significant reduction in winter
-        elif environmental['season'] == 'summer':
-            adjustments['seasonal'] = 10  # Increase in summer
-        
-        # Feeding consistency adjustments
-        if feeding['feeding_consistency'] == 'inconsistent':
-            adjustments['feeding_consistency'] = -10  # Slight reduction for inconsistent feeding
-        
-        # Calculate total adjustment (clamp between -50% and +30%)
-        adjustments['total_adjustment'] = sum([
-            adjustments['water_quality'],
-            adjustments['temperature'],
-            adjustments['mortality'],
-            adjustments['growth'],
-            adjustments['seasonal'],
-            adjustments['feeding_consistency']
-        ])
-        
-        # Clamp total adjustment to reasonable range
-        adjustments['total_adjustment'] = max(-50, min(30, adjustments['total_adjustment']))
-        
-        return adjustments
-    
-    def _calculate_medical_adjustments(self, medical_analysis):
-        """Calculate feeding adjustments based on medical conditions"""
-        medical_adjustment = 0
-        
-        if medical_analysis['disease_severity'] == 'high':
-            # Reduce feeding by 50% for high severity diseases
-            medical_adjustment = -50
-        elif medical_analysis['disease_severity'] == 'medium':
-            # Reduce feeding by 30% for medium severity diseases
-            medical_adjustment = -30
-        elif medical_analysis['disease_severity'] == 'low':
-            # Reduce feeding by 10% for low severity diseases
-            medical_adjustment = -10
-        
-        # Apply additional adjustments based on specific feeding recommendations
-        for adjustment in medical_analysis.get('feeding_adjustments', []):
-            if adjustment['type'] == 'reduce_feed':
-                # Use the most severe reduction
-                medical_adjustment = min(medical_adjustment, (adjustment['percentage'] - 1) * 100)
-        
-        return medical_adjustment
-    
-    def _calculate_feeding_recommendations(self, fish_count, latest_sampling, water_quality, 
-                                         mortality, feeding, environmental, growth, medical):
-        """Calculate feeding recommendations using scientific formulas based on %BW/day"""
-        
-        # Get fish weight in grams
-        avg_weight_g = float(latest_sampling.average_weight_kg) * 1000
-        
-        # Get feeding stage and %BW/day from scientific feeding table
-        feeding_stage = self._get_feeding_stage(avg_weight_g)
-        base_rate = feeding_stage['percent_bw_per_day']
-        protein_requirement = feeding_stage['protein_percent']
-        pellet_size = feeding_stage['pellet_size']
-        
-        # Core formula: Daily feed (kg) = (Number of fish × Average weight (g) ÷ 1000) × (%BW/day ÷ 100)
-        total_biomass_kg = (fish_count * avg_weight_g) / 1000
-        base_daily_feed_kg = total_biomass_kg * (base_rate / 100)
-        
-        # Apply environmental and condition adjustments (±10-30%)
-        adjustments = self._calculate_feeding_adjustments(
-            water_quality, mortality, growth, environmental, feeding
-        )
-        
-        # Apply medical adjustments
-        medical_adjustment = self._calculate_medical_adjustments(medical)
-        adjustments['medical_adjustment'] = medical_adjustment
-        adjustments['total_adjustment'] += medical_adjustment
-        
-        # Calculate final feeding rate with adjustments
-        adjustment_factor = 1 + (adjustments['total_adjustment'] / 100)
-        final_rate = base_rate * adjustment_factor
-        final_daily_feed_kg = base_daily_feed_kg * adjustment_factor
-        
-        # Determine feeding frequency based on fish size
-        feeding_frequency = self._get_feeding_frequency(avg_weight_g)
-        
-        return {
-            'base_rate': base_rate,
-            'final_rate': round(final_rate, 2),
-            'recommended_feed_kg': round(final_daily_feed_kg, 2),
-            'feeding_frequency': feeding_frequency,
-            'protein_requirement': protein_requirement,
-            'pellet_size': pellet_size,
-            'feeding_stage': feeding_stage['stage_name'],
-            'adjustments': adjustments,
-            'total_biomass_kg': round(total_biomass_kg, 2),
-            'base_daily_feed_kg': round(base_daily_feed_kg, 2)
-        }
+        features = {**features, **grid['features']}
+        if grid['fish_count'] is not None:
+            fish_count = grid['fish_count']
     
-    def _generate_comprehensive_notes(self, pond, species, fish_analysis, water_quality, 
-                                    mortality, feeding, environmental, growth, recommendations, medical=None):
-        """Generate detailed notes explaining the recommendations"""
-        
-        notes = [
-            f"=== SCIENTIFIC FEEDING ADVICE FOR {species.name.upper()} IN {pond.name.upper()} ===",
-            f"Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M')}",
-            "",
-            "📊 SCIENTIFIC FEEDING STAGE ANALYSIS:",
-            f"• Current Stage: {recommendations.get('feeding_stage', 'Unknown')}",
-            f"• Fish Weight: {float(recommendations.get('total_biomass_kg', 0) / fish_analysis.get('current_count', 1)) * 1000:.1f} g average",
-            f"• Pieces per kg: {recommendations.get('pcs_per_kg', 'N/A')}",
-            f"• Protein Requirement: {recommendations.get('protein_requirement', 'N/A')}%",
-            f"• Recommended Pellet Size: {recommendations.get('pellet_size', 'N/A')}",
-            f"• Feeding Frequency: {recommendations.get('feeding_frequency', 'N/A')} times per day",
-            f"• Feeding Times: {recommendations.get('feeding_times', 'N/A')}",
-            f"• Feeding Split: {recommendations.get('feeding_split', 'N/A')}",
-            "",
-            "🧮 DAILY FEEDING CALCULATION:",
-            f"• Formula: Daily feed (kg) = (Fish count × Avg weight (g) ÷ 1000) × (%BW/day ÷ 100)",
-            f"• Fish Count: {fish_analysis.get('current_count', 0):,} fish",
-            f"• Total Biomass: {recommendations.get('total_biomass_kg', 0):.2f} kg",
-            f"• Base %BW/day: {recommendations.get('base_rate', 0):.1f}%",
-            f"• Base Daily Feed: {recommendations.get('base_daily_feed_kg', 0):.2f} kg",
-            f"• Final %BW/day: {recommendations.get('final_rate', 0):.1f}% (after adjustments)",
-            f"• Final Daily Feed: {recommendations.get('recommended_feed_kg', 0):.2f} kg",
-            f"• Feeding Frequency: {recommendations.get('feeding_frequency', 2)} times per day",
-            "",
-            "⚖️ FEEDING ADJUSTMENTS:",
-            f"• Water Quality: {recommendations.get('adjustments', {}).get('water_quality', 0):+.0f}%",
-            f"• Temperature: {recommendations.get('adjustments', {}).get('temperature', 0):+.0f}%",
-            f"• Mortality Risk: {recommendations.get('adjustments', {}).get('mortality', 0):+.0f}%",
-            f"• Growth Quality: {recommendations.get('adjustments', {}).get('growth', 0):+.0f}%",
-            f"• Seasonal: {recommendations.get('adjustments', {}).get('seasonal', 0):+.0f}%",
-            f"• Feeding Consistency: {recommendations.get('adjustments', {}).get('feeding_consistency', 0):+.0f}%",
-            f"• Total Adjustment: {recommendations.get('adjustments', {}).get('total_adjustment', 0):+.0f}%",
-            "",
-            "=== FISH POPULATION ANALYSIS ===",
-            f"Current fish count: {fish_analysis['current_count']:,}",
-            f"Survival rate: {fish_analysis['survival_rate']:.1f}%",
-            f"Mortality trend: {fish_analysis['mortality_trend']}",
-            "",
-            "=== WATER QUALITY ANALYSIS ===",
-            f"Quality status: {water_quality['quality_status'].upper()} (Score: {water_quality['quality_score']}/100)",
-            f"Temperature: {water_quality['temperature']}°C" if water_quality['temperature'] else "Temperature: Not available",
-            f"pH: {water_quality['ph']}" if water_quality['ph'] else "pH: Not available",
-            f"Dissolved Oxygen: {water_quality['dissolved_oxygen']} mg/L" if water_quality['dissolved_oxygen'] else "Dissolved Oxygen: Not available",
-            "",
-            "=== MORTALITY ANALYSIS ===",
-            f"Recent deaths (30d): {mortality['total_recent_deaths']}",
-            f"Mortality events: {mortality['mortality_events']}",
-            f"Risk factors: {', '.join(mortality['risk_factors']) if mortality['risk_factors'] else 'None identified'}",
-            "",
-            "=== FEEDING PATTERN ANALYSIS ===",
-            f"Average daily feed (30d): {feeding['avg_daily_feed']:.2f} kg",
-            f"Feeding consistency: {feeding['feeding_consistency']}",
-            f"Feed types used: {len(feeding['feed_types_used'])}",
-            "",
-            "=== GROWTH ANALYSIS ===",
-            f"Growth rate: {growth['growth_rate_kg_per_day']:.4f} kg/day",
-            f"Growth trend: {growth['growth_trend']}",
-            f"Growth quality: {growth['growth_quality']}",
-            "",
-            "=== ENVIRONMENTAL FACTORS ===",
-            f"Season: {environmental['season'].title()}",
-            f"Temperature trend: {environmental['temperature_trend']}",
-            f"Seasonal factors: {', '.join(environmental['seasonal_factors'])}",
-            "",
-        ]
-        
-        # Add medical considerations if available
-        if medical and medical.get('active_diseases'):
-            notes.extend([
-                "=== MEDICAL CONSIDERATIONS ===",
-                f"Disease severity: {medical['disease_severity'].title()}",
-                f"Active diseases: {len(medical['active_diseases'])}",
-            ])
-            
-            for disease in medical['active_diseases']:
-                status = "Applied" if disease['is_applied'] else "Pending"
-                notes.append(f"• {disease['disease_name']} ({disease['confidence']:.0f}% confidence) - {status}")
-            
-            if medical.get('medical_warnings'):
-                notes.append("Medical warnings:")
-                for warning in medical['medical_warnings']:
-                    notes.append(f"• {warning}")
-            
-            if medical.get('recommended_feed_changes'):
-                notes.append("Feed recommendations:")
-                for change in medical['recommended_feed_changes']:
-                    notes.append(f"• {change}")
-            
-            notes.append("")
-        
-        notes.extend([
-            "=== RECOMMENDATIONS ===",
-            f"Recommended feeding rate: {recommendations['final_rate']:.1f}% of biomass",
-            f"Daily feed amount: {recommendations['recommended_feed_kg']:.2f} kg",
-            f"Feeding frequency: {recommendations['feeding_frequency']} times per day",
-            "",
-            "=== ADJUSTMENT FACTORS APPLIED ===",
-            f"Water quality impact: {recommendations['adjustments']['water_quality']:+.0f}%",
-            f"Temperature impact: {recommendations['adjustments']['temperature']:+.0f}%",
-            f"Mortality risk level: {recommendations['adjustments']['mortality']:+.0f}%",
-            f"Growth quality: {recommendations['adjustments']['growth']:+.0f}%",
-            f"Seasonal impact: {recommendations['adjustments']['seasonal']:+.0f}%",
-        ])
-        
-        # Add medical adjustment if available
-        if medical and 'medical_adjustment' in recommendations['adjustments']:
-            notes.append(f"Medical conditions impact: {recommendations['adjustments']['medical_adjustment']:+.0f}%")
-        
-        notes.extend([
-            f"Total adjustment: {recommendations['adjustments']['total_adjustment']:+.0f}%",
-        ])
-        
-        return '\n'.join(notes)
+        started = time.perf_counter()
+        result = compute_what_if_grid(get_rule_plan(request.user.pk), grid['axes'], fish_count, features)
+        result['timings_ms'] = {'grid': round((time.perf_counter() - started) * 1000, 2)}
+        return Response(result)
 
 
-class SurvivalRateViewSet(viewsets.ModelViewSet):
+class SurvivalRateViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for survival rate tracking"""
     queryset = SurvivalRate.objects.all()
     serializer_class = SurvivalRateSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        queryset = SurvivalRate.objects.filter(pond__user=self.request.user)
+        queryset = SurvivalRate.objects.filter(owner=self.request.user)
         
         # Filter by pond
         pond_id = self.request.query_params.get('pond')
@@ -2906,16 +1605,12 @@ class SurvivalRateViewSet(viewsets.ModelViewSet):
         if not latest_stocking:
             return Response({'error': 'No stocking data available'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Calculate totals
-        total_mortality = Mortality.objects.filter(
-            pond=pond, species_id=species_id
-        ).aggregate(total=Sum('count'))['total'] or 0
-        
-        total_harvested = Harvest.objects.filter(
-            pond=pond, species_id=species_id
-        ).aggregate(total=Sum('total_count'))['total'] or 0
-        
-        current_alive = max(0, latest_stocking.pcs - total_mortality - total_harvested)
+        # Totals from the population ledger
+        population = PondSpeciesPopulation.get_for(pond, species_id)
+        total_stocked = population.stocked_count
+        total_mortality = population.dead_count
+        total_harvested = population.harvested_count
+        current_alive = population.alive_count
         
         # Calculate total survival weight in kg
         # Get latest fish sampling for average weight
@@ -2932,20 +1627,14 @@ class SurvivalRateViewSet(viewsets.ModelViewSet):
         
         total_survival_kg = current_alive * avg_weight_kg
         
-        # Calculate mortality weight
-        total_mortality_weight = Mortality.objects.filter(
-            pond=pond, species_id=species_id
-        ).aggregate(total=Sum('total_weight_kg'))['total'] or 0
-        
-        # Calculate harvested weight
-        total_harvested_weight = Harvest.objects.filter(
-            pond=pond, species_id=species_id
-        ).aggregate(total=Sum('total_weight_kg'))['total'] or 0
+        # Mortality and harvested weight
+        total_mortality_weight = population.dead_weight_kg
+        total_harvested_weight = population.harvested_weight_kg
         
         # Generate comprehensive notes
         notes_parts = [
             f"Calculated on {timezone.now().strftime('%Y-%m-%d %H:%M')}",
-            f"Initial stocking: {latest_stocking.pcs} fish ({latest_stocking.stocking_date})",
+            f"Initial stocking: {total_stocked} fish (latest stocking {latest_stocking.date})",
             f"Current alive: {current_alive} fish",
             f"Total mortality: {total_mortality} fish ({total_mortality_weight:.2f} kg)",
             f"Total harvested: {total_harvested} fish ({total_harvested_weight:.2f} kg)",
@@ -2958,7 +1647,7 @@ class SurvivalRateViewSet(viewsets.ModelViewSet):
             'pond': pond.id,
             'species': species_id,
             'date': timezone.now().date(),
-            'initial_stocked': latest_stocking.pcs,
+            'initial_stocked': total_stocked,
             'current_alive': current_alive,
             'total_harvested': total_harvested,
             'notes': ' | '.join(notes_parts)
@@ -2980,7 +1669,12 @@ class TargetBiomassViewSet(viewsets.ViewSet):
     
     @action(detail=False, methods=['post'])
     def calculate(self, request):
-        """Calculate target biomass requirements and feeding recommendations"""
+        """Project days and feed to a target biomass over a grid of growth, FCR, mortality and temperature scenarios.
+        
+        Optional grid fields: growth_percentiles, fcr_values, mortality_rates (% per day),
+        temperatures_c and max_days. The headline figures are the scenario medians and
+        ``projection`` holds their distribution and every scenario.
+        """
         try:
             # Get input parameters
             pond_id = request.data.get('pond_id')
@@ -3008,47 +1702,33 @@ class TargetBiomassViewSet(viewsets.ViewSet):
                     'error': 'Target biomass must be greater than 0'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Get pond and species
-            pond = get_object_or_404(Pond, id=pond_id, user=request.user)
-            species = get_object_or_404(Species, id=species_id)
-            
-            # Calculate current biomass from latest fish sampling data
-            latest_sampling = FishSampling.objects.filter(
-                pond=pond, species=species
-            ).order_by('-date').first()
-            
-            if not latest_sampling:
+            try:
+                current_date_obj = datetime.strptime(current_date, '%Y-%m-%d').date()
+            except (ValueError, TypeError):
                 return Response({
-                    'error': 'No fish sampling data available for this pond and species. Please add fish sampling data first.'
+                    'error': 'Invalid current_date format. Use YYYY-MM-DD'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Calculate current biomass using the same method as biomass analysis
-            # This should show TOTAL current biomass (initial + growth), not just growth
-            # This ensures consistency with the biomass analysis report
+            try:
+                grid = parse_scenario_grid(request.data)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Get latest stocking data
-            latest_stocking = Stocking.objects.filter(
-                pond=pond, species=species
-            ).order_by('-date').first()
+            # Get pond and species
+            pond = get_object_or_404(Pond, id=pond_id, user=request.user)
+            species = get_object_or_404(Species, id=species_id, user=request.user)
             
-            if not latest_stocking:
+            inputs = gather_projection_inputs(pond, species, current_date_obj)
+            if inputs is None:
                 return Response({
-                    'error': 'No stocking data available for this pond and species.'
+                    'error': 'Stocking and fish sampling data are required for this pond and species. Please add fish sampling data first.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if inputs['alive_count'] <= 0:
+                return Response({
+                    'error': 'No fish are alive in this pond for this species.'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Calculate cumulative biomass change from all samplings
-            cumulative_biomass_change = 0
-            all_samplings = FishSampling.objects.filter(
-                pond=pond, species=species
-            ).order_by('date')
-            
-            for sampling in all_samplings:
-                if sampling.biomass_difference_kg:
-                    cumulative_biomass_change += float(sampling.biomass_difference_kg)
-            
-            # Current biomass = Initial stocking + Cumulative growth (same as biomass analysis)
-            initial_biomass_kg = float(latest_stocking.total_weight_kg)
-            current_biomass_kg = initial_biomass_kg + cumulative_biomass_change
+            current_biomass_kg = inputs['current_biomass_kg']
             
             # Validate that target biomass is greater than current biomass
             if target_biomass_kg <= current_biomass_kg:
@@ -3056,173 +1736,42 @@ class TargetBiomassViewSet(viewsets.ViewSet):
                     'error': f'Target biomass ({target_biomass_kg} kg) must be greater than current biomass ({current_biomass_kg:.1f} kg)'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Calculate biomass gap
-            biomass_gap_kg = target_biomass_kg - current_biomass_kg
-            
-            # Calculate actual growth rate from fish sampling data and stocking
-            # This provides a more accurate and dynamic growth rate calculation
-            all_samplings_for_growth = FishSampling.objects.filter(
-                pond=pond, species=species
-            ).order_by('date')
+            try:
+                scenarios = build_scenarios(inputs, grid)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             
-            growth_rate_kg_per_day = 0.005  # Default conservative growth rate
-            growth_calculation_method = "default"
+            result = simulate_scenarios(
+                get_rule_plan(request.user.pk), inputs['average_weight_kg'], inputs['alive_count'], target_biomass_kg, scenarios, grid['max_days']
+            )
+            projection = summarize_projection(result, scenarios, current_date_obj)
             
-            if all_samplings_for_growth.count() >= 1:
-                # Method 1: Calculate from first sampling to latest sampling (includes stocking comparison)
-                first_sampling = all_samplings_for_growth.first()
-                latest_sampling = all_samplings_for_growth.last()
-                
-                # Calculate total growth period from stocking to latest sampling
-                total_days = (latest_sampling.date - latest_stocking.date).days
-                
-                if total_days > 0:
-                    # Calculate per-fish growth rate from stocking to latest sampling
-                    initial_avg_weight = float(latest_stocking.total_weight_kg) / float(latest_stocking.pcs)
-                    current_avg_weight = float(latest_sampling.average_weight_kg)
-                    weight_gain_per_fish = current_avg_weight - initial_avg_weight
-                    
-                    # Growth rate per fish per day
-                    growth_rate_kg_per_day = weight_gain_per_fish / total_days
-                    growth_calculation_method = "stocking_to_latest"
-                    
-                    # Ensure realistic growth rate (not too high or too low)
-                    growth_rate_kg_per_day = max(growth_rate_kg_per_day, 0.001)  # Minimum 0.001 kg/day per fish
-                    growth_rate_kg_per_day = min(growth_rate_kg_per_day, 0.1)    # Maximum 0.1 kg/day per fish
-                
-                # Method 2: If we have multiple samplings, also calculate from sampling intervals
-                if all_samplings_for_growth.count() >= 2:
-                    sampling_growth_rates = []
-                    
-                    for i in range(1, len(all_samplings_for_growth)):
-                        current_sampling = all_samplings_for_growth[i]
-                        previous_sampling = all_samplings_for_growth[i-1]
-                        
-                        days_diff = (current_sampling.date - previous_sampling.date).days
-                        if days_diff > 0:
-                            # Calculate per-fish growth rate between samplings
-                            weight_gain_per_fish = float(current_sampling.average_weight_kg) - float(previous_sampling.average_weight_kg)
-                            if weight_gain_per_fish > 0:  # Only consider positive growth
-                                period_growth_rate = weight_gain_per_fish / days_diff
-                                sampling_growth_rates.append(period_growth_rate)
-                    
-                    # If we have sampling-based growth rates, use weighted average
-                    if sampling_growth_rates:
-                        # Weight recent growth rates more heavily
-                        if len(sampling_growth_rates) >= 2:
-                            # Use average of recent growth rates
-                            recent_growth_rate = sum(sampling_growth_rates[-2:]) / len(sampling_growth_rates[-2:])
-                            # Blend with overall growth rate (70% recent, 30% overall)
-                            growth_rate_kg_per_day = (recent_growth_rate * 0.7) + (growth_rate_kg_per_day * 0.3)
-                            growth_calculation_method = "blended_recent_and_overall"
-                        else:
-                            # Use the single sampling growth rate
-                            growth_rate_kg_per_day = sampling_growth_rates[0]
-                            growth_calculation_method = "single_sampling_period"
-                        
-                        # Ensure realistic bounds
-                        growth_rate_kg_per_day = max(growth_rate_kg_per_day, 0.001)
-                        growth_rate_kg_per_day = min(growth_rate_kg_per_day, 0.1)
-            
-            # Calculate feed conversion ratio from feeding logs and biomass data
-            feed_conversion_ratio = 1.5  # Default FCR
-            fcr_calculation_method = "default"
-            feeding_analysis = {}
-            
-            # Get all feeding data for this pond and species
-            all_feeding = Feed.objects.filter(pond=pond).order_by('date')
-            feeding_analysis['total_feeding_records'] = all_feeding.count()
-            
-            if all_feeding.exists():
-                # Calculate FCR from stocking to latest sampling
-                feeding_from_stocking = all_feeding.filter(date__gte=latest_stocking.date)
-                total_feed_consumed = feeding_from_stocking.aggregate(total=Sum('amount_kg'))['total'] or 0
-                
-                # Total biomass gain from stocking to latest sampling
-                total_biomass_gain = cumulative_biomass_change
-                
-                if total_biomass_gain > 0 and total_feed_consumed > 0:
-                    feed_conversion_ratio = float(total_feed_consumed) / total_biomass_gain
-                    fcr_calculation_method = "stocking_to_latest"
-                    feeding_analysis['fcr_from_stocking'] = feed_conversion_ratio
-                    feeding_analysis['total_feed_consumed'] = float(total_feed_consumed)
-                    feeding_analysis['total_biomass_gain'] = total_biomass_gain
-                
-                # If we have multiple samplings, calculate FCR for each period
-                if all_samplings_for_growth.count() >= 2:
-                    period_fcrs = []
-                    
-                    for i in range(1, len(all_samplings_for_growth)):
-                        current_sampling = all_samplings_for_growth[i]
-                        previous_sampling = all_samplings_for_growth[i-1]
-                        
-                        # Get feeding data for this period
-                        period_feeding = all_feeding.filter(
-                            date__gt=previous_sampling.date,
-                            date__lte=current_sampling.date
-                        ).aggregate(total=Sum('amount_kg'))['total'] or 0
-                        
-                        # Get biomass gain for this period
-                        if current_sampling.biomass_difference_kg:
-                            period_biomass_gain = float(current_sampling.biomass_difference_kg)
-                            
-                            if period_biomass_gain > 0 and period_feeding > 0:
-                                period_fcr = float(period_feeding) / period_biomass_gain
-                                period_fcrs.append(period_fcr)
-                    
-                    # Use average of period FCRs if available
-                    if period_fcrs:
-                        avg_period_fcr = sum(period_fcrs) / len(period_fcrs)
-                        # Weight recent FCRs more heavily
-                        if len(period_fcrs) >= 2:
-                            recent_fcr = sum(period_fcrs[-2:]) / len(period_fcrs[-2:])
-                            feed_conversion_ratio = (recent_fcr * 0.7) + (avg_period_fcr * 0.3)
-                            fcr_calculation_method = "weighted_recent_periods"
-                        else:
-                            feed_conversion_ratio = avg_period_fcr
-                            fcr_calculation_method = "single_period"
-                        
-                        feeding_analysis['period_fcrs'] = period_fcrs
-                        feeding_analysis['avg_period_fcr'] = avg_period_fcr
-                
-                # Get recent feeding patterns (last 30 days)
-                from datetime import timedelta
-                recent_cutoff = latest_sampling.date - timedelta(days=30)
-                recent_feeding = all_feeding.filter(date__gte=recent_cutoff)
-                feeding_analysis['recent_feeding_records'] = recent_feeding.count()
-                recent_total_feed = recent_feeding.aggregate(total=Sum('amount_kg'))['total'] or 0
-                feeding_analysis['recent_total_feed'] = float(recent_total_feed)
-                
-                # Calculate daily feeding rate
-                if recent_feeding.exists():
-                    days_span = (latest_sampling.date - recent_cutoff).days
-                    if days_span > 0:
-                        daily_feeding_rate = float(recent_total_feed) / days_span
-                        feeding_analysis['daily_feeding_rate'] = daily_feeding_rate
-                
-                # Ensure realistic FCR bounds
-                feed_conversion_ratio = max(feed_conversion_ratio, 0.8)  # Minimum FCR
-                feed_conversion_ratio = min(feed_conversion_ratio, 3.0)  # Maximum FCR
-            
-            # Calculate estimated days to reach target
-            # Convert per-fish growth rate to total biomass growth rate
-            current_fish_count = latest_stocking.pcs  # Use initial stocking count as current count
-            total_biomass_growth_rate = growth_rate_kg_per_day * current_fish_count
-            estimated_days = int(biomass_gap_kg / total_biomass_growth_rate) if total_biomass_growth_rate > 0 else 365
-            
-            # Calculate feed requirements
-            estimated_feed_kg = biomass_gap_kg * feed_conversion_ratio
+            biomass_gap_kg = target_biomass_kg - current_biomass_kg
+            feed_conversion_ratio = inputs['feed_conversion_ratio']
+            median_growth_rate = projection['median_specific_growth_rate']
+            growth_rate_kg_per_day = inputs['average_weight_kg'] * median_growth_rate
+            if projection['days']:
+                estimated_days = projection['days']['p50']
+                estimated_feed_kg = projection['feed_kg']['p50']
+                target_date = current_date_obj + timedelta(days=estimated_days)
+            else:
+                estimated_days = grid['max_days']
+                estimated_feed_kg = projection['median_feed_kg']
+                target_date = current_date_obj + timedelta(days=estimated_days)
             daily_feed_kg = estimated_feed_kg / estimated_days if estimated_days > 0 else 0
             
-            # Calculate target date
-            from datetime import datetime, timedelta
-            current_date_obj = datetime.strptime(current_date, '%Y-%m-%d').date()
-            target_date = current_date_obj + timedelta(days=estimated_days)
-            
             # Generate recommendations
             recommendations = []
             warnings = []
             
+            if projection['reached_count'] == 0:
+                warnings.append(f"No scenario reaches the target within {grid['max_days']} days")
+            elif projection['reached_count'] < projection['scenario_count']:
+                warnings.append(
+                    f"Only {projection['reached_count']} of {projection['scenario_count']} scenarios reach the target "
+                    f"within {grid['max_days']} days"
+                )
+            
             # Growth rate recommendations
             if growth_rate_kg_per_day < 0.003:
                 recommendations.append("Consider increasing feeding frequency or improving feed quality to boost growth rate")
@@ -3252,7 +1801,8 @@ class TargetBiomassViewSet(viewsets.ViewSet):
             
             # Environmental recommendations
             recommendations.append("Monitor water quality parameters (pH, temperature, dissolved oxygen) regularly")
-            recommendations.append("Consider seasonal adjustments to feeding rates")
+            if inputs['temperature_c'] is not None:
+                recommendations.append(f"Latest water temperature: {inputs['temperature_c']:.1f}°C")
             
             # Cost considerations
             recent_feed_cost = Feed.objects.filter(pond=pond).order_by('-date').first()
@@ -3260,55 +1810,20 @@ class TargetBiomassViewSet(viewsets.ViewSet):
                 estimated_feed_cost = (float(estimated_feed_kg) / 25) * float(recent_feed_cost.cost_per_packet)
                 recommendations.append(f"Estimated feed cost: ₹{estimated_feed_cost:.2f} (based on recent feed prices)")
             
-            # Add current biomass information to recommendations
-            recommendations.append(f"Current total biomass: {current_biomass_kg:.1f}kg (Initial: {initial_biomass_kg:.1f}kg + Growth: {cumulative_biomass_change:.1f}kg)")
-            recommendations.append(f"Average fish weight: {float(latest_sampling.average_weight_kg):.3f} kg")
-            
-            # Add growth rate information with calculation method
-            if growth_calculation_method == "stocking_to_latest":
-                recommendations.append(f"Per-fish growth rate: {growth_rate_kg_per_day:.4f} kg/day per fish")
-                recommendations.append(f"Total biomass growth rate: {total_biomass_growth_rate:.1f} kg/day (for {current_fish_count} fish)")
-            elif growth_calculation_method == "blended_recent_and_overall":
-                recommendations.append(f"Per-fish growth rate (weighted): {growth_rate_kg_per_day:.4f} kg/day per fish")
-                recommendations.append(f"Total biomass growth rate: {total_biomass_growth_rate:.1f} kg/day (for {current_fish_count} fish)")
-            elif growth_calculation_method == "single_sampling_period":
-                recommendations.append(f"Per-fish growth rate: {growth_rate_kg_per_day:.4f} kg/day per fish")
-                recommendations.append(f"Total biomass growth rate: {total_biomass_growth_rate:.1f} kg/day (for {current_fish_count} fish)")
-            else:
-                recommendations.append(f"Using default growth rate: {growth_rate_kg_per_day:.4f} kg/day per fish (insufficient sampling data)")
-                recommendations.append(f"Total biomass growth rate: {total_biomass_growth_rate:.1f} kg/day (for {current_fish_count} fish)")
-            
-            # Add growth period information
-            if all_samplings_for_growth.count() >= 1:
-                total_growth_days = (latest_sampling.date - latest_stocking.date).days
-                recommendations.append(f"Growth period analyzed: {total_growth_days} days from stocking to latest sampling")
-            
-            # Add feeding analysis information
-            if fcr_calculation_method == "stocking_to_latest":
-                recommendations.append(f"Feed Conversion Ratio: {feed_conversion_ratio:.2f} (calculated from {feeding_analysis.get('total_feeding_records', 0)} feeding records)")
-                recommendations.append(f"Total feed consumed: {feeding_analysis.get('total_feed_consumed', 0):.1f}kg for {feeding_analysis.get('total_biomass_gain', 0):.1f}kg biomass gain")
-            elif fcr_calculation_method == "weighted_recent_periods":
-                recommendations.append(f"Feed Conversion Ratio: {feed_conversion_ratio:.2f} (weighted average from {len(feeding_analysis.get('period_fcrs', []))} sampling periods)")
-                recommendations.append(f"Average period FCR: {feeding_analysis.get('avg_period_fcr', 0):.2f}")
-            elif fcr_calculation_method == "single_period":
-                recommendations.append(f"Feed Conversion Ratio: {feed_conversion_ratio:.2f} (from single sampling period)")
-            else:
-                recommendations.append(f"Feed Conversion Ratio: {feed_conversion_ratio:.2f} (default - no feeding data available)")
-            
-            # Add feeding pattern information
-            if feeding_analysis.get('recent_feeding_records', 0) > 0:
-                recommendations.append(f"Recent feeding: {feeding_analysis.get('recent_feeding_records', 0)} records in last 30 days")
-                if feeding_analysis.get('daily_feeding_rate'):
-                    recommendations.append(f"Daily feeding rate: {feeding_analysis.get('daily_feeding_rate', 0):.1f}kg/day")
-            
-            # Add feeding efficiency recommendations
-            if feed_conversion_ratio < 1.2:
-                recommendations.append("Excellent feed conversion! Maintain current feeding practices")
-            elif feed_conversion_ratio < 1.8:
-                recommendations.append("Good feed conversion. Consider optimizing feeding times and amounts")
-            else:
-                recommendations.append("Feed conversion could be improved. Review feeding schedule and water quality")
-                warnings.append("High FCR may indicate overfeeding or poor water quality")
+            recommendations.append(
+                f"Current total biomass: {current_biomass_kg:.1f}kg "
+                f"({inputs['alive_count']} fish alive at {inputs['average_weight_kg']:.3f} kg)"
+            )
+            recommendations.append(
+                f"Median specific growth rate: {median_growth_rate * 100:.2f}% body weight/day "
+                f"from {len(inputs['growth_rates'])} sampling intervals"
+            )
+            recommendations.append(f"Feed Conversion Ratio: {feed_conversion_ratio:.2f}")
+            if projection['days']:
+                recommendations.append(
+                    f"Target reached between {projection['target_dates']['p10']} and {projection['target_dates']['p90']} "
+                    f"in 80% of the {projection['reached_count']} scenarios that reach it"
+                )
             
             return Response({
                 'current_biomass_kg': current_biomass_kg,
@@ -3320,17 +1835,57 @@ class TargetBiomassViewSet(viewsets.ViewSet):
                 'growth_rate_kg_per_day': round(growth_rate_kg_per_day, 4),
                 'feed_conversion_ratio': round(feed_conversion_ratio, 2),
                 'target_date': target_date.strftime('%Y-%m-%d'),
+                'projection': projection,
                 'recommendations': recommendations,
                 'warnings': warnings
             }, status=status.HTTP_200_OK)
             
+        except Http404:
+            raise
         except Exception as e:
             return Response({
                 'error': f'Failed to calculate target biomass: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @action(detail=False, methods=['post'])
+    def required_ration(self, request):
+        """Daily ration needed to reach each target biomass by its target date.
+        
+        Body: {"requests": [{"pond_id", "species_id", "target_biomass_kg", "target_date", "current_date"?}, ...]}.
+        Every request is solved in the same vectorized search, using the observed growth,
+        FCR, survival and temperature of its pond/species and the feeding-stage limits.
+        """
+        try:
+            ration_requests = parse_ration_requests(request.data)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        ponds = Pond.objects.filter(user=request.user).in_bulk({item['pond_id'] for item in ration_requests})
+        species = Species.objects.filter(user=request.user).in_bulk({item['species_id'] for item in ration_requests})
+        missing = [
+            index for index, item in enumerate(ration_requests)
+            if item['pond_id'] not in ponds or item['species_id'] not in species
+        ]
+        if missing:
+            return Response({
+                'error': f"Unknown pond or species in requests: {', '.join(map(str, missing))}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Observed inputs are gathered once per pond/species/date
+        inputs = {}
+        for item in ration_requests:
+            key = (item['pond_id'], item['species_id'], item['current_date'])
+            if key not in inputs:
+                inputs[key] = gather_projection_inputs(ponds[item['pond_id']], species[item['species_id']], item['current_date'])
+        
+        results = required_ration_plan(get_rule_plan(request.user.pk), ration_requests, inputs)
+        for result in results:
+            result['pond_name'] = ponds[result['pond_id']].name
+            result['species_name'] = species[result['species_id']].name
+        return Response({'results': results})
 
 
-class MedicalDiagnosticViewSet(viewsets.ModelViewSet):
+class MedicalDiagnosticViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for medical diagnostic results"""
     queryset = MedicalDiagnostic.objects.all()
     serializer_class = MedicalDiagnosticSerializer
@@ -3377,7 +1932,7 @@ class MedicalDiagnosticViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class VendorViewSet(viewsets.ModelViewSet):
+class VendorViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for vendor/supplier management"""
     queryset = Vendor.objects.all()
     serializer_class = VendorSerializer
@@ -3408,7 +1963,7 @@ class VendorViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for customer management"""
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
@@ -3438,7 +1993,7 @@ class CustomerViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(customers, many=True)
         return Response(serializer.data)
 
-class ItemServiceViewSet(viewsets.ModelViewSet):
+class ItemServiceViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ViewSet for items and services management"""
     queryset = ItemService.objects.all()
     serializer_class = ItemServiceSerializer
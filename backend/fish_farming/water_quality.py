@@ -0,0 +1,226 @@
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .advice import DAILY_LOG_WINDOW_DAYS, WATER_SAMPLE_WINDOW_DAYS
+from .models import DailyLog, PondSpeciesPopulation, Sampling
+
+
+# Optimal (min, max) used when a pond has no fish or a species has no range of its own
+DEFAULT_OPTIMAL_RANGES = {'temperature': (20, 28), 'ph': (6.5, 8.5)}
+# How far (below, above) the optimal range a reading still counts as acceptable
+ACCEPTABLE_MARGINS = {'temperature': (5, 4), 'ph': (0.5, 0.5)}
+# Species fields holding the optimal (min, max) of each ranged reading
+SPECIES_RANGE_FIELDS = {
+    'temperature': ('optimal_temp_min', 'optimal_temp_max'),
+    'ph': ('optimal_ph_min', 'optimal_ph_max'),
+}
+# Dissolved oxygen (mg/L) at or above which it is good / acceptable
+DISSOLVED_OXYGEN_LIMITS = (5, 3)
+# Ammonia (mg/L) at or below which it is safe / acceptable
+AMMONIA_LIMITS = (0.02, 0.05)
+
+OPTIMAL_POINTS = 25
+ACCEPTABLE_POINTS = 15
+# Lowest score of each status, best first; anything lower is poor
+QUALITY_STATUSES = [(80, 'excellent'), (60, 'good'), (40, 'fair')]
+
+SCORED_READINGS = ['temperature', 'ph', 'dissolved_oxygen', 'ammonia']
+# Reading name and its Sampling / DailyLog column (daily logs only record some)
+READING_COLUMNS = [
+    ('temperature', 'temperature_c', 'water_temp_c'),
+    ('ph', 'ph', 'ph'),
+    ('dissolved_oxygen', 'dissolved_oxygen', None),
+    ('turbidity', 'turbidity', None),
+    ('ammonia', 'ammonia', None),
+    ('nitrite', 'nitrite', None),
+]
+
+
+def reading_array(values):
+    """Float array of readings; a missing reading or a reading of 0 counts as not recorded (NaN)"""
+    return np.array([float(value) if value else np.nan for value in values], dtype=float)
+
+
+def _points_in_range(values, low, high, margins):
+    below, above = margins
+    return np.where(
+        (values >= low) & (values <= high), OPTIMAL_POINTS,
+        np.where((values >= low - below) & (values <= high + above), ACCEPTABLE_POINTS, 0)
+    )
+
+
+def score_water_quality(readings, ranges=None):
+    """Score water readings element-wise, 0-100, with 25 points per scored reading.
+
+    ``readings`` maps each of SCORED_READINGS to a float array (NaN where not
+    recorded, which scores 0); ``ranges`` maps temperature and pH to arrays of
+    their optimal (min, max), defaulting to DEFAULT_OPTIMAL_RANGES. Returns
+    the points per reading, the score and the quality status of every element.
+    """
+    ranges = ranges or DEFAULT_OPTIMAL_RANGES
+    points = {
+        name: _points_in_range(readings[name], *ranges[name], ACCEPTABLE_MARGINS[name])
+        for name in ('temperature', 'ph')
+    }
+    good, acceptable = DISSOLVED_OXYGEN_LIMITS
+    oxygen = readings['dissolved_oxygen']
+    points['dissolved_oxygen'] = np.where(oxygen >= good, OPTIMAL_POINTS, np.where(oxygen >= acceptable, ACCEPTABLE_POINTS, 0))
+    safe, acceptable = AMMONIA_LIMITS
+    ammonia = readings['ammonia']
+    points['ammonia'] = np.where(ammonia <= safe, OPTIMAL_POINTS, np.where(ammonia <= acceptable, ACCEPTABLE_POINTS, 0))
+
+    score = sum(points[name] for name in SCORED_READINGS)
+    status = np.select([score >= minimum for minimum, _ in QUALITY_STATUSES], [name for _, name in QUALITY_STATUSES], 'poor')
+    return {'points': points, 'score': score, 'status': status}
+
+
+def _latest_per_pond(queryset, *order_by):
+    """The first row of each pond in ``order_by`` order, in one windowed query"""
+    return queryset.annotate(
+        pond_rank=Window(expression=RowNumber(), partition_by=[F('pond_id')], order_by=list(order_by))
+    ).filter(pond_rank=1)
+
+
+def latest_water_readings(pond_ids, today):
+    """{pond_id: readings} from each pond's latest water sample, or else its latest daily log.
+
+    Mirrors the feeding advice: samples of the last WATER_SAMPLE_WINDOW_DAYS
+    days win, and a daily log of the last DAILY_LOG_WINDOW_DAYS days only
+    gives temperature and pH. One query per source.
+    """
+    sample_columns = [sample_column for _, sample_column, _ in READING_COLUMNS]
+    readings = {}
+    samples = _latest_per_pond(
+        Sampling.objects.filter(
+            pond_id__in=pond_ids,
+            sample_type__is_water=True,
+            date__gte=today - timedelta(days=WATER_SAMPLE_WINDOW_DAYS)
+        ),
+        F('date').desc(), F('id').desc()
+    ).values_list('pond_id', 'date', *sample_columns)
+    for pond_id, date, *values in samples:
+        readings[pond_id] = {'source': 'sampling', 'date': date, **dict(zip(
+            [name for name, _, _ in READING_COLUMNS], values
+        ))}
+
+    without_samples = [pond_id for pond_id in pond_ids if pond_id not in readings]
+    if without_samples:
+        log_columns = [(name, log_column) for name, _, log_column in READING_COLUMNS if log_column]
+        logs = _latest_per_pond(
+            DailyLog.objects.filter(
+                pond_id__in=without_samples,
+                date__gte=today - timedelta(days=DAILY_LOG_WINDOW_DAYS)
+            ),
+            F('date').desc()
+        ).values_list('pond_id', 'date', *[log_column for _, log_column in log_columns])
+        for pond_id, date, *values in logs:
+            readings[pond_id] = {
+                'source': 'daily_log', 'date': date,
+                **{name: None for name, _, _ in READING_COLUMNS},
+                **dict(zip([name for name, _ in log_columns], values)),
+            }
+    return readings
+
+
+def _species_ranges(species_list):
+    """{reading: (min array, max array)} over the species, the default range where a species has no complete range"""
+    ranges = {}
+    for name, (min_field, max_field) in SPECIES_RANGE_FIELDS.items():
+        default_low, default_high = DEFAULT_OPTIMAL_RANGES[name]
+        lows = np.array([
+            np.nan if species is None or getattr(species, min_field) is None else float(getattr(species, min_field))
+            for species in species_list
+        ], dtype=float)
+        highs = np.array([
+            np.nan if species is None or getattr(species, max_field) is None else float(getattr(species, max_field))
+            for species in species_list
+        ], dtype=float)
+        complete = ~np.isnan(lows) & ~np.isnan(highs)
+        ranges[name] = (np.where(complete, lows, default_low), np.where(complete, highs, default_high))
+    return ranges
+
+
+def farm_water_quality(ponds, today):
+    """Water quality of every pond, scored against the optimal ranges of the species alive in it.
+
+    Readings are loaded for all ponds at once and every (pond, species) pair
+    is scored in one vectorized pass; a pond takes the score of its least
+    comfortable species. Ponds without live fish are scored against
+    DEFAULT_OPTIMAL_RANGES.
+    """
+    ponds = list(ponds)
+    pond_ids = [pond.id for pond in ponds]
+    readings = latest_water_readings(pond_ids, today)
+
+    species_by_pond = {}
+    for population in PondSpeciesPopulation.objects.filter(
+        pond_id__in=pond_ids, species__isnull=False, alive_count__gt=0
+    ).select_related('species').order_by('species__name'):
+        species_by_pond.setdefault(population.pond_id, []).append(population.species)
+
+    # One row per (pond, species) pair
+    row_ponds = []
+    row_species = []
+    for pond in ponds:
+        for species in species_by_pond.get(pond.id, [None]):
+            row_ponds.append(pond)
+            row_species.append(species)
+
+    empty = {name: None for name, _, _ in READING_COLUMNS}
+    row_readings = [readings.get(pond.id, empty) for pond in row_ponds]
+    ranges = _species_ranges(row_species)
+    scores = score_water_quality(
+        {name: reading_array([reading[name] for reading in row_readings]) for name in SCORED_READINGS},
+        ranges
+    )
+
+    results = {}
+    for index, (pond, species) in enumerate(zip(row_ponds, row_species)):
+        result = results.get(pond.id)
+        if result is None:
+            reading = readings.get(pond.id)
+            result = results[pond.id] = {
+                'pond': pond.id,
+                'pond_name': pond.name,
+                'source': reading['source'] if reading else None,
+                'date': reading['date'] if reading else None,
+                'readings': {
+                    name: float(value) if value is not None else None
+                    for name, value in (reading or empty).items() if name not in ('source', 'date')
+                },
+                'quality_score': None,
+                'quality_status': None,
+                'limiting_species': None,
+                'species': [],
+            }
+        score = int(scores['score'][index])
+        result['species'].append({
+            'species': species.id if species else None,
+            'species_name': species.name if species else None,
+            'optimal_temperature': [float(ranges['temperature'][0][index]), float(ranges['temperature'][1][index])],
+            'optimal_ph': [float(ranges['ph'][0][index]), float(ranges['ph'][1][index])],
+            'points': {name: int(scores['points'][name][index]) for name in SCORED_READINGS},
+            'quality_score': score,
+            'quality_status': str(scores['status'][index]),
+        })
+        if result['quality_score'] is None or score < result['quality_score']:
+            result['quality_score'] = score
+            result['quality_status'] = str(scores['status'][index])
+            result['limiting_species'] = species.name if species else None
+
+    ponds_scored = [results[pond.id] for pond in ponds]
+    status_counts = {name: 0 for _, name in QUALITY_STATUSES}
+    status_counts['poor'] = 0
+    for result in ponds_scored:
+        status_counts[result['quality_status']] += 1
+    return {
+        'date': today,
+        'pond_count': len(ponds_scored),
+        'ponds_without_readings': sum(1 for result in ponds_scored if result['source'] is None),
+        'average_score': round(float(np.mean([result['quality_score'] for result in ponds_scored])), 1) if ponds_scored else None,
+        'status_counts': status_counts,
+        'ponds': ponds_scored,
+    }
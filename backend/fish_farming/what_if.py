@@ -0,0 +1,187 @@
+import numpy as np
+
+from .feeding_stages import FEEDING_STAGES, feeding_stage_column, feeding_stage_indices
+from .rules import ADJUSTMENT_GROUPS, ADJUSTMENT_LIMITS, FEATURES, MISSING_VALUES, parse_rule_value
+
+
+SEASONS = ('spring', 'summer', 'autumn', 'winter')
+MAX_GRID_CELLS = 100000
+MAX_AXIS_VALUES = 1000
+DEFAULT_FISH_COUNT = 1000
+
+# Axes of the grid in response order: (name, default values, minimum, maximum)
+GRID_AXES = [
+    ('water_temp_c', list(range(10, 38, 2)), -5, 45),
+    ('season', list(SEASONS), None, None),
+    ('average_weight_g', [1, 5, 10, 25, 50, 100, 250, 500, 1000], 0.01, 5000),
+    ('disease_confidence', [0, 50, 70, 90], 0, 100),
+]
+
+# Features the grid axes set; every other feature is held at its base value
+AXIS_FEATURES = ('water_temp_c', 'season', 'max_disease_confidence', 'disease_count', 'has_medical_warnings')
+
+# Base feature values when neither a pond/species nor the request gives them
+DEFAULT_BASE_FEATURES = {
+    'water_quality_status': 'unknown',
+    'growth_quality': 'normal',
+    'feeding_consistency': 'unknown',
+    'high_mortality_rate': False,
+    'disease_present': False,
+}
+
+STAGE_RATES = feeding_stage_column('percent_bw_per_day').astype(float)
+STAGE_FREQUENCIES = feeding_stage_column('feeding_frequency')
+
+# Python's round() per cell, so the grid rounds ties like the saved advice (np.round does not)
+_round = np.frompyfunc(round, 2, 1)
+
+
+def _axis_values(data, name, default, minimum, maximum):
+    """Values of one numeric axis: a list, a comma-separated string or {"start", "stop", "step"} (stop included)"""
+    values = data.get(name)
+    if values is None or values == '':
+        return [float(value) for value in default]
+    if isinstance(values, dict):
+        try:
+            start, stop = float(values['start']), float(values['stop'])
+            step = float(values.get('step') or 1)
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f'{name} ranges need numeric start and stop (and optionally step)')
+        if step <= 0 or stop < start:
+            raise ValueError(f'{name} ranges need start <= stop and a positive step')
+        if (stop - start) / step + 1 > MAX_AXIS_VALUES:
+            raise ValueError(f'{name} can have at most {MAX_AXIS_VALUES} values')
+        # Rounding keeps float steps such as 0.1 from dropping the stop value
+        numbers = np.round(np.arange(round((stop - start) / step) + 1) * step + start, 10).tolist()
+    else:
+        if not isinstance(values, (list, tuple)):
+            values = str(values).split(',')
+        try:
+            numbers = [float(value) for value in values]
+        except (TypeError, ValueError):
+            raise ValueError(f'{name} must be a list of numbers or a range')
+        if not numbers or any(number != number for number in numbers):
+            raise ValueError(f'{name} must be a list of numbers or a range')
+        if len(numbers) > MAX_AXIS_VALUES:
+            raise ValueError(f'{name} can have at most {MAX_AXIS_VALUES} values')
+    if min(numbers) < minimum or max(numbers) > maximum:
+        raise ValueError(f'{name} values must be between {minimum} and {maximum}')
+    return numbers
+
+
+def base_feature_values(features):
+    """Feature values held constant over the grid, converted to their rule kind (ValueError if invalid)"""
+    values = dict(DEFAULT_BASE_FEATURES)
+    for feature, value in features.items():
+        if feature in AXIS_FEATURES:
+            continue
+        kind = FEATURES[feature]
+        if value is None or value == '':
+            values[feature] = MISSING_VALUES[kind]
+        elif kind == 'category':
+            values[feature] = str(value)
+        else:
+            values[feature] = parse_rule_value(feature, value)
+    return values
+
+
+def parse_what_if_grid(data):
+    """Read the grid axes, fish count and base features from request data (ValueError if invalid)"""
+    axes = {}
+    for name, default, minimum, maximum in GRID_AXES:
+        if name == 'season':
+            seasons = data.get('season')
+            if seasons is None or seasons == '':
+                seasons = default
+            elif not isinstance(seasons, (list, tuple)):
+                seasons = str(seasons).split(',')
+            seasons = [str(season).strip().lower() for season in seasons]
+            unknown = sorted(set(seasons) - set(SEASONS))
+            if not seasons or unknown:
+                raise ValueError(f"season must be a list of: {', '.join(SEASONS)}")
+            axes[name] = seasons
+        else:
+            axes[name] = _axis_values(data, name, default, minimum, maximum)
+
+    cells = int(np.prod([len(values) for values in axes.values()]))
+    if cells > MAX_GRID_CELLS:
+        raise ValueError(f'The grid has {cells} cells; at most {MAX_GRID_CELLS} are allowed')
+
+    fish_count = data.get('fish_count')
+    if fish_count is not None and fish_count != '':
+        try:
+            fish_count = int(fish_count)
+        except (TypeError, ValueError):
+            raise ValueError('fish_count must be a whole number')
+        if fish_count < 0:
+            raise ValueError('fish_count cannot be negative')
+
+    features = data.get('features') or {}
+    if not isinstance(features, dict):
+        raise ValueError('features must be an object of feature values')
+    unknown = sorted(set(features) - set(FEATURES) | set(features) & set(AXIS_FEATURES))
+    if unknown:
+        raise ValueError(f"Unknown or grid-controlled features: {', '.join(unknown)}")
+    base_feature_values(features)
+
+    return {'axes': axes, 'fish_count': fish_count, 'features': features}
+
+
+def compute_what_if_grid(rule_plan, axes, fish_count, features):
+    """Recommended feeding rate and ration over every combination of the grid axes.
+
+    Follows the sampling-based feeding advice: the feeding stage of each
+    weight gives the base %BW/day, and the user's adjustment rules give the
+    clamped environmental adjustment plus the medical adjustment. The rules
+    are evaluated once over the temperature x season x confidence axes, and
+    the weight axis is joined by broadcasting, so the result has shape
+    (temperatures, seasons, weights, confidences). Learning from previously
+    applied advice is not included, since it depends on a pond's history.
+    """
+    temperatures = np.asarray(axes['water_temp_c'], dtype=float)
+    seasons = np.asarray(axes['season'], dtype=str)
+    weights_g = np.asarray(axes['average_weight_g'], dtype=float)
+    confidences = np.asarray(axes['disease_confidence'], dtype=float)
+    diseased = confidences > 0
+
+    base_features = base_feature_values(features)
+    columns = dict(base_features)
+    columns.update({
+        # Advice treats a 0 °C reading as no reading
+        'water_temp_c': np.where(temperatures == 0, np.nan, temperatures)[:, None, None, None],
+        'season': seasons[None, :, None, None],
+        'max_disease_confidence': np.where(diseased, confidences, np.nan)[None, None, None, :],
+        'disease_count': diseased.astype(float)[None, None, None, :],
+        'has_medical_warnings': diseased[None, None, None, :],
+    })
+    rule_shape = (len(temperatures), len(seasons), 1, len(confidences))
+    evaluation = rule_plan.evaluate_columns(columns, rule_shape, ADJUSTMENT_GROUPS + ['medical'])
+
+    low, high = ADJUSTMENT_LIMITS
+    environmental = np.clip(sum(evaluation.adjustments[group] for group in ADJUSTMENT_GROUPS), low, high)
+    total_adjustment = environmental + evaluation.adjustments['medical']
+    adjustment_factor = 1 + total_adjustment / 100
+
+    stages = feeding_stage_indices(weights_g)
+    base_rates = STAGE_RATES[stages]
+    final_rates = base_rates[None, None, :, None] * adjustment_factor
+    biomass_kg = fish_count * weights_g / 1000
+    feed_kg = (biomass_kg * (base_rates / 100))[None, None, :, None] * adjustment_factor
+
+    return {
+        'dimensions': [name for name, _, _, _ in GRID_AXES],
+        'axes': axes,
+        'shape': list(final_rates.shape),
+        'fish_count': fish_count,
+        'base_features': {
+            feature: None if value != value or value == '' else value for feature, value in base_features.items()
+        },
+        'feeding_stage': [FEEDING_STAGES[index]['stage_name'] for index in stages.tolist()],
+        'base_rate_percent': base_rates.tolist(),
+        'feeding_frequency': STAGE_FREQUENCIES[stages].tolist(),
+        'biomass_kg': _round(biomass_kg, 2).tolist(),
+        # Adjustments do not depend on weight: (temperatures, seasons, confidences)
+        'adjustment_percent': _round(total_adjustment[:, :, 0, :], 2).tolist(),
+        'feeding_rate_percent': _round(final_rates, 2).tolist(),
+        'recommended_feed_kg': _round(feed_kg, 2).tolist(),
+    }
@@ -1069,6 +1069,14 @@ export function useBiomassAnalysis(params?: { pond?: number; species?: number; s
   );
 }
 
+// Daily biomass series per pond/species
+export function useBiomassSeries(params?: { pairs?: string; pond?: number; species?: number; method?: 'linear' | 'log'; end_date?: string }) {
+  return useApiQuery(
+    ['biomass-series', JSON.stringify(params || {})],
+    () => apiService.getBiomassSeries(params)
+  );
+}
+
 // FCR Analysis
 export function useFcrAnalysis(params?: { pond?: number; species?: number; start_date?: string; end_date?: string }) {
   const result = useApiQuery(
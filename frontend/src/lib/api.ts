@@ -1,4 +1,4 @@
-import axios from 'axios';
+import axios, { AxiosResponse } from 'axios';
 
 import { API_CONFIG } from '@/config/api';
 
@@ -131,10 +131,44 @@ export interface SampleType {
   description: string;
   icon: string;
   color: string;
+  is_water: boolean;
   is_active: boolean;
   created_at: string;
 }
 
+export type WaterQualityStatus = 'excellent' | 'good' | 'fair' | 'poor';
+
+export interface SpeciesWaterQuality {
+  species: number | null;
+  species_name: string | null;
+  optimal_temperature: [number, number];
+  optimal_ph: [number, number];
+  points: { temperature: number; ph: number; dissolved_oxygen: number; ammonia: number };
+  quality_score: number;
+  quality_status: WaterQualityStatus;
+}
+
+export interface PondWaterQuality {
+  pond: number;
+  pond_name: string;
+  source: 'sampling' | 'daily_log' | null;
+  date: string | null;
+  readings: Record<'temperature' | 'ph' | 'dissolved_oxygen' | 'turbidity' | 'ammonia' | 'nitrite', number | null>;
+  quality_score: number;
+  quality_status: WaterQualityStatus;
+  limiting_species: string | null;
+  species: SpeciesWaterQuality[];
+}
+
+export interface FarmWaterQuality {
+  date: string;
+  pond_count: number;
+  ponds_without_readings: number;
+  average_score: number | null;
+  status_counts: Record<WaterQualityStatus, number>;
+  ponds: PondWaterQuality[];
+}
+
 export interface Sampling {
   id: number;
   pond: number;
@@ -326,6 +360,53 @@ export interface FeedingBand {
   created_at: string;
 }
 
+export interface FeedingRule {
+  id?: number;
+  key: string;
+  group: string;
+  feature: string;
+  operator: 'lt' | 'lte' | 'gt' | 'gte' | 'eq' | 'ne';
+  value: string;
+  adjustment_percent: string | number;
+  priority: number;
+  is_active?: boolean;
+  description: string;
+  user?: number;
+  created_at?: string;
+  updated_at?: string;
+}
+
+export type WhatIfAxis = number[] | string | { start: number; stop: number; step?: number };
+
+export interface FeedingWhatIfRequest {
+  water_temp_c?: WhatIfAxis;
+  season?: string[] | string;
+  average_weight_g?: WhatIfAxis;
+  disease_confidence?: WhatIfAxis;
+  fish_count?: number;
+  features?: Record<string, string | number | boolean | null>;
+  pond?: number;
+  species?: number;
+}
+
+export interface FeedingWhatIfGrid {
+  dimensions: string[];
+  axes: { water_temp_c: number[]; season: string[]; average_weight_g: number[]; disease_confidence: number[] };
+  shape: number[];
+  fish_count: number;
+  base_features: Record<string, string | number | boolean | null>;
+  feeding_stage: string[];
+  base_rate_percent: number[];
+  feeding_frequency: number[];
+  biomass_kg: number[];
+  // [temperature][season][confidence]
+  adjustment_percent: number[][][];
+  // [temperature][season][weight][confidence]
+  feeding_rate_percent: number[][][][];
+  recommended_feed_kg: number[][][][];
+  timings_ms: { grid: number };
+}
+
 export interface Alert {
   id: number;
   pond: number;
@@ -380,6 +461,8 @@ export interface FeedingAdvice {
   is_applied: boolean;
   applied_date: string | null;
   notes: string;
+  input_fingerprint: string;
+  reused?: boolean;
   created_at: string;
   updated_at: string;
   pond_name: string;
@@ -515,6 +598,27 @@ export interface BiomassAnalysis {
   };
 }
 
+export interface BiomassSeries {
+  pond_id: number;
+  pond_name: string;
+  species_id: number;
+  species_name: string;
+  start_date: string;
+  end_date: string;
+  alive_count: number[];
+  average_weight_kg: number[];
+  biomass_kg: number[];
+  current_alive_count: number;
+  current_average_weight_kg: number;
+  current_biomass_kg: number;
+}
+
+export interface BiomassSeriesResponse {
+  method: 'linear' | 'log';
+  end_date: string;
+  series: BiomassSeries[];
+}
+
 export interface FcrAnalysis {
   summary: {
     total_feed_kg: number;
@@ -696,6 +800,37 @@ export interface ItemService {
   updated_at: string;
 }
 
+// Largest page the backend serves (MAX_PAGE_SIZE in fish_farming/pagination.py)
+const MAX_PAGE_SIZE = 1000;
+
+// List endpoints are paginated. Follow `next` until the last page and return every row.
+async function getAllRows<T>(url: string, params?: PaginationParams): Promise<AxiosResponse<T[]>> {
+  const first = await api.get<PaginatedResponse<T> | T[]>(url, { params: { page_size: MAX_PAGE_SIZE, ...params } });
+  if (Array.isArray(first.data)) {
+    return { ...first, data: first.data };
+  }
+  const rows = [...first.data.results];
+  let next = first.data.next;
+  while (next) {
+    // Keep the configured base URL; only the query (cursor or page) changes
+    const page = await api.get<PaginatedResponse<T>>(url, {
+      params: Object.fromEntries(new URL(next).searchParams),
+    });
+    rows.push(...page.data.results);
+    next = page.data.next;
+  }
+  return { ...first, data: rows };
+}
+
+// One numbered page when `page` is given, otherwise every row as a single page
+async function getListPage<T>(url: string, params?: PaginationParams): Promise<AxiosResponse<PaginatedResponse<T>>> {
+  if (params?.page !== undefined) {
+    return api.get<PaginatedResponse<T>>(url, { params });
+  }
+  const response = await getAllRows<T>(url, params);
+  return { ...response, data: { count: response.data.length, next: null, previous: null, results: response.data } };
+}
+
 // API Functions
 export const apiService = {
   // Authentication
@@ -722,7 +857,7 @@ export const apiService = {
   },
 
   // Species
-  getSpecies: (params?: PaginationParams) => api.get<PaginatedResponse<Species>>('/species/', { params }),
+  getSpecies: (params?: PaginationParams) => getListPage<Species>('/species/', params),
   getSpeciesById: (id: number) => api.get<Species>(`/species/${id}/`),
   createSpecies: (data: Partial<Species>) => api.post<Species>('/species/', data),
   updateSpecies: (id: number, data: Partial<Species>) => api.put<Species>(`/species/${id}/`, data),
@@ -735,51 +870,52 @@ export const apiService = {
   getSpeciesAncestors: (id: number) => api.get<Species[]>(`/species/${id}/ancestors/`),
 
   // Ponds
-  getPonds: (params?: PaginationParams) => api.get<PaginatedResponse<Pond>>('/ponds/', { params }),
+  getPonds: (params?: PaginationParams) => getListPage<Pond>('/ponds/', params),
   getPondById: (id: number) => api.get<Pond>(`/ponds/${id}/`),
   getPondSummary: (id: number) => api.get<PondSummary>(`/ponds/${id}/summary/`),
   getPondFinancialSummary: (id: number) => api.get<FinancialSummary>(`/ponds/${id}/financial_summary/`),
+  getFarmWaterQuality: (params?: { include_inactive?: boolean }) => api.get<FarmWaterQuality>('/ponds/water_quality/', { params }),
   createPond: (data: Partial<Pond>) => api.post<Pond>('/ponds/', data),
   updatePond: (id: number, data: Partial<Pond>) => api.put<Pond>(`/ponds/${id}/`, data),
   deletePond: (id: number) => api.delete(`/ponds/${id}/`),
 
   // Stocking
-  getStocking: (params?: PaginationParams) => api.get<PaginatedResponse<Stocking>>('/stocking/', { params }),
+  getStocking: (params?: PaginationParams) => getListPage<Stocking>('/stocking/', params),
   getStockingById: (id: number) => api.get<Stocking>(`/stocking/${id}/`),
   createStocking: (data: Partial<Stocking>) => api.post<Stocking>('/stocking/', data),
   updateStocking: (id: number, data: Partial<Stocking>) => api.put<Stocking>(`/stocking/${id}/`, data),
   deleteStocking: (id: number) => api.delete(`/stocking/${id}/`),
 
   // Daily Logs
-  getDailyLogs: (params?: PaginationParams) => api.get<PaginatedResponse<DailyLog>>('/daily-logs/', { params }),
+  getDailyLogs: (params?: PaginationParams) => getListPage<DailyLog>('/daily-logs/', params),
   getDailyLogById: (id: number) => api.get<DailyLog>(`/daily-logs/${id}/`),
   createDailyLog: (data: Partial<DailyLog>) => api.post<DailyLog>('/daily-logs/', data),
   updateDailyLog: (id: number, data: Partial<DailyLog>) => api.put<DailyLog>(`/daily-logs/${id}/`, data),
   deleteDailyLog: (id: number) => api.delete(`/daily-logs/${id}/`),
 
   // Sample Types
-  getSampleTypes: () => api.get<SampleType[]>('/sample-types/'),
+  getSampleTypes: () => getAllRows<SampleType>('/sample-types/'),
   getSampleTypeById: (id: number) => api.get<SampleType>(`/sample-types/${id}/`),
   createSampleType: (data: Partial<SampleType>) => api.post<SampleType>('/sample-types/', data),
   updateSampleType: (id: number, data: Partial<SampleType>) => api.put<SampleType>(`/sample-types/${id}/`, data),
   deleteSampleType: (id: number) => api.delete(`/sample-types/${id}/`),
 
   // Water Quality Sampling
-  getSamplings: (params?: PaginationParams) => api.get<PaginatedResponse<Sampling>>('/sampling/', { params }),
+  getSamplings: (params?: PaginationParams) => getListPage<Sampling>('/sampling/', params),
   getSamplingById: (id: number) => api.get<Sampling>(`/sampling/${id}/`),
   createSampling: (data: Partial<Sampling>) => api.post<Sampling>('/sampling/', data),
   updateSampling: (id: number, data: Partial<Sampling>) => api.put<Sampling>(`/sampling/${id}/`, data),
   deleteSampling: (id: number) => api.delete(`/sampling/${id}/`),
 
   // Mortality Tracking
-  getMortalities: (params?: PaginationParams) => api.get<PaginatedResponse<Mortality>>('/mortality/', { params }),
+  getMortalities: (params?: PaginationParams) => getListPage<Mortality>('/mortality/', params),
   getMortalityById: (id: number) => api.get<Mortality>(`/mortality/${id}/`),
   createMortality: (data: Partial<Mortality>) => api.post<Mortality>('/mortality/', data),
   updateMortality: (id: number, data: Partial<Mortality>) => api.put<Mortality>(`/mortality/${id}/`, data),
   deleteMortality: (id: number) => api.delete(`/mortality/${id}/`),
 
   // Feed Types
-  getFeedTypes: (params?: PaginationParams) => api.get<PaginatedResponse<FeedType>>('/feed-types/', { params }),
+  getFeedTypes: (params?: PaginationParams) => getListPage<FeedType>('/feed-types/', params),
   getFeedTypeById: (id: number) => api.get<FeedType>(`/feed-types/${id}/`),
   createFeedType: (data: Partial<FeedType>) => api.post<FeedType>('/feed-types/', data),
   updateFeedType: (id: number, data: Partial<FeedType>) => api.put<FeedType>(`/feed-types/${id}/`, data),
@@ -792,7 +928,7 @@ export const apiService = {
   getFeedTypeAncestors: (id: number) => api.get<FeedType[]>(`/feed-types/${id}/ancestors/`),
 
   // Account Types
-  getAccountTypes: () => api.get<AccountType[]>('/account-types/'),
+  getAccountTypes: () => getAllRows<AccountType>('/account-types/'),
   getAccountTypeById: (id: number) => api.get<AccountType>(`/account-types/${id}/`),
   createAccountType: (data: Partial<AccountType>) => api.post<AccountType>('/account-types/', data),
   updateAccountType: (id: number, data: Partial<AccountType>) => api.put<AccountType>(`/account-types/${id}/`, data),
@@ -812,49 +948,57 @@ export const apiService = {
   getAccountTypeAncestors: (id: number) => api.get<AccountType[]>(`/account-types/${id}/ancestors/`),
 
   // Feeds
-  getFeeds: (params?: PaginationParams) => api.get<PaginatedResponse<Feed>>('/feeds/', { params }),
+  getFeeds: (params?: PaginationParams) => getListPage<Feed>('/feeds/', params),
   getFeedById: (id: number) => api.get<Feed>(`/feeds/${id}/`),
   createFeed: (data: Partial<Feed>) => api.post<Feed>('/feeds/', data),
   updateFeed: (id: number, data: Partial<Feed>) => api.put<Feed>(`/feeds/${id}/`, data),
   deleteFeed: (id: number) => api.delete(`/feeds/${id}/`),
 
   // Feed Inventory
-  getInventoryFeeds: () => api.get<InventoryFeed[]>('/inventory-feed/'),
+  getInventoryFeeds: () => getAllRows<InventoryFeed>('/inventory-feed/'),
   getInventoryFeedById: (id: number) => api.get<InventoryFeed>(`/inventory-feed/${id}/`),
   createInventoryFeed: (data: Partial<InventoryFeed>) => api.post<InventoryFeed>('/inventory-feed/', data),
   updateInventoryFeed: (id: number, data: Partial<InventoryFeed>) => api.put<InventoryFeed>(`/inventory-feed/${id}/`, data),
   deleteInventoryFeed: (id: number) => api.delete(`/inventory-feed/${id}/`),
 
   // Feeding Bands
-  getFeedingBands: () => api.get<FeedingBand[]>('/feeding-bands/'),
+  getFeedingBands: () => getAllRows<FeedingBand>('/feeding-bands/'),
   getFeedingBandById: (id: number) => api.get<FeedingBand>(`/feeding-bands/${id}/`),
   createFeedingBand: (data: Partial<FeedingBand>) => api.post<FeedingBand>('/feeding-bands/', data),
   updateFeedingBand: (id: number, data: Partial<FeedingBand>) => api.put<FeedingBand>(`/feeding-bands/${id}/`, data),
   deleteFeedingBand: (id: number) => api.delete(`/feeding-bands/${id}/`),
 
+  // Feeding Rules
+  getFeedingRules: () => getAllRows<FeedingRule>('/feeding-rules/'),
+  getDefaultFeedingRules: () => api.get<FeedingRule[]>('/feeding-rules/defaults/'),
+  getEffectiveFeedingRules: () => api.get<FeedingRule[]>('/feeding-rules/effective/'),
+  createFeedingRule: (data: Partial<FeedingRule>) => api.post<FeedingRule>('/feeding-rules/', data),
+  updateFeedingRule: (id: number, data: Partial<FeedingRule>) => api.put<FeedingRule>(`/feeding-rules/${id}/`, data),
+  deleteFeedingRule: (id: number) => api.delete(`/feeding-rules/${id}/`),
+
   // Harvests
-  getHarvests: (params?: PaginationParams) => api.get<PaginatedResponse<Harvest>>('/harvests/', { params }),
+  getHarvests: (params?: PaginationParams) => getListPage<Harvest>('/harvests/', params),
   getHarvestById: (id: number) => api.get<Harvest>(`/harvests/${id}/`),
   createHarvest: (data: Partial<Harvest>) => api.post<Harvest>('/harvests/', data),
   updateHarvest: (id: number, data: Partial<Harvest>) => api.put<Harvest>(`/harvests/${id}/`, data),
   deleteHarvest: (id: number) => api.delete(`/harvests/${id}/`),
 
   // Expenses
-  getExpenses: (params?: PaginationParams) => api.get<PaginatedResponse<Expense>>('/expenses/', { params }),
+  getExpenses: (params?: PaginationParams) => getListPage<Expense>('/expenses/', params),
   getExpenseById: (id: number) => api.get<Expense>(`/expenses/${id}/`),
   createExpense: (data: Partial<Expense>) => api.post<Expense>('/expenses/', data),
   updateExpense: (id: number, data: Partial<Expense>) => api.put<Expense>(`/expenses/${id}/`, data),
   deleteExpense: (id: number) => api.delete(`/expenses/${id}/`),
 
   // Income
-  getIncomes: (params?: PaginationParams) => api.get<PaginatedResponse<Income>>('/incomes/', { params }),
+  getIncomes: (params?: PaginationParams) => getListPage<Income>('/incomes/', params),
   getIncomeById: (id: number) => api.get<Income>(`/incomes/${id}/`),
   createIncome: (data: Partial<Income>) => api.post<Income>('/incomes/', data),
   updateIncome: (id: number, data: Partial<Income>) => api.put<Income>(`/incomes/${id}/`, data),
   deleteIncome: (id: number) => api.delete(`/incomes/${id}/`),
 
   // Expense Types
-  getExpenseTypes: () => api.get<ExpenseType[]>('/expense-types/'),
+  getExpenseTypes: () => getAllRows<ExpenseType>('/expense-types/'),
   getExpenseTypeById: (id: number) => api.get<ExpenseType>(`/expense-types/${id}/`),
   createExpenseType: (data: Partial<ExpenseType>) => api.post<ExpenseType>('/expense-types/', data),
   updateExpenseType: (id: number, data: Partial<ExpenseType>) => api.put<ExpenseType>(`/expense-types/${id}/`, data),
@@ -867,7 +1011,7 @@ export const apiService = {
   getExpenseTypeAncestors: (id: number) => api.get<ExpenseType[]>(`/expense-types/${id}/ancestors/`),
 
   // Income Types
-  getIncomeTypes: () => api.get<IncomeType[]>('/income-types/'),
+  getIncomeTypes: () => getAllRows<IncomeType>('/income-types/'),
   getIncomeTypeById: (id: number) => api.get<IncomeType>(`/income-types/${id}/`),
   createIncomeType: (data: Partial<IncomeType>) => api.post<IncomeType>('/income-types/', data),
   updateIncomeType: (id: number, data: Partial<IncomeType>) => api.put<IncomeType>(`/income-types/${id}/`, data),
@@ -880,40 +1024,43 @@ export const apiService = {
   getIncomeTypeAncestors: (id: number) => api.get<IncomeType[]>(`/income-types/${id}/ancestors/`),
 
   // Alerts
-  getAlerts: () => api.get<Alert[]>('/alerts/'),
+  getAlerts: () => getAllRows<Alert>('/alerts/'),
   getAlertById: (id: number) => api.get<Alert>(`/alerts/${id}/`),
   resolveAlert: (id: number) => api.post(`/alerts/${id}/resolve/`),
 
   // Fish Sampling
-  getFishSampling: (params?: PaginationParams) => api.get<PaginatedResponse<FishSampling>>('/fish-sampling/', { params }),
+  getFishSampling: (params?: PaginationParams) => getListPage<FishSampling>('/fish-sampling/', params),
   getFishSamplingById: (id: number) => api.get<FishSampling>(`/fish-sampling/${id}/`),
   createFishSampling: (data: Partial<FishSampling>) => api.post<FishSampling>('/fish-sampling/', data),
   updateFishSampling: (id: number, data: Partial<FishSampling>) => api.put<FishSampling>(`/fish-sampling/${id}/`, data),
   deleteFishSampling: (id: number) => api.delete(`/fish-sampling/${id}/`),
   getBiomassAnalysis: (params?: { pond?: number; species?: number; start_date?: string; end_date?: string }) => 
     api.get<BiomassAnalysis>('/fish-sampling/biomass_analysis/', { params }),
+  getBiomassSeries: (params?: { pairs?: string; pond?: number; species?: number; method?: 'linear' | 'log'; end_date?: string }) =>
+    api.get<BiomassSeriesResponse>('/fish-sampling/biomass_series/', { params }),
   getFcrAnalysis: (params?: { pond?: number; species?: number; start_date?: string; end_date?: string }) => {
     console.log('API getFcrAnalysis called with params:', params);
     return api.get<FcrAnalysis>('/fish-sampling/fcr_analysis/', { params });
   },
 
   // Feeding Advice
-  getFeedingAdvice: (params?: PaginationParams) => api.get<PaginatedResponse<FeedingAdvice>>('/feeding-advice/', { params }),
+  getFeedingAdvice: (params?: PaginationParams) => getListPage<FeedingAdvice>('/feeding-advice/', params),
   getFeedingAdviceById: (id: number) => api.get<FeedingAdvice>(`/feeding-advice/${id}/`),
   createFeedingAdvice: (data: Partial<FeedingAdvice>) => api.post<FeedingAdvice>('/feeding-advice/', data),
   generateFeedingAdvice: (data: { pond_id: number }) => api.post<FeedingAdvice>('/feeding-advice/generate_advice/', data),
-  autoGenerateFeedingAdvice: (data: { pond: number }) => {
+  autoGenerateFeedingAdvice: (data: { pond: number; force?: boolean }) => {
     console.log('API Debug - Sending request to:', '/feeding-advice/auto_generate/');
     console.log('API Debug - Request data:', data);
     console.log('API Debug - Full URL:', `${API_BASE_URL}/feeding-advice/auto_generate/`);
-    return api.post<{ message: string; advice: FeedingAdvice[]; warnings?: { species_without_sampling?: string[]; failed_species?: string[] } }>('/feeding-advice/auto_generate/', data);
+    return api.post<{ message: string; advice: FeedingAdvice[]; unchanged_species: string[]; warnings?: { species_without_sampling?: string[]; failed_species?: string[] } }>('/feeding-advice/auto_generate/', data);
   },
   updateFeedingAdvice: (id: number, data: Partial<FeedingAdvice>) => api.put<FeedingAdvice>(`/feeding-advice/${id}/`, data),
   deleteFeedingAdvice: (id: number) => api.delete(`/feeding-advice/${id}/`),
   applyFeedingAdvice: (id: number) => api.post(`/feeding-advice/${id}/apply_advice/`),
+  getFeedingWhatIf: (data: FeedingWhatIfRequest) => api.post<FeedingWhatIfGrid>('/feeding-advice/what_if/', data),
 
   // Medical Diagnostic
-  getMedicalDiagnostics: (params?: PaginationParams) => api.get<PaginatedResponse<MedicalDiagnostic>>('/medical-diagnostics/', { params }),
+  getMedicalDiagnostics: (params?: PaginationParams) => getListPage<MedicalDiagnostic>('/medical-diagnostics/', params),
   getMedicalDiagnosticById: (id: number) => api.get<MedicalDiagnostic>(`/medical-diagnostics/${id}/`),
   createMedicalDiagnostic: (data: Partial<MedicalDiagnostic>) => api.post<MedicalDiagnostic>('/medical-diagnostics/', data),
   updateMedicalDiagnostic: (id: number, data: Partial<MedicalDiagnostic>) => api.put<MedicalDiagnostic>(`/medical-diagnostics/${id}/`, data),
@@ -923,7 +1070,7 @@ export const apiService = {
   getRecentMedicalDiagnostics: () => api.get<MedicalDiagnostic[]>('/medical-diagnostics/recent/'),
 
   // Vendors
-  getVendors: (params?: PaginationParams) => api.get<PaginatedResponse<Vendor>>('/vendors/', { params }),
+  getVendors: (params?: PaginationParams) => getListPage<Vendor>('/vendors/', params),
   getVendorById: (id: number) => api.get<Vendor>(`/vendors/${id}/`),
   createVendor: (data: Partial<Vendor>) => api.post<Vendor>('/vendors/', data),
   updateVendor: (id: number, data: Partial<Vendor>) => api.put<Vendor>(`/vendors/${id}/`, data),
@@ -932,7 +1079,7 @@ export const apiService = {
   getVendorsByType: (type: string) => api.get<Vendor[]>(`/vendors/by_type/?type=${type}`),
 
   // Customers
-  getCustomers: (params?: PaginationParams) => api.get<PaginatedResponse<Customer>>('/customers/', { params }),
+  getCustomers: (params?: PaginationParams) => getListPage<Customer>('/customers/', params),
   getCustomerById: (id: number) => api.get<Customer>(`/customers/${id}/`),
   createCustomer: (data: Partial<Customer>) => api.post<Customer>('/customers/', data),
   updateCustomer: (id: number, data: Partial<Customer>) => api.put<Customer>(`/customers/${id}/`, data),
@@ -941,7 +1088,7 @@ export const apiService = {
   getCustomersByType: (type: string) => api.get<Customer[]>(`/customers/by_type/?type=${type}`),
 
   // Item Services
-  getItemServices: (params?: PaginationParams) => api.get<PaginatedResponse<ItemService>>('/item-services/', { params }),
+  getItemServices: (params?: PaginationParams) => getListPage<ItemService>('/item-services/', params),
   getItemServiceById: (id: number) => api.get<ItemService>(`/item-services/${id}/`),
   createItemService: (data: Partial<ItemService>) => api.post<ItemService>('/item-services/', data),
   updateItemService: (id: number, data: Partial<ItemService>) => api.put<ItemService>(`/item-services/${id}/`, data),